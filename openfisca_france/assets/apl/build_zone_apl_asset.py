@@ -0,0 +1,62 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Build the binary asset zone_apl_by_depcom.npz (sorted depcom codes and their APL zone) used by the zone_apl formula,
+from 20110914_zonage.csv and commune_depcom_by_subcommune_depcom.json.
+"""
+
+
+import argparse
+import logging
+import os
+import sys
+
+import numpy as np
+
+from openfisca_france.model.lgtm import build_zone_apl_arrays
+
+
+app_name = os.path.splitext(os.path.basename(__file__))[0]
+log = logging.getLogger(app_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('-o', '--output', default = os.path.join(os.path.dirname(__file__), 'zone_apl_by_depcom.npz'),
+        help = u"path of the generated asset")
+    parser.add_argument('-v', '--verbose', action = 'store_true', default = False, help = u"increase output verbosity")
+    args = parser.parse_args()
+    logging.basicConfig(level = logging.DEBUG if args.verbose else logging.WARNING)
+
+    depcoms, zones = build_zone_apl_arrays()
+    np.savez_compressed(args.output, depcoms = depcoms, zones = zones)
+    log.info(u'{} depcom codes written to {}'.format(len(depcoms), args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
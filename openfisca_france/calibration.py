@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import logging
+import time
+
+import numpy as np
+from scipy import sparse
+
+
+log = logging.getLogger(__name__)
+RATIO_QUANTILES = (0, 1, 5, 10, 25, 50, 75, 90, 95, 99, 100)
+
+
+def build_design_matrix(margins, values_by_name, count):
+    '''
+    Construit la matrice creuse des variables de calage (une ligne par ménage) et le vecteur des marges
+
+    margins associe à chaque variable soit un total (variable numérique), soit un dictionnaire donnant le total de
+    chaque modalité (variable catégorielle). values_by_name associe à chaque variable un couple (index, valeurs) : le
+    ménage de chaque observation et sa valeur. Une variable des ménages a une observation par ménage, une variable
+    des individus une observation par individu.
+    Renvoie la matrice, les marges et le libellé (variable, modalité) de chaque colonne.
+    '''
+    columns = []
+    rows = []
+    data = []
+    labels = []
+    targets = []
+    for name, margin in sorted(margins.iteritems()):
+        index, values = values_by_name[name]
+        if isinstance(margin, dict):
+            for category, target in sorted(margin.iteritems()):
+                is_category = values == category
+                rows.append(index[is_category])
+                columns.append(np.repeat(len(labels), is_category.sum()))
+                data.append(np.ones(is_category.sum()))
+                labels.append((name, category))
+                targets.append(target)
+            unknown_categories = set(np.unique(values)) - set(margin)
+            if unknown_categories:
+                log.info(u'Categories {} of {} have no margin'.format(sorted(unknown_categories), name))
+        else:
+            rows.append(index)
+            columns.append(np.repeat(len(labels), len(index)))
+            data.append(np.asarray(values, dtype = float))
+            labels.append((name, None))
+            targets.append(margin)
+    design_matrix = sparse.coo_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(columns))),
+        shape = (count, len(labels)),
+        ).tocsr()
+    return design_matrix, np.array(targets, dtype = float), labels
+
+
+def calibrate(initial_weights, design_matrix, targets, bounds = None, max_iterations = 50, method = 'raking',
+        tolerance = 1e-6):
+    '''
+    Calcule les poids calés les plus proches des poids initiaux qui respectent les marges
+
+    Les poids calés valent initial_weights * F(design_matrix . lambda), où F dépend de la méthode (linear, raking ou
+    logit) et où lambda est obtenu par la méthode de Newton. bounds = (bas, haut) borne le rapport des poids calés
+    aux poids initiaux : il est obligatoire pour logit et tronque la méthode linéaire.
+    Renvoie les poids calés et un rapport sur le calage.
+    '''
+    assert method in ('linear', 'logit', 'raking'), method
+    assert method != 'logit' or bounds is not None, 'Method logit requires bounds'
+    start_time = time.time()
+    initial_weights = np.asarray(initial_weights, dtype = float)
+    transposed_design_matrix = design_matrix.T.tocsr()
+    scale = np.maximum(np.abs(targets), 1)
+    lambda_ = np.zeros(design_matrix.shape[1])
+    converged = False
+    for iteration in xrange(max_iterations + 1):
+        ratio, ratio_derivative = calculate_ratio(design_matrix.dot(lambda_), bounds = bounds, method = method)
+        residuals = transposed_design_matrix.dot(initial_weights * ratio) - targets
+        if (np.abs(residuals) / scale).max() < tolerance:
+            converged = True
+            break
+        if iteration == max_iterations:
+            break
+        jacobian = transposed_design_matrix.dot(
+            sparse.diags(initial_weights * ratio_derivative, 0).dot(design_matrix)).toarray()
+        # Categorical margins are collinear (their categories share the same total): use a least-squares step.
+        lambda_ -= np.linalg.lstsq(jacobian, residuals, rcond = -1)[0]
+
+    report = dict(
+        converged = converged,
+        iterations = iteration,
+        max_relative_error = float((np.abs(residuals) / scale).max()),
+        ratio_quantiles = dict(zip(RATIO_QUANTILES, np.percentile(ratio, RATIO_QUANTILES))),
+        seconds = time.time() - start_time,
+        )
+    if converged:
+        log.info(u'Calibration converged in {iterations} iterations and {seconds:.3f} s'.format(**report))
+    else:
+        log.warning(u'Calibration did not converge after {iterations} iterations: max relative error '
+            u'{max_relative_error}'.format(**report))
+    return initial_weights * ratio, report
+
+
+def calculate_ratio(u, bounds = None, method = 'raking'):
+    '''
+    Renvoie la fonction de calage F(u) de la méthode et sa dérivée
+    '''
+    if method == 'raking':
+        ratio = np.exp(u)
+        return ratio, ratio
+    if method == 'linear':
+        ratio = 1 + u
+        if bounds is None:
+            return ratio, np.ones_like(u)
+        low, up = bounds
+        return np.clip(ratio, low, up), 1.0 * ((low < ratio) & (ratio < up))
+    low, up = bounds
+    assert low < 1 < up, bounds
+    a = (up - low) / ((1 - low) * (up - 1))
+    exp_au = np.exp(np.minimum(a * u, 700))
+    denominator = (up - 1) + (1 - low) * exp_au
+    ratio = (low * (up - 1) + up * (1 - low) * exp_au) / denominator
+    ratio_derivative = a * (1 - low) * (up - 1) * (up - low) * exp_au / denominator ** 2
+    return ratio, ratio_derivative
+
+
+def calibrate_simulation(simulation, margins, weight_column_name_by_entity_symbol, **kwargs):
+    '''
+    Cale les poids des ménages d'une simulation d'enquête et en déduit ceux des autres entités
+
+    Les marges portent sur des variables des ménages (typmen15, nbinde...) ou des individus (ageq...). Les poids des
+    familles, foyers fiscaux et individus sont multipliés par le rapport de calage du ménage de leur tête.
+    Renvoie le rapport de calage.
+    '''
+    menages = simulation.entity_by_key_singular['menage']
+    persons = simulation.persons
+    idmen = persons.holder_by_name[menages.index_for_person_variable_name].array
+    values_by_name = {}
+    for name in margins:
+        entity = simulation.get_or_new_holder(name).entity
+        values = simulation.calculate(name)
+        if entity is menages:
+            values_by_name[name] = (np.arange(menages.count), values)
+        else:
+            assert entity is persons, u'Margins on variable {} of entity {} are not supported'.format(name,
+                entity.key_plural)
+            values_by_name[name] = (idmen, values)
+    design_matrix, targets, _ = build_design_matrix(margins, values_by_name, menages.count)
+
+    weight_holder = simulation.get_or_new_holder(weight_column_name_by_entity_symbol[menages.symbol])
+    initial_weights = simulation.calculate(weight_holder.column.name)
+    weights, report = calibrate(initial_weights, design_matrix, targets, **kwargs)
+    ratio = weights / np.where(initial_weights == 0, 1, initial_weights)
+
+    weight_holder.array = weights.astype(weight_holder.column.dtype)
+    person_ratio = ratio[idmen]
+    for entity in simulation.entity_by_key_singular.itervalues():
+        if entity is menages or entity.symbol not in weight_column_name_by_entity_symbol:
+            continue
+        holder = simulation.get_or_new_holder(weight_column_name_by_entity_symbol[entity.symbol])
+        array = simulation.calculate(holder.column.name)
+        if entity.is_persons_entity:
+            entity_ratio = person_ratio
+        else:
+            is_head = persons.holder_by_name[entity.role_for_person_variable_name].array == 0
+            # Entities without a head keep their weight.
+            entity_ratio = np.ones(entity.count)
+            entity_ratio[persons.holder_by_name[entity.index_for_person_variable_name].array[is_head]] = \
+                person_ratio[is_head]
+        holder.array = (array * entity_ratio).astype(holder.column.dtype)
+    return report
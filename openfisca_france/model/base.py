@@ -23,8 +23,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import collections
 import functools
+import weakref
 
+import numpy as np
 from openfisca_core.columns import build_column
 from openfisca_core.enumerations import Enum
 from openfisca_core.formulas import make_reference_formula_decorator
@@ -36,6 +39,71 @@ QUIFAM = Enum(['chef', 'part', 'enf1', 'enf2', 'enf3', 'enf4', 'enf5', 'enf6', '
 QUIFOY = Enum(['vous', 'conj', 'pac1', 'pac2', 'pac3', 'pac4', 'pac5', 'pac6', 'pac7', 'pac8', 'pac9'])
 QUIMEN = Enum(['pref', 'cref', 'enf1', 'enf2', 'enf3', 'enf4', 'enf5', 'enf6', 'enf7', 'enf8', 'enf9'])
 
+zero_array_by_size = {}
+zero_shortcut_calls_count_by_function_name = collections.Counter()
+zero_shortcut_hits_count_by_function_name = collections.Counter()
+projection_cache_max_bytes = None  # Default byte budget of the projection cache of new simulations (None = unbounded)
+role_mask_cache_by_entity = weakref.WeakKeyDictionary()
+
+
+class ProjectionCache(object):
+    '''
+    Cache des projections de variables entre individus et entités (split_by_roles, sum_by_entity...) d'une simulation
+
+    Les projections sont indexées par (holder, période, opération, entité, rôles, valeur par défaut). Une projection
+    est invalidée dès que le tableau du holder ou la composition des entités change. Quand max_bytes est donné, les
+    projections les moins récemment utilisées sont évincées au-delà de ce budget.
+    '''
+    bytes = 0
+    max_bytes = None
+    projection_by_key = None
+    simulation = None  # Simulation owning the cache (None for a standalone cache)
+    statistics = None
+
+    def __init__(self, max_bytes = None, simulation = None):
+        self.max_bytes = max_bytes
+        self.simulation = simulation
+        self.projection_by_key = collections.OrderedDict()
+        self.statistics = dict(evictions = 0, hits = 0, invalidations = 0, misses = 0)
+
+    def get(self, key, source_arrays):
+        projection = self.projection_by_key.pop(key, None)
+        if projection is not None:
+            if all(array is source_array for array, source_array in zip(projection[0], source_arrays)):
+                self.projection_by_key[key] = projection
+                self.statistics['hits'] += 1
+                return projection[1]
+            self.bytes -= projection[2]
+            self.statistics['invalidations'] += 1
+        self.statistics['misses'] += 1
+        return None
+
+    @property
+    def hit_rate(self):
+        requests_count = self.statistics['hits'] + self.statistics['misses']
+        return self.statistics['hits'] / float(requests_count) if requests_count else None
+
+    def invalidate(self, holder = None):
+        '''
+        Oublie les projections du holder donné, ou toutes les projections
+        '''
+        for key in self.projection_by_key.keys():
+            if holder is None or key[0] is holder:
+                self.bytes -= self.projection_by_key.pop(key)[2]
+                self.statistics['invalidations'] += 1
+
+    def set(self, key, source_arrays, projection):
+        projection_bytes = sum(array.nbytes for array in projection.itervalues()) \
+            if isinstance(projection, dict) else projection.nbytes
+        if self.max_bytes is not None and projection_bytes > self.max_bytes:
+            return
+        self.projection_by_key[key] = (source_arrays, projection, projection_bytes)
+        self.bytes += projection_bytes
+        if self.max_bytes is not None:
+            while self.bytes > self.max_bytes:
+                self.bytes -= self.projection_by_key.popitem(last = False)[1][2]
+                self.statistics['evictions'] += 1
+
 
 # Functions and decorators
 
@@ -47,3 +115,204 @@ build_column = functools.partial(
 
 
 reference_formula = make_reference_formula_decorator(entity_class_by_symbol = entities.entity_class_by_symbol)
+
+
+def is_zero_array(array):
+    '''
+    Indique si toutes les valeurs du tableau sont nulles, en temps constant pour un tableau constant
+    '''
+    if array.ndim == 1 and array.strides == (0,):
+        return array.size == 0 or not array[0]
+    return not array.any()
+
+
+def new_constant_array(count, dtype, value = 0):
+    '''
+    Renvoie un tableau en lecture seule de count valeurs égales à value, qui n'occupe la mémoire que d'une valeur
+
+    Toute opération sur ce tableau produit un tableau ordinaire : il n'est matérialisé qu'à la demande.
+    '''
+    array = np.empty(1, dtype = dtype)
+    array.fill(value)
+    array = np.lib.stride_tricks.as_strided(array, shape = (count,), strides = (0,))
+    array.flags.writeable = False
+    return array
+
+
+def get_zero_array(size):
+    array = zero_array_by_size.get(size)
+    if array is None:
+        zero_array_by_size[size] = array = new_constant_array(size, np.float32)
+    return array
+
+
+def is_each_zero_array(function_name, *arrays):
+    '''
+    Indique si tous les tableaux donnés sont nuls, en comptant les appels et les succès par formule
+
+    Sert aux formules qui valent zéro quand toutes leurs cases de déclaration (fXXX) sont nulles : elles renvoient
+    alors get_zero_array sans calculer leur corps.
+    '''
+    zero_shortcut_calls_count_by_function_name[function_name] += 1
+    for array in arrays:
+        if not is_zero_array(array):
+            return False
+    zero_shortcut_hits_count_by_function_name[function_name] += 1
+    return True
+
+
+def get_formula_entity(formula, entity = None):
+    simulation = formula.holder.entity.simulation
+    if entity is None:
+        entity = formula.holder.entity
+    else:
+        assert entity in simulation.entity_by_key_singular, u"Unknown entity: {}".format(entity).encode('utf-8')
+        entity = simulation.entity_by_key_singular[entity]
+    assert not entity.is_persons_entity
+    return entity
+
+
+def get_projection(formula, operation, array_or_dated_holder, entity, roles, default, project):
+    '''
+    Renvoie la projection du holder par l'opération donnée, depuis le cache de la simulation si elle y est à jour
+
+    project calcule la projection en cas d'absence. Les projections d'un tableau (et non d'un holder) ne sont pas
+    gardées en cache. Les tableaux gardés en cache sont en lecture seule. Quand la simulation est tracée, chaque
+    étape reçoit le nombre de projections trouvées et calculées dans projection_cache_infos.
+    '''
+    if isinstance(array_or_dated_holder, np.ndarray):
+        return project()
+    holder = getattr(array_or_dated_holder, 'holder', array_or_dated_holder)
+    simulation = holder.entity.simulation
+    period = getattr(array_or_dated_holder, 'period', None)
+    if period is None and not holder.column.is_permanent:
+        period = simulation.period
+    index_array, role_array = get_role_positions(entity)[:2]
+    source_arrays = (array_or_dated_holder.array, index_array, role_array)
+    key = (holder, period, operation, entity.key_singular, None if roles is None else tuple(roles), default)
+    projection_cache = get_projection_cache(simulation)
+    projection = projection_cache.get(key, source_arrays)
+    if simulation.stack_trace:
+        frame = simulation.stack_trace[-1]
+        projection_cache_infos = frame.get('projection_cache_infos')
+        if projection_cache_infos is None:
+            frame['projection_cache_infos'] = projection_cache_infos = dict(hits = 0, misses = 0)
+        projection_cache_infos['hits' if projection is not None else 'misses'] += 1
+    if projection is None:
+        projection = project()
+        for array in (projection.itervalues() if isinstance(projection, dict) else [projection]):
+            array.flags.writeable = False
+        projection_cache.set(key, source_arrays, projection)
+    # Copy dictionaries, so that formulas may add or remove roles without altering the cache.
+    return dict(projection) if isinstance(projection, dict) else projection
+
+
+def get_projection_cache(simulation):
+    '''
+    Renvoie le cache de projections de la simulation
+
+    Il est gardé sur la simulation elle-même, et non dans un registre du module, pour être libéré avec elle : ses clés
+    référencent les holders de la simulation. Comme Simulation.clone copie les attributs de la simulation, un clone
+    hérite du cache de son parent : il reçoit alors son propre cache, avec le même budget.
+    '''
+    projection_cache = getattr(simulation, 'projection_cache', None)
+    if projection_cache is None or projection_cache.simulation is not simulation:
+        simulation.projection_cache = projection_cache = ProjectionCache(
+            max_bytes = projection_cache_max_bytes if projection_cache is None else projection_cache.max_bytes,
+            simulation = simulation,
+            )
+    return projection_cache
+
+
+def get_role_matrix(formula, array_or_dated_holder, default = None, entity = None, roles = None):
+    '''
+    Répartit un tableau d'individus dans une matrice (entités × rôles) : équivalent matriciel de split_by_roles
+
+    Les cellules sans individu valent default (la valeur par défaut de la colonne pour un holder, 0 pour un tableau),
+    si bien que les réductions selon l'axe 1 ignorent les rôles vacants comme le faisaient les boucles sur les rôles.
+    Pour un holder, la matrice complète est gardée dans le cache de projections de la simulation. Pour une liste de
+    rôles consécutifs, le résultat est une vue de cette matrice.
+    '''
+    entity = get_formula_entity(formula, entity)
+    index_array, role_array, mask = get_role_positions(entity)
+    if isinstance(array_or_dated_holder, np.ndarray):
+        array = array_or_dated_holder
+        assert array.size == index_array.size, u"Expected an array of size {}. Got: {}".format(index_array.size,
+            array.size)
+        if default is None:
+            default = 0
+    else:
+        array = array_or_dated_holder.array
+        if default is None:
+            default = array_or_dated_holder.column.default
+    matrix = get_projection(formula, 'role_matrix', array_or_dated_holder, entity, None, default,
+        lambda: new_role_matrix(array, default, index_array, mask.shape, role_array))
+    return select_roles(matrix, roles)
+
+
+def get_role_positions(entity):
+    '''
+    Renvoie les tableaux d'index et de rôles des individus dans l'entité, et la matrice des rôles occupés
+
+    La matrice est gardée en cache par entité tant que les tableaux d'index et de rôles des individus ne changent pas.
+    '''
+    persons = entity.simulation.persons
+    index_array = persons.holder_by_name[entity.index_for_person_variable_name].array
+    role_array = persons.holder_by_name[entity.role_for_person_variable_name].array
+    cache = role_mask_cache_by_entity.get(entity)
+    if cache is None or cache[0] is not index_array or cache[1] is not role_array:
+        # Comme split_by_roles, prévoit toujours au moins 11 rôles.
+        roles_count = max(entity.roles_count, 11, role_array.max() + 1 if role_array.size else 0)
+        mask = np.zeros((entity.count, roles_count), dtype = bool)
+        mask[index_array, role_array] = True
+        mask.flags.writeable = False
+        role_mask_cache_by_entity[entity] = cache = (index_array, role_array, mask)
+    return cache
+
+
+def new_role_matrix(array, default, index_array, shape, role_array):
+    matrix = np.empty(shape, dtype = array.dtype)
+    matrix.fill(default)
+    matrix[index_array, role_array] = array
+    return matrix
+
+
+def select_roles(matrix, roles):
+    if roles is None:
+        return matrix
+    roles = list(roles)
+    if roles and roles == range(roles[0], roles[-1] + 1):
+        return matrix[:, roles[0]:roles[-1] + 1]
+    return matrix[:, roles]
+
+
+# Cached versions of the projection methods of formulas
+
+
+def cast_from_entity_to_role(formula, array_or_dated_holder, default = None, entity = None, role = None):
+    assert isinstance(role, int)
+    return cast_from_entity_to_roles(formula, array_or_dated_holder, default = default, entity = entity,
+        roles = [role])
+
+
+def cast_from_entity_to_roles(formula, array_or_dated_holder, default = None, entity = None, roles = None):
+    source_entity = None if isinstance(array_or_dated_holder, np.ndarray) else array_or_dated_holder.entity
+    return get_projection(formula, 'cast_from_entity_to_roles', array_or_dated_holder, source_entity, roles, default,
+        lambda: formula.cast_from_entity_to_roles(array_or_dated_holder, default = default, entity = entity,
+            roles = roles))
+
+
+def filter_role(formula, array_or_dated_holder, default = None, entity = None, role = None):
+    return get_projection(formula, 'filter_role', array_or_dated_holder, get_formula_entity(formula, entity), [role],
+        default, lambda: formula.filter_role(array_or_dated_holder, default = default, entity = entity, role = role))
+
+
+def split_by_roles(formula, array_or_dated_holder, default = None, entity = None, roles = None):
+    return get_projection(formula, 'split_by_roles', array_or_dated_holder, get_formula_entity(formula, entity), roles,
+        default, lambda: formula.split_by_roles(array_or_dated_holder, default = default, entity = entity,
+            roles = roles))
+
+
+def sum_by_entity(formula, array_or_dated_holder, entity = None, roles = None):
+    return get_projection(formula, 'sum_by_entity', array_or_dated_holder, get_formula_entity(formula, entity), roles,
+        None, lambda: formula.sum_by_entity(array_or_dated_holder, entity = entity, roles = roles))
@@ -8,15 +8,46 @@
 
 from __future__ import division
 
-from numpy import  floor, arange, array, where
+from numpy import  floor, arange, array, bincount, minimum as min_, where
 
-from .base import QUIMEN
+from .base import QUIMEN, filter_role, split_by_roles
 
 
 PREF = QUIMEN['pref']
 CREF = QUIMEN['cref']
 ENFS = [QUIMEN['enf1'], QUIMEN['enf2'], QUIMEN['enf3'], QUIMEN['enf4'], QUIMEN['enf5'], QUIMEN['enf6'], QUIMEN['enf7'], QUIMEN['enf8'], QUIMEN['enf9'], ]
 
+# typmen15 des ménages non complexes, selon min(nbinde, 3), cohab, act_cpl et la présence d'enfants actifs
+TYPMEN15_BY_CATEGORY = array([
+    # Aucun individu
+    [[[0, 0], [0, 0], [0, 0]], [[0, 0], [0, 0], [0, 0]]],
+    # Une personne : seule (active ou inactive)
+    [[[2, 2], [1, 1], [0, 0]], [[0, 0], [0, 0], [0, 0]]],
+    # Deux personnes : famille monoparentale ou couple sans enfant
+    [[[5, 4], [3, 3], [0, 0]], [[8, 8], [6, 6], [7, 7]]],
+    # Trois personnes et plus : famille monoparentale ou couple avec enfant
+    [[[5, 4], [3, 3], [0, 0]], [[12, 11], [9, 9], [10, 10]]],
+    ])
+# typmen15 des ménages complexes, selon le nombre d'actifs (plafonné à 2)
+TYPMEN15_COMPLEXE_BY_NB_ACT = array([15, 13, 14])
+
+
+def count_by_menage(self, condition):
+    '''
+    Compte, pour chaque ménage, les individus qui vérifient la condition, en une seule passe sur les individus
+    '''
+    menages = self.holder.entity
+    idmen = menages.simulation.persons.holder_by_name[menages.index_for_person_variable_name].array
+    return bincount(idmen[condition], minlength = menages.count)
+
+
+def get_quimen(self):
+    '''
+    Renvoie le rôle de chaque individu dans son ménage
+    '''
+    menages = self.holder.entity
+    return menages.simulation.persons.holder_by_name[menages.role_for_person_variable_name].array
+
 
 def _nbinde(self, agem_holder):
     """
@@ -24,13 +55,8 @@ def _nbinde(self, agem_holder):
     'men'
     Values range between 1 and 6 for 6 members or more
     """
-    agem = self.split_by_roles(agem_holder)
-
-    n1 = 0
-    for ind in agem.iterkeys():
-        n1 += 1 * (floor(agem[ind]) >= 0)
-    n2 = where(n1 >= 6, 6, n1)
-    return n2
+    n1 = count_by_menage(self, floor(agem_holder.array) >= 0)
+    return min_(n1, 6)
 
 
 def _ageq(agem):
@@ -61,14 +87,9 @@ def _nb_ageq0(self, agem_holder):
     Calcule le nombre d'individus dans chaque tranche d'âge quinquennal (voir ageq)
     'men'
     '''
-    agem = self.split_by_roles(agem_holder)
-
     ag1 = 0
-    nb = 0
-    for agm in agem.itervalues():
-        age = floor(agm / 12)
-        nb += (ag1 <= age) & (age <= (ag1 + 4))
-    return nb
+    age = floor(agem_holder.array / 12)
+    return count_by_menage(self, (ag1 <= age) & (age <= (ag1 + 4)))
 
 
 def _cohab(self, quimen_holder):
@@ -76,7 +97,7 @@ def _cohab(self, quimen_holder):
     Indicatrice de vie en couple
     'men'
     '''
-    quimen = self.filter_role(quimen_holder, role = CREF)
+    quimen = filter_role(self, quimen_holder, role = CREF)
 
     return quimen == 1
 
@@ -86,7 +107,7 @@ def _act_cpl(self, activite_holder, cohab):
     Nombre d'actifs parmi la personne de référence et son conjoint
     'men'
     '''
-    activite = self.split_by_roles(activite_holder, roles = [PREF, CREF])
+    activite = split_by_roles(self, activite_holder, roles = [PREF, CREF])
 
     return 1 * (activite[PREF] <= 1) + 1 * (activite[CREF] <= 1) * cohab
 
@@ -96,12 +117,8 @@ def _act_enf(self, activite_holder):
     Nombre de membres actifs du ménage autre que la personne de référence ou son conjoint
     'men'
     '''
-    activite = self.split_by_roles(activite_holder, roles = ENFS)
-
-    res = 0
-    for act in activite.itervalues():
-        res += 1 * (act <= 1)
-    return res
+    quimen = get_quimen(self)
+    return count_by_menage(self, (activite_holder.array <= 1) & (quimen >= ENFS[0]) & (quimen <= ENFS[-1]))
 
 
 def _nb_act(act_cpl, act_enf):
@@ -120,16 +137,9 @@ def _cplx(self, quifam_holder, quimen_holder, age_holder):
 
     Un ménage est complexe si les personnes autres que la personne de référence ou son conjoint ne sont pas enfants.
     """
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    quifam = self.split_by_roles(quifam_holder, roles = ENFS)
-    quimen = self.split_by_roles(quimen_holder, roles = ENFS)
-
-    # TODO problème avec les ENFS qui n'existent pas: leur quifam = 0
-    # On contourne en utilisant le fait que leur quimen = 0 également
-    res = 0
-    from itertools import izip
-    for quif, quim, age_i in izip(quifam.itervalues(), quimen.itervalues(), age.itervalues()):
-        res += 1 * (quif == 0) * (quim != 0) + age_i > 25
+    quimen = quimen_holder.array
+    est_enf = (quimen >= ENFS[0]) & (quimen <= ENFS[-1])
+    res = count_by_menage(self, est_enf & (1 * (quifam_holder.array == 0) + age_holder.array > 25))
 
     return (res > 0.5)
     # En fait on ne peut pas car on n'a les enfants qu'au sens des allocations familiales ...
@@ -156,23 +166,11 @@ def _typmen15(nbinde, cohab, act_cpl, cplx, act_enf):
     15 Autres ménages, tous inactifs
     'men'
     '''
-    res = 0 + (cplx == 0) * (
-            1 * ((nbinde == 1) & (cohab == 0) & (act_cpl == 1)) +  #  Personne seule active
-            2 * ((nbinde == 1) & (cohab == 0) & (act_cpl == 0)) +  # Personne seule inactive
-            3 * ((nbinde > 1) & (cohab == 0) & (act_cpl == 1)) +  # Familles monoparentales, parent actif
-            4 * ((nbinde > 1) & (cohab == 0) & (act_cpl == 0) & (act_enf >= 1)) +  # Familles monoparentales, parent inactif et au moins un enfant actif
-            5 * ((nbinde > 1) & (cohab == 0) & (act_cpl == 0) & (act_enf == 0)) +  # Familles monoparentales, tous inactifs
-            6 * ((nbinde == 2) & (cohab == 1) & (act_cpl == 1)) +  # Couples sans enfant, 1 actif
-            7 * ((nbinde == 2) & (cohab == 1) & (act_cpl == 2)) +  # Couples sans enfant, 2 actifs
-            8 * ((nbinde == 2) & (cohab == 1) & (act_cpl == 0)) +  # Couples sans enfant, tous inactifs
-            9 * ((nbinde > 2) & (cohab == 1) & (act_cpl == 1)) +  # Couples avec enfant, 1 membre du couple actif
-            10 * ((nbinde > 2) & (cohab == 1) & (act_cpl == 2)) +  # Couples avec enfant, 2 membres du couple actif
-            11 * ((nbinde > 2) & (cohab == 1) & (act_cpl == 0) & (act_enf >= 1)) +  # Couples avec enfant, couple inactif et au moins un enfant actif
-            12 * ((nbinde > 2) & (cohab == 1) & (act_cpl == 0) & (act_enf == 0))  # Couples avec enfant, tous inactifs
-                           ) + (cplx == 1) * (
-            13 * (((act_cpl + act_enf) == 1)) +  # Autres ménages, 1 actif
-            14 * (((act_cpl + act_enf) > 1)) +  # Autres ménages, 2 actifs ou plus
-            15 * (((act_cpl + act_enf) == 0)))  # Autres ménages, tous inactifs
+    res = where(
+        cplx,
+        TYPMEN15_COMPLEXE_BY_NB_ACT[min_(act_cpl + act_enf, 2)],
+        TYPMEN15_BY_CATEGORY[min_(nbinde, 3), 1 * cohab, min_(act_cpl, 2), 1 * (act_enf >= 1)],
+        )
 
 #    ratio = (( (typmen15!=res)).sum())/((typmen15!=0).sum())
     # print ratio  2.7 % d'erreurs enfant non nés et erreur d'enfants
@@ -8,10 +8,10 @@
 
 from __future__ import division
 
-from numpy import (zeros, maximum as max_, minimum as min_, logical_not as not_)
+from numpy import (maximum as max_, minimum as min_, logical_not as not_)
 from openfisca_core.accessors import law
 
-from .base import QUIFAM, QUIFOY
+from .base import QUIFAM, QUIFOY, cast_from_entity_to_roles, filter_role, get_role_matrix, split_by_roles
 
 
 CHEF = QUIFAM['chef']
@@ -25,7 +25,7 @@ def _acs_montant__2009(self, age_holder):
     Calcule le montant de l'ACS en cas d'éligibilité (jusqu'au 31 juillet 2009)
     '''
     # TODO
-    ages = self.filter_role(age_holder, role = CHEF)
+    ages = filter_role(self, age_holder, role = CHEF)
     return 0*ages
 
 
@@ -33,8 +33,8 @@ def _acs_montant_2009_(self, age_holder, P = law.cmu):
     '''
     Calcule le montant de l'ACS en cas d'éligibilité (à compter du 1 août 2009)
     '''
-    ages_couple = self.split_by_roles(age_holder, roles = [CHEF, PART])
-    ages_pac = self.split_by_roles(age_holder, roles = ENFS)
+    ages_couple = get_role_matrix(self, age_holder, roles = [CHEF, PART])
+    ages_pac = get_role_matrix(self, age_holder, roles = ENFS)
     return 12 * ((nb_par_age(ages_couple, 0, 15) + nb_par_age(ages_pac, 0, 15)) * P.acs_moins_16_ans +
        (nb_par_age(ages_couple, 16, 49) + nb_par_age(ages_pac, 16, 25)) * P.acs_16_49_ans +
        nb_par_age(ages_couple, 50, 59) * P.acs_50_59_ans +
@@ -92,18 +92,18 @@ def _cmu_br(self, so_holder, apl_holder, als_holder, alf_holder, cmu_forfait_log
     '''
     Calcule la base de ressources du foyer CMU
     '''
-    so = self.cast_from_entity_to_roles(so_holder)
-    so = self.filter_role(so, role = CHEF)
-    apl = self.cast_from_entity_to_roles(apl_holder)
-    apl = self.filter_role(apl, role = CHEF)
-    als = self.cast_from_entity_to_roles(als_holder)
-    als = self.filter_role(als, role = CHEF)
-    alf = self.cast_from_entity_to_roles(alf_holder)
-    alf = self.filter_role(alf, role = CHEF)
+    so = cast_from_entity_to_roles(self, so_holder)
+    so = filter_role(self, so, role = CHEF)
+    apl = cast_from_entity_to_roles(self, apl_holder)
+    apl = filter_role(self, apl, role = CHEF)
+    als = cast_from_entity_to_roles(self, als_holder)
+    als = filter_role(self, als, role = CHEF)
+    alf = cast_from_entity_to_roles(self, alf_holder)
+    alf = filter_role(self, alf, role = CHEF)
 
-    cmu_br_i_par = self.split_by_roles(cmu_br_i_holder, roles = [CHEF, PART])
-    cmu_br_i_pac = self.split_by_roles(cmu_br_i_holder, roles = ENFS)
-    age_pac = self.split_by_roles(cmu_br_i_holder, roles = ENFS)
+    cmu_br_i_par = split_by_roles(self, cmu_br_i_holder, roles = [CHEF, PART])
+    cmu_br_i_pac = split_by_roles(self, cmu_br_i_holder, roles = ENFS)
+    age_pac = split_by_roles(self, cmu_br_i_holder, roles = ENFS)
 
     res = (cmu_br_i_par[CHEF] + cmu_br_i_par[PART] +
         ((so == 2) + (so == 6)) * cmu_forfait_logement_base +
@@ -118,7 +118,7 @@ def _cmu_nb_pac(self, age_holder, P = law.cmu):
     '''
     Calcule de nombre d'enfants / personnes à charge à comptabiliser dans la famille CMU
     '''
-    ages = self.split_by_roles(age_holder, roles = ENFS)
+    ages = get_role_matrix(self, age_holder, roles = ENFS)
     return nb_par_age(ages, 0, P.age_limite_pac)
 
 
@@ -142,12 +142,10 @@ def _acs(cmu_c, acs_plafond, cmu_br, acs_montant):
 def nb_par_age(ages, min, max):
     '''
     Calcule le nombre d'individus ayant un âge compris entre min et max
+
+    ages est une matrice (familles × rôles) produite par get_role_matrix.
     '''
-    res = None
-    for key, age in ages.iteritems():
-        if res is None: res = zeros(len(age))
-        res += (min <= age) & (age <= max)
-    return res
+    return ((min <= ages) & (ages <= max)).sum(axis = 1)
 
 
 def rsa_socle_base(nbp, P):
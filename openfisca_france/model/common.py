@@ -27,7 +27,7 @@ from __future__ import division
 
 from numpy import floor, logical_not as not_
 
-from .base import QUIFAM, QUIFOY
+from .base import QUIFAM, QUIFOY, cast_from_entity_to_role, split_by_roles, sum_by_entity
 
 CHEF = QUIFAM['chef']
 ENFS = [QUIFAM['enf{}'.format(i)] for i in range(1, 10)]
@@ -40,7 +40,7 @@ def _uc(self, agem_holder):
     Calcule le nombre d'unités de consommation du ménage avec l'échelle de l'insee
     'men'
     '''
-    agem = self.split_by_roles(agem_holder)
+    agem = split_by_roles(self, agem_holder)
 
     uc_adt = 0.5
     uc_enf = 0.3
@@ -59,10 +59,10 @@ def _typ_men(self, isol_holder, af_nbenf_holder):
     'men'
     TODO: prendre les enfants du ménages et non ceux de la famille
     '''
-    af_nbenf = self.cast_from_entity_to_role(af_nbenf_holder, role = CHEF)
-    af_nbenf = self.sum_by_entity(af_nbenf)
-    isol = self.cast_from_entity_to_role(isol_holder, role = CHEF)
-    isol = self.sum_by_entity(isol)
+    af_nbenf = cast_from_entity_to_role(self, af_nbenf_holder, role = CHEF)
+    af_nbenf = sum_by_entity(self, af_nbenf)
+    isol = cast_from_entity_to_role(self, isol_holder, role = CHEF)
+    isol = sum_by_entity(self, isol)
 
     _0_kid = af_nbenf == 0
     _1_kid = af_nbenf == 1
@@ -84,13 +84,13 @@ def _revdisp(self, rev_trav_holder, pen_holder, rev_cap_holder, psoc_holder, ppe
     Revenu disponible - ménage
     'men'
     '''
-    pen = self.sum_by_entity(pen_holder)
-    ppe = self.cast_from_entity_to_role(ppe_holder, role = VOUS)
-    ppe = self.sum_by_entity(ppe)
-    psoc = self.cast_from_entity_to_role(psoc_holder, role = CHEF)
-    psoc = self.sum_by_entity(psoc)
-    rev_cap = self.sum_by_entity(rev_cap_holder)
-    rev_trav = self.sum_by_entity(rev_trav_holder)
+    pen = sum_by_entity(self, pen_holder)
+    ppe = cast_from_entity_to_role(self, ppe_holder, role = VOUS)
+    ppe = sum_by_entity(self, ppe)
+    psoc = cast_from_entity_to_role(self, psoc_holder, role = CHEF)
+    psoc = sum_by_entity(self, psoc)
+    rev_cap = sum_by_entity(self, rev_cap_holder)
+    rev_trav = sum_by_entity(self, rev_trav_holder)
 
     return rev_trav + pen + rev_cap + psoc + ppe + impo
 
@@ -108,7 +108,7 @@ def _revnet(self, rev_trav, pen, rev_cap):
     Revenu net du ménage
     'men'
     '''
-    return self.sum_by_entity(rev_trav + pen + rev_cap)
+    return sum_by_entity(self, rev_trav + pen + rev_cap)
 
 
 def _nivvie_net(revnet, uc):
@@ -124,7 +124,7 @@ def _revini(self, rev_trav, pen, rev_cap, cotpat_contrib, cotsal_contrib):
     Revenu initial du ménage
     'men'
     '''
-    return self.sum_by_entity(rev_trav + pen + rev_cap - cotpat_contrib - cotsal_contrib)
+    return sum_by_entity(self, rev_trav + pen + rev_cap - cotpat_contrib - cotsal_contrib)
 
 
 def _nivvie_ini(revini, uc):
@@ -177,10 +177,10 @@ def _rev_cap(self, fon_holder, rev_cap_bar_holder, cotsoc_bar, rev_cap_lib_holde
     '''
     Revenus du patrimoine
     '''
-    fon = self.cast_from_entity_to_role(fon_holder, role = VOUS)
-    imp_lib = self.cast_from_entity_to_role(imp_lib_holder, role = VOUS)
-    rev_cap_bar = self.cast_from_entity_to_role(rev_cap_bar_holder, role = VOUS)
-    rev_cap_lib = self.cast_from_entity_to_role(rev_cap_lib_holder, role = VOUS)
+    fon = cast_from_entity_to_role(self, fon_holder, role = VOUS)
+    imp_lib = cast_from_entity_to_role(self, imp_lib_holder, role = VOUS)
+    rev_cap_bar = cast_from_entity_to_role(self, rev_cap_bar_holder, role = VOUS)
+    rev_cap_lib = cast_from_entity_to_role(self, rev_cap_lib_holder, role = VOUS)
 
     return fon + rev_cap_bar + cotsoc_bar + rev_cap_lib + cotsoc_lib + imp_lib + rac
 
@@ -203,8 +203,8 @@ def _mini(self, aspa, aah_holder, caah_holder, asi, rsa, aefa, api, ass, psa):
     '''
     Minima sociaux
     '''
-    aah = self.sum_by_entity(aah_holder)
-    caah = self.sum_by_entity(caah_holder)
+    aah = sum_by_entity(self, aah_holder)
+    caah = sum_by_entity(self, caah_holder)
 
     return aspa + aah + caah + asi + rsa + aefa + api + ass + psa
 
@@ -220,8 +220,8 @@ def _impo(self, irpp_holder, tax_hab):
     '''
     Impôts directs
     '''
-    irpp = self.cast_from_entity_to_role(irpp_holder, role = VOUS)
-    irpp = self.sum_by_entity(irpp)
+    irpp = cast_from_entity_to_role(self, irpp_holder, role = VOUS)
+    irpp = sum_by_entity(self, irpp)
 
     return irpp + tax_hab
 
@@ -231,12 +231,12 @@ def _crds(self, crdssal, crdsrst, crdscho, crds_fon_holder, crds_cap_bar, crds_c
     '''
     Contribution au remboursement de la dette sociale
     '''
-    crds_fon = self.cast_from_entity_to_role(crds_fon_holder, role = VOUS)
-    crds_lgtm = self.cast_from_entity_to_role(crds_lgtm_holder, role = CHEF)
-    crds_mini = self.cast_from_entity_to_role(crds_mini_holder, role = CHEF)
-    crds_pfam = self.cast_from_entity_to_role(crds_pfam_holder, role = CHEF)
-    crds_pv_immo = self.cast_from_entity_to_role(crds_pv_immo_holder, role = VOUS)
-    crds_pv_mo = self.cast_from_entity_to_role(crds_pv_mo_holder, role = VOUS)
+    crds_fon = cast_from_entity_to_role(self, crds_fon_holder, role = VOUS)
+    crds_lgtm = cast_from_entity_to_role(self, crds_lgtm_holder, role = CHEF)
+    crds_mini = cast_from_entity_to_role(self, crds_mini_holder, role = CHEF)
+    crds_pfam = cast_from_entity_to_role(self, crds_pfam_holder, role = CHEF)
+    crds_pv_immo = cast_from_entity_to_role(self, crds_pv_immo_holder, role = VOUS)
+    crds_pv_mo = cast_from_entity_to_role(self, crds_pv_mo_holder, role = VOUS)
 
     return (crdssal + crdsrst + crdscho +
             crds_fon + crds_cap_bar + crds_cap_lib + crds_pv_mo + crds_pv_immo +
@@ -248,9 +248,9 @@ def _csg(self, csgsali, csgsald, csgchoi, csgchod, csgrsti, csgrstd, csg_fon_hol
     """
     Contribution sociale généralisée
     """
-    csg_fon = self.cast_from_entity_to_role(csg_fon_holder, role = VOUS)
-    csg_pv_immo = self.cast_from_entity_to_role(csg_pv_immo_holder, role = VOUS)
-    csg_pv_mo = self.cast_from_entity_to_role(csg_pv_mo_holder, role = VOUS)
+    csg_fon = cast_from_entity_to_role(self, csg_fon_holder, role = VOUS)
+    csg_pv_immo = cast_from_entity_to_role(self, csg_pv_immo_holder, role = VOUS)
+    csg_pv_mo = cast_from_entity_to_role(self, csg_pv_mo_holder, role = VOUS)
 
     return (csgsali + csgsald + csgchoi + csgchod + csgrsti + csgrstd +
             csg_fon + csg_cap_lib + csg_pv_mo + csg_pv_immo + csg_cap_bar)
@@ -268,38 +268,38 @@ def _prelsoc_cap(self, prelsoc_fon_holder, prelsoc_cap_lib, prelsoc_cap_bar, pre
     """
     Prélèvements sociaux sur les revenus du capital
     """
-    prelsoc_fon = self.cast_from_entity_to_role(prelsoc_fon_holder, role = VOUS)
-    prelsoc_pv_immo = self.cast_from_entity_to_role(prelsoc_pv_immo_holder, role = VOUS)
-    prelsoc_pv_mo = self.cast_from_entity_to_role(prelsoc_pv_mo_holder, role = VOUS)
+    prelsoc_fon = cast_from_entity_to_role(self, prelsoc_fon_holder, role = VOUS)
+    prelsoc_pv_immo = cast_from_entity_to_role(self, prelsoc_pv_immo_holder, role = VOUS)
+    prelsoc_pv_mo = cast_from_entity_to_role(self, prelsoc_pv_mo_holder, role = VOUS)
 
     return prelsoc_fon + prelsoc_cap_lib + prelsoc_cap_bar + prelsoc_pv_mo + prelsoc_pv_immo
 
 
 def _check_csk(self, prelsoc_cap_bar_holder, prelsoc_pv_mo_holder, prelsoc_fon_holder):
-    prelsoc_cap_bar = self.sum_by_entity(prelsoc_cap_bar_holder)
-    prelsoc_pv_mo = self.cast_from_entity_to_role(prelsoc_pv_mo_holder, role = CHEF)
-    prelsoc_pv_mo = self.sum_by_entity(prelsoc_pv_mo)
-    prelsoc_fon = self.cast_from_entity_to_role(prelsoc_fon_holder, role = CHEF)
-    prelsoc_fon = self.sum_by_entity(prelsoc_fon)
+    prelsoc_cap_bar = sum_by_entity(self, prelsoc_cap_bar_holder)
+    prelsoc_pv_mo = cast_from_entity_to_role(self, prelsoc_pv_mo_holder, role = CHEF)
+    prelsoc_pv_mo = sum_by_entity(self, prelsoc_pv_mo)
+    prelsoc_fon = cast_from_entity_to_role(self, prelsoc_fon_holder, role = CHEF)
+    prelsoc_fon = sum_by_entity(self, prelsoc_fon)
 
     return prelsoc_cap_bar + prelsoc_pv_mo + prelsoc_fon
 
 
 def _check_csg(self, csg_cap_bar_holder, csg_pv_mo_holder, csg_fon_holder):
-    csg_cap_bar = self.sum_by_entity(csg_cap_bar_holder)
-    csg_pv_mo = self.cast_from_entity_to_role(csg_pv_mo_holder, role = CHEF)
-    csg_pv_mo = self.sum_by_entity(csg_pv_mo)
-    csg_fon = self.cast_from_entity_to_role(csg_fon_holder, role = CHEF)
-    csg_fon = self.sum_by_entity(csg_fon)
+    csg_cap_bar = sum_by_entity(self, csg_cap_bar_holder)
+    csg_pv_mo = cast_from_entity_to_role(self, csg_pv_mo_holder, role = CHEF)
+    csg_pv_mo = sum_by_entity(self, csg_pv_mo)
+    csg_fon = cast_from_entity_to_role(self, csg_fon_holder, role = CHEF)
+    csg_fon = sum_by_entity(self, csg_fon)
 
     return csg_cap_bar + csg_pv_mo + csg_fon
 
 
 def _check_crds(self, crds_cap_bar_holder, crds_pv_mo_holder, crds_fon_holder):
-    crds_cap_bar = self.sum_by_entity(crds_cap_bar_holder)
-    crds_pv_mo = self.cast_from_entity_to_role(crds_pv_mo_holder, role = CHEF)
-    crds_pv_mo = self.sum_by_entity(crds_pv_mo)
-    crds_fon = self.cast_from_entity_to_role(crds_fon_holder, role = CHEF)
-    crds_fon = self.sum_by_entity(crds_fon)
+    crds_cap_bar = sum_by_entity(self, crds_cap_bar_holder)
+    crds_pv_mo = cast_from_entity_to_role(self, crds_pv_mo_holder, role = CHEF)
+    crds_pv_mo = sum_by_entity(self, crds_pv_mo)
+    crds_fon = cast_from_entity_to_role(self, crds_fon_holder, role = CHEF)
+    crds_fon = sum_by_entity(self, crds_fon)
 
     return crds_cap_bar + crds_pv_mo + crds_fon
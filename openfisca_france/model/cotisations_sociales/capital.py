@@ -13,7 +13,7 @@ import logging
 
 from openfisca_core.accessors import law
 
-from ..base import QUIFOY
+from ..base import QUIFOY, cast_from_entity_to_role
 
 
 log = logging.getLogger(__name__)
@@ -53,7 +53,7 @@ def _csg_cap_bar(self, rev_cap_bar, _P):
     '''
     Calcule la CSG sur les revenus du captial soumis au barème
     '''
-    return self.cast_from_entity_to_role(-rev_cap_bar * _P.csg.capital.glob,
+    return cast_from_entity_to_role(self, -rev_cap_bar * _P.csg.capital.glob,
         entity = 'foyer_fiscal', role = VOUS)
 
 
@@ -61,7 +61,7 @@ def _crds_cap_bar(self, rev_cap_bar, _P):
     '''
     Calcule la CRDS sur les revenus du capital soumis au barème
     '''
-    return self.cast_from_entity_to_role(-rev_cap_bar * _P.crds.capital,
+    return cast_from_entity_to_role(self, -rev_cap_bar * _P.crds.capital,
         entity = 'foyer_fiscal', role = VOUS)
 
 
@@ -71,7 +71,7 @@ def _prelsoc_cap_bar__2005(self, rev_cap_bar, _P):
     '''
     P = _P.prelsoc
     total = P.base_pat
-    return self.cast_from_entity_to_role(-rev_cap_bar * total,
+    return cast_from_entity_to_role(self, -rev_cap_bar * total,
         entity = 'foyer_fiscal', role = VOUS)
 
 def _prelsoc_cap_bar_2006_2008(self, rev_cap_bar, _P):
@@ -80,7 +80,7 @@ def _prelsoc_cap_bar_2006_2008(self, rev_cap_bar, _P):
     '''
     P = _P.prelsoc
     total = P.base_pat + P.add_pat
-    return self.cast_from_entity_to_role(-rev_cap_bar * total,
+    return cast_from_entity_to_role(self, -rev_cap_bar * total,
         entity = 'foyer_fiscal', role = VOUS)
 
 def _prelsoc_cap_bar_2009_(self, rev_cap_bar, _P):
@@ -89,7 +89,7 @@ def _prelsoc_cap_bar_2009_(self, rev_cap_bar, _P):
     '''
     P = _P.prelsoc
     total = P.base_pat + P.add_pat + P.rsa
-    return self.cast_from_entity_to_role(-rev_cap_bar * total,
+    return cast_from_entity_to_role(self, -rev_cap_bar * total,
         entity = 'foyer_fiscal', role = VOUS)
 # plus-values de valeurs mobilières
 
@@ -228,7 +228,7 @@ def _csg_cap_lib(self, rev_cap_lib, _P):
     '''
     Calcule la CSG sur les revenus du capital soumis au prélèvement libératoire
     '''
-    return self.cast_from_entity_to_role(-rev_cap_lib * _P.csg.capital.glob,
+    return cast_from_entity_to_role(self, -rev_cap_lib * _P.csg.capital.glob,
         entity = 'foyer_fiscal', role = VOUS)
 
 
@@ -237,7 +237,7 @@ def _crds_cap_lib(self, rev_cap_lib, _P):
     Calcule la CRDS sur les revenus du capital
     soumis au prélèvement libératoire
     '''
-    return self.cast_from_entity_to_role(-rev_cap_lib * _P.crds.capital,
+    return cast_from_entity_to_role(self, -rev_cap_lib * _P.crds.capital,
         entity = 'foyer_fiscal', role = VOUS)
 
 
@@ -253,7 +253,7 @@ def _prelsoc_cap_lib(self, period, rev_cap_lib, prelsoc = law.prelsoc):
         total = prelsoc.base_pat + prelsoc.add_pat
     else:
         total = prelsoc.base_pat + prelsoc.add_pat + prelsoc.rsa
-    return self.cast_from_entity_to_role(-rev_cap_lib * total, entity = 'foyer_fiscal', role = VOUS)
+    return cast_from_entity_to_role(self, -rev_cap_lib * total, entity = 'foyer_fiscal', role = VOUS)
 
 
 # TODO: non_imposabilité pour les revenus au barème
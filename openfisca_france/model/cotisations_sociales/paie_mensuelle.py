@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Paie mensuelle : cotisations sociales, CSG, CRDS et allègement Fillon calculés mois par mois
+
+Les formules de travail.py portent sur des montants annuels, avec un plafond de la sécurité sociale annualisé. Ici,
+les salaires sont donnés par mois (une matrice individus × mois) : chaque mois se voit appliquer son plafond mensuel et
+sa législation. Les mois régis par les mêmes paramètres sont évalués ensemble, en une seule passe vectorielle.
+"""
+
+
+from __future__ import division
+
+import collections
+
+from numpy import asarray, zeros
+from openfisca_core import periods
+
+from ..base import ProjectionCache
+from .preprocessing import fingerprint_legislation, get_monthly_preprocessed_nodes
+from .travail import (calc_alleg_fillon, calc_cotisations, calc_cotpat_accident, calc_cotpat_contrib,
+    calc_cotsal_contrib, calc_cotsal_noncontrib, calc_csg_crds, calc_pension_civile, calc_rafp, seuil_fds,
+    select_cotpat_main_d_oeuvre_names, select_cotpat_noncontrib_names, select_cotpat_transport_names)
+
+
+NB_HEURES_MENSUELLES = 151.67
+
+
+def calculate_monthly_payroll(year, compact_legislations, salbrut, type_sal, hsup = None, primes = None,
+        indemnite_residence = None, supp_familial_traitement = None, taille_entreprise = None,
+        taux_accident_travail = None):
+    '''
+    Calcule la paie de chaque mois de l'année
+
+    compact_legislations : législations compactes de chacun des mois (cf. get_monthly_compact_legislations)
+    salbrut, hsup, primes, indemnite_residence, supp_familial_traitement : montants mensuels (individus × mois)
+    type_sal, taille_entreprise, taux_accident_travail : valeurs par individu
+
+    Renvoie un dictionnaire donnant, pour chaque variable (cotsal, cotpat, csgsald, alleg_fillon, etc), ses montants
+    mensuels (individus × mois). Les montants annuels s'obtiennent par somme sur les mois (axis = 1).
+    '''
+    salbrut = asarray(salbrut, dtype = float)
+    count, months_count = salbrut.shape
+    assert len(compact_legislations) == months_count, \
+        "Expected {} legislations, got {}".format(months_count, len(compact_legislations))
+    monthly_arrays = [salbrut] + [
+        zeros((count, months_count)) if array is None else zeros((count, months_count)) + asarray(array)
+        for array in (hsup, primes, indemnite_residence, supp_familial_traitement)
+        ]
+    type_sal = asarray(type_sal)
+    taille_entreprise = zeros(count) if taille_entreprise is None else asarray(taille_entreprise)
+    taux_accident_travail = zeros(count) if taux_accident_travail is None else asarray(taux_accident_travail)
+
+    # Regroupe les mois ayant les mêmes paramètres, pour les évaluer en une seule passe.
+    months_by_fingerprint = collections.OrderedDict()
+    for month, compact_legislation in enumerate(compact_legislations):
+        fingerprint = fingerprint_legislation(compact_legislation.cotsoc.gen, compact_legislation.cotsoc.pat,
+            compact_legislation.cotsoc.sal, compact_legislation.cotsoc.exo_bas_sal, compact_legislation.csg.act,
+            compact_legislation.crds.act)
+        months_by_fingerprint.setdefault(fingerprint, []).append(month)
+
+    amounts_by_name = {}
+    for months in months_by_fingerprint.itervalues():
+        # Une ligne par individu et par mois du groupe, les mois d'un même individu étant contigus
+        rows = [array[:, months].ravel() for array in monthly_arrays]
+        amount_by_name = calculate_payroll(year, compact_legislations[months[0]], *rows,
+            type_sal = type_sal.repeat(len(months)),
+            taille_entreprise = taille_entreprise.repeat(len(months)),
+            taux_accident_travail = taux_accident_travail.repeat(len(months)))
+        for name, amount in amount_by_name.iteritems():
+            if name not in amounts_by_name:
+                amounts_by_name[name] = zeros((count, months_count))
+            amounts_by_name[name][:, months] = amount.reshape(count, len(months))
+    return amounts_by_name
+
+
+def calculate_payroll(year, _P, salbrut, hsup, primes, indemnite_residence, supp_familial_traitement, type_sal,
+        taille_entreprise, taux_accident_travail):
+    '''
+    Calcule la paie d'un mois, sous une même législation, pour des vecteurs de montants mensuels
+    '''
+    preprocessed_nodes = get_monthly_preprocessed_nodes(_P)
+    pat = preprocessed_nodes['cotisations_employeur_bundles'].__dict__
+    sal = preprocessed_nodes['cotisations_salarie_bundles'].__dict__
+    plaf_ss = _P.cotsoc.gen.plaf_ss
+
+    # Pension civile et retraite additionnelle de la fonction publique (salbrut est le traitement indiciaire brut)
+    cot_sal_pension_civile = calc_pension_civile(preprocessed_nodes['cotisations_salarie'].__dict__, type_sal,
+        salbrut, 'cnracl1')
+    cot_pat_pension_civile = calc_pension_civile(preprocessed_nodes['cotisations_employeur'].__dict__, type_sal,
+        salbrut, 'cnracl')
+    rafp_plaf_assiette = _P.cotsoc.sal.fonc.etat.rafp_plaf_assiette
+    cot_sal_rafp = calc_rafp(preprocessed_nodes['cotisations_salarie'].public_titulaire_etat['rafp'], type_sal,
+        salbrut, primes, supp_familial_traitement, indemnite_residence, rafp_plaf_assiette, nb_mois = 1)
+    cot_pat_rafp = calc_rafp(preprocessed_nodes['cotisations_employeur'].public_titulaire_etat['rafp'], type_sal,
+        salbrut, primes, supp_familial_traitement, indemnite_residence, rafp_plaf_assiette, nb_mois = 1)
+
+    cotsal_contrib = calc_cotsal_contrib(sal, type_sal, salbrut, hsup, primes, indemnite_residence, cot_sal_rafp,
+        cot_sal_pension_civile)
+    cotsal_noncontrib = calc_cotsal_noncontrib(sal, type_sal, salbrut, hsup, primes, indemnite_residence,
+        cot_sal_rafp, cot_sal_pension_civile, cotsal_contrib, seuil_fds(_P), nb_mois = 1)
+
+    # Les barèmes patronaux partagent une même ventilation de l'assiette entre les tranches.
+    projection_cache = ProjectionCache()
+    cotpat_contrib = calc_cotpat_contrib(pat, type_sal, salbrut, indemnite_residence, primes, cot_pat_rafp,
+        cot_pat_pension_civile, projection_cache = projection_cache)
+    cotpat_transport = calc_cotisations(pat, type_sal, salbrut, indemnite_residence, primes,
+        select_cotpat_transport_names, projection_cache = projection_cache)
+    cotpat_main_d_oeuvre = cotpat_transport + calc_cotisations(pat, type_sal, salbrut, indemnite_residence, primes,
+        select_cotpat_main_d_oeuvre_names, projection_cache = projection_cache)
+    cotpat_accident = calc_cotpat_accident(salbrut, type_sal, taux_accident_travail)
+    cotpat_noncontrib = cotpat_accident + calc_cotisations(pat, type_sal, salbrut, indemnite_residence, primes,
+        select_cotpat_noncontrib_names, projection_cache = projection_cache)
+
+    return dict(
+        alleg_fillon = calc_alleg_fillon(year, salbrut, salbrut / NB_HEURES_MENSUELLES, type_sal, taille_entreprise,
+            _P.cotsoc),
+        cot_pat_pension_civile = cot_pat_pension_civile,
+        cot_pat_rafp = cot_pat_rafp,
+        cot_sal_pension_civile = cot_sal_pension_civile,
+        cot_sal_rafp = cot_sal_rafp,
+        cotpat = cotpat_contrib + cotpat_noncontrib + cotpat_main_d_oeuvre,
+        cotpat_contrib = cotpat_contrib,
+        cotpat_main_d_oeuvre = cotpat_main_d_oeuvre,
+        cotpat_noncontrib = cotpat_noncontrib,
+        cotpat_transport = cotpat_transport,
+        cotsal = cotsal_contrib + cotsal_noncontrib,
+        cotsal_contrib = cotsal_contrib,
+        cotsal_noncontrib = cotsal_noncontrib,
+        crdssal = calc_csg_crds(_P.crds.act, plaf_ss, salbrut, hsup, primes, indemnite_residence,
+            supp_familial_traitement, nb_mois = 1),
+        csgsald = calc_csg_crds(_P.csg.act.deduc, plaf_ss, salbrut, hsup, primes, indemnite_residence,
+            supp_familial_traitement, nb_mois = 1),
+        csgsali = calc_csg_crds(_P.csg.act.impos, plaf_ss, salbrut, hsup, primes, indemnite_residence,
+            supp_familial_traitement, nb_mois = 1),
+        )
+
+
+def get_monthly_compact_legislations(simulation, year):
+    '''
+    Renvoie les législations compactes des douze mois de l'année
+    '''
+    return [
+        simulation.get_compact_legislation(periods.instant((year, month, 1)))
+        for month in range(1, 13)
+        ]
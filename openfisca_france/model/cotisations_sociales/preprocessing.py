@@ -25,9 +25,12 @@
 
 from __future__ import division
 
+import collections
 import copy
+import hashlib
 import logging
 
+from numpy import array, asarray, inf, maximum as max_, minimum as min_, newaxis, searchsorted, zeros
 from openfisca_core.taxscales import TaxScalesTree, scale_tax_scales
 from openfisca_core.enumerations import Enum
 from openfisca_core.legislations import CompactNode
@@ -42,6 +45,9 @@ CAT = Enum(['prive_non_cadre',
             'public_non_titulaire'])
 DEBUG_SAL_TYPE = 'public_titulaire_etat'
 log = logging.getLogger(__name__)
+PREPROCESSING_CACHE_SIZE = 32  # Nombre maximal de jeux de barèmes conservés par preprocess_compact_legislation
+preprocessed_nodes_by_fingerprint = collections.OrderedDict()  # Du moins récemment au plus récemment utilisé
+preprocessing_cache_statistics = dict(hits = 0, misses = 0)
 TAUX_DE_PRIME = 1 / 4  # primes (hors supplément familial et indemnité de résidence) / rémunération brute
 
 
@@ -52,9 +58,13 @@ TAUX_DE_PRIME = 1 / 4  # primes (hors supplément familial et indemnité de rés
 #        salaire total 0,55%
 
 
-def build_pat(_P):
-    """Construit le dictionnaire de barèmes des cotisations patronales à partir de _P.cotsoc.pat"""
-    plaf_ss = 12 * _P.cotsoc.gen.plaf_ss
+def build_pat(_P, plaf_ss = None):
+    """
+    Construit le dictionnaire de barèmes des cotisations patronales à partir de _P.cotsoc.pat
+    Les seuils sont exprimés en plafonds annuels de la sécurité sociale, sauf si un autre plafond est donné.
+    """
+    if plaf_ss is None:
+        plaf_ss = 12 * _P.cotsoc.gen.plaf_ss
     pat = scale_tax_scales(TaxScalesTree('pat', _P.cotsoc.pat), plaf_ss)
 
     for bareme in ['apprentissage', 'apprentissage_add']:
@@ -120,12 +130,14 @@ def build_pat(_P):
     return pat
 
 
-def build_sal(_P):
+def build_sal(_P, plaf_ss = None):
     '''
     Construit le dictionnaire de barèmes des cotisations salariales
     à partir des informations contenues dans P.cotsoc.sal
+    Les seuils sont exprimés en plafonds annuels de la sécurité sociale, sauf si un autre plafond est donné.
     '''
-    plaf_ss = 12 * _P.cotsoc.gen.plaf_ss
+    if plaf_ss is None:
+        plaf_ss = 12 * _P.cotsoc.gen.plaf_ss
 
     sal = scale_tax_scales(TaxScalesTree('sal', _P.cotsoc.sal), plaf_ss)
     sal['noncadre'].update(sal['commun'])
@@ -167,14 +179,162 @@ def build_sal(_P):
 def preprocess_compact_legislation(compact_legislation):
     '''
     Preprocess the legislation parameters to build the cotisations sociales taxscales (barèmes)
+
+    The built nodes only depend on cotsoc.gen.plaf_ss, cotsoc.pat and cotsoc.sal: they are cached by the fingerprint of
+    these parameters and shared between legislations (periods, reforms) having the same ones.
     '''
-    sal = build_sal(compact_legislation)
-    pat = build_pat(compact_legislation)
+    compact_legislation.cotsoc.__dict__.update(get_preprocessed_nodes(compact_legislation))
+
 
-    compact_legislation.cotsoc.cotisations_employeur = CompactNode()
-    compact_legislation.cotsoc.cotisations_salarie = CompactNode()
-    cotsoc_dict = compact_legislation.cotsoc.__dict__
+def get_monthly_preprocessed_nodes(compact_legislation):
+    '''
+    Renvoie les nœuds des barèmes de cotisations sociales avec des seuils en plafonds mensuels de la sécurité sociale
+    (paie mensuelle), sans modifier la législation
+    '''
+    return get_preprocessed_nodes(compact_legislation, monthly = True)
+
+
+def get_preprocessed_nodes(compact_legislation, monthly = False):
+    cotsoc = compact_legislation.cotsoc
+    key = (monthly, fingerprint_legislation(cotsoc.gen.plaf_ss, cotsoc.pat, cotsoc.sal))
+    preprocessed_nodes = preprocessed_nodes_by_fingerprint.pop(key, None)
+    if preprocessed_nodes is None:
+        preprocessing_cache_statistics['misses'] += 1
+        preprocessed_nodes = build_preprocessed_nodes(compact_legislation,
+            plaf_ss = cotsoc.gen.plaf_ss if monthly else None)
+        while len(preprocessed_nodes_by_fingerprint) >= PREPROCESSING_CACHE_SIZE:
+            preprocessed_nodes_by_fingerprint.popitem(last = False)
+    else:
+        preprocessing_cache_statistics['hits'] += 1
+    preprocessed_nodes_by_fingerprint[key] = preprocessed_nodes
+    return preprocessed_nodes
+
+
+def build_preprocessed_nodes(compact_legislation, plaf_ss = None):
+    '''
+    Construit les nœuds des barèmes de cotisations sociales (et leurs regroupements) par catégorie de salarié
+    '''
+    sal = build_sal(compact_legislation, plaf_ss = plaf_ss)
+    pat = build_pat(compact_legislation, plaf_ss = plaf_ss)
+
+    preprocessed_nodes = dict(
+        cotisations_employeur = CompactNode(),
+        cotisations_salarie = CompactNode(),
+        cotisations_employeur_bundles = CompactNode(),
+        cotisations_salarie_bundles = CompactNode(),
+        )
     for cotisation_name, bareme_dict in (('cotisations_employeur', pat), ('cotisations_salarie', sal)):
         for category, bareme in bareme_dict.iteritems():
             if category in CAT._nums:
-                cotsoc_dict[cotisation_name].__dict__[category] = bareme
+                preprocessed_nodes[cotisation_name].__dict__[category] = bareme
+                preprocessed_nodes[cotisation_name + '_bundles'].__dict__[category] = TaxScalesBundle(bareme)
+    return preprocessed_nodes
+
+
+def clear_preprocessing_cache():
+    preprocessed_nodes_by_fingerprint.clear()
+    preprocessing_cache_statistics.update(hits = 0, misses = 0)
+
+
+class TaxScalesBundle(object):
+    '''
+    Regroupe les barèmes marginaux d'une catégorie de salarié pour les évaluer en une seule passe
+
+    Les seuils de tous les barèmes sont fusionnés en une grille commune : chaque barème y devient une ligne de taux
+    marginaux. La ventilation de l'assiette entre les tranches de la grille n'est alors calculée qu'une fois, quel que
+    soit le nombre de barèmes évalués.
+    '''
+    index_by_name = None
+    names = None
+    options = None
+    rates = None  # Taux marginaux (barèmes × tranches de la grille commune)
+    tax_scales = None
+    thresholds = None  # Seuils de la grille commune, terminés par l'infini
+
+    def __init__(self, tax_scale_by_name):
+        self.names = sorted(tax_scale_by_name)
+        self.index_by_name = dict((name, index) for index, name in enumerate(self.names))
+        self.tax_scales = tax_scales = [tax_scale_by_name[name] for name in self.names]
+        self.options = [getattr(tax_scale, 'option', None) for tax_scale in tax_scales]
+        thresholds = sorted(set(
+            threshold
+            for tax_scale in tax_scales
+            for threshold in tax_scale.thresholds
+            ))
+        self.rates = zeros((len(tax_scales), len(thresholds)))
+        for index, tax_scale in enumerate(tax_scales):
+            if not tax_scale.thresholds:
+                continue
+            # Taux du barème en vigueur au début de chaque tranche de la grille commune (nul sous son premier seuil)
+            brackets_index = searchsorted(tax_scale.thresholds, thresholds, side = 'right') - 1
+            self.rates[index] = (brackets_index >= 0) * asarray(tax_scale.rates)[max_(brackets_index, 0)]
+        self.thresholds = array(thresholds + [inf])
+
+    def brackets(self, base):
+        '''Ventile l'assiette entre les tranches de la grille commune (individus × tranches)'''
+        if len(self.thresholds) == 1:
+            return zeros((len(base), 0))
+        return max_(min_(asarray(base)[:, newaxis], self.thresholds[newaxis, 1:]) - self.thresholds[newaxis, :-1], 0)
+
+    def calc(self, base):
+        '''Renvoie le montant de chacun des barèmes, par nom de barème'''
+        amounts = self.brackets(base).dot(self.rates.T)
+        return dict((name, amounts[:, index]) for index, name in enumerate(self.names))
+
+    def calc_sum(self, base, names):
+        '''Renvoie la somme des montants des barèmes nommés'''
+        return self.brackets(base).dot(self.sum_rates(names))
+
+    def select_names(self, option, excluded_names = (), included_names = None):
+        '''
+        Renvoie les noms des barèmes ayant l'option demandée
+        Les barèmes sont exclus ou retenus selon leur attribut name, qui peut différer de leur nom dans la catégorie.
+        '''
+        return [
+            name
+            for name, tax_scale_option, tax_scale in zip(self.names, self.options, self.tax_scales)
+            if tax_scale_option == option and tax_scale.name not in excluded_names and (
+                included_names is None or tax_scale.name in included_names)
+            ]
+
+    def sum_rates(self, names):
+        '''Renvoie les taux marginaux de la somme des barèmes nommés, par tranche de la grille commune'''
+        rates = zeros(len(self.thresholds) - 1)
+        for name in names:
+            rates += self.rates[self.index_by_name[name]]
+        return rates
+
+
+def fingerprint_legislation(*nodes):
+    '''
+    Calcule l'empreinte du contenu de nœuds de la législation compacte (paramètres et barèmes)
+    Deux législations (dates ou réformes) dont ces nœuds ont le même contenu ont la même empreinte.
+    '''
+    digest = hashlib.sha1()
+
+    def update_digest(value):
+        if isinstance(value, dict):
+            items = value.iteritems()
+        elif hasattr(value, '__dict__'):
+            items = value.__dict__.iteritems()
+        elif isinstance(value, (list, tuple)):
+            digest.update('[')
+            for item in value:
+                update_digest(item)
+            digest.update(']')
+            return
+        else:
+            digest.update(repr(value))
+            digest.update(',')
+            return
+        digest.update(value.__class__.__name__)
+        digest.update('{')
+        for name, child in sorted(items):
+            digest.update(repr(name))
+            digest.update(':')
+            update_digest(child)
+        digest.update('}')
+
+    for node in nodes:
+        update_digest(node)
+    return digest.hexdigest()
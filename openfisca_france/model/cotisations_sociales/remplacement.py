@@ -15,6 +15,8 @@ from numpy import logical_not as not_, maximum as max_, minimum as min_, ones
 
 from openfisca_core.taxscales import TaxScalesTree, scale_tax_scales
 
+from ..base import cast_from_entity_to_roles
+
 
 log = logging.getLogger(__name__)
 
@@ -191,7 +193,7 @@ def _casa(self, rstbrut, irpp_holder, csg_rempl, _P):  # TODO: irpp_n_2
     """
     # TODO: replace irpp by irpp_n_2
 
-    irpp = self.cast_from_entity_to_roles(irpp_holder)
+    irpp = cast_from_entity_to_roles(self, irpp_holder)
     casa = (csg_rempl == 3) * _P.prelsoc.add_ret * rstbrut * (irpp > _P.ir.recouvrement.seuil)
 
     return -casa
@@ -27,12 +27,12 @@ from __future__ import division
 
 import logging
 
-from numpy import (logical_not as not_, logical_or as or_, maximum as max_, minimum as min_, zeros)
+from numpy import (logical_not as not_, logical_or as or_, maximum as max_, minimum as min_, searchsorted, zeros)
 from openfisca_core.accessors import law
 from openfisca_core.enumerations import Enum
 from openfisca_core.taxscales import TaxScalesTree, scale_tax_scales
 
-from ..base import QUIFAM, QUIFOY, QUIMEN
+from ..base import QUIFAM, QUIFOY, QUIMEN, cast_from_entity_to_role, cast_from_entity_to_roles, get_projection_cache
 
 
 TAUX_DE_PRIME = 1 / 4  # primes (hors supplément familial et indemnité de résidence) / rémunération brute
@@ -46,6 +46,8 @@ CAT = Enum(['prive_non_cadre',
             'public_titulaire_hospitaliere',
             'public_non_titulaire'])
 CHEF = QUIFAM['chef']
+COTPAT_CONTRIB_CATEGORIES = ["prive_cadre", "prive_non_cadre", "public_non_titulaire",
+    "public_titulaire_hospitaliere"]  # TODO: move up
 DEBUG_SAL_TYPE = 'public_titulaire_hospitaliere'
 log = logging.getLogger(__name__)
 PREF = QUIMEN['pref']
@@ -70,37 +72,21 @@ def _mhsup(hsup):
 ############################################################################
 
 
-def _cotpat_contrib(salbrut, hsup, type_sal, indemnite_residence, primes, cot_pat_rafp, cot_pat_pension_civile, _P):
+def _cotpat_contrib(self, salbrut, hsup, type_sal, indemnite_residence, primes, cot_pat_rafp, cot_pat_pension_civile,
+        period, _P):
     '''
     Cotisation sociales patronales contributives
     '''
-    pat = _P.cotsoc.cotisations_employeur.__dict__
-    cotpat = zeros(len(salbrut))
-    for category in CAT:
-        iscat = (type_sal == category[1])  # category[1] is the numerical index
-        if category[0] in pat.keys():
-            for bar in pat[category[0]].itervalues():
-                if category[0] in ["prive_cadre", "prive_non_cadre", "public_non_titulaire", "public_titulaire_hospitaliere"]:  # TODO: move up
-                    is_contrib = (bar.option == "contrib") & (bar.name not in ['cnracl', 'rafp', 'pension'])
-                    temp = -(iscat
-                             * bar.calc(salbrut + (category[0] == 'public_non_titulaire') * (indemnite_residence + primes))
-                             ) * is_contrib
-                    cotpat += temp
-#                    if is_contrib == 1:
-#                        if category[0] == DEBUG_SAL_TYPE:
-#                            if (temp != 0).all():
-#                                log.info(bar)
-#                                log.info(temp / 12)
-
-#        if category[0] == DEBUG_SAL_TYPE:
-#            log.info("rafp pat: %s" % str(cot_pat_rafp / 12))
-#            log.info("pension civile pat: %s" % str(cot_pat_pension_civile / 12))
-
-    cotpat += cot_pat_rafp + cot_pat_pension_civile
-    return cotpat
-
-
-def _cotpat_main_d_oeuvre(salbrut, hsup, type_sal, primes, indemnite_residence, cotpat_transport, _P):
+#    if category == DEBUG_SAL_TYPE:
+#        log.info("rafp pat: %s" % str(cot_pat_rafp / 12))
+#        log.info("pension civile pat: %s" % str(cot_pat_pension_civile / 12))
+
+    return calc_cotpat_contrib(_P.cotsoc.cotisations_employeur_bundles.__dict__, type_sal, salbrut,
+        indemnite_residence, primes, cot_pat_rafp, cot_pat_pension_civile, period = period,
+        projection_cache = get_projection_cache(self.holder.entity.simulation))
+
+
+def _cotpat_main_d_oeuvre(self, salbrut, hsup, type_sal, primes, indemnite_residence, cotpat_transport, period, _P):
     '''
     Cotisation sociales patronales main d'oeuvre
     TODO: A discriminer selon la taille de l'entreprise
@@ -109,43 +95,19 @@ def _cotpat_main_d_oeuvre(salbrut, hsup, type_sal, primes, indemnite_residence,
         - D291: taxe sur les salaire, versement transport, FNAL, CSA, taxe d'apprentissage, formation continue
         - D993: participation à l'effort de construction
     '''
-    pat = _P.cotsoc.cotisations_employeur.__dict__
-    cotpat = zeros(len(salbrut))
-    for category in CAT:
-        iscat = (type_sal == category[1])  # category[1] is the numerical index
-        if category[0] in pat.keys():
-            for bar in pat[category[0]].itervalues():
-                is_mo = (bar.option == "main-d-oeuvre")
-                temp = -(iscat
-                         * bar.calc(salbrut + (category[0] == 'public_non_titulaire') * (indemnite_residence + primes))
-                         * is_mo)
-                cotpat += temp
-#                if is_mo == 1:
-#                    if  category[0] == DEBUG_SAL_TYPE:
-#                        log.info(category[0])
-#                        log.info(bar.name)
-#                        log.info(temp / 12)
+    cotpat = calc_cotisations(_P.cotsoc.cotisations_employeur_bundles.__dict__, type_sal, salbrut,
+        indemnite_residence, primes, select_cotpat_main_d_oeuvre_names, period = period,
+        projection_cache = get_projection_cache(self.holder.entity.simulation))
     return cotpat + cotpat_transport
 
 
-def _cotpat_transport(salbrut, hsup, type_sal, indemnite_residence, primes, _P):
+def _cotpat_transport(self, salbrut, hsup, type_sal, indemnite_residence, primes, period, _P):
     '''
     Versement transport
     '''
-    pat = _P.cotsoc.cotisations_employeur.__dict__
-    transport = zeros(len(salbrut))
-    for category in CAT:
-        iscat = (type_sal == category[1])  # category[1] is the numerical index of the category
-        if category[0] in pat.keys():  # category[0] is the name of the category
-            if 'transport' in pat[category[0]]:
-                bar = pat[category[0]]['transport']
-                temp = -bar.calc(salbrut + (category[0] == 'public_non_titulaire') * (indemnite_residence + primes)) * iscat  # check
-                transport += temp
-#                if  category[0] == DEBUG_SAL_TYPE:
-#                    log.info(category[0])
-#                    log.info(bar.name)
-#                    log.info(temp / 12)
-    return transport
+    return calc_cotisations(_P.cotsoc.cotisations_employeur_bundles.__dict__, type_sal, salbrut,
+        indemnite_residence, primes, select_cotpat_transport_names, period = period,
+        projection_cache = get_projection_cache(self.holder.entity.simulation))  # check
 
 
 def _taux_accident_travail(exposition_accident, period, accident = law.cotsoc.accident):
@@ -164,33 +126,16 @@ def _cotpat_accident(salbrut, type_sal, taux_accident_travail):
     '''
     Cotisations patronales accident du travail et maladie professionelle
     '''
-    prive = (type_sal == CAT['prive_cadre']) + (type_sal == CAT['prive_non_cadre'])
-    return -salbrut * taux_accident_travail * prive  # TODO: check public
+    return calc_cotpat_accident(salbrut, type_sal, taux_accident_travail)
 
 
-def _cotpat_noncontrib(salbrut, hsup, type_sal, primes, indemnite_residence, cotpat_accident, _P):
+def _cotpat_noncontrib(self, salbrut, hsup, type_sal, primes, indemnite_residence, cotpat_accident, period, _P):
     '''
     Cotisation sociales patronales non contributives
     '''
-    pat = _P.cotsoc.cotisations_employeur.__dict__
-    cotpat = zeros(len(salbrut))
-    for category in CAT:
-        iscat = (type_sal == category[1])
-        if category[0] in pat.keys():
-            for bar in pat[category[0]].itervalues():
-                is_noncontrib = (bar.option == "noncontrib")
-                temp = -(iscat
-                         * bar.calc(salbrut + (category[0] == 'public_non_titulaire') * (indemnite_residence + primes))
-                         * is_noncontrib)
-#                log.info(temp)
-#                log.info("\n \n")
-                cotpat += temp
-#                if is_noncontrib == 1:
-#                    if  category[0] == DEBUG_SAL_TYPE:
-#                        log.info(category[0])
-#                        log.info(bar)
-#                        log.info(temp / 12)
-#                        log.info("\n \n")
+    cotpat = calc_cotisations(_P.cotsoc.cotisations_employeur_bundles.__dict__, type_sal, salbrut,
+        indemnite_residence, primes, select_cotpat_noncontrib_names, period = period,
+        projection_cache = get_projection_cache(self.holder.entity.simulation))
 
 #    log.info("accident : %s" % cotpat_accident)
     return cotpat + cotpat_accident
@@ -220,48 +165,16 @@ def _cotsal_contrib(salbrut, hsup, type_sal, primes, indemnite_residence, cot_sa
     '''
     Cotisations sociales salariales contributives
     '''
-    sal = _P.cotsoc.cotisations_salarie.__dict__
-    cotsal = zeros(len(salbrut))
-    for category in CAT:
-        iscat = (type_sal == category[1])
-        if category[0] in sal:
-            for bar in sal[category[0]].itervalues():
-                is_contrib = (bar.option == "contrib") & (bar.name not in ["rafp", "pension", "cnracl1", "cnracl2"])  # dealed by pension civile and rafp
-                temp = -(iscat
-                         * bar.calc(salbrut - hsup
-                                    + (category[0] == 'public_non_titulaire') * (indemnite_residence + primes))
-                        ) * is_contrib
-                cotsal += temp
-#                log.info(bar)
-#                log.info(temp)
-#                if  category[0] == DEBUG_SAL_TYPE:
-#                    if (temp != 0).all():
-#                        log.info(category[0])
-#                        log.info(bar.name)
-#                        log.info(temp / 12)
-
-#        if category[0] == DEBUG_SAL_TYPE:
-#            log.info("cot_sal_pension_civile %s" % str(cot_sal_pension_civile / 12))
-#            log.info("rafp sal %s" % str(cot_sal_rafp / 12))
+#    if category == DEBUG_SAL_TYPE:
+#        log.info("cot_sal_pension_civile %s" % str(cot_sal_pension_civile / 12))
+#        log.info("rafp sal %s" % str(cot_sal_rafp / 12))
 
-    public_titulaire = ((type_sal == CAT['public_titulaire_etat'])
-              + (type_sal == CAT['public_titulaire_territoriale'])
-              + (type_sal == CAT['public_titulaire_hospitaliere']))
-
-    return cotsal + (cot_sal_pension_civile + cot_sal_rafp) * public_titulaire
+    return calc_cotsal_contrib(_P.cotsoc.cotisations_salarie_bundles.__dict__, type_sal, salbrut, hsup, primes,
+        indemnite_residence, cot_sal_rafp, cot_sal_pension_civile)
 
 
 def _cot_sal_pension_civile(salbrut, type_sal, _P):
-    sal = _P.cotsoc.cotisations_salarie.__dict__
-    terr_or_hosp = (type_sal == CAT['public_titulaire_territoriale']) | (type_sal == CAT['public_titulaire_hospitaliere'])
-    cot_sal_pension_civile = (
-        (type_sal == CAT['public_titulaire_etat']) * sal['public_titulaire_etat']['pension'].calc(salbrut)
-        + terr_or_hosp * sal['public_titulaire_territoriale']['cnracl1'].calc(salbrut)
-                              )
-#    if array(type_sal == DEBUG_SAL_TYPE).all():
-#        log.info('cot_sal_pension_civile %s', cot_sal_pension_civile / 12)
-
-    return -cot_sal_pension_civile
+    return calc_pension_civile(_P.cotsoc.cotisations_salarie.__dict__, type_sal, salbrut, 'cnracl1')
 
 
 def _cot_sal_rafp(salbrut, type_sal, primes, supp_familial_traitement, indemnite_residence, _P):
@@ -270,49 +183,21 @@ def _cot_sal_rafp(salbrut, type_sal, primes, supp_familial_traitement, indemnite
     TODO: ajouter la gipa qui n'est pas affectée par le plafond d'assiette
     Note: sal_brut est le traitement indiciaire brut pour les fonctionnaires
     '''
-    eligibles = ((type_sal == CAT['public_titulaire_etat'])
-                 + (type_sal == CAT['public_titulaire_territoriale'])
-                 + (type_sal == CAT['public_titulaire_hospitaliere']))
-    tib = salbrut * eligibles / 12
-
-    plaf_ass = _P.cotsoc.sal.fonc.etat.rafp_plaf_assiette
-    base_imposable = primes + supp_familial_traitement + indemnite_residence
     plaf_ss = _P.cotsoc.gen.plaf_ss
     sal = scale_tax_scales(TaxScalesTree('sal', _P.cotsoc.sal), plaf_ss)
-    assiette = min_(base_imposable / 12 , plaf_ass * tib)
     # Même régime pour etat et colloc
-    cot_sal_rafp = eligibles * sal['fonc']['etat']['rafp'].calc(assiette)
-    return -12 * cot_sal_rafp
+    return calc_rafp(sal['fonc']['etat']['rafp'], type_sal, salbrut, primes, supp_familial_traitement,
+        indemnite_residence, _P.cotsoc.sal.fonc.etat.rafp_plaf_assiette)
 
 
 def _cotsal_noncontrib(salbrut, hsup, type_sal, primes, indemnite_residence, cot_sal_rafp, cot_sal_pension_civile, cotsal_contrib, _P):
     '''
     Cotisations sociales salariales non-contributives
     '''
-    sal = _P.cotsoc.cotisations_salarie.__dict__
-    cotsal = zeros(len(salbrut))
     seuil_assuj_fds = seuil_fds(_P)
 #    log.info("seuil assujetissement FDS %i", seuil_assuj_fds)
-    for category in CAT:
-        iscat = (type_sal == category[1])
-        if category[0] in sal:
-            for bar in sal[category[0]].itervalues():
-                is_exempt_fds = (category[0] in ['public_titulaire_etat', 'public_titulaire_territoriale', 'public_titulaire_hospitaliere']) * (bar.name == 'solidarite') * ((salbrut - hsup) / 12 <= seuil_assuj_fds)  # TODO: check assiette voir IPP
-                is_noncontrib = (bar.option == "noncontrib")  # and (bar.name in ["famille", "maladie"])
-                temp = -(iscat
-                         * bar.calc(salbrut + primes + indemnite_residence
-                                    - hsup + cot_sal_rafp + cot_sal_pension_civile
-                                    + cotsal_contrib * (category[0] == 'public_non_titulaire') * (bar.name == "excep_solidarite"))  # * (category[0] == 'public_non_titulaire')
-                         * is_noncontrib * not_(is_exempt_fds)
-                         )
-                cotsal += temp
-#                if  category[0] == DEBUG_SAL_TYPE:
-#                    if (temp != 0).all():
-#                        log.info(category[0])
-#                        log.info(bar)
-#                        log.info(temp / 12)
-
-    return cotsal
+    return calc_cotsal_noncontrib(_P.cotsoc.cotisations_salarie_bundles.__dict__, type_sal, salbrut, hsup, primes,
+        indemnite_residence, cot_sal_rafp, cot_sal_pension_civile, cotsal_contrib, seuil_assuj_fds)
 
 
 def _cotsal(cotsal_contrib, cotsal_noncontrib):
@@ -326,27 +211,24 @@ def _csgsald(salbrut, primes, indemnite_residence, supp_familial_traitement, hsu
     '''
     CSG deductible sur les salaires
     '''
-    plaf_ss = _P.cotsoc.gen.plaf_ss
-    csg = scale_tax_scales(_P.csg.act.deduc, plaf_ss)
-    return -12 * csg.calc((salbrut + primes + indemnite_residence + supp_familial_traitement - hsup) / 12)
+    return calc_csg_crds(_P.csg.act.deduc, _P.cotsoc.gen.plaf_ss, salbrut, hsup, primes, indemnite_residence,
+        supp_familial_traitement)
 
 
 def _csgsali(salbrut, hsup, primes, indemnite_residence, supp_familial_traitement, _P):
     '''
     CSG imposable sur les salaires
     '''
-    plaf_ss = _P.cotsoc.gen.plaf_ss
-    csg = scale_tax_scales(_P.csg.act.impos, plaf_ss)
-    return -12 * csg.calc((salbrut + primes + indemnite_residence + supp_familial_traitement - hsup) / 12)
+    return calc_csg_crds(_P.csg.act.impos, _P.cotsoc.gen.plaf_ss, salbrut, hsup, primes, indemnite_residence,
+        supp_familial_traitement)
 
 
 def _crdssal(salbrut, hsup, primes, indemnite_residence, supp_familial_traitement, _P):
     '''
     CRDS sur les salaires
     '''
-    plaf_ss = _P.cotsoc.gen.plaf_ss
-    crds = scale_tax_scales(_P.crds.act, plaf_ss)
-    return -12 * crds.calc((salbrut - hsup + primes + indemnite_residence + supp_familial_traitement) / 12)
+    return calc_csg_crds(_P.crds.act, _P.cotsoc.gen.plaf_ss, salbrut, hsup, primes, indemnite_residence,
+        supp_familial_traitement)
 
 
 def _sal_h_b(salbrut):
@@ -362,15 +244,7 @@ def _alleg_fillon(period, salbrut, sal_h_b, type_sal, taille_entreprise, cotsoc
     Allègement de charges patronales sur les bas et moyens salaires
     dit allègement Fillon
     '''
-    if period.start.year >= 2007:
-        # TODO: deal with taux between 2005 and 2007
-        taux_fillon = taux_exo_fillon(sal_h_b, taille_entreprise, cotsoc)
-        alleg_fillon = (taux_fillon * salbrut
-            * ((type_sal == CAT['prive_non_cadre'])
-                | (type_sal == CAT['prive_cadre'])))
-        return alleg_fillon
-    else:
-        return 0 * salbrut
+    return calc_alleg_fillon(period.start.year, salbrut, sal_h_b, type_sal, taille_entreprise, cotsoc)
 
 
 def _alleg_cice(period, salbrut, sal_h_b, type_sal, taille_entreprise, cotsoc = law.cotsoc):
@@ -448,13 +322,7 @@ def _cot_pat_pension_civile(salbrut, type_sal, _P):
     Pension civile part patronale
     Note : salbrut est égal au traitement indiciaire brut
     """
-    pat = _P.cotsoc.cotisations_employeur.__dict__
-    terr_or_hosp = (type_sal == CAT['public_titulaire_territoriale']) | (type_sal == CAT['public_titulaire_hospitaliere'])
-    cot_pat_pension_civile = (
-        (type_sal == CAT['public_titulaire_etat']) * pat['public_titulaire_etat']['pension'].calc(salbrut)
-        + terr_or_hosp * pat['public_titulaire_territoriale']['cnracl'].calc(salbrut)
-        )
-    return -cot_pat_pension_civile
+    return calc_pension_civile(_P.cotsoc.cotisations_employeur.__dict__, type_sal, salbrut, 'cnracl')
 
 
 def _cot_pat_rafp(salbrut, type_sal, primes, supp_familial_traitement, indemnite_residence, _P):
@@ -463,20 +331,8 @@ def _cot_pat_rafp(salbrut, type_sal, primes, supp_familial_traitement, indemnite
     TODO: ajouter la gipa qui n'est pas affectée par le plafond d'assiette
     Note: salbrut est le traitement indiciaire brut pour les fonctionnaires
     '''
-
-    eligibles = ((type_sal == CAT['public_titulaire_etat'])
-                 + (type_sal == CAT['public_titulaire_territoriale'])
-                 + (type_sal == CAT['public_titulaire_hospitaliere']))
-    tib = salbrut * eligibles / 12
-    plaf_ass = _P.cotsoc.sal.fonc.etat.rafp_plaf_assiette
-    base_imposable = primes + supp_familial_traitement + indemnite_residence
-    plaf_ss = _P.cotsoc.gen.plaf_ss  # TODO: build somewhere else
-    pat = scale_tax_scales(TaxScalesTree('pat', _P.cotsoc.pat), plaf_ss)
-    assiette = min_(base_imposable / 12, plaf_ass * tib)
-
-    bareme_rafp = _P.cotsoc.cotisations_employeur.public_titulaire_etat['rafp']
-    cot_pat_rafp = eligibles * bareme_rafp.calc(assiette)
-    return -12 * cot_pat_rafp
+    return calc_rafp(_P.cotsoc.cotisations_employeur.public_titulaire_etat['rafp'], type_sal, salbrut, primes,
+        supp_familial_traitement, indemnite_residence, _P.cotsoc.sal.fonc.etat.rafp_plaf_assiette)
 
 
 def _primes(type_sal, salbrut):
@@ -496,7 +352,7 @@ def _supp_familial_traitement(self, type_sal, salbrut, af_nbenf_holder, _P):
     TODO: gérer le cas encore problématique du conjoint fonctionnaire
     '''
     # TODO: un seul sft par couple où est présent un fonctionnaire
-    fonc_nbenf = self.cast_from_entity_to_role(af_nbenf_holder, role = CHEF)
+    fonc_nbenf = cast_from_entity_to_role(self, af_nbenf_holder, role = CHEF)
     P = _P.fonc.supp_fam
 
     part_fixe_1 = P.fixe.enf1
@@ -557,7 +413,7 @@ def _indemnite_residence(self, salbrut, type_sal, zone_apl_holder, _P):
     '''
     Indemnité de résidence des fonctionnaires
     '''
-    zone_apl = self.cast_from_entity_to_roles(zone_apl_holder)
+    zone_apl = cast_from_entity_to_roles(self, zone_apl_holder)
 
     P = _P.fonc.indem_resid
     min_zone_1, min_zone_2, min_zone_3 = P.min * P.taux.zone1, P.min * P.taux.zone2, P.min * P.taux.zone3
@@ -593,13 +449,188 @@ def _rev_microsocial(self, assiette_service, assiette_vente, assiette_proflib, _
     P = _P.cotsoc.sal.microsocial
     total = assiette_service + assiette_vente + assiette_proflib
     prelsoc_ms = assiette_service * P.servi + assiette_vente * P.vente + assiette_proflib * P.rsi
-    return self.cast_from_entity_to_role(total - prelsoc_ms,
+    return cast_from_entity_to_role(self, total - prelsoc_ms,
         entity = 'foyer_fiscal', role = VOUS)
 
 ############################################################################
 # # Helper functions
 ############################################################################
 
+def calc_alleg_fillon(year, salbrut, sal_h_b, type_sal, taille_entreprise, cotsoc):
+    '''
+    Allègement Fillon des salariés du privé, pour un salaire brut et le salaire horaire brut correspondant
+    '''
+    if year < 2007:
+        return 0 * salbrut
+    # TODO: deal with taux between 2005 and 2007
+    taux_fillon = taux_exo_fillon(sal_h_b, taille_entreprise, cotsoc)
+    return taux_fillon * salbrut * ((type_sal == CAT['prive_non_cadre']) | (type_sal == CAT['prive_cadre']))
+
+
+def calc_cotpat_accident(salbrut, type_sal, taux_accident_travail):
+    '''
+    Cotisations patronales accident du travail et maladie professionelle, comptées négativement
+    '''
+    prive = (type_sal == CAT['prive_cadre']) + (type_sal == CAT['prive_non_cadre'])
+    return -salbrut * taux_accident_travail * prive  # TODO: check public
+
+
+def calc_cotpat_contrib(bundles, type_sal, salbrut, indemnite_residence, primes, cot_pat_rafp, cot_pat_pension_civile,
+        period = None, projection_cache = None):
+    '''
+    Cotisations sociales patronales contributives, pension civile et retraite additionnelle comprises
+    '''
+    cotpat = calc_cotisations(bundles, type_sal, salbrut, indemnite_residence, primes, select_cotpat_contrib_names,
+        categories = COTPAT_CONTRIB_CATEGORIES, period = period, projection_cache = projection_cache)
+    return cotpat + cot_pat_rafp + cot_pat_pension_civile
+
+
+def calc_cotsal_contrib(bundles, type_sal, salbrut, hsup, primes, indemnite_residence, cot_sal_rafp,
+        cot_sal_pension_civile):
+    '''
+    Cotisations sociales salariales contributives, pension civile et retraite additionnelle des titulaires comprises
+    '''
+    cotsal = calc_cotisations(bundles, type_sal, salbrut - hsup, indemnite_residence, primes,
+        select_cotsal_contrib_names)
+    public_titulaire = ((type_sal == CAT['public_titulaire_etat'])
+              + (type_sal == CAT['public_titulaire_territoriale'])
+              + (type_sal == CAT['public_titulaire_hospitaliere']))
+    return cotsal + (cot_sal_pension_civile + cot_sal_rafp) * public_titulaire
+
+
+def calc_cotisations(bundles, type_sal, salbrut, indemnite_residence, primes, select_names, categories = None,
+        period = None, projection_cache = None):
+    '''
+    Somme, comptée négativement, des barèmes retenus par select_names pour chaque catégorie de salarié
+    L'assiette est salbrut, augmenté de l'indemnité de résidence et des primes pour les non titulaires du public.
+    Sert aussi bien aux montants annuels qu'à la paie mensuelle, selon les regroupements de barèmes donnés.
+    Quand un cache de projections est donné, la ventilation de l'assiette entre les tranches de chaque catégorie y est
+    gardée pour la période donnée : les formules qui évaluent d'autres barèmes du même regroupement sur les mêmes
+    tableaux la réutilisent. Ces matrices (individus × tranches) restent dans le cache de la simulation et comptent
+    dans son budget (projection_cache_max_bytes), qu'il faut borner pour ne pas les garder toute la simulation.
+    '''
+    cotisations = zeros(len(salbrut))
+    for category, indices in iter_indices_by_category(type_sal):
+        if category not in bundles or (categories is not None and category not in categories):
+            continue
+        assiette = salbrut[indices]
+        if category == 'public_non_titulaire':
+            assiette = assiette + indemnite_residence[indices] + primes[indices]
+        bundle = bundles[category]
+        if projection_cache is None:
+            brackets = bundle.brackets(assiette)
+        else:
+            key = ('cotisations_brackets', period, category)
+            source_arrays = (bundle, type_sal, salbrut, indemnite_residence, primes)
+            brackets = projection_cache.get(key, source_arrays)
+            if brackets is None:
+                brackets = bundle.brackets(assiette)
+                projection_cache.set(key, source_arrays, brackets)
+        cotisations[indices] -= brackets.dot(bundle.sum_rates(select_names(bundle)))
+    return cotisations
+
+
+def calc_cotsal_noncontrib(bundles, type_sal, salbrut, hsup, primes, indemnite_residence, cot_sal_rafp,
+        cot_sal_pension_civile, cotsal_contrib, seuil_assuj_fds, nb_mois = 12):
+    '''
+    Cotisations sociales salariales non-contributives, pour des montants couvrant nb_mois mois
+    '''
+    cotsal = zeros(len(salbrut))
+    for category, indices in iter_indices_by_category(type_sal):
+        if category not in bundles:
+            continue
+        bundle = bundles[category]
+        assiette = (salbrut[indices] + primes[indices] + indemnite_residence[indices] - hsup[indices]
+            + cot_sal_rafp[indices] + cot_sal_pension_civile[indices])
+        if category in ['public_titulaire_etat', 'public_titulaire_territoriale', 'public_titulaire_hospitaliere']:
+            # TODO: check assiette voir IPP
+            is_exempt_fds = (salbrut[indices] - hsup[indices]) / nb_mois <= seuil_assuj_fds
+            cotsal[indices] -= not_(is_exempt_fds) * bundle.calc_sum(assiette,
+                bundle.select_names("noncontrib", included_names = ['solidarite']))
+            special_names = ['solidarite']
+        elif category == 'public_non_titulaire':
+            cotsal[indices] -= bundle.calc_sum(assiette + cotsal_contrib[indices],
+                bundle.select_names("noncontrib", included_names = ['excep_solidarite']))
+            special_names = ['excep_solidarite']
+        else:
+            special_names = []
+        cotsal[indices] -= bundle.calc_sum(assiette, bundle.select_names("noncontrib", special_names))
+    return cotsal
+
+
+def calc_csg_crds(bareme, plaf_ss, salbrut, hsup, primes, indemnite_residence, supp_familial_traitement, nb_mois = 12):
+    '''
+    CSG ou CRDS sur les salaires, comptée négativement, pour des montants couvrant nb_mois mois
+    Les seuils du barème sont exprimés en plafonds mensuels de la sécurité sociale.
+    '''
+    bareme = scale_tax_scales(bareme, plaf_ss)
+    return -nb_mois * bareme.calc((salbrut - hsup + primes + indemnite_residence + supp_familial_traitement) / nb_mois)
+
+
+def calc_pension_civile(baremes, type_sal, salbrut, cnracl_name):
+    '''
+    Pension civile des titulaires de la fonction publique, comptée négativement
+    Note : salbrut est égal au traitement indiciaire brut
+    '''
+    terr_or_hosp = ((type_sal == CAT['public_titulaire_territoriale'])
+        | (type_sal == CAT['public_titulaire_hospitaliere']))
+    return -(
+        (type_sal == CAT['public_titulaire_etat']) * baremes['public_titulaire_etat']['pension'].calc(salbrut)
+        + terr_or_hosp * baremes['public_titulaire_territoriale'][cnracl_name].calc(salbrut)
+        )
+
+
+def calc_rafp(bareme_rafp, type_sal, salbrut, primes, supp_familial_traitement, indemnite_residence, plaf_assiette,
+        nb_mois = 12):
+    '''
+    Retraite additionnelle de la fonction publique, comptée négativement, pour des montants couvrant nb_mois mois
+    TODO: ajouter la gipa qui n'est pas affectée par le plafond d'assiette
+    Note: salbrut est le traitement indiciaire brut pour les fonctionnaires
+    '''
+    eligibles = ((type_sal == CAT['public_titulaire_etat'])
+                 + (type_sal == CAT['public_titulaire_territoriale'])
+                 + (type_sal == CAT['public_titulaire_hospitaliere']))
+    tib = salbrut * eligibles / nb_mois
+    base_imposable = primes + supp_familial_traitement + indemnite_residence
+    assiette = min_(base_imposable / nb_mois, plaf_assiette * tib)
+    return -nb_mois * eligibles * bareme_rafp.calc(assiette)
+
+
+def select_cotpat_contrib_names(bundle):
+    return bundle.select_names("contrib", ['cnracl', 'rafp', 'pension'])
+
+
+def select_cotpat_main_d_oeuvre_names(bundle):
+    return bundle.select_names("main-d-oeuvre")
+
+
+def select_cotpat_noncontrib_names(bundle):
+    return bundle.select_names("noncontrib")
+
+
+def select_cotpat_transport_names(bundle):
+    return ['transport'] if 'transport' in bundle.index_by_name else []
+
+
+def select_cotsal_contrib_names(bundle):
+    # rafp, pension et cnracl sont traitées par pension civile et rafp
+    return bundle.select_names("contrib", ["rafp", "pension", "cnracl1", "cnracl2"])
+
+
+def iter_indices_by_category(type_sal):
+    '''
+    Itère sur les catégories de salarié présentes et renvoie, pour chacune, son nom et les indices des individus qui en
+    relèvent. Les individus sont regroupés par un unique tri de type_sal, de sorte que les barèmes de chaque catégorie
+    ne sont évalués que sur ses propres individus.
+    '''
+    order = type_sal.argsort(kind = 'mergesort')
+    sorted_type_sal = type_sal[order]
+    for category, category_index in sorted(CAT, key = lambda category: category[1]):
+        start, stop = searchsorted(sorted_type_sal, [category_index, category_index + 1])
+        if start < stop:
+            yield category, order[start:stop]
+
+
 def taux_exo_fillon(sal_h_b, taille_entreprise, P):
     '''
     Exonération Fillon
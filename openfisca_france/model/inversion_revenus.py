@@ -25,17 +25,29 @@
 
 from __future__ import division
 
+import collections
+import datetime
 import logging
+import weakref
 
-from numpy import zeros, logical_not as not_
+from numpy import (abs as abs_, asarray, clip, concatenate, diff, linspace, logical_not as not_, maximum as max_,
+    minimum as min_, searchsorted, where, zeros)
 from openfisca_core.taxscales import MarginalRateTaxScale, TaxScalesTree, combine_tax_scales, scale_tax_scales
-from scipy.optimize import fsolve
 
+from .cotisations_sociales.preprocessing import fingerprint_legislation
 from .cotisations_sociales.remplacement import exo_csg_chom
 from .cotisations_sociales.travail import CAT, TAUX_DE_PRIME
 
 
+INVERSED_BAREMES_CACHE_SIZE = 32  # Nombre maximal de jeux de barèmes inversés conservés par get_inversed_baremes
+inversed_baremes_by_key = collections.OrderedDict()  # Du moins récemment au plus récemment utilisé
+legislation_fingerprints_cache = weakref.WeakKeyDictionary()  # Empreintes par législation, voir get_fingerprint
 log = logging.getLogger(__name__)
+SALNET_TO_SALBRUT_CACHE_SIZE = 32  # Nombre maximal de tables conservées par get_salnet_to_salbrut_table
+salnet_to_salbrut_table_by_key = collections.OrderedDict()  # Du moins récemment au plus récemment utilisé
+SALNET_TO_SALBRUT_REFINEMENT = True  # Corrige l'interpolation par un pas de Newton évalué sur la simulation
+SOLVER_MAX_ITERATIONS = 100  # Nombre maximal d'évaluations pour l'encadrement puis pour la recherche de la racine
+SOLVER_TOLERANCE = 0.01  # Tolérance (en euros) sur l'écart au revenu cible ou sur la largeur de l'encadrement
 
 # TODO: CHECK la csg déductible en 2006 est case GH
 # TODO:  la revenus soumis aux csg déductible et imposable sont en CG et BH en 2010
@@ -66,6 +78,24 @@ def _salbrut_from_sali(sali, hsup, type_sal, _defaultP):
     sauf pour les fonctionnaires où il renvoie le tratement indiciaire brut
     Note : le supplément familial de traitement est imposable
     '''
+    inversed_bareme = get_inversed_baremes(build_salbrut_from_sali_inversed_baremes, _defaultP)
+
+    # TODO: complete this to deal with the fonctionnaire
+    # supp_familial_traitement = 0  # TODO: dépend de salbrut
+    # indemnite_residence = 0  # TODO: fix bug
+    salbrut = zeros(len(sali))
+    for category in ['prive_non_cadre', 'prive_cadre', 'public_titulaire_etat']:
+        salbrut += inversed_bareme[category].calc(sali) * (type_sal == CAT[category])
+
+    # <NODE desc= "Supplément familial de traitement " shortname="Supp. fam." code= "supp_familial_traitement"/>
+    # <NODE desc= "Indemnité de résidence" shortname="Ind. rés." code= "indemenite_residence"/>
+    return salbrut + hsup
+
+
+def build_salbrut_from_sali_inversed_baremes(_defaultP):
+    '''
+    Construit les barèmes inversés permettant de passer du salaire imposable au salaire brut
+    '''
     plaf_ss = 12 * _defaultP.cotsoc.gen.plaf_ss
 
     salarie = scale_tax_scales(TaxScalesTree('sal', _defaultP.cotsoc.sal), plaf_ss)
@@ -86,13 +116,6 @@ def _salbrut_from_sali(sali, hsup, type_sal, _defaultP):
     noncadre.add_tax_scale(csg['act']['deduc'])
     cadre.add_tax_scale(csg['act']['deduc'])
 
-    nca = noncadre.inverse()
-    cad = cadre.inverse()
-    brut_nca = nca.calc(sali)
-    brut_cad = cad.calc(sali)
-    salbrut = brut_nca * (type_sal == CAT['prive_non_cadre'])
-    salbrut += brut_cad * (type_sal == CAT['prive_cadre'])
-
     # public etat
     # TODO: modifier la contribution exceptionelle de solidarité
     # en fixant son seuil de non imposition dans le barème (à corriger dans param.xml
@@ -111,31 +134,30 @@ def _salbrut_from_sali(sali, hsup, type_sal, _defaultP):
     bareme_prime.add_bracket(0, -TAUX_DE_PRIME)  # barème équivalent à taux_prime*TIB
     public_etat.add_tax_scale(bareme_prime)
 
-    etat = public_etat.inverse()
+    return {
+        'prive_cadre': cadre.inverse(),
+        'prive_non_cadre': noncadre.inverse(),
+        'public_titulaire_etat': public_etat.inverse(),
+        }
 
-    # TODO: complete this to deal with the fonctionnaire
-    # supp_familial_traitement = 0  # TODO: dépend de salbrut
-    # indemnite_residence = 0  # TODO: fix bug
 
-    # print 'sali', sali / 12
-    brut_etat = etat.calc(sali)
-    # print 'brut_etat', brut_etat/12
-    # print 'impot', public_etat.calc(brut_etat) / 12
-    # print 'brut_etat', brut_etat / 12
-    salbrut_etat = (brut_etat)
-    # TODO: fonctionnaire
-    # print 'salbrut_etat', salbrut_etat / 12
-    salbrut += salbrut_etat * (type_sal == CAT['public_titulaire_etat'])
+def _salbrut_from_salnet(salnet, hsup, type_sal, _defaultP):
+    '''
+    Calcule le salaire brut à partir du salaire net
+    Renvoie 0 sauf pour les salariés non cadres, cadres (TODO: et les contractuels de la fonction publique ?)
+    '''
+    inversed_bareme = get_inversed_baremes(build_salbrut_from_salnet_inversed_baremes, _defaultP)
+
+    salbrut = zeros(len(salnet))
+    for category in ['prive_non_cadre', 'prive_cadre']:
+        salbrut += inversed_bareme[category].calc(salnet) * (type_sal == CAT[category])
 
-    # <NODE desc= "Supplément familial de traitement " shortname="Supp. fam." code= "supp_familial_traitement"/>
-    # <NODE desc= "Indemnité de résidence" shortname="Ind. rés." code= "indemenite_residence"/>
     return salbrut + hsup
 
 
-def _salbrut_from_salnet(salnet, hsup, type_sal, _defaultP):
+def build_salbrut_from_salnet_inversed_baremes(_defaultP):
     '''
-    Calcule le salaire brut à partir du salaire net
-    Renvoie 0 sauf pour les salariés non cadres, cadres (TODO: et les contractuels de la fonction publique ?)
+    Construit les barèmes inversés permettant de passer du salaire net au salaire brut
     '''
     plaf_ss = 12 * _defaultP.cotsoc.gen.plaf_ss
 
@@ -156,17 +178,11 @@ def _salbrut_from_salnet(salnet, hsup, type_sal, _defaultP):
         bareme.add_tax_scale(csg_impos)
         bareme.add_tax_scale(crds)
 
-    inversed_bareme = {
+    return {
         'prive_cadre': prive_cadre.inverse(),
         'prive_non_cadre': prive_non_cadre.inverse(),
         }
 
-    salbrut = zeros(len(salnet))
-    for category in ['prive_non_cadre', 'prive_cadre']:
-        salbrut += inversed_bareme[category].calc(salnet) * (type_sal == CAT[category])
-
-    return salbrut + hsup
-
 
 ############################################################################
 # Allocations chômage
@@ -177,26 +193,47 @@ def _chobrut_from_choi(choi, csg_rempl, _defaultP):
     '''
     Calcule les allocations chômage brute à partir des allocations imposables
     '''
+    inversed_bareme = get_inversed_baremes(build_chobrut_from_choi_inversed_baremes, _defaultP)
+    chobrut = (csg_rempl == 1) * choi + (csg_rempl == 2) * inversed_bareme['reduit'].calc(choi) \
+        + (csg_rempl == 3) * inversed_bareme['plein'].calc(choi)
+    isexo = exo_csg_chom(chobrut, csg_rempl, _defaultP)
+    chobrut = not_(isexo) * chobrut + (isexo) * choi
+
+    return chobrut
+
+
+def build_chobrut_from_choi_inversed_baremes(_defaultP):
+    '''
+    Construit les barèmes inversés permettant de passer des allocations chômage imposables aux allocations brutes
+    '''
     P = _defaultP.csg.chom
     plaf_ss = 12 * _defaultP.cotsoc.gen.plaf_ss
     csg = scale_tax_scales(TaxScalesTree('csg', P), plaf_ss)
     taux_plein = csg['plein']['deduc']
     taux_reduit = csg['reduit']['deduc']
 
-    chom_plein = taux_plein.inverse()
-    chom_reduit = taux_reduit.inverse()
-    chobrut = (csg_rempl == 1) * choi + (csg_rempl == 2) * chom_reduit.calc(choi) \
-        + (csg_rempl == 3) * chom_plein.calc(choi)
-    isexo = exo_csg_chom(chobrut, csg_rempl, _defaultP)
-    chobrut = not_(isexo) * chobrut + (isexo) * choi
-
-    return chobrut
+    return {
+        'plein': taux_plein.inverse(),
+        'reduit': taux_reduit.inverse(),
+        }
 
 
 def _chobrut_from_chonet(chonet, csg_rempl, _defaultP):
     '''
     Calcule les allocations chômage brute à partir des allocations imposables
     '''
+    inversed_bareme = get_inversed_baremes(build_chobrut_from_chonet_inversed_baremes, _defaultP)
+    chobrut = (csg_rempl == 1) * chonet + (csg_rempl == 2) * inversed_bareme['reduit'].calc(chonet) \
+        + (csg_rempl == 3) * inversed_bareme['plein'].calc(chonet)
+    isexo = exo_csg_chom(chobrut, csg_rempl, _defaultP)
+    chobrut = not_(isexo) * chobrut + (isexo) * chonet
+    return chobrut
+
+
+def build_chobrut_from_chonet_inversed_baremes(_defaultP):
+    '''
+    Construit les barèmes inversés permettant de passer des allocations chômage nettes aux allocations brutes
+    '''
     P = _defaultP.csg.chom
     plaf_ss = 12 * _defaultP.cotsoc.gen.plaf_ss
     csg = scale_tax_scales(TaxScalesTree('csg', P), plaf_ss)
@@ -207,14 +244,11 @@ def _chobrut_from_chonet(chonet, csg_rempl, _defaultP):
     taux_reduit = combine_tax_scales(csg['reduit'])
     taux_plein.add_tax_scale(crds)
     taux_reduit.add_tax_scale(crds)
-    chom_plein = taux_plein.inverse()
-    chom_reduit = taux_reduit.inverse()
 
-    chobrut = (csg_rempl == 1) * chonet + (csg_rempl == 2) * chom_reduit.calc(chonet) \
-        + (csg_rempl == 3) * chom_plein.calc(chonet)
-    isexo = exo_csg_chom(chobrut, csg_rempl, _defaultP)
-    chobrut = not_(isexo) * chobrut + (isexo) * chonet
-    return chobrut
+    return {
+        'plein': taux_plein.inverse(),
+        'reduit': taux_reduit.inverse(),
+        }
 
 
 ############################################################################
@@ -226,17 +260,37 @@ def _rstbrut_from_rsti(rsti, csg_rempl, _defaultP):
     '''
     Calcule les pensions de retraites brutes à partir des pensions imposables
     '''
-    P = _defaultP.csg.retraite
-    rst_plein = P.plein.deduc.inverse()
-    rst_reduit = P.reduit.deduc.inverse()
-    rstbrut = (csg_rempl == 2) * rst_reduit.calc(rsti) + (csg_rempl == 3) * rst_plein.calc(rsti)
+    inversed_bareme = get_inversed_baremes(build_rstbrut_from_rsti_inversed_baremes, _defaultP)
+    rstbrut = (csg_rempl == 2) * inversed_bareme['reduit'].calc(rsti) \
+        + (csg_rempl == 3) * inversed_bareme['plein'].calc(rsti)
     return rstbrut
 
 
+def build_rstbrut_from_rsti_inversed_baremes(_defaultP):
+    '''
+    Construit les barèmes inversés permettant de passer des pensions imposables aux pensions brutes
+    '''
+    P = _defaultP.csg.retraite
+    return {
+        'plein': P.plein.deduc.inverse(),
+        'reduit': P.reduit.deduc.inverse(),
+        }
+
+
 def _rstbrut_from_rstnet(rstnet, csg_rempl, _defaultP):
     '''
     Calcule les pensions de retraites brutes à partir des pensions nettes
     '''
+    inversed_bareme = get_inversed_baremes(build_rstbrut_from_rstnet_inversed_baremes, _defaultP)
+    rstbrut = (csg_rempl == 2) * inversed_bareme['reduit'].calc(rstnet) \
+        + (csg_rempl == 3) * inversed_bareme['plein'].calc(rstnet)
+    return rstbrut
+
+
+def build_rstbrut_from_rstnet_inversed_baremes(_defaultP):
+    '''
+    Construit les barèmes inversés permettant de passer des pensions nettes aux pensions brutes
+    '''
     P = _defaultP.csg.retraite
     plaf_ss = 12 * _defaultP.cotsoc.gen.plaf_ss
     csg = scale_tax_scales(TaxScalesTree('csg', P), plaf_ss)
@@ -252,10 +306,54 @@ def _rstbrut_from_rstnet(rstnet, csg_rempl, _defaultP):
         taux_plein.add_tax_scale(casa)
         taux_reduit.add_tax_scale(casa)
 
-    rst_plein = taux_plein.inverse()
-    rst_reduit = taux_reduit.inverse()
-    rstbrut = (csg_rempl == 2) * rst_reduit.calc(rstnet) + (csg_rempl == 3) * rst_plein.calc(rstnet)
-    return rstbrut
+    return {
+        'plein': taux_plein.inverse(),
+        'reduit': taux_reduit.inverse(),
+        }
+
+
+############################################################################
+# Cache des barèmes inversés
+############################################################################
+
+
+def get_inversed_baremes(build_inversed_baremes, _defaultP):
+    '''
+    Renvoie les barèmes inversés construits par build_inversed_baremes à partir de la législation _defaultP.
+    Ils sont mémorisés selon la date de la législation et l'empreinte des paramètres de cotisations et de contributions
+    sociales dont ils dépendent : les réformes qui ne modifient pas ces paramètres réutilisent les barèmes de la
+    législation de référence.
+    Les barèmes renvoyés sont partagés et ne doivent pas être modifiés.
+    '''
+    key = (
+        build_inversed_baremes.__name__,
+        getattr(_defaultP, 'instant', None),
+        get_fingerprint(_defaultP, 'cotsoc.gen', 'cotsoc.sal', 'crds', 'csg', 'prelsoc'),
+        )
+    inversed_baremes = inversed_baremes_by_key.pop(key, None)
+    if inversed_baremes is None:
+        inversed_baremes = build_inversed_baremes(_defaultP)
+        while len(inversed_baremes_by_key) >= INVERSED_BAREMES_CACHE_SIZE:
+            inversed_baremes_by_key.popitem(last = False)
+    inversed_baremes_by_key[key] = inversed_baremes
+    return inversed_baremes
+
+
+def get_fingerprint(compact_legislation, *paths):
+    '''
+    Renvoie l'empreinte des nœuds de la législation compacte désignés par leurs chemins (ex : 'cotsoc.sal').
+    Elle n'est calculée qu'une fois par législation compacte et par jeu de chemins.
+    '''
+    fingerprint_by_paths = legislation_fingerprints_cache.get(compact_legislation)
+    if fingerprint_by_paths is None:
+        legislation_fingerprints_cache[compact_legislation] = fingerprint_by_paths = {}
+    fingerprint = fingerprint_by_paths.get(paths)
+    if fingerprint is None:
+        fingerprint_by_paths[paths] = fingerprint = fingerprint_legislation(*(
+            reduce(getattr, path.split('.'), compact_legislation)
+            for path in paths
+            ))
+    return fingerprint
 
 
 ############################################################################
@@ -265,43 +363,272 @@ def _rstbrut_from_rstnet(rstnet, csg_rempl, _defaultP):
 
 def _num_chobrut_from_chonet(self, chonet, period):
     """Calcule les allocations chomage brutes à partir des allocations nettes par inversion numérique."""
-    simulation = self.holder.entity.simulation
-    function = lambda chobrut: brut_to_net(
-        chobrut = chobrut,
+    function = BrutToNetEvaluator(
+        input_name = 'chobrut',
         output_name = 'chonet',
         period = period,
-        simulation = simulation,
-        ) - chonet
-    return fsolve(function, chonet)
+        simulation = self.holder.entity.simulation,
+        )
+    return solve_numerically('chobrut', function, chonet)
 
 
 def _num_rstbrut_from_rstnet(self, period, rstnet):
     """Calcule les pensions brutes à partir des pensions nettes par inversion numérique."""
-    simulation = self.holder.entity.simulation
-    function = lambda rstbrut: brut_to_net(
+    function = BrutToNetEvaluator(
+        input_name = 'rstbrut',
         output_name = 'rstnet',
         period = period,
-        rstbrut = rstbrut,
-        simulation = simulation,
-        ) - rstnet
-    return fsolve(function, rstnet)
+        simulation = self.holder.entity.simulation,
+        )
+    return solve_numerically('rstbrut', function, rstnet)
 
 
 def _num_salbrut_from_salnet(self, period, salnet):
     """Calcule les salaires bruts à partir des salaires nets par inversion numérique."""
-    simulation = self.holder.entity.simulation
-    function = lambda salbrut: brut_to_net(
+    function = BrutToNetEvaluator(
+        input_name = 'salbrut',
         output_name = 'salnet',
         period = period,
-        salbrut = salbrut,
-        simulation = simulation,
-        ) - salnet
-    return fsolve(function, salnet)
-
-
-def brut_to_net(input = None, output_name = None, period = None, simulation = None, **input_array_by_name):
-    simulation = simulation.clone(debug = simulation.debug, debug_all = simulation.debug_all)
-    simulation.get_holder(output_name).delete_arrays()
-    for variable_name, array in input_array_by_name.iteritems():
-        simulation.get_or_new_holder(variable_name).set_array(period, array)
-    return simulation.calculate(output_name)
+        simulation = self.holder.entity.simulation,
+        )
+    return solve_numerically('salbrut', function, salnet)
+
+
+class BrutToNetEvaluator(object):
+    """Calcule une variable nette pour des valeurs successives de la variable brute dont elle dépend.
+
+    La simulation n'est clonée qu'une seule fois. Les holders remplis lors de la première évaluation forment le
+    sous-graphe situé entre la variable brute et la variable nette : ce sont les seuls à être vidés puis recalculés lors
+    des évaluations suivantes. Tous les autres holders continuent de partager, en lecture seule, les tableaux de la
+    simulation parente.
+    """
+    input_holder = None
+    output_name = None
+    period = None
+    simulation = None
+    touched_holders = None  # Holders recalculés à chaque évaluation, connus après la première évaluation
+
+    def __init__(self, input_name = None, output_name = None, period = None, simulation = None):
+        assert input_name is not None
+        assert output_name is not None
+        assert simulation is not None
+        self.simulation = simulation = simulation.clone(debug = simulation.debug, debug_all = simulation.debug_all)
+        simulation.get_holder(output_name).delete_arrays()
+        self.input_holder = simulation.get_or_new_holder(input_name)
+        self.output_name = output_name
+        self.period = period
+
+    def __call__(self, input_array):
+        simulation = self.simulation
+        period = self.period
+        if self.touched_holders is None:
+            shared_holders = set(
+                holder
+                for holder in iter_simulation_holders(simulation)
+                if holder.get_array(period) is not None
+                )
+        else:
+            for holder in self.touched_holders:
+                holder.delete_arrays()
+        self.input_holder.set_array(period, input_array)
+        output_array = simulation.calculate(self.output_name)
+        if self.touched_holders is None:
+            self.touched_holders = [
+                holder
+                for holder in iter_simulation_holders(simulation)
+                if holder is not self.input_holder and holder not in shared_holders
+                    and holder.get_array(period) is not None
+                ]
+            log.debug(u"Inversion numérique de {} : {} holders recalculés à chaque itération".format(self.output_name,
+                len(self.touched_holders)))
+        return output_array
+
+
+############################################################################
+# Table de correspondance (enquêtes)
+############################################################################
+
+
+def _tab_salbrut_from_salnet(self, period, salnet, hsup, type_sal, _P):
+    """Calcule les salaires bruts à partir des salaires nets par interpolation dans une table de correspondance.
+
+    Adapté aux enquêtes : la table n'est calculée qu'une fois par période, par catégorie de salarié et par législation,
+    puis chaque individu est inversé par recherche dichotomique dans la table. Lorsque SALNET_TO_SALBRUT_REFINEMENT est
+    vrai, une seule évaluation de la simulation permet ensuite de corriger l'interpolation par un pas de Newton.
+    """
+    simulation = self.holder.entity.simulation
+    salbrut = zeros(len(salnet))
+    slope = zeros(len(salnet))
+    for category in CAT:
+        is_category = type_sal == category[1]  # category[1] is the numerical index
+        if not is_category.any():
+            continue
+        salbrut_grid, salnet_grid = get_salnet_to_salbrut_table(category[0], period, simulation, _P)
+        salbrut[is_category], slope[is_category] = interpolate_inverse(salnet[is_category], salbrut_grid,
+            salnet_grid)
+    salbrut += hsup
+
+    if SALNET_TO_SALBRUT_REFINEMENT:
+        evaluate = BrutToNetEvaluator(input_name = 'salbrut', output_name = 'salnet', period = period,
+            simulation = simulation)
+        residual = salnet - evaluate(salbrut)
+        if residual.size:
+            log.info(u"Table salnet -> salbrut : écart maximal de {:.2f} € sur le salaire net avant correction".format(
+                abs_(residual).max()))
+        salbrut += residual / slope
+    return salbrut
+
+
+def build_salnet_to_salbrut_table(category, period, simulation):
+    """Calcule la table (salbrut, salnet) d'une catégorie de salarié sur une grille de salaires bruts.
+
+    La grille est fine pour les salaires courants puis plus lâche pour les hauts salaires. Les milieux des intervalles
+    de la grille sont calculés en même temps afin d'estimer l'erreur maximale d'interpolation de la table.
+    """
+    salbrut_grid = concatenate((linspace(0, 100000, 10001), linspace(100000, 1000000, 9001)[1:]))
+    salbrut_points = zeros(2 * salbrut_grid.size - 1)
+    salbrut_points[::2] = salbrut_grid
+    salbrut_points[1::2] = (salbrut_grid[:-1] + salbrut_grid[1:]) / 2
+    table_simulation = simulation.tax_benefit_system.new_scenario().init_single_entity(
+        axes = [
+            dict(
+                count = salbrut_points.size,
+                name = 'salbrut',
+                max = salbrut_points[-1],
+                min = salbrut_points[0],
+                ),
+            ],
+        period = period,
+        parent1 = dict(
+            birth = datetime.date(period.start.year - 40, 1, 1),
+            type_sal = CAT[category],
+            ),
+        ).new_simulation()
+    table_simulation.get_or_new_holder('salbrut').set_array(period, salbrut_points)
+    salnet_points = table_simulation.calculate('salnet')
+
+    salnet_grid = salnet_points[::2]
+    # La table doit être strictement croissante pour être inversée.
+    is_increasing = concatenate(([True], diff(salnet_grid) > 0))
+    salbrut_grid = salbrut_grid[is_increasing]
+    salnet_grid = salnet_grid[is_increasing]
+    error = abs_(interpolate_inverse(salnet_points[1::2], salbrut_grid, salnet_grid)[0] - salbrut_points[1::2]).max()
+    log.info(u"Table salnet -> salbrut {} {} : {} points, erreur maximale d'interpolation de {:.2f} €".format(
+        category, period, salbrut_grid.size, error))
+    return salbrut_grid, salnet_grid
+
+
+def get_salnet_to_salbrut_table(category, period, simulation, _P):
+    """Renvoie la table (salbrut, salnet) d'une catégorie de salarié, en la mémorisant par période et par législation.
+
+    Seuls les paramètres de cotisations et de contributions sociales entrent dans l'empreinte de la législation.
+    """
+    key = (category, unicode(period), get_fingerprint(_P, 'cotsoc', 'crds', 'csg', 'prelsoc'))
+    table = salnet_to_salbrut_table_by_key.pop(key, None)
+    if table is None:
+        table = build_salnet_to_salbrut_table(category, period, simulation)
+        while len(salnet_to_salbrut_table_by_key) >= SALNET_TO_SALBRUT_CACHE_SIZE:
+            salnet_to_salbrut_table_by_key.popitem(last = False)
+    salnet_to_salbrut_table_by_key[key] = table
+    return table
+
+
+def interpolate_inverse(net, brut_grid, net_grid):
+    """Inverse par interpolation linéaire une table croissante (brut_grid, net_grid).
+
+    Renvoie les bruts correspondant aux nets donnés et la pente de la table en ces points. Au-delà des bornes de la
+    table, l'interpolation est prolongée linéairement.
+    """
+    index = clip(searchsorted(net_grid, net, side = 'right') - 1, 0, net_grid.size - 2)
+    slope = (net_grid[index + 1] - net_grid[index]) / (brut_grid[index + 1] - brut_grid[index])
+    return brut_grid[index] + (net - net_grid[index]) / slope, slope
+
+
+############################################################################
+# Solveur
+############################################################################
+
+
+def solve_numerically(variable_name, function, target, max_iterations = None, tolerance = None):
+    """Résout function(x) = target élément par élément et signale les individus pour lesquels la résolution échoue."""
+    solution, unconverged_count = solve_increasing_function(function, target, max_iterations = max_iterations,
+        tolerance = tolerance)
+    if unconverged_count:
+        log.warning(u"Inversion numérique de {} : {} individus sur {} n'ont pas convergé".format(variable_name,
+            unconverged_count, solution.size))
+    return solution
+
+
+def solve_increasing_function(function, target, max_iterations = None, tolerance = None):
+    """Inverse élément par élément une fonction vectorielle croissante.
+
+    Chaque individu est traité comme un problème indépendant à une dimension : la racine de function(x) - target est
+    d'abord encadrée, puis approchée par la méthode de la fausse position (variante Illinois) avec repli sur la
+    dichotomie. Seuls les individus n'ayant pas encore convergé sont mis à jour, de sorte que chaque itération coûte une
+    évaluation de function et un temps et une mémoire linéaires en le nombre d'individus.
+
+    Renvoie la solution et le nombre d'individus n'ayant pas convergé.
+    """
+    if max_iterations is None:
+        max_iterations = SOLVER_MAX_ITERATIONS
+    if tolerance is None:
+        tolerance = SOLVER_TOLERANCE
+    target = asarray(target, dtype = float)
+    evaluate = lambda x: asarray(function(x), dtype = float) - target
+
+    # Encadrement de la racine, en élargissant l'intervalle tant que nécessaire
+    step = max_(abs_(target), 1)
+    lower = target - step
+    upper = target + step
+    lower_residual = evaluate(lower)
+    upper_residual = evaluate(upper)
+    for iteration in range(max_iterations):
+        lower_too_high = lower_residual > 0
+        upper_too_low = not_(lower_too_high) & (upper_residual < 0)
+        if not (lower_too_high.any() or upper_too_low.any()):
+            break
+        step = where(lower_too_high | upper_too_low, 2 * step, step)
+        lower = where(lower_too_high, lower - step, lower)
+        upper = where(upper_too_low, upper + step, upper)
+        residual = evaluate(where(lower_too_high, lower, upper))
+        lower_residual = where(lower_too_high, residual, lower_residual)
+        upper_residual = where(upper_too_low, residual, upper_residual)
+    bracketed = (lower_residual <= 0) & (upper_residual >= 0)
+
+    solution = where(abs_(lower_residual) <= abs_(upper_residual), lower, upper)
+    converged = not_(bracketed) | (min_(abs_(lower_residual), abs_(upper_residual)) <= tolerance) | (
+        upper - lower <= tolerance)
+    # Côté de l'encadrement remplacé à l'itération précédente : -1 pour la borne inférieure, 1 pour la supérieure
+    replaced_side = zeros(target.shape, dtype = int)
+    for iteration in range(max_iterations):
+        active = not_(converged)
+        if not active.any():
+            break
+        middle = (lower + upper) / 2
+        denominator = where(upper_residual != lower_residual, upper_residual - lower_residual, 1)
+        secant = (lower * upper_residual - upper * lower_residual) / denominator
+        candidate = where((lower < secant) & (secant < upper), secant, middle)
+        solution = where(active, candidate, solution)
+        residual = evaluate(solution)
+
+        replaces_lower = active & (residual < 0)
+        replaces_upper = active & (residual >= 0)
+        # Variante Illinois : lorsque la même borne est conservée deux fois de suite, son résidu est divisé par deux.
+        upper_residual = where(replaces_lower & (replaced_side == -1), upper_residual / 2, upper_residual)
+        lower_residual = where(replaces_upper & (replaced_side == 1), lower_residual / 2, lower_residual)
+        lower = where(replaces_lower, solution, lower)
+        lower_residual = where(replaces_lower, residual, lower_residual)
+        upper = where(replaces_upper, solution, upper)
+        upper_residual = where(replaces_upper, residual, upper_residual)
+        replaced_side = where(replaces_lower, -1, where(replaces_upper, 1, replaced_side))
+
+        converged |= active & ((abs_(residual) <= tolerance) | (upper - lower <= tolerance))
+
+    unconverged_count = int(not_(converged & bracketed).sum())
+    return solution, unconverged_count
+
+
+def iter_simulation_holders(simulation):
+    for entity in simulation.entity_by_key_plural.itervalues():
+        for holder in entity.holder_by_name.itervalues():
+            yield holder
@@ -11,11 +11,20 @@ from __future__ import division
 
 import logging
 
-from numpy import (datetime64, int16, logical_and as and_, logical_not as not_, logical_or as or_, logical_xor as xor_,
-    maximum as max_, minimum as min_, round)
+from numpy import (asarray, concatenate, cumsum, datetime64, diff, int16, logical_and as and_, logical_not as not_,
+    logical_or as or_, logical_xor as xor_, maximum as max_, minimum as min_, round, searchsorted, select, vstack,
+    where)
 from openfisca_core.accessors import law
 
-from .base import QUIFOY
+from .base import (
+    QUIFOY,
+    cast_from_entity_to_role,
+    cast_from_entity_to_roles,
+    filter_role,
+    get_projection_cache,
+    split_by_roles,
+    sum_by_entity,
+    )
 
 
 CONJ = QUIFOY['conj']
@@ -84,27 +93,27 @@ def _nb_pac(nbF, nbJ, nbR):
 
 def _nbF(self, age, alt, inv, quifoy):
     enfant_a_charge = and_(and_(quifoy >= 2, or_(age < 18, inv)), not_(alt))
-    return self.sum_by_entity(enfant_a_charge.astype(int16))
+    return sum_by_entity(self, enfant_a_charge.astype(int16))
 
 
 def _nbG(self, alt, inv, quifoy):
     enfant_a_charge_invalide = and_(and_(quifoy >= 2, inv), not_(alt))
-    return self.sum_by_entity(enfant_a_charge_invalide.astype(int16))
+    return sum_by_entity(self, enfant_a_charge_invalide.astype(int16))
 
 
 def _nbH(self, age, alt, inv, quifoy):
     enfant_a_charge_garde_alternee = and_(and_(quifoy >= 2, or_(age < 18, inv)), alt)
-    return self.sum_by_entity(enfant_a_charge_garde_alternee.astype(int16))
+    return sum_by_entity(self, enfant_a_charge_garde_alternee.astype(int16))
 
 
 def _nbI(self, alt, inv, quifoy):
     enfant_a_charge_garde_alternee_invalide = and_(and_(quifoy >= 2, inv), alt)
-    return self.sum_by_entity(enfant_a_charge_garde_alternee_invalide.astype(int16))
+    return sum_by_entity(self, enfant_a_charge_garde_alternee_invalide.astype(int16))
 
 
 def _nbJ(self, age, inv, quifoy):
     majeur_celibataire_sans_enfant = and_(and_(quifoy >= 2, age >= 18), not_(inv))
-    return self.sum_by_entity(majeur_celibataire_sans_enfant.astype(int16))
+    return sum_by_entity(self, majeur_celibataire_sans_enfant.astype(int16))
 
 
 def _marpac(self, statmarit_holder):
@@ -112,7 +121,7 @@ def _marpac(self, statmarit_holder):
     Marié (1) ou Pacsé (5)
     'foy'
     '''
-    statmarit = self.filter_role(statmarit_holder, role = VOUS)
+    statmarit = filter_role(self, statmarit_holder, role = VOUS)
 
     return (statmarit == 1) | (statmarit == 5)
 
@@ -122,7 +131,7 @@ def _celdiv(self, statmarit_holder):
     Célibataire (2) ou divorcé (3)
     'foy'
     '''
-    statmarit = self.filter_role(statmarit_holder, role = VOUS)
+    statmarit = filter_role(self, statmarit_holder, role = VOUS)
 
     return (statmarit == 2) | (statmarit == 3)
 
@@ -132,7 +141,7 @@ def _veuf(self, statmarit_holder):
     Veuf (4)
     'foy'
     '''
-    statmarit = self.filter_role(statmarit_holder, role = VOUS)
+    statmarit = filter_role(self, statmarit_holder, role = VOUS)
 
     return statmarit == 4
 
@@ -142,7 +151,7 @@ def _jveuf(self, statmarit_holder):
     Jeune Veuf
     'foy'
     '''
-    statmarit = self.filter_role(statmarit_holder, role = VOUS)
+    statmarit = filter_role(self, statmarit_holder, role = VOUS)
 
     return statmarit == 6
 
@@ -210,8 +219,8 @@ def _indu_plaf_abat_pen(self, rev_pen_holder, pen_net_holder, abatpen = law.ir.t
     Plafonnement de l'abattement de 10% sur les pensions du foyer
     'foy'
     """
-    pen_net = self.sum_by_entity(pen_net_holder)
-    rev_pen = self.sum_by_entity(rev_pen_holder)
+    pen_net = sum_by_entity(self, pen_net_holder)
+    rev_pen = sum_by_entity(self, rev_pen_holder)
 
     abat = rev_pen - pen_net
     return abat - min_(abat, abatpen.max)
@@ -234,14 +243,14 @@ def _rto(self, f1aw, f1bw, f1cw, f1dw):
     """
     Rentes viagères à titre onéreux (avant abattements)
     """
-    return self.cast_from_entity_to_role(f1aw + f1bw + f1cw + f1dw,
+    return cast_from_entity_to_role(self, f1aw + f1bw + f1cw + f1dw,
         entity = 'foyer_fiscal', role = VOUS)
 
 def _rto_net(self, f1aw, f1bw, f1cw, f1dw, abatviag = law.ir.tspr.abatviag):
     '''
     Rentes viagères après abattements
     '''
-    return self.cast_from_entity_to_role(
+    return cast_from_entity_to_role(self,
         round(abatviag.taux1 * f1aw + abatviag.taux2 * f1bw + abatviag.taux3 * f1cw + abatviag.taux4 * f1dw),
         entity = 'foyer_fiscal',
         role = VOUS,
@@ -264,7 +273,7 @@ def _rev_cat_tspr(self, tspr_holder, indu_plaf_abat_pen):
     Traitemens salaires pensions et rentes
     'foy'
     '''
-    tspr = self.sum_by_entity(tspr_holder)
+    tspr = sum_by_entity(self, tspr_holder)
 
     return tspr + indu_plaf_abat_pen
 
@@ -429,7 +438,8 @@ def _rev_cat_rpns(self, nbnc_pvce_holder, mbic_mvct, rpns_i_holder, defrag, defa
     Revenus personnels non salariés
     'foy'
     '''
-    return self.sum_by_entity(rpns_i_holder) - self.sum_by_entity(nbnc_pvce_holder) - defrag - defncn - defacc - defmeu - mbic_mvct
+    return (sum_by_entity(self, rpns_i_holder) - sum_by_entity(self, nbnc_pvce_holder) - defrag - defncn - defacc
+        - defmeu - mbic_mvct)
 
 
 def _rev_cat(rev_cat_tspr, rev_cat_rvcm, rev_cat_rfon, rev_cat_rpns, rev_cat_pv):
@@ -455,9 +465,9 @@ def _rbg(self, rev_cat, deficit_ante, f6gh, nbic_impm_holder, nacc_pvce_holder,
     '''
     # (Total 17)
     # sans les revenus au quotient
-    nacc_pvce = self.sum_by_entity(nacc_pvce_holder)
+    nacc_pvce = sum_by_entity(self, nacc_pvce_holder)
     return max_(0,
-                rev_cat + f6gh + (self.sum_by_entity(nbic_impm_holder) + nacc_pvce) * (1 + cga) - deficit_ante)
+                rev_cat + f6gh + (sum_by_entity(self, nbic_impm_holder) + nacc_pvce) * (1 + cga) - deficit_ante)
 
 
 def _csg_deduc_patrimoine(f6de):
@@ -473,7 +483,7 @@ def _csg_deduc_patrimoine_simulated(self, rev_cat_rfon, rev_cap_bar, rto_holder,
     Cette fonction simule le montant mentionné dans la case f6de de la déclaration 2042
     http://bofip.impots.gouv.fr/bofip/887-PGP
     '''
-    rto = self.sum_by_entity(rto_holder)
+    rto = sum_by_entity(self, rto_holder)
     patrimoine_deduc = rev_cat_rfon + rev_cap_bar + rto
     return taux * patrimoine_deduc
 
@@ -494,20 +504,49 @@ def _rni(rng, abat_spe):
     return rng - abat_spe
 
 
-def _ir_brut(self, nbptr, taux_effectif, rni, bareme = law.ir.bareme):
+def calculate_quotient_familial(rni, nbptr, nb_adult, bareme, period = None, projection_cache = None):
+    '''
+    Impôt au barème avec quotient familial (ligne 0) et sans quotient familial (ligne 1)
+
+    Le barème est évalué une seule fois, sur la matrice des revenus par part des deux lignes : chaque revenu est
+    situé dans sa tranche par searchsorted, puis taxé à partir de l'impôt cumulé au seuil de cette tranche. Quand un
+    cache de projections est donné, le résultat y est gardé pour la période donnée, pour que _ir_brut et _ir_ss_qf,
+    appelées avec les mêmes tableaux, se le partagent.
+    '''
+    if projection_cache is not None:
+        key = ('quotient_familial', period)
+        source_arrays = (rni, nbptr, nb_adult, bareme)
+        impot = projection_cache.get(key, source_arrays)
+        if impot is None:
+            impot = calculate_quotient_familial(rni, nbptr, nb_adult, bareme)
+            projection_cache.set(key, source_arrays, impot)
+        return impot
+    nb_parts = vstack((nbptr, nb_adult))
+    thresholds = asarray(bareme.thresholds, dtype = float)
+    rates = asarray(bareme.rates, dtype = float)
+    amounts = concatenate(([0], cumsum(rates[:-1] * diff(thresholds))))  # Impôt cumulé au seuil de chaque tranche
+    revenu_par_part = max_(rni / nb_parts, thresholds[0])
+    tranche = searchsorted(thresholds, revenu_par_part, side = 'right') - 1
+    return nb_parts * (amounts[tranche] + rates[tranche] * (revenu_par_part - thresholds[tranche]))
+
+
+def _ir_brut(self, nbptr, taux_effectif, rni, nb_adult, period, bareme = law.ir.bareme):
     '''
     Impot sur le revenu avant non imposabilité et plafonnement du quotient
     'foy'
     '''
-    return  (taux_effectif == 0) * nbptr * bareme.calc(rni / nbptr) + taux_effectif * rni# TODO: partir d'ici, petite différence avec Matlab REMOVE
+    # TODO: partir d'ici, petite différence avec Matlab REMOVE
+    impot = calculate_quotient_familial(rni, nbptr, nb_adult, bareme, period = period,
+        projection_cache = get_projection_cache(self.holder.entity.simulation))
+    return (taux_effectif == 0) * impot[0] + taux_effectif * rni
 
 
-def _ir_ss_qf(ir_brut, rni, nb_adult, bareme = law.ir.bareme):
+def _ir_ss_qf(self, rni, nbptr, nb_adult, period, bareme = law.ir.bareme):
     '''
     Impôt sans quotient familial
     '''
-    A = bareme.calc(rni / nb_adult)
-    return nb_adult * A
+    return calculate_quotient_familial(rni, nbptr, nb_adult, bareme, period = period,
+        projection_cache = get_projection_cache(self.holder.entity.simulation))[1]
 
 
 def _ir_plaf_qf(ir_brut, ir_ss_qf, nb_adult, nb_pac, nbptr, marpac, veuf, jveuf, celdiv, caseE, caseF, caseG, caseH,
@@ -515,9 +554,6 @@ def _ir_plaf_qf(ir_brut, ir_ss_qf, nb_adult, nb_pac, nbptr, marpac, veuf, jveuf,
     '''
     Impôt après plafonnement du quotient familial et réduction complémentaire
     '''
-    A = ir_ss_qf
-    I = ir_brut
-
     aa0 = (nbptr - nb_adult) * 2  # nombre de demi part excédant nbadult
     # on dirait que les impôts font une erreur sur aa1 (je suis obligé de
     # diviser par 2)
@@ -525,26 +561,17 @@ def _ir_plaf_qf(ir_brut, ir_ss_qf, nb_adult, nb_pac, nbptr, marpac, veuf, jveuf,
     aa2 = max_((nbptr - 2) * 2, 0)  # nombre de demi part restantes
     # celdiv parents isolés
     condition61 = celdiv & caseT
-    B1 = plafond_qf.celib_enf * aa1 + plafond_qf.marpac * aa2
-    # tous les autres
-    B2 = plafond_qf.marpac * aa0  # si autre
     # celdiv, veufs (non jveuf) vivants seuls et autres conditions
     # TODO: année en dur... pour caseH
     condition63 = (celdiv | (veuf & not_(jveuf))) & not_(caseN) & (nb_pac == 0) & (caseK | caseE) & (caseH < 1981)
-    B3 = plafond_qf.celib
-
-    B = B1 * condition61 + \
-        B2 * (not_(condition61 | condition63)) + \
-        B3 * (condition63 & not_(condition61))
-    C = max_(0, A - B)
-    # Impôt après plafonnement
-    IP0 = max_(I, C)
+    # Plafond de l'avantage procuré par les demi-parts, par foyer (tous les autres par défaut)
+    B = select(
+        [condition61, condition63],
+        [plafond_qf.celib_enf * aa1 + plafond_qf.marpac * aa2, plafond_qf.celib],
+        default = plafond_qf.marpac * aa0,
+        )
 
     # 6.2 réduction d'impôt pratiquée sur l'impot après plafonnement et le cas particulier des DOM
-    # pas de réduction complémentaire
-    condition62a = (I >= C)
-    # réduction complémentaire
-    condition62b = (I < C)
     # celdiv veuf
     condition62caa0 = (celdiv | (veuf & not_(jveuf)))
     condition62caa1 = (nb_pac == 0) & (caseP | caseG | caseF | caseW)
@@ -554,15 +581,14 @@ def _ir_plaf_qf(ir_brut, ir_ss_qf, nb_adult, nb_pac, nbptr, marpac, veuf, jveuf,
     # marié pacs
     condition62cab = (marpac | jveuf) & caseS & not_(caseP | caseF)
     condition62ca = (condition62caa | condition62cab)
-
     # plus de 590 euros si on a des plus de
     condition62cb = ((nbG + nbR + nbI) > 0) | caseP | caseF
     D = plafond_qf.reduc_postplafond * (condition62ca + ~condition62ca * condition62cb * (
         1 * caseP + 1 * caseF + nbG + nbR + nbI / 2))
 
-    E = max_(0, A - I - B)
-    Fo = D * (D <= E) + E * (E < D)
-    IP1 = IP0 - Fo
+    # Impôt après plafonnement C : s'il dépasse ir_brut, il est diminué de la réduction complémentaire D, dans la
+    # limite de l'avantage restant max_(0, ir_ss_qf - ir_brut - B)
+    C = max_(0, ir_ss_qf - B)
 
     # TODO: 6.3 Cas particulier: Contribuables domiciliés dans les DOM.
     # conditionGuadMarReu =
@@ -572,9 +598,7 @@ def _ir_plaf_qf(ir_brut, ir_ss_qf, nb_adult, nb_pac, nbptr, marpac, veuf, jveuf,
     # postplafGuyane = 6700
     # IP2 = IP1 - conditionGuadMarReu*min( postplafGuadMarReu,.3*IP1)  - conditionGuyane*min(postplafGuyane,.4*IP1)
 
-    # Récapitulatif
-
-    return condition62a * IP0 + condition62b * IP1  # IP2 si DOM
+    return where(ir_brut >= C, ir_brut, C - min_(D, max_(0, ir_ss_qf - ir_brut - B)))  # IP2 si DOM
 
 
 def _avantage_qf(ir_ss_qf, ir_plaf_qf):
@@ -601,7 +625,7 @@ def _ip_net(self, ir_plaf_qf, cncn_info_holder, decote, taux = law.ir.rpns.taux1
     '''
     irpp après décote
     '''
-    return max_(0, ir_plaf_qf + self.sum_by_entity(cncn_info_holder) * taux - decote)
+    return max_(0, ir_plaf_qf + sum_by_entity(self, cncn_info_holder) * taux - decote)
 
 
 def _iaidrdi(ip_net, reductions):
@@ -623,8 +647,8 @@ def _teicaa(self, f5qm_holder, bareme = law.ir.teicaa):  # f5rm
     """
     Taxe exceptionelle sur l'indemnité compensatrice des agents d'assurance
     """
-    f5qm = self.filter_role(f5qm_holder, role = VOUS)
-    f5rm = self.filter_role(f5qm_holder, role = CONJ)
+    f5qm = filter_role(self, f5qm_holder, role = VOUS)
+    f5rm = filter_role(self, f5qm_holder, role = CONJ)
 
     return bareme.calc(f5qm) + bareme.calc(f5rm)
 
@@ -633,7 +657,7 @@ def _micro_social_vente(self, ebic_impv_holder):
     '''
     Assiette régime microsociale pour les ventes
     '''
-    return self.sum_by_entity(ebic_impv_holder)
+    return sum_by_entity(self, ebic_impv_holder)
     # P = _P.ir.rpns.microentreprise
     # assert (ebic_impv <= P.vente.max)
 
@@ -642,7 +666,7 @@ def _micro_social_service(self, ebic_imps_holder):
     '''
     Assiette régime microsociale pour les prestations et services
     '''
-    return self.sum_by_entity(ebic_imps_holder)
+    return sum_by_entity(self, ebic_imps_holder)
     # P = _P.ir.rpns.microentreprise
     # assert (ebic_imps <= P.servi.max)
 
@@ -653,7 +677,7 @@ def _micro_social_proflib(self, ebnc_impo_holder, P = law.ir.rpns.microentrepris
     '''
     # TODO: distinction RSI/CIPAV (pour les cotisations sociales)
     # http://vosdroits.service-public.fr/professionnels-entreprises/F23267.xhtml
-    return self.sum_by_entity(ebnc_impo_holder)
+    return sum_by_entity(self, ebnc_impo_holder)
     # assert (ebnc_impo <= P.specialbnc.max)
 
 
@@ -663,9 +687,9 @@ def _micro_social_2009_(assiette_service, assiette_vente, assiette_proflib, _P,
 
 
 def _micro_entreprise(self, ebnc_impo_holder, ebic_imps_holder, ebic_impv_holder, me = law.ir.rpns.microentreprise):
-    ebnc_impo = self.sum_by_entity(ebnc_impo_holder)
-    ebic_imps = self.sum_by_entity(ebic_imps_holder)
-    ebic_impv = self.sum_by_entity(ebic_impv_holder)
+    ebnc_impo = sum_by_entity(self, ebnc_impo_holder)
+    ebic_imps = sum_by_entity(self, ebic_imps_holder)
+    ebic_impv = sum_by_entity(self, ebic_impv_holder)
     return ebnc_impo * (1 - me.specialbnc.taux) + ebic_imps * (1 - me.servi.taux) + ebic_impv * (1 - me.vente.taux)
 
 
@@ -676,13 +700,13 @@ def _plus_values__2007(self, f3vg, f3vh, f3vl, f3vm, f3vi_holder, f3vf_holder, f
     TODO: f3vt, 2013 f3Vg au barème / tout refaire
     """
 
-    rpns_pvce = self.sum_by_entity(rpns_pvce_holder)
-    f3vd = self.filter_role(f3vd_holder, role = VOUS)
-    f3sd = self.filter_role(f3vd_holder, role = CONJ)
-    f3vi = self.filter_role(f3vi_holder, role = VOUS)
-    f3si = self.filter_role(f3vi_holder, role = CONJ)
-    f3vf = self.filter_role(f3vf_holder, role = VOUS)
-    f3sf = self.filter_role(f3vf_holder, role = CONJ)
+    rpns_pvce = sum_by_entity(self, rpns_pvce_holder)
+    f3vd = filter_role(self, f3vd_holder, role = VOUS)
+    f3sd = filter_role(self, f3vd_holder, role = CONJ)
+    f3vi = filter_role(self, f3vi_holder, role = VOUS)
+    f3si = filter_role(self, f3vi_holder, role = CONJ)
+    f3vf = filter_role(self, f3vf_holder, role = VOUS)
+    f3sf = filter_role(self, f3vf_holder, role = CONJ)
     #  TODO: remove this todo use sum for all fields after checking
         # revenus taxés à un taux proportionnel
     rdp = max_(0, f3vg - f3vh) + f3vl + rpns_pvce + f3vm + f3vi + f3vf
@@ -702,13 +726,13 @@ def _plus_values_2008_2011(self, f3vg, f3vh, f3vl, f3vm, f3vi_holder, f3vf_holde
     TODO: f3vt, 2013 f3Vg au barème / tout refaire
     """
 
-    rpns_pvce = self.sum_by_entity(rpns_pvce_holder)
-    f3vd = self.filter_role(f3vd_holder, role = VOUS)
-    f3sd = self.filter_role(f3vd_holder, role = CONJ)
-    f3vi = self.filter_role(f3vi_holder, role = VOUS)
-    f3si = self.filter_role(f3vi_holder, role = CONJ)
-    f3vf = self.filter_role(f3vf_holder, role = VOUS)
-    f3sf = self.filter_role(f3vf_holder, role = CONJ)
+    rpns_pvce = sum_by_entity(self, rpns_pvce_holder)
+    f3vd = filter_role(self, f3vd_holder, role = VOUS)
+    f3sd = filter_role(self, f3vd_holder, role = CONJ)
+    f3vi = filter_role(self, f3vi_holder, role = VOUS)
+    f3si = filter_role(self, f3vi_holder, role = CONJ)
+    f3vf = filter_role(self, f3vf_holder, role = VOUS)
+    f3sf = filter_role(self, f3vf_holder, role = CONJ)
     #  TODO: remove this todo use sum for all fields after checking
         # revenus taxés à un taux proportionnel
     rdp = max_(0, f3vg - f3vh) + f3vl + rpns_pvce + f3vm + f3vi + f3vf
@@ -732,13 +756,13 @@ def _plus_values_2012(self, f3vg, f3vh, f3vl, f3vm, f3vi_holder, f3vf_holder, f3
     TODO: f3vt, 2013 f3Vg au barème / tout refaire
     """
 
-    rpns_pvce = self.sum_by_entity(rpns_pvce_holder)
-    f3vd = self.filter_role(f3vd_holder, role = VOUS)
-    f3sd = self.filter_role(f3vd_holder, role = CONJ)
-    f3vi = self.filter_role(f3vi_holder, role = VOUS)
-    f3si = self.filter_role(f3vi_holder, role = CONJ)
-    f3vf = self.filter_role(f3vf_holder, role = VOUS)
-    f3sf = self.filter_role(f3vf_holder, role = CONJ)
+    rpns_pvce = sum_by_entity(self, rpns_pvce_holder)
+    f3vd = filter_role(self, f3vd_holder, role = VOUS)
+    f3sd = filter_role(self, f3vd_holder, role = CONJ)
+    f3vi = filter_role(self, f3vi_holder, role = VOUS)
+    f3si = filter_role(self, f3vi_holder, role = CONJ)
+    f3vf = filter_role(self, f3vf_holder, role = VOUS)
+    f3sf = filter_role(self, f3vf_holder, role = CONJ)
     # TODO: remove this todo use sum for all fields after checking
     # revenus taxés à un taux proportionnel
     rdp = max_(0, f3vg - f3vh) + f3vl + rpns_pvce + f3vm + f3vi + f3vf
@@ -765,13 +789,13 @@ def _plus_values_2013_(self, f3vg, f3vh, f3vl, f3vm, f3vi_holder, f3vf_holder, f
     Taxation des plus value
     TODO: f3vt, 2013 f3Vg au barème / tout refaire
     """
-    rpns_pvce = self.sum_by_entity(rpns_pvce_holder)
-    f3vd = self.filter_role(f3vd_holder, role = VOUS)
-    f3sd = self.filter_role(f3vd_holder, role = CONJ)
-    f3vi = self.filter_role(f3vi_holder, role = VOUS)
-    f3si = self.filter_role(f3vi_holder, role = CONJ)
-    f3vf = self.filter_role(f3vf_holder, role = VOUS)
-    f3sf = self.filter_role(f3vf_holder, role = CONJ)
+    rpns_pvce = sum_by_entity(self, rpns_pvce_holder)
+    f3vd = filter_role(self, f3vd_holder, role = VOUS)
+    f3sd = filter_role(self, f3vd_holder, role = CONJ)
+    f3vi = filter_role(self, f3vi_holder, role = VOUS)
+    f3si = filter_role(self, f3vi_holder, role = CONJ)
+    f3vf = filter_role(self, f3vf_holder, role = VOUS)
+    f3sf = filter_role(self, f3vf_holder, role = CONJ)
     #  TODO: remove this todo use sum for all fields after checking
     # revenus taxés à un taux proportionnel
     rdp = max_(0, f3vg - f3vh) + f3vl + rpns_pvce + f3vm + f3vi + f3vf
@@ -814,7 +838,7 @@ def _cesthra(self, sal_holder, bareme = law.ir.cesthra):
     'foy'
     PLF 2013 (rejeté) : 'taxe à 75%'
     '''
-    sal = self.split_by_roles(sal_holder)
+    sal = split_by_roles(self, sal_holder)
 
     cesthra = 0
     for rev in sal.itervalues():
@@ -844,7 +868,7 @@ def _alv(self, f6gi, f6gj, f6el, f6em, f6gp, f6gu):
     '''
     Pensions alimentaires versées
     '''
-    return self.cast_from_entity_to_role(-(f6gi + f6gj + f6el + f6em + f6gp + f6gu),
+    return cast_from_entity_to_role(self, -(f6gi + f6gj + f6el + f6em + f6gp + f6gu),
                                          entity = 'foyer_fiscal', role = VOUS)
 
 
@@ -854,10 +878,10 @@ def _rfr(self, rni, f3va_holder, f3vi_holder, rfr_cd, rfr_rvcm, rpns_exon_holder
     Revenu fiscal de référence
     f3vg -> rev_cat_pv -> ... -> rni
     '''
-    f3va = self.sum_by_entity(f3va_holder)
-    f3vi = self.sum_by_entity(f3vi_holder)
-    rpns_exon = self.sum_by_entity(rpns_exon_holder)
-    rpns_pvce = self.sum_by_entity(rpns_pvce_holder)
+    f3va = sum_by_entity(self, f3va_holder)
+    f3vi = sum_by_entity(self, f3vi_holder)
+    rpns_exon = sum_by_entity(self, rpns_exon_holder)
+    rpns_pvce = sum_by_entity(self, rpns_pvce_holder)
     return (max_(0, rni) + rfr_cd + rfr_rvcm + rev_cap_lib + f3vi + rpns_exon + rpns_pvce + f3va +
             f3vz + microentreprise)
 
@@ -987,11 +1011,11 @@ def _rpns_exon(frag_exon, arag_exon, nrag_exon, mbic_exon, abic_exon, nbnc_proc,
 
 def _defrag(self, f5qf, f5qg, f5qn, f5qo, f5qp, f5qq, frag_impo_holder, nrag_impg_holder, frag_fore_holder,
             frag_pvct_holder, arag_impg_holder, cga = law.ir.rpns.cga_taux2):
-    frag_fore = self.sum_by_entity(frag_fore_holder)
-    frag_impo = self.sum_by_entity(frag_impo_holder)
-    arag_impg = self.sum_by_entity(arag_impg_holder)
-    nrag_impg = self.sum_by_entity(nrag_impg_holder)
-    frag_pvct = self.sum_by_entity(frag_pvct_holder)
+    frag_fore = sum_by_entity(self, frag_fore_holder)
+    frag_impo = sum_by_entity(self, frag_impo_holder)
+    arag_impg = sum_by_entity(self, arag_impg_holder)
+    nrag_impg = sum_by_entity(self, nrag_impg_holder)
+    frag_pvct = sum_by_entity(self, frag_pvct_holder)
     return min_(f5qf + f5qg + f5qn + f5qo + f5qp + f5qq, (1 + cga) * (frag_impo + nrag_impg + frag_pvct)
                 + arag_impg + frag_fore)
 
@@ -1002,11 +1026,11 @@ def _defacc(self, f5rn, f5ro, f5rp, f5rq, f5rr, f5rw, macc_impv_holder, macc_imp
     def abat_rpns(rev, P):
         return max_(0, rev - min_(rev, max_(P.taux * min_(P.max, rev), P.min)))
 
-    nacc_impn = self.sum_by_entity(nacc_impn_holder)
-    macc_pvct = self.sum_by_entity(macc_pvct_holder)
-    macc_impv = self.sum_by_entity(macc_impv_holder)
-    macc_imps = self.sum_by_entity(macc_imps_holder)
-    aacc_impn = self.sum_by_entity(aacc_impn_holder)
+    nacc_impn = sum_by_entity(self, nacc_impn_holder)
+    macc_pvct = sum_by_entity(self, macc_pvct_holder)
+    macc_impv = sum_by_entity(self, macc_impv_holder)
+    macc_imps = sum_by_entity(self, macc_imps_holder)
+    aacc_impn = sum_by_entity(self, aacc_impn_holder)
     macc_timp = abat_rpns(macc_impv, microentreprise.vente) + abat_rpns(macc_imps, microentreprise.servi)
     return min_(f5rn + f5ro + f5rp + f5rq + f5rr + f5rw, aacc_impn + macc_pvct + macc_timp + (1 + cga) * nacc_impn)
 
@@ -1016,17 +1040,17 @@ def _defncn(self, f5ht, f5it, f5jt, f5kt, f5lt, f5mt, mncn_impo_holder, mncn_pvc
             cga = law.ir.rpns.cga_taux2, spbnc = law.ir.rpns.microentreprise.specialbnc):
     def abat_rpns(rev, P):
         return max_(0, rev - min_(rev, max_(P.taux * min_(P.max, rev), P.min)))
-    cncn_bene = self.sum_by_entity(cncn_bene_holder)
-    mncn_impo = self.sum_by_entity(mncn_impo_holder)
-    mncn_pvct = self.sum_by_entity(mncn_pvct_holder)
-    cncn_aimp = self.sum_by_entity(cncn_aimp_holder)
+    cncn_bene = sum_by_entity(self, cncn_bene_holder)
+    mncn_impo = sum_by_entity(self, mncn_impo_holder)
+    mncn_pvct = sum_by_entity(self, mncn_pvct_holder)
+    cncn_aimp = sum_by_entity(self, cncn_aimp_holder)
     return min_(f5ht + f5it + f5jt + f5kt + f5lt + f5mt, abat_rpns(mncn_impo, spbnc) +
                 mncn_pvct + cncn_aimp + (1 + cga) * cncn_bene)
 
 
 def _defmeu(self, f5ga, f5gb, f5gc, f5gd, f5ge, f5gf, f5gg, f5gh, f5gi, f5gj, alnp_imps_holder, nacc_defs_holder):
-    nacc_defs = self.sum_by_entity(nacc_defs_holder)
-    alnp_imps = self.sum_by_entity(alnp_imps_holder)
+    nacc_defs = sum_by_entity(self, nacc_defs_holder)
+    alnp_imps = sum_by_entity(self, alnp_imps_holder)
     return min_(f5ga + f5gb + f5gc + f5gd + f5ge + f5gf + f5gg + f5gh + f5gi + f5gj, alnp_imps + nacc_defs)
 
 
@@ -1184,7 +1208,7 @@ def _rpns_mvct(self, macc_mvct, mbnc_mvct, mncn_mvct):
     mbnc_mvct (f5kz)
 
     '''
-    return (mbnc_mvct + self.cast_from_entity_to_role(
+    return (mbnc_mvct + cast_from_entity_to_role(self,
         macc_mvct,
         entity = 'foyer_fiscal',
         role = VOUS
@@ -1317,7 +1341,7 @@ def _abat_spe(self, age_holder, caseP, caseF, rng, nbN, abattements_speciaux = l
       par deux soit 2 748€. Exemple : 10 990 € pour un jeune ménage et 8 243 €
       pour un célibataire avec un jeune enfant en résidence alternée.
     """
-    age = self.split_by_roles(age_holder, roles = [VOUS, CONJ])
+    age = split_by_roles(self, age_holder, roles = [VOUS, CONJ])
 
     ageV, ageC = age[VOUS], age[CONJ]
     invV, invC = caseP, caseF
@@ -1335,8 +1359,8 @@ def _abat_spe(self, age_holder, caseP, caseF, rng, nbN, abattements_speciaux = l
 def _taux_effectif(self, rni, nbptr, microentreprise, abnc_proc_holder, nbnc_proc_holder,
                    bareme = law.ir.bareme,
                    me = law.ir.rpns.microentreprise, cga = law.ir.rpns.cga_taux2):
-    abnc_proc = self.sum_by_entity(abnc_proc_holder)
-    nbnc_proc = self.sum_by_entity(nbnc_proc_holder)
+    abnc_proc = sum_by_entity(self, abnc_proc_holder)
+    nbnc_proc = sum_by_entity(self, nbnc_proc_holder)
     base_fictive = rni + microentreprise + abnc_proc + nbnc_proc * (1 + cga)
     return ((base_fictive != 0) * nbptr * bareme.calc(base_fictive / nbptr) / max_(1, base_fictive) +
             0 * (base_fictive == 0))
@@ -1474,7 +1498,7 @@ def _ppe_coef_tp(ppe_du_sa, ppe_du_ns, ppe_tp_sa, ppe_tp_ns, ppe = law.ir.credit
 
 
 def _ppe_base(self, ppe_rev, ppe_coef_tp, ppe_coef_holder):
-    ppe_coef = self.cast_from_entity_to_roles(ppe_coef_holder)
+    ppe_coef = cast_from_entity_to_roles(self, ppe_coef_holder)
 
     return ppe_rev / (ppe_coef_tp + (ppe_coef_tp == 0)) * ppe_coef
 
@@ -1495,10 +1519,10 @@ def _ppe_brute(self, ppe_elig, ppe_elig_i_holder, ppe_rev_holder, ppe_base_holde
     'foy'
     Cf. http://travail-emploi.gouv.fr/informations-pratiques,89/fiches-pratiques,91/remuneration,113/la-prime-pour-l-emploi-ppe,1034.html
     '''
-    ppe_base = self.split_by_roles(ppe_base_holder)
-    ppe_coef_tp = self.split_by_roles(ppe_coef_tp_holder)
-    ppe_elig_i = self.split_by_roles(ppe_elig_i_holder)
-    ppe_rev = self.split_by_roles(ppe_rev_holder)
+    ppe_base = split_by_roles(self, ppe_base_holder)
+    ppe_coef_tp = split_by_roles(self, ppe_coef_tp_holder)
+    ppe_elig_i = split_by_roles(self, ppe_elig_i_holder)
+    ppe_rev = split_by_roles(self, ppe_rev_holder)
 
     eliv, elic, eli1, eli2, eli3 = ppe_elig_i[VOUS], ppe_elig_i[CONJ], ppe_elig_i[PAC1], \
         ppe_elig_i[PAC2], ppe_elig_i[PAC3],
@@ -1586,7 +1610,7 @@ def _ppe(self, ppe_brute, rsa_act_i_holder):
     'foy'
     """
 #   TODO: les foyers qui paient l'ISF n'ont pas le droit à la PPE
-    rsa_act_i = self.split_by_roles(rsa_act_i_holder, roles = [VOUS, CONJ])
+    rsa_act_i = split_by_roles(self, rsa_act_i_holder, roles = [VOUS, CONJ])
 
 #   On retranche le RSA activité de la PPE
 #   Dans les agrégats officiels de la DGFP, c'est la PPE brute qu'il faut comparer
@@ -14,7 +14,7 @@ import logging
 from numpy import logical_not as not_, minimum as min_, maximum as max_
 from openfisca_core.accessors import law
 
-from .base import QUIFOY, QUIMEN
+from .base import QUIFOY, QUIMEN, cast_from_entity_to_role, filter_role, sum_by_entity
 
 
 log = logging.getLogger(__name__)
@@ -103,8 +103,8 @@ def _charges_deduc_reforme(charge_loyer):
 
 
 def _charge_loyer(self, loyer_holder, nbptr, charge_loyer = law.ir.autre.charge_loyer):
-    loyer = self.cast_from_entity_to_role(loyer_holder, role = PREF)
-    loyer = self.sum_by_entity(loyer)
+    loyer = cast_from_entity_to_role(self, loyer_holder, role = PREF)
+    loyer = sum_by_entity(self, loyer)
 
     plaf = charge_loyer.plaf
     plaf_nbp = charge_loyer.plaf_nbp
@@ -180,17 +180,17 @@ def _cd_eparet(self, f6ps_holder, f6rs_holder, f6ss_holder):
     Épargne retraite - PERP, PRÉFON, COREM et CGOS
     2004-
     '''
-    f6ps = self.filter_role(f6ps_holder, role = VOUS)
-    f6pt = self.filter_role(f6ps_holder, role = CONJ)
-    f6pu = self.filter_role(f6ps_holder, role = PAC1)
+    f6ps = filter_role(self, f6ps_holder, role = VOUS)
+    f6pt = filter_role(self, f6ps_holder, role = CONJ)
+    f6pu = filter_role(self, f6ps_holder, role = PAC1)
 
-    f6rs = self.filter_role(f6rs_holder, role = VOUS)
-    f6rt = self.filter_role(f6rs_holder, role = CONJ)
-    f6ru = self.filter_role(f6rs_holder, role = PAC1)
+    f6rs = filter_role(self, f6rs_holder, role = VOUS)
+    f6rt = filter_role(self, f6rs_holder, role = CONJ)
+    f6ru = filter_role(self, f6rs_holder, role = PAC1)
 
-    f6ss = self.filter_role(f6ss_holder, role = VOUS)
-    f6st = self.filter_role(f6ss_holder, role = CONJ)
-    f6su = self.filter_role(f6ss_holder, role = PAC1)
+    f6ss = filter_role(self, f6ss_holder, role = VOUS)
+    f6st = filter_role(self, f6ss_holder, role = CONJ)
+    f6su = filter_role(self, f6ss_holder, role = PAC1)
 
     # TODO: En théorie, les plafonds de déductions (ps, pt, pu) sont calculés sur
     # le formulaire 2041 GX
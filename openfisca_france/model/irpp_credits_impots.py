@@ -14,7 +14,7 @@ import logging
 from numpy import logical_not as not_, maximum as max_, minimum as min_, around, logical_or as or_
 from openfisca_core.accessors import law
 
-from .base import QUIFOY
+from .base import QUIFOY, cast_from_entity_to_roles, get_zero_array, is_each_zero_array, sum_by_entity
 
 log = logging.getLogger(__name__)
 VOUS = QUIFOY['vous']
@@ -96,6 +96,8 @@ def _accult(f7uo, _P):
     Acquisition de biens culturels (case 7UO)
     2002-
     '''
+    if is_each_zero_array('_accult', f7uo):
+        return get_zero_array(f7uo.size)
     P = _P.ir.credits_impot.accult
     return P.taux * f7uo
 
@@ -114,6 +116,8 @@ def _aidmob(f1ar, f1br, f1cr, f1dr, f1er, _P):
     Crédit d'impôt aide à la mobilité
     2005-2008
     '''
+    if is_each_zero_array('_aidmob', f1ar, f1br, f1cr, f1dr, f1er):
+        return get_zero_array(f1ar.size)
     return (f1ar + f1br + f1cr + f1dr + f1er) * _P.ir.credits_impot.aidmob.montant
 
 
@@ -123,6 +127,8 @@ def _aidper_2002_2003(marpac, nb_pac2, nbH, f7wi, _P):
     (cases 7WI, 7WJ, 7WL).
     2002-2003
     '''
+    if is_each_zero_array('_aidper_2002_2003', f7wi):
+        return get_zero_array(f7wi.size)
     P = _P.ir.credits_impot.aidper
 
     n = nb_pac2 - nbH / 2
@@ -141,6 +147,8 @@ def _aidper_2004_2005(marpac, nb_pac2, nbH, f7wi, f7wj, _P):
     (cases 7WI, 7WJ).
     2004-2005
     '''
+    if is_each_zero_array('_aidper_2004_2005', f7wi, f7wj):
+        return get_zero_array(f7wi.size)
     P = _P.ir.credits_impot.aidper
 
     n = nb_pac2 - nbH/2
@@ -161,6 +169,8 @@ def _aidper_2006_2009(marpac, nb_pac2, f7wi, f7wj, _P):
     2006-2009
     cf. cerfa 50796
     '''
+    if is_each_zero_array('_aidper_2006_2009', f7wi, f7wj):
+        return get_zero_array(f7wi.size)
     P = _P.ir.credits_impot.aidper
 
     max0 = P.max * (1 + marpac) + P.pac1 * nb_pac2
@@ -175,6 +185,8 @@ def _aidper_2010_2011(marpac, nb_pac2, f7sf, f7wi, f7wj, f7wl, _P):
     (cases 7SF, 7WI, 7WJ, 7WL).
     2010-2011
     '''
+    if is_each_zero_array('_aidper_2010_2011', f7sf, f7wi, f7wj, f7wl):
+        return get_zero_array(f7sf.size)
     P = _P.ir.credits_impot.aidper
     max0 = P.max * (1 + marpac) + P.pac1 * nb_pac2
 
@@ -189,6 +201,8 @@ def _aidper_2012(marpac, nb_pac2, f7wi, f7wj, f7wl, f7wr, _P):
     (cases 7WI, 7WJ, 7WL, 7WR).
     2012
     '''
+    if is_each_zero_array('_aidper_2012', f7wi, f7wj, f7wl, f7wr):
+        return get_zero_array(f7wi.size)
     P = _P.ir.credits_impot.aidper
     # On ne contrôle pas que 7WR ne dépasse pas le plafond (ça dépend du nombre de logements (7sa) et de la nature des
     #travaux, c'est un peu le bordel)
@@ -206,6 +220,8 @@ def _aidper_2013(marpac, nb_pac2, f7wj, f7wl, f7wr, _P):
     (cases 7WI, 7WJ, 7WL).
     2013
     '''
+    if is_each_zero_array('_aidper_2013', f7wj, f7wl, f7wr):
+        return get_zero_array(f7wj.size)
     P = _P.ir.credits_impot.aidper
     # On ne contrôle pas que 7WR ne dépasse pas le plafond (ça dépend du nombre de logements et de la nature des
     #travaux, c'est un peu le bordel)
@@ -222,6 +238,8 @@ def _assloy(f4bf, _P):
     Crédit d’impôt primes d’assurance pour loyers impayés (case 4BF)
     2005-
     '''
+    if is_each_zero_array('_assloy', f4bf):
+        return get_zero_array(f4bf.size)
     return _P.ir.credits_impot.assloy.taux * f4bf
 
 
@@ -230,6 +248,8 @@ def _autent(f8uy):
     Auto-entrepreneur : versements d’impôt sur le revenu (case 8UY)
     2009-
     '''
+    if is_each_zero_array('_autent', f8uy):
+        return get_zero_array(f8uy.size)
     return f8uy
 
 
@@ -238,6 +258,8 @@ def _ci_garext(f7ga, f7gb, f7gc, f7ge, f7gf, f7gg, _P):
     Frais de garde des enfants à l’extérieur du domicile (cases 7GA à 7GC et 7GE à 7GG)
     2005-
     '''
+    if is_each_zero_array('_ci_garext', f7ga, f7gb, f7gc, f7ge, f7gf, f7gg):
+        return get_zero_array(f7ga.size)
     P = _P.ir.credits_impot.garext
     max1 = P.max
     return P.taux * (min_(f7ga, max1) +
@@ -261,22 +283,32 @@ def _creimp_exc_2008(rni, nbptr, iai, mohist, elig_creimp_exc_2008):
 
 def _creimp_2002(f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th):
     '''Avoir fiscaux et crédits d'impôt 2002 '''
+    if is_each_zero_array('_creimp_2002', f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th):
+        return get_zero_array(f2ab.size)
     return (f2ab + f8ta + f8tb + f8tc + f8td_2002_2005 + f8te - f8tf + f8tg + f8th)
 
 
 def _creimp_2003(f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th, f8to, f8tp):
     '''Avoir fiscaux et crédits d'impôt 2003 '''
+    if is_each_zero_array('_creimp_2003', f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th, f8to, f8tp):
+        return get_zero_array(f2ab.size)
     return (f2ab + f8ta + f8tb + f8tc + f8td_2002_2005 + f8te - f8tf + f8tg + f8th + f8to - f8tp)
 
 
 def _creimp_2004(f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz):
     '''Avoir fiscaux et crédits d'impôt 2004 '''
+    if is_each_zero_array('_creimp_2004', f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th, f8to, f8tp,
+            f8tz, f8uz):
+        return get_zero_array(f2ab.size)
     return (f2ab + f8ta + f8tb + f8tc + f8td_2002_2005 + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tz + f8uz)
 
 
 def _creimp_2005(f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa, f8wb,
             f8wc, f8we):
     '''Avoir fiscaux et crédits d'impôt 2005 '''
+    if is_each_zero_array('_creimp_2005', f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th, f8to, f8tp,
+            f8tz, f8uz, f8wa, f8wb, f8wc, f8we):
+        return get_zero_array(f2ab.size)
     return  (f2ab + f8ta + f8tb + f8tc + f8td_2002_2005 + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tz + f8uz + f8wa +
             f8wb + f8wc + f8we)
 
@@ -284,6 +316,9 @@ def _creimp_2005(f2ab, f8ta, f8tb, f8tc, f8td_2002_2005, f8te, f8tf, f8tg, f8th,
 def _creimp_2006(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa, f8wb, f8wc, f8wd, f8we,
             f8wr, f8ws, f8wt, f8wu):
     '''Avoir fiscaux et crédits d'impôt 2006 '''
+    if is_each_zero_array('_creimp_2006', f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa,
+            f8wb, f8wc, f8wd, f8we, f8wr, f8ws, f8wt, f8wu):
+        return get_zero_array(f2ab.size)
     return  (f2ab + f8ta + f8tb + f8tc + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tz + f8uz + f8wa + f8wb + f8wc +
             f8wd + f8we + f8wr + f8ws + f8wt + f8wu)
 
@@ -291,6 +326,9 @@ def _creimp_2006(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8t
 def _creimp_2007(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa, f8wb, f8wc, f8wd, f8wr,
             f8ws, f8wt, f8wu, f8wv, f8wx):
     '''Avoir fiscaux et crédits d'impôt 2007 '''
+    if is_each_zero_array('_creimp_2007', f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa,
+            f8wb, f8wc, f8wd, f8wr, f8ws, f8wt, f8wu, f8wv, f8wx):
+        return get_zero_array(f2ab.size)
     return  (f2ab + f8ta + f8tb + f8tc + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tz + f8uz + f8wa + f8wb + f8wc +
             f8wd + f8wr + f8ws + f8wt + f8wu + f8wv + f8wx)
 
@@ -298,6 +336,9 @@ def _creimp_2007(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8t
 def _creimp_2008(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa, f8wb, f8wc, f8wd, f8we,
             f8wr, f8ws, f8wt, f8wu, f8wv, f8wx):
     '''Avoir fiscaux et crédits d'impôt 2008'''
+    if is_each_zero_array('_creimp_2008', f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa,
+            f8wb, f8wc, f8wd, f8we, f8wr, f8ws, f8wt, f8wu, f8wv, f8wx):
+        return get_zero_array(f2ab.size)
     return  (f2ab + f8ta + f8tb + f8tc + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tz + f8uz + f8wa + f8wb + f8wc +
             f8wd + f8wr + f8ws + f8wt + f8wu + f8wv + f8wx)
 
@@ -305,6 +346,9 @@ def _creimp_2008(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8t
 def _creimp_2009(f2ab, f8ta, f8tb, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa, f8wb, f8wd, f8we, f8wr, f8ws,
             f8wt, f8wu, f8wv, f8wx):
     '''Avoir fiscaux et crédits d'impôt 2009'''
+    if is_each_zero_array('_creimp_2009', f2ab, f8ta, f8tb, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa, f8wb,
+            f8wd, f8we, f8wr, f8ws, f8wt, f8wu, f8wv, f8wx):
+        return get_zero_array(f2ab.size)
     return  (f2ab + f8ta + f8tb + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tz + f8uz + f8wa + f8wb + f8wd +
             f8we + f8wr + f8ws + f8wt + f8wu + f8wv + f8wx)
 
@@ -312,6 +356,9 @@ def _creimp_2009(f2ab, f8ta, f8tb, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8u
 def _creimp_2010_2011(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz, f8wa, f8wb, f8wd, f8we,
              f8wr, f8wt, f8wu, f8wv):
     '''Avoir fiscaux et crédits d'impôt 2011 '''
+    if is_each_zero_array('_creimp_2010_2011', f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8tz, f8uz,
+            f8wa, f8wb, f8wd, f8we, f8wr, f8wt, f8wu, f8wv):
+        return get_zero_array(f2ab.size)
     return (f2ab + f8ta + f8tb + f8tc + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tz + f8uz + f8wa + f8wb + f8wd +
     f8we + f8wr + f8wt + f8wu + f8wv)
 
@@ -319,6 +366,9 @@ def _creimp_2010_2011(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp
 def _creimp_2012(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8ts, f8tz, f8uz, f8wa, f8wb, f8wd, f8we,
             f8wr, f8wt, f8wu, f8wv):
     '''Avoir fiscaux et crédits d'impôt 2012 '''
+    if is_each_zero_array('_creimp_2012', f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8ts, f8tz, f8uz,
+            f8wa, f8wb, f8wd, f8we, f8wr, f8wt, f8wu, f8wv):
+        return get_zero_array(f2ab.size)
     return (f2ab + f8ta + f8tb + f8tc +f8te - f8tf + f8tg + f8th + f8to - f8tp + f8ts + f8tz + f8uz + f8wa + f8wb +
             f8wd + f8we + f8wr + f8wt + f8wu + f8wv)
 
@@ -326,6 +376,9 @@ def _creimp_2012(f2ab, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8to, f8tp, f8t
 def _creimp_2013(f2ab, f2ck, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8tl, f8to, f8tp, f8ts, f8tz, f8uw, f8uz, f8wa,
             f8wb, f8wc, f8wd, f8we, f8wr, f8wt, f8wu):
     '''Avoir fiscaux et crédits d'impôt 2013 '''
+    if is_each_zero_array('_creimp_2013', f2ab, f2ck, f8ta, f8tb, f8tc, f8te, f8tf, f8tg, f8th, f8tl, f8to, f8tp, f8ts,
+            f8tz, f8uw, f8uz, f8wa, f8wb, f8wc, f8wd, f8we, f8wr, f8wt, f8wu):
+        return get_zero_array(f2ab.size)
     return (f2ab + f2ck + f8ta + f8tb + f8tc + f8te - f8tf + f8tg + f8th + f8to - f8tp + f8tl + f8ts + f8tz + f8uw +
             f8uz + f8wa + f8wb + f8wc + f8wd + f8we + f8wr + f8wt + f8wu)
 
@@ -335,6 +388,8 @@ def _direpa(f2bg):
     Crédit d’impôt directive « épargne » (case 2BG)
     2006-
     '''
+    if is_each_zero_array('_direpa', f2bg):
+        return get_zero_array(f2bg.size)
     return f2bg
 
 
@@ -343,6 +398,8 @@ def _divide(marpac, f2dc, f2gr, _P):
     Crédit d'impôt dividendes
     2005-2009
     '''
+    if is_each_zero_array('_divide', f2dc, f2gr):
+        return get_zero_array(f2dc.size)
     P = _P.ir.credits_impot.divide
 
     max1 = P.max * (marpac + 1)
@@ -354,6 +411,8 @@ def _drbail(f4tq, _P):
     Crédit d’impôt représentatif de la taxe additionnelle au droit de bail (case 4TQ)
     2002-
     '''
+    if is_each_zero_array('_drbail', f4tq):
+        return get_zero_array(f4tq.size)
     P = _P.ir.credits_impot.drbail
     return P.taux * f4tq
 
@@ -363,6 +422,8 @@ def _inthab_2007(marpac, nb_pac2, caseP, caseF, nbG, nbR, f7uh, P = law.ir.credi
     Crédit d’impôt intérêts des emprunts pour l’habitation principale (cases 7UH)
     2007
     '''
+    if is_each_zero_array('_inthab_2007', f7uh):
+        return get_zero_array(f7uh.size)
     invalide = caseP | caseF | (nbG != 0) | (nbR != 0)
     max0 = P.max * (marpac + 1) * (1 + invalide) + nb_pac2 * P.add
     return P.taux1 * min_(max0, f7uh)
@@ -373,6 +434,8 @@ def _inthab_2008(marpac, nb_pac2, caseP, caseF, nbG, nbR, f7vy, f7vz, _P):
     Crédit d’impôt intérêts des emprunts pour l’habitation principale (cases 7VX, 7VY et 7VZ)
     2008
     '''
+    if is_each_zero_array('_inthab_2008', f7vy, f7vz):
+        return get_zero_array(f7vy.size)
     P = _P.ir.credits_impot.inthab
 
     invalide = caseP | caseF | (nbG != 0) | (nbR != 0)
@@ -388,6 +451,8 @@ def _inthab_2009(marpac, nb_pac2, caseP, caseF, nbG, nbR, f7vx, f7vy, f7vz, _P):
     Crédit d’impôt intérêts des emprunts pour l’habitation principale (cases 7VX, 7VY et 7VZ)
     2009
     '''
+    if is_each_zero_array('_inthab_2009', f7vx, f7vy, f7vz):
+        return get_zero_array(f7vx.size)
     P = _P.ir.credits_impot.inthab
 
     invalide = caseP | caseF | (nbG != 0) | (nbR != 0)
@@ -404,6 +469,8 @@ def _inthab_2010(marpac, nb_pac2, caseP, caseF, nbG, nbR, f7vw, f7vx, f7vy, f7vz
     Crédit d’impôt intérêts des emprunts pour l’habitation principale (cases 7VW, 7VX, 7VY et 7VZ)
     2010
     '''
+    if is_each_zero_array('_inthab_2010', f7vw, f7vx, f7vy, f7vz):
+        return get_zero_array(f7vw.size)
     P = _P.ir.credits_impot.inthab
 
     invalide = caseP | caseF | (nbG != 0) | (nbR != 0)
@@ -422,6 +489,8 @@ def _inthab_2011(marpac, nb_pac2, caseP, caseF, nbG, nbR, f7vu, f7vw, f7vv, f7vx
     Crédit d’impôt intérêts des emprunts pour l’habitation principale (cases 7VW, 7VX, 7VY et 7VZ)
     2011
     '''
+    if is_each_zero_array('_inthab_2011', f7vu, f7vw, f7vv, f7vx, f7vy, f7vz):
+        return get_zero_array(f7vu.size)
     P = _P.ir.credits_impot.inthab
 
     invalide = caseP | caseF | (nbG != 0) | (nbR != 0)
@@ -445,6 +514,8 @@ def _inthab_2012_2013(marpac, nb_pac2, caseP, caseF, nbG, nbR, f7vt, f7vu, f7vv,
     Crédit d’impôt intérêts des emprunts pour l’habitation principale (cases 7VW, 7VX, 7VY et 7VZ)
     2011
     '''
+    if is_each_zero_array('_inthab_2012_2013', f7vt, f7vu, f7vv, f7vw, f7vx, f7vy, f7vz):
+        return get_zero_array(f7vt.size)
     P = _P.ir.credits_impot.inthab
 
     invalide = caseP | caseF | (nbG != 0) | (nbR != 0)
@@ -465,7 +536,7 @@ def _inthab_2012_2013(marpac, nb_pac2, caseP, caseF, nbG, nbR, f7vt, f7vu, f7vv,
                 P.taux6 * min_(f7vt, max6))
 
 def _jeunes_2005_2008(self, jeunes_ind_holder):
-    return self.sum_by_entity(jeunes_ind_holder)
+    return sum_by_entity(self, jeunes_ind_holder)
 
 
 def _jeunes_ind(self, age, nbptr_holder, rfr_holder, sali, marpac_holder, elig_creimp_jeunes, _P):
@@ -480,9 +551,9 @@ def _jeunes_ind(self, age, nbptr_holder, rfr_holder, sali, marpac_holder, elig_c
     #TODO: vérifier si les jeunes sous le foyer fiscal de leurs parents sont éligibles
 
     P = _P.ir.credits_impot.jeunes
-    rfr = self.cast_from_entity_to_roles(rfr_holder)
-    nbptr = self.cast_from_entity_to_roles(nbptr_holder)
-    marpac = self.cast_from_entity_to_roles(marpac_holder)
+    rfr = cast_from_entity_to_roles(self, rfr_holder)
+    nbptr = cast_from_entity_to_roles(self, nbptr_holder)
+    marpac = cast_from_entity_to_roles(self, marpac_holder)
 
     elig = (age < P.age) * (rfr < P.rfr_plaf * (marpac * P.rfr_mult + not_(marpac)) + max_(0, nbptr - 2) * .5 *
             P.rfr_maj + (nbptr == 1.5) * P.rfr_maj)
@@ -496,6 +567,8 @@ def _mecena(f7us):
     Mécénat d'entreprise (case 7US)
     2003-
     '''
+    if is_each_zero_array('_mecena', f7us):
+        return get_zero_array(f7us.size)
     return f7us
 
 
@@ -512,6 +585,8 @@ def _preetu_2005(f7uk, _P):
     Crédit d’impôt pour souscription de prêts étudiants (cases 7UK, 7VO et 7TD)
     2005
     '''
+    if is_each_zero_array('_preetu_2005', f7uk):
+        return get_zero_array(f7uk.size)
     P = _P.ir.credits_impot.preetu
 
     return P.taux * min_(f7uk, P.max)
@@ -522,6 +597,8 @@ def _preetu_2006_2007(f7uk, f7vo, _P):
     Crédit d’impôt pour souscription de prêts étudiants (cases 7UK, 7VO et 7TD)
     2006-2007
     '''
+    if is_each_zero_array('_preetu_2006_2007', f7uk, f7vo):
+        return get_zero_array(f7uk.size)
     P = _P.ir.credits_impot.preetu
 
     max1 = P.max * (1 + f7vo)
@@ -533,6 +610,8 @@ def _preetu_2008_(f7uk, f7vo, f7td, _P):
     Crédit d’impôt pour souscription de prêts étudiants (cases 7UK, 7VO et 7TD)
     2008-
     '''
+    if is_each_zero_array('_preetu_2008_', f7uk, f7vo, f7td):
+        return get_zero_array(f7uk.size)
     P = _P.ir.credits_impot.preetu
 
     max1 = P.max * f7vo
@@ -545,6 +624,8 @@ def _prlire(f2dh, f2ch, marpac, _P):
     2002-
     http://www2.impots.gouv.fr/documentation/2013/brochure_ir/index.html#122/z
     '''
+    if is_each_zero_array('_prlire', f2dh, f2ch):
+        return get_zero_array(f2dh.size)
     plaf_resid = max_(_P.ir.rvcm.abat_assvie * (1 + marpac) - f2ch, 0)
     return _P.ir.credits_impot.prlire.taux * min_(f2dh, plaf_resid)
 
@@ -555,6 +636,8 @@ def _quaenv_2005(marpac, nb_pac2, f7wf, f7wg, f7wh, _P):
     (cases 7WF, 7WG, 7WH)
     2005
     '''
+    if is_each_zero_array('_quaenv_2005', f7wf, f7wg, f7wh):
+        return get_zero_array(f7wf.size)
     P = _P.ir.credits_impot.quaenv
 
     n = nb_pac2
@@ -573,6 +656,8 @@ def _quaenv_2006_2008(marpac, nb_pac2, f7wf, f7wg, f7wh, f7wq, _P):
     (cases 7WF, 7WG, 7WH, 7WQ)
     2006-2008
     '''
+    if is_each_zero_array('_quaenv_2006_2008', f7wf, f7wg, f7wh, f7wq):
+        return get_zero_array(f7wf.size)
     P = _P.ir.credits_impot.quaenv
 
     max0 = P.max * (1 + marpac) + P.pac1 * nb_pac2
@@ -592,6 +677,8 @@ def _quaenv_2009(marpac, nb_pac2, f7we, f7wf, f7wg, f7wh, f7wk, f7wq, f7sb, f7sc
     (cases 7WF, 7WG, 7WH, 7WK, 7WQ, 7SB, 7SC, 7SD, 7SE)
     2009
     '''
+    if is_each_zero_array('_quaenv_2009', f7we, f7wf, f7wg, f7wh, f7wk, f7wq, f7sb, f7sc, f7sd, f7se):
+        return get_zero_array(f7we.size)
     P = _P.ir.credits_impot.quaenv
     max0 = P.max * (1 + marpac) + P.pac1 * nb_pac2
 
@@ -621,6 +708,8 @@ def _quaenv_2010_2011(marpac, nb_pac2, f7we, f7wf, f7wg, f7wh, f7wk, f7wq, f7sb,
     (cases 7WF, 7WH, 7WK, 7WQ, 7SB, 7SD, 7SE et 7SH)
     2010-2011
     '''
+    if is_each_zero_array('_quaenv_2010_2011', f7we, f7wf, f7wg, f7wh, f7wk, f7wq, f7sb, f7sd, f7se, f7sh):
+        return get_zero_array(f7we.size)
     P = _P.ir.credits_impot.quaenv
     max0 = P.max * (1 + marpac) + P.pac1 * nb_pac2
 
@@ -650,6 +739,10 @@ def _quaenv_2012(f7sd, f7se, f7sf, f7sg, f7sh, f7si, f7sj, f7sk, f7sl, f7sm, f7s
     Crédits d’impôt pour dépenses en faveur de la qualité environnementale
     2013
     '''
+    if is_each_zero_array('_quaenv_2012', f7sd, f7se, f7sf, f7sg, f7sh, f7si, f7sj, f7sk, f7sl, f7sm, f7sn, f7so, f7sp,
+            f7sq, f7sr, f7ss, f7tt, f7tu, f7tv, f7tw, f7tx, f7ty, f7st, f7su, f7sv, f7sw, f7sz, f7wc, f7we, f7wg, f7wh,
+            f7wk):
+        return get_zero_array(f7sd.size)
     max0 = P.max * (1 + marpac) + P.pac1 * nb_pac2
     maxi1 = max_(0, max0 - f7ty)
     maxi2 = max_(0, maxi1 - f7tx)
@@ -696,6 +789,9 @@ def _quaenv_2013(f7sd, f7se, f7sf, f7sg, f7sh, f7si, f7sj, f7sk, f7sl, f7sm, f7s
     Crédits d’impôt pour dépenses en faveur de la qualité environnementale
     2013
     '''
+    if is_each_zero_array('_quaenv_2013', f7sd, f7se, f7sf, f7sg, f7sh, f7si, f7sj, f7sk, f7sl, f7sm, f7sn, f7so, f7sp,
+            f7sq, f7sr, f7ss, f7st, f7su, f7sv, f7sw, f7sz, f7wc, f7we, f7wg, f7wh, f7wk):
+        return get_zero_array(f7sd.size)
     max0 = P.max * (1 + marpac) + P.pac1 * nb_pac2
     max1 = max_(0, max0 - quaenv_bouquet * (f7ss + f7st) - not_(quaenv_bouquet) * (f7ss + f7st + f7sv))
     max2 = max_(0, max1 - quaenv_bouquet * (f7sn + f7sr + f7sq) - not_(quaenv_bouquet) * (f7sn + f7sq + f7sr))
@@ -734,6 +830,9 @@ def _quaenv_bouquet(f7sd, f7se, f7sn, f7so, f7sp, f7sq, f7sr, f7ss, f7st, f7ve,
     Les dépenses de travaux dépendent d'un bouquet de travaux
     2013
     '''
+    if is_each_zero_array('_quaenv_bouquet', f7sd, f7se, f7sn, f7so, f7sp, f7sq, f7sr, f7ss, f7st, f7ve, f7vf, f7vg,
+            f7wa, f7wb, f7wc, f7wf, f7wh, f7wq, f7ws, f7wt):
+        return get_zero_array(f7sd.size)
     t1 = or_(or_(f7wt * f7ws, f7wq), f7wf)
     t2 = or_(f7wc * f7wb, f7wa)
     t3 = or_(f7vg * f7vf, f7ve)
@@ -749,6 +848,8 @@ def _saldom2_2007_2008(nb_pac2, f7db, f7dg, f7dl, _P):
     Crédit d’impôt emploi d’un salarié à domicile (cases 7DB, 7DG)
     2007-2008
     '''
+    if is_each_zero_array('_saldom2_2007_2008', f7db, f7dg, f7dl):
+        return get_zero_array(f7db.size)
     P = _P.ir.reductions_impots.saldom
 
     isinvalid = f7dg
@@ -767,6 +868,8 @@ def _saldom2_2009_(nb_pac2, f7db, f7dg, f7dl, f7dq, _P):
     Crédit d’impôt emploi d’un salarié à domicile (cases 7DB, 7DG)
     2009-2010
     '''
+    if is_each_zero_array('_saldom2_2009_', f7db, f7dg, f7dl, f7dq):
+        return get_zero_array(f7db.size)
     P = _P.ir.reductions_impots.saldom
 
     isinvalid = f7dg
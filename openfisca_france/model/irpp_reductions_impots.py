@@ -14,7 +14,7 @@ import logging
 from numpy import minimum as min_, maximum as max_, logical_not as not_, ones, size, around
 from openfisca_core.accessors import law
 
-from .base import QUIFOY
+from .base import QUIFOY, filter_role, get_zero_array, is_each_zero_array, split_by_roles
 
 
 log = logging.getLogger(__name__)
@@ -149,6 +149,8 @@ def _accult(f7uo, _P):
     Acquisition de biens culturels (case 7UO)
     2013
     '''
+    if is_each_zero_array('_accult', f7uo):
+        return get_zero_array(f7uo.size)
     P = _P.ir.credits_impot.accult
     return P.taux * f7uo
 
@@ -163,6 +165,8 @@ def _adhcga(f7ff, f7fg, P = law.ir.reductions_impots.adhcga):
     Frais de comptabilité et d'adhésion à un CGA ou AA
     2002-
     '''
+    if is_each_zero_array('_adhcga', f7ff, f7fg):
+        return get_zero_array(f7ff.size)
     return min_(f7ff, P.max * f7fg)
 
 
@@ -171,6 +175,8 @@ def _assvie(nb_pac, f7gw, f7gx, f7gy, P = law.ir.reductions_impots.assvie):
     Assurance-vie (cases GW, GX et GY de la 2042)
     2002-2004
     '''
+    if is_each_zero_array('_assvie', f7gw, f7gx, f7gy):
+        return get_zero_array(f7gw.size)
     max1 = P.max + nb_pac * P.pac
     return P.taux * min_(f7gw + f7gx + f7gy, max1)
 
@@ -180,6 +186,8 @@ def _cappme_2002(marpac, f7cf, _P, P = law.ir.reductions_impots.cappme):
     Souscriptions au capital des PME
     2002
     '''
+    if is_each_zero_array('_cappme_2002', f7cf):
+        return get_zero_array(f7cf.size)
     base = f7cf
     seuil = P.seuil * (marpac + 1)
     return P.taux * min_(base, seuil)
@@ -190,6 +198,8 @@ def _cappme_2003(marpac, f7cf, f7cl, _P, P = law.ir.reductions_impots.cappme):
     Souscriptions au capital des PME
     2003
     '''
+    if is_each_zero_array('_cappme_2003', f7cf, f7cl):
+        return get_zero_array(f7cf.size)
     base = f7cf + f7cl
     seuil = P.seuil * (marpac + 1)
     return P.taux * min_(base, seuil)
@@ -200,6 +210,8 @@ def _cappme_2004(marpac, f7cf, f7cl, f7cm, _P, P = law.ir.reductions_impots.capp
     Souscriptions au capital des PME
     2004
     '''
+    if is_each_zero_array('_cappme_2004', f7cf, f7cl, f7cm):
+        return get_zero_array(f7cf.size)
     base = f7cf + f7cl + f7cm
     seuil = P.seuil * (marpac + 1)
     return P.taux * min_(base, seuil)
@@ -210,6 +222,8 @@ def _cappme_2005_2008(marpac, f7cf, f7cl, f7cm, f7cn, _P, P = law.ir.reductions_
     Souscriptions au capital des PME
     2005-2008
     '''
+    if is_each_zero_array('_cappme_2005_2008', f7cf, f7cl, f7cm, f7cn):
+        return get_zero_array(f7cf.size)
     base = f7cf + f7cl + f7cm + f7cn
     seuil = P.seuil * (marpac + 1)
     return P.taux * min_(base, seuil)
@@ -220,6 +234,8 @@ def _cappme_2009_2010(marpac, f7cf, f7cl, f7cm, f7cn, f7cu, _P, P = law.ir.reduc
     Souscriptions au capital des PME
     2009-2010
     '''
+    if is_each_zero_array('_cappme_2009_2010', f7cf, f7cl, f7cm, f7cn, f7cu):
+        return get_zero_array(f7cf.size)
     base = f7cf + f7cl + f7cm + f7cn + f7cu
     seuil = P.seuil * (marpac + 1)
     seuil = P.seuil_tpe * (marpac + 1) * (f7cu > 0) + P.seuil * (marpac + 1) * (f7cu <= 0)
@@ -231,6 +247,8 @@ def _cappme_2011(marpac, f7cf, f7cl, f7cm, f7cn, f7cq, f7cu, _P, P = law.ir.redu
     Souscriptions au capital des PME
     2011
     '''
+    if is_each_zero_array('_cappme_2011', f7cf, f7cl, f7cm, f7cn, f7cq, f7cu):
+        return get_zero_array(f7cf.size)
     base = f7cl + f7cm + f7cn + f7cq
     seuil = P.seuil_tpe * (marpac + 1) * (f7cu > 0) + P.seuil * (marpac + 1) * (f7cu <= 0)
     max0 = max_(seuil - base, 0)
@@ -242,6 +260,8 @@ def _cappme_2012(marpac, f7cf, f7cl, f7cm, f7cn, f7cq, f7cu, _P, P = law.ir.redu
     Souscriptions au capital des PME
     2012 cf. 2041 GR
     '''
+    if is_each_zero_array('_cappme_2012', f7cf, f7cl, f7cm, f7cn, f7cq, f7cu):
+        return get_zero_array(f7cf.size)
     #TODO: gérer les changements de situation familiale
     base = f7cl + f7cm + f7cn
     seuil1 = P.seuil * (marpac + 1)
@@ -256,6 +276,8 @@ def _cappme_2013(marpac, f7cc, f7cf, f7cl, f7cm, f7cn, f7cq, f7cu, _P, P = law.i
     Souscriptions au capital des PME
     2013
     '''
+    if is_each_zero_array('_cappme_2013', f7cc, f7cf, f7cl, f7cm, f7cn, f7cq, f7cu):
+        return get_zero_array(f7cc.size)
     base = f7cl + f7cm
     seuil1 = P.seuil * (marpac + 1)
     seuil2 = max_(0, P.seuil_tpe * (marpac + 1) - min_(base, seuil1) - min_(f7cn, seuil1) - min_(f7cu, seuil1))
@@ -270,13 +292,13 @@ def _cotsyn(self, f7ac_holder, sal_holder, cho_holder, rst_holder, P = law.ir.re
     '''
     Cotisations syndicales (2002-20131
     '''
-    f7ac = self.filter_role(f7ac_holder, role = VOUS)
-    f7ae = self.filter_role(f7ac_holder, role = CONJ)
-    f7ag = self.filter_role(f7ac_holder, role = PAC1)
+    f7ac = filter_role(self, f7ac_holder, role = VOUS)
+    f7ae = filter_role(self, f7ac_holder, role = CONJ)
+    f7ag = filter_role(self, f7ac_holder, role = PAC1)
 
-    cho = self.split_by_roles(cho_holder)
-    rst = self.split_by_roles(rst_holder)
-    sal = self.split_by_roles(sal_holder)
+    cho = split_by_roles(self, cho_holder)
+    rst = split_by_roles(self, rst_holder)
+    sal = split_by_roles(self, sal_holder)
 
     tx = P.seuil
 
@@ -295,6 +317,8 @@ def _creaen_2006_2008(f7fy, f7gy, _P, P = law.ir.reductions_impots.creaen):
     Aide aux créateurs et repreneurs d'entreprises
     2006-2008
     '''
+    if is_each_zero_array('_creaen_2006_2008', f7fy, f7gy):
+        return get_zero_array(f7fy.size)
     return (P.base * f7fy + P.hand * f7gy)
 
 
@@ -303,6 +327,8 @@ def _creaen_2009(f7fy, f7gy, f7jy, f7hy, f7ky, f7iy, _P, P = law.ir.reductions_i
     Aide aux créateurs et repreneurs d'entreprises
     2009
     '''
+    if is_each_zero_array('_creaen_2009', f7fy, f7gy, f7jy, f7hy, f7ky, f7iy):
+        return get_zero_array(f7fy.size)
     return (P.base * ((f7jy + f7fy) + f7hy / 2) +
                 P.hand * ((f7ky + f7gy) + f7iy / 2))
 
@@ -312,6 +338,8 @@ def _creaen_2010_2011(f7fy, f7gy, f7jy, f7hy, f7ky, f7iy, f7ly, f7my, _P, P = la
     Aide aux créateurs et repreneurs d'entreprises
     2010-2011
     '''
+    if is_each_zero_array('_creaen_2010_2011', f7fy, f7gy, f7jy, f7hy, f7ky, f7iy, f7ly, f7my):
+        return get_zero_array(f7fy.size)
     return (P.base * ((f7jy + f7fy) + (f7hy + f7ly) / 2) +
                 P.hand * ((f7ky + f7gy) + (f7iy + f7my) / 2))
 
@@ -321,6 +349,8 @@ def _creaen_2012_2014(f7ly, f7my, _P, P = law.ir.reductions_impots.creaen):
     Aide aux créateurs et repreneurs d'entreprises
     2012-
     '''
+    if is_each_zero_array('_creaen_2012_2014', f7ly, f7my):
+        return get_zero_array(f7ly.size)
     return (P.base * (f7ly / 2) +
                 P.hand * (f7my / 2))
 
@@ -330,6 +360,8 @@ def _deffor(f7uc, P = law.ir.reductions_impots.deffor):
     Défense des forêts contre l'incendie
     2006-
     '''
+    if is_each_zero_array('_deffor', f7uc):
+        return get_zero_array(f7uc.size)
     return P.taux * min_(f7uc, P.max)
 
 
@@ -338,6 +370,8 @@ def _daepad(f7cd, f7ce, P = law.ir.reductions_impots.daepad):
     Dépenses d'accueil dans un établissement pour personnes âgées dépendantes
     ?-
     '''
+    if is_each_zero_array('_daepad', f7cd, f7ce):
+        return get_zero_array(f7cd.size)
     return P.taux * (min_(f7cd, P.max) + min_(f7ce, P.max))
 
 
@@ -346,6 +380,8 @@ def _dfppce_2002_2003(rbg_int, f7uf, _P, P = law.ir.reductions_impots.dfppce):
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales
     '''
+    if is_each_zero_array('_dfppce_2002_2003', f7uf):
+        return get_zero_array(f7uf.size)
     base = f7uf
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -356,6 +392,8 @@ def _dfppce_2004(rbg_int, f7uf, f7xs, _P, P = law.ir.reductions_impots.dfppce):
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales
     '''
+    if is_each_zero_array('_dfppce_2004', f7uf, f7xs):
+        return get_zero_array(f7uf.size)
     base = f7uf + f7xs
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -366,6 +404,8 @@ def _dfppce_2005(rbg_int, f7uf, f7xs, f7xt, _P, P = law.ir.reductions_impots.dfp
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales
     '''
+    if is_each_zero_array('_dfppce_2005', f7uf, f7xs, f7xt):
+        return get_zero_array(f7uf.size)
     base = f7uf + f7xs + f7xt
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -376,6 +416,8 @@ def _dfppce_2006(rbg_int, f7uf, f7xs, f7xt, f7xu, _P, P = law.ir.reductions_impo
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales
     '''
+    if is_each_zero_array('_dfppce_2006', f7uf, f7xs, f7xt, f7xu):
+        return get_zero_array(f7uf.size)
     base = f7uf + f7xs + f7xt + f7xu
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -386,6 +428,8 @@ def _dfppce_2007(rbg_int, f7uf, f7xs, f7xt, f7xu, f7xw, _P, P = law.ir.reduction
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales
     '''
+    if is_each_zero_array('_dfppce_2007', f7uf, f7xs, f7xt, f7xu, f7xw):
+        return get_zero_array(f7uf.size)
     base = f7uf + f7xs + f7xt + f7xu + f7xw
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -396,6 +440,8 @@ def _dfppce_2008_2010(rbg_int, f7uf, f7xs, f7xt, f7xu, f7xw, f7xy, _P, P = law.i
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales
     '''
+    if is_each_zero_array('_dfppce_2008_2010', f7uf, f7xs, f7xt, f7xu, f7xw, f7xy):
+        return get_zero_array(f7uf.size)
     base = f7uf + f7xs + f7xt + f7xu + f7xw + f7xy
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -406,6 +452,8 @@ def _dfppce_2011(rbg_int, f7uf, f7xs, f7xt, f7xu, f7xw, f7xy, f7vc, P = law.ir.r
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales (2011-2013)
     '''
+    if is_each_zero_array('_dfppce_2011', f7uf, f7xs, f7xt, f7xu, f7xw, f7xy, f7vc):
+        return get_zero_array(f7uf.size)
     base = f7uf + f7vc + f7xs + f7xt + f7xu + f7xw + f7xy
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -419,6 +467,8 @@ def _dfppce_2012(rbg_int, f7uf, f7xs, f7xt, f7xu, f7xw, f7xy, f7vc, P = law.ir.r
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales (2011-2013)
     '''
+    if is_each_zero_array('_dfppce_2012', f7uf, f7xs, f7xt, f7xu, f7xw, f7xy, f7vc):
+        return get_zero_array(f7uf.size)
     base = min_(P.max_niv, f7uf) + f7vc + f7xs + f7xt + f7xu + f7xw + f7xy
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -429,6 +479,8 @@ def _dfppce_2013(rbg_int, f7uf, f7uh, f7xs, f7xt, f7xu, f7xw, f7xy, f7vc, P = la
     Dons aux autres oeuvres et dons effectués pour le financement des partis
     politiques et des campagnes électorales (2011-2013)
     '''
+    if is_each_zero_array('_dfppce_2013', f7uf, f7uh, f7xs, f7xt, f7xu, f7xw, f7xy, f7vc):
+        return get_zero_array(f7uf.size)
     base = min_(P.max_niv, f7uf + f7uh) + f7vc + f7xs + f7xt + f7xu + f7xw + f7xy
     max1 = P.max * rbg_int
     return P.taux * min_(base, max1)
@@ -438,6 +490,8 @@ def _doment_2005(f7ur, f7oz, f7pz, f7qz, f7rz):
     '''
     Investissements dans les DOM-TOM dans le cadre d'une entrepise.
     '''
+    if is_each_zero_array('_doment_2005', f7ur, f7oz, f7pz, f7qz, f7rz):
+        return get_zero_array(f7ur.size)
     return  f7ur + f7oz + f7pz + f7qz + f7rz
 
 
@@ -445,6 +499,8 @@ def _doment_2006_2008(f7ur, f7oz, f7pz, f7qz, f7rz, f7sz):
     '''
     Investissements dans les DOM-TOM dans le cadre d'une entrepise.
     '''
+    if is_each_zero_array('_doment_2006_2008', f7ur, f7oz, f7pz, f7qz, f7rz, f7sz):
+        return get_zero_array(f7ur.size)
     return  f7ur + f7oz + f7pz + f7qz + f7rz + f7sz
 #TODO: vérifier pour 2002
 #TODO: pb 7ul 2005-2009 (ITRED = 0 au lieu de 20€ (forfaitaire), dû à ça : Cochez [7UL] si vous déclarez en ligne pour
@@ -455,6 +511,8 @@ def _doment_2009(f7oz, f7pz, f7qz, f7rz, f7sz, f7qe, f7qf, f7qg, f7qh, f7qi, f7q
     '''
     Investissements dans les DOM-TOM dans le cadre d'une entrepise.
     '''
+    if is_each_zero_array('_doment_2009', f7oz, f7pz, f7qz, f7rz, f7sz, f7qe, f7qf, f7qg, f7qh, f7qi, f7qj):
+        return get_zero_array(f7oz.size)
     return  f7oz + f7pz + f7qz + f7rz + f7sz + f7qe + f7qf + f7qg + f7qh + f7qi + f7qj
 
 
@@ -463,6 +521,9 @@ def _doment_2010(f7oz, f7pz, f7qz, f7rz, f7qe, f7qf, f7qg, f7qh, f7qi, f7qj, f7q
     '''
     Investissements dans les DOM-TOM dans le cadre d'une entrepise.
     '''
+    if is_each_zero_array('_doment_2010', f7oz, f7pz, f7qz, f7rz, f7qe, f7qf, f7qg, f7qh, f7qi, f7qj, f7qo, f7qp, f7qq,
+            f7qr, f7qs, f7mm, f7ma, f7lg, f7ks, f7ls):
+        return get_zero_array(f7oz.size)
     return (f7oz + f7pz + f7qz + f7rz + f7qe + f7qf + f7qg + f7qh + f7qi + f7qj + f7qo + f7qp + f7qq + f7qr + f7qs +
                 f7mm + f7ma + f7lg + f7ks + f7ls)
 
@@ -472,6 +533,10 @@ def _doment_2011(f7ks, f7kt, f7ku, f7lg, f7lh, f7li, f7mm, f7ma, f7mb, f7mc, f7m
     '''
     Investissements dans les DOM-TOM dans le cadre d'une entrepise.
     '''
+    if is_each_zero_array('_doment_2011', f7ks, f7kt, f7ku, f7lg, f7lh, f7li, f7mm, f7ma, f7mb, f7mc, f7mn, f7oz, f7pa,
+            f7pb, f7pd, f7pe, f7pf, f7ph, f7pi, f7pj, f7pl, f7pz, f7qz, f7qe, f7qf, f7qg, f7qh, f7qi, f7qo, f7qp, f7qq,
+            f7qr, f7qv):
+        return get_zero_array(f7ks.size)
     return (f7ks + f7kt + f7ku + f7lg + f7lh + f7li + f7mb + f7mn + f7mc + f7mm + f7ma +  f7oz + f7pa + f7pb + f7pd +
                 f7pe + f7pf + f7ph + f7pi + f7pj + f7pl + f7pz + f7qz + f7qf + f7qg + f7qh + f7qi + f7qo +
                 f7qp + f7qq + f7qr + f7qe + f7qv)
@@ -484,6 +549,11 @@ def _doment_2012(f7ks, f7kt, f7ku, f7lg, f7lh, f7li, f7ma, f7mb, f7mc, f7mm, f7m
     '''
     Investissements dans les DOM-TOM dans le cadre d'une entrepise.
     '''
+    if is_each_zero_array('_doment_2012', f7ks, f7kt, f7ku, f7lg, f7lh, f7li, f7ma, f7mb, f7mc, f7mm, f7mn, f7nu, f7nv,
+            f7nw, f7ny, f7pa, f7pb, f7pd, f7pe, f7pf, f7ph, f7pi, f7pj, f7pl, f7pm, f7pn, f7po, f7pp, f7pr, f7ps, f7pt,
+            f7pu, f7pw, f7px, f7py, f7pz, f7qe, f7qf, f7qg, f7qi, f7qo, f7qp, f7qr, f7qv, f7qz, f7rg, f7ri, f7rj, f7rk,
+            f7rl, f7rm, f7ro, f7rp, f7rq, f7rr, f7rt, f7ru, f7rv, f7rw, f7rx, f7ry):
+        return get_zero_array(f7ks.size)
     return (f7ks + f7kt + f7ku + f7lg + f7lh + f7li + f7ma + f7mb + f7mc + f7mm + f7mn +  f7pz + f7nu + f7nv + f7nw +
                 f7ny + f7pa + f7pb + f7pd + f7pe + f7pf + f7ph + f7pi + f7pj + f7pl + f7pm + f7pn + f7po + f7pp + f7pr +
                 f7ps + f7pt + f7pu + f7pw + f7px + f7py + f7qe + f7qf + f7qg + f7qi + f7qo + f7qp + f7qr + f7qv + f7qz +
@@ -498,6 +568,12 @@ def _doment_2013(fhsa, fhsb, fhsf, fhsg, fhsc, fhsh, fhse, fhsj, fhsk, fhsl, fhs
     '''
     Investissements dans les DOM-TOM dans le cadre d'une entrepise.
     '''
+    if is_each_zero_array('_doment_2013', fhsa, fhsb, fhsf, fhsg, fhsc, fhsh, fhse, fhsj, fhsk, fhsl, fhsp, fhsq, fhsm,
+            fhsr, fhso, fhst, fhsu, fhsv, fhsw, fhsz, fhta, fhtb, fhtd, f7ks, f7kt, f7ku, f7lg, f7lh, f7li, f7ma, f7mb,
+            f7mc, f7mm, f7mn, f7nu, f7nv, f7nw, f7ny, f7pa, f7pb, f7pd, f7pe, f7pf, f7ph, f7pi, f7pj, f7pl, f7pm, f7pn,
+            f7po, f7pp, f7pr, f7ps, f7pt, f7pu, f7pw, f7px, f7py, f7qe, f7qf, f7qg, f7qi, f7qo, f7qp, f7qr, f7qv, f7qz,
+            f7rg, f7ri, f7rj, f7rk, f7rl, f7rm, f7ro, f7rp, f7rq, f7rr, f7rt, f7ru, f7rv, f7rw, f7ry):
+        return get_zero_array(fhsa.size)
     return (fhsa + fhsb + fhsf + fhsg + fhsc + fhsh + fhse + fhsj + fhsk + fhsl + fhsp + fhsq + fhsm + fhsr + fhso +
                 fhst + fhsu + fhsv + fhsw + fhsz + fhta + fhtb + fhtd + f7ks + f7kt + f7ku + f7lg + f7lh + f7li + f7ma +
                 f7mb + f7mc + f7mm + f7mn + f7nu + f7nv + f7nw + f7ny + f7pa + f7pb + f7pd + f7pe + f7pf + f7ph + f7pi +
@@ -511,6 +587,8 @@ def _domlog_2002(f7ua, f7ub, f7uc, f7uj, _P, P = law.ir.reductions_impots.domlog
     Investissements OUTRE-MER dans le secteur du logement et autres secteurs d’activité
     2002
     '''
+    if is_each_zero_array('_domlog_2002', f7ua, f7ub, f7uc, f7uj):
+        return get_zero_array(f7ua.size)
     return P.taux1 * f7uj + P.taux2 * (f7ua + f7ub + f7uc)
 
 
@@ -519,6 +597,8 @@ def _domlog_2003_2004(f7ua, f7ub, f7uc, f7ui, f7uj, _P, P = law.ir.reductions_im
     Investissements OUTRE-MER dans le secteur du logement et autres secteurs d’activité
     2003-2004
     '''
+    if is_each_zero_array('_domlog_2003_2004', f7ua, f7ub, f7uc, f7ui, f7uj):
+        return get_zero_array(f7ua.size)
     return P.taux1 * f7uj + P.taux2 * (f7ua + f7ub + f7uc) + f7ui
 
 
@@ -527,6 +607,8 @@ def _domlog_2005_2007(f7ua, f7ub, f7uc, f7ui, f7uj, _P, P = law.ir.reductions_im
     Investissements OUTRE-MER dans le secteur du logement et autres secteurs d’activité
     2005-2007
     '''
+    if is_each_zero_array('_domlog_2005_2007', f7ua, f7ub, f7uc, f7ui, f7uj):
+        return get_zero_array(f7ua.size)
     return P.taux1 * f7uj + P.taux2 * (f7ua + f7ub) + f7ui
 #En accord avec la DGFiP mais pas de 7ub et 7uj dans la notice
 
@@ -535,6 +617,8 @@ def _domlog_2008(f7ui):
     Investissements OUTRE-MER dans le secteur du logement et autres secteurs d’activité
     2008
     '''
+    if is_each_zero_array('_domlog_2008', f7ui):
+        return get_zero_array(f7ui.size)
     return f7ui
 
 
@@ -543,6 +627,8 @@ def _domlog_2009(f7qb, f7qc, f7qd, f7qk):
     Investissements OUTRE-MER dans le secteur du logement et autres secteurs d’activité
     2009
     '''
+    if is_each_zero_array('_domlog_2009', f7qb, f7qc, f7qd, f7qk):
+        return get_zero_array(f7qb.size)
     return f7qb + f7qc + f7qd + f7qk / 2
 
 
@@ -552,6 +638,8 @@ def _domlog_2010(f7qb, f7qc, f7qd, f7ql, f7qt, f7qm):
     2010
     TODO: Plafonnement sur la notice
     '''
+    if is_each_zero_array('_domlog_2010', f7qb, f7qc, f7qd, f7ql, f7qt, f7qm):
+        return get_zero_array(f7qb.size)
     return f7qb + f7qc + f7qd + f7ql + f7qt + f7qm
 
 
@@ -561,6 +649,8 @@ def _domlog_2011(f7qb, f7qc, f7qd, f7ql, f7qm, f7qt, f7oa, f7ob, f7oc, f7oh, f7o
     2011
     TODO: Plafonnement sur la notice
     '''
+    if is_each_zero_array('_domlog_2011', f7qb, f7qc, f7qd, f7ql, f7qm, f7qt, f7oa, f7ob, f7oc, f7oh, f7oi, f7oj, f7ok):
+        return get_zero_array(f7qb.size)
     return f7qb + f7qc + f7qd + f7ql + f7qm + f7qt + f7oa + f7ob + f7oc + f7oh + f7oi + f7oj + f7ok
 
 
@@ -571,6 +661,9 @@ def _domlog_2012(f7qb, f7qc, f7qd, f7ql, f7qm, f7qt, f7oa, f7ob, f7oc, f7oh, f7o
     2012
     TODO: Plafonnement sur la notice
     '''
+    if is_each_zero_array('_domlog_2012', f7qb, f7qc, f7qd, f7ql, f7qm, f7qt, f7oa, f7ob, f7oc, f7oh, f7oi, f7oj, f7ok,
+            f7ol, f7om, f7on, f7oo, f7op, f7oq, f7or, f7os, f7ot, f7ou, f7ov, f7ow):
+        return get_zero_array(f7qb.size)
     return (f7qb + f7qc + f7qd + f7ql + f7qm + f7qt + f7oa + f7ob + f7oc + f7oh + f7oi + f7oj + f7ok + f7ol + f7om +
                 f7on + f7oo + f7op + f7oq + f7or + f7os + f7ot + f7ou + f7ov + f7ow)
 
@@ -582,6 +675,10 @@ def _domlog_2013(fhod, fhoe, fhof, fhog, fhox, fhoy, fhoz, f7qb, f7qc, f7qd, f7q
     2013
     TODO: Plafonnement sur la notice
     '''
+    if is_each_zero_array('_domlog_2013', fhod, fhoe, fhof, fhog, fhox, fhoy, fhoz, f7qb, f7qc, f7qd, f7ql, f7qm, f7qt,
+            f7oa, f7ob, f7oc, f7oh, f7oi, f7oj, f7ok, f7ol, f7om, f7on, f7oo, f7op, f7oq, f7or, f7os, f7ot, f7ou, f7ov,
+            f7ow):
+        return get_zero_array(fhod.size)
     return (f7qb + f7qc + f7qd + f7ql + f7qm + f7qt + f7oa + f7ob + f7oc + f7oh + f7oi + f7oj + f7ok + f7ol + f7om +
                 f7on + f7oo + f7op + f7oq + f7or + f7os + f7ot + f7ou + f7ov + f7ow + fhod + fhoe +
                 fhof + fhog + fhox + fhoy + fhoz)
@@ -593,6 +690,8 @@ def _domsoc_2010_2012(f7qn, f7qk, f7qu, f7kg, f7kh, f7ki, f7qj, f7qs, f7qw, f7qx
     2010-
     TODO plafonnement à 15% f7qa / liens avec autres investissments ?
     '''
+    if is_each_zero_array('_domsoc_2010_2012', f7qn, f7qk, f7qu, f7kg, f7kh, f7ki, f7qj, f7qs, f7qw, f7qx):
+        return get_zero_array(f7qn.size)
     return  f7qn + f7qk + f7qu + f7kg + f7kh + f7ki + f7qj + f7qs + f7qw + f7qx
 
 
@@ -602,6 +701,9 @@ def _domsoc_2013(fhra, fhrb, fhrc, fhrd, f7qn, f7qk, f7qu, f7kg, f7kh, f7ki, f7q
     2013
     TODO plafonnement à 15% f7qa / liens avec autres investissments ?
     '''
+    if is_each_zero_array('_domsoc_2013', fhra, fhrb, fhrc, fhrd, f7qn, f7qk, f7qu, f7kg, f7kh, f7ki, f7qj, f7qs, f7qw,
+            f7qx):
+        return get_zero_array(fhra.size)
     return  fhra + fhrb + fhrc + fhrd + f7qn + f7qk + f7qu + f7kg + f7kh + f7ki + f7qj + f7qs + f7qw + f7qx
 
 
@@ -609,6 +711,8 @@ def _donapd_2002_2010(f7ud, P = law.ir.reductions_impots.donapd):
     '''
     Dons effectués à  des organises d'aide aux personnes en difficulté (2002-2010)
     '''
+    if is_each_zero_array('_donapd_2002_2010', f7ud):
+        return get_zero_array(f7ud.size)
     return P.taux * min_(f7ud, P.max)
 
 
@@ -616,6 +720,8 @@ def _donapd_2011_2013(f7ud, f7va, P = law.ir.reductions_impots.donapd):
     '''
     Dons effectués à  des organises d'aide aux personnes en difficulté (2011-2013)
     '''
+    if is_each_zero_array('_donapd_2011_2013', f7ud, f7va):
+        return get_zero_array(f7ud.size)
     return P.taux * min_(f7ud + f7va, P.max)
 
 
@@ -624,6 +730,8 @@ def _duflot(f7gh, f7gi, P = law.ir.reductions_impots.duflot):
      Investissements locatifs interméiaires (loi Duflot)
      2013-
      '''
+     if is_each_zero_array('_duflot', f7gh, f7gi):
+         return get_zero_array(f7gh.size)
      return min_(P.plafond, P.taux_m * f7gh + P.taux_om * f7gi) / 9
 #TODO: / 5 dans trois TOM
 
@@ -632,6 +740,8 @@ def _ecodev(f7uh, rbg_int, P = law.ir.reductions_impots.ecodev):
     Sommes versées sur un compte épargne codéveloppement (case 7UH)
     2009
     '''
+    if is_each_zero_array('_ecodev', f7uh):
+        return get_zero_array(f7uh.size)
     return min_(f7uh * P.taux, min_(P.base * rbg_int, P.max))  # page3 ligne 18
 
 
@@ -639,6 +749,8 @@ def _ecpess(f7ea, f7eb, f7ec, f7ed, f7ef, f7eg, P = law.ir.reductions_impots.ecp
     '''
     Réduction d'impôt au titre des enfants à charge poursuivant leurs études secondaires ou supérieures
     '''
+    if is_each_zero_array('_ecpess', f7ea, f7eb, f7ec, f7ed, f7ef, f7eg):
+        return get_zero_array(f7ea.size)
     return (P.col * (f7ea + f7eb / 2) +
             P.lyc * (f7ec + f7ed / 2) +
             P.sup * (f7ef + f7eg / 2))
@@ -650,6 +762,8 @@ def _garext_2002(f7ga, f7gb, f7gc, _P, P = law.ir.reductions_impots.garext):
     et GE, GF, GG
     2002
     '''
+    if is_each_zero_array('_garext_2002', f7ga, f7gb, f7gc):
+        return get_zero_array(f7ga.size)
     max1 = P.max
     return P.taux * (min_(f7ga, max1) + min_(f7gb, max1) + min_(f7gc, max1))
 
@@ -660,6 +774,8 @@ def _garext_2003_2005(f7ga, f7gb, f7gc, f7ge, f7gf, f7gg, _P, P = law.ir.reducti
     et GE, GF, GG
     2003-2005
     '''
+    if is_each_zero_array('_garext_2003_2005', f7ga, f7gb, f7gc, f7ge, f7gf, f7gg):
+        return get_zero_array(f7ga.size)
     max1 = P.max
     max2 = P.max / 2
     return P.taux * (min_(f7ga, max1) +
@@ -675,6 +791,8 @@ def _intagr(f7um, marpac, P = law.ir.reductions_impots.intagr):
     Intérêts pour paiement différé accordé aux agriculteurs
     2005-
     '''
+    if is_each_zero_array('_intagr', f7um):
+        return get_zero_array(f7um.size)
     max1 = P.max * (1 + marpac)
     return P.taux * min_(f7um, max1)
 
@@ -684,6 +802,8 @@ def _intcon(f7uh, P = law.ir.reductions_impots.intcon):
     Intérêts des prêts à la consommation (case UH)
     2004-2005
     '''
+    if is_each_zero_array('_intcon', f7uh):
+        return get_zero_array(f7uh.size)
     max1 = P.max
     return P.taux * min_(f7uh, max1)
 
@@ -693,6 +813,8 @@ def _intemp(nb_pac, f7wg, P = law.ir.reductions_impots.intemp):
     Intérêts d'emprunts
     2002-2003
     '''
+    if is_each_zero_array('_intemp', f7wg):
+        return get_zero_array(f7wg.size)
     max1 = P.max + P.pac * nb_pac
     return P.taux * min_(f7wg, max1)
 
@@ -701,6 +823,8 @@ def _invfor_2002_2005(marpac, f7un, _P, P = law.ir.reductions_impots.invfor):
     '''
     Investissements forestiers pour 2002-2005
     '''
+    if is_each_zero_array('_invfor_2002_2005', f7un):
+        return get_zero_array(f7un.size)
     seuil = P.seuil * (marpac + 1)
     return P.taux * min_(f7un, seuil)
 
@@ -709,6 +833,8 @@ def _invfor_2006_2008(f7un, _P, P = law.ir.reductions_impots.invfor):
     '''
     Investissements forestiers pour 2006-2008
     '''
+    if is_each_zero_array('_invfor_2006_2008', f7un):
+        return get_zero_array(f7un.size)
     return P.taux * f7un
 
 
@@ -716,6 +842,8 @@ def _invfor_2009(marpac, f7un, f7up, f7uq, _P, P = law.ir.reductions_impots.invf
     '''
     Investissements forestiers pour 2009
     '''
+    if is_each_zero_array('_invfor_2009', f7un, f7up, f7uq):
+        return get_zero_array(f7un.size)
     return P.taux * (min_(f7un, P.seuil * (marpac + 1)) + min_(f7up, P.ifortra_seuil * (marpac + 1)) +
             min_(f7uq, P.iforges_seuil * (marpac + 1)))
 
@@ -724,6 +852,8 @@ def _invfor_2010(marpac, f7te, f7un, f7up, f7uq, f7uu, _P, P = law.ir.reductions
     '''
     Investissements forestiers pour 2010
     '''
+    if is_each_zero_array('_invfor_2010', f7te, f7un, f7up, f7uq, f7uu):
+        return get_zero_array(f7te.size)
     return (P.taux * (
         min_(f7un, P.seuil * (marpac + 1)) +
         min_(f7up + f7uu + f7te, P.ifortra_seuil * (marpac + 1)) +
@@ -734,6 +864,8 @@ def _invfor_2011(marpac, f7te, f7tf, f7ul, f7un, f7up, f7uq, f7uu, f7uv, _P, P =
     '''
     Investissements forestiers pour 2011 cf. 2041 GK
     '''
+    if is_each_zero_array('_invfor_2011', f7te, f7tf, f7ul, f7un, f7up, f7uq, f7uu, f7uv):
+        return get_zero_array(f7te.size)
     max0 = max_(0, P.ifortra_seuil * (marpac + 1) - f7ul)
     max1 = max_(0, max0 - f7uu + f7te + f7uv + f7tf)
     return (P.taux * (
@@ -749,6 +881,8 @@ def _invfor_2012(marpac, f7te, f7tf, f7tg, f7ul, f7un, f7up, f7uq, f7uu, f7uv, f
     '''
     Investissements forestiers pour 2012 cf. 2041 GK
     '''
+    if is_each_zero_array('_invfor_2012', f7te, f7tf, f7tg, f7ul, f7un, f7up, f7uq, f7uu, f7uv, f7uw):
+        return get_zero_array(f7te.size)
     max0 = max_(0, P.ifortra_seuil * (marpac + 1) - f7ul)
     max1 = max_(0, max0 - f7uu + f7te + f7uv + f7tf)
     max2 = max_(0, max1 - f7tg - f7uw)
@@ -766,6 +900,8 @@ def _invfor_2013(marpac, f7te, f7tf, f7tg, f7th, f7ul, f7un, f7up, f7uq, f7uu, f
     '''
     Investissements forestiers pour 2013 cf. 2041 GK
     '''
+    if is_each_zero_array('_invfor_2013', f7te, f7tf, f7tg, f7th, f7ul, f7un, f7up, f7uq, f7uu, f7uv, f7uw, f7ux):
+        return get_zero_array(f7te.size)
     max0 = max_(0, P.ifortra_seuil * (marpac + 1) - f7ul)
     max1 = max_(0, max0 - f7uu + f7te + f7uv + f7tf)
     max2 = max_(0, max1 - f7tg - f7uw)
@@ -786,6 +922,8 @@ def _invlst_2004(marpac, f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f7xj, f7xk, f
     Investissements locatifs dans le secteur touristique
     2004
     '''
+    if is_each_zero_array('_invlst_2004', f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f7xj, f7xk, f7xl, f7xm, f7xn, f7xo):
+        return get_zero_array(f7xc.size)
     seuil1 = P.seuil1 * (1 + marpac)
     seuil2 = P.seuil2 * (1 + marpac)
     seuil3 = P.seuil3 * (1 + marpac)
@@ -813,6 +951,9 @@ def _invlst_2005_2010(marpac, f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f7xj, f7
     Investissements locatifs dans le secteur touristique
     2005-2010
     '''
+    if is_each_zero_array('_invlst_2005_2010', f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f7xj, f7xk, f7xl, f7xm, f7xn,
+            f7xo):
+        return get_zero_array(f7xc.size)
     seuil1 = P.seuil1 * (1 + marpac)
     seuil2 = P.seuil2 * (1 + marpac)
     seuil3 = P.seuil3 * (1 + marpac)
@@ -840,6 +981,9 @@ def _invlst_2011(marpac, f7xa, f7xb, f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f
     Investissements locatifs dans le secteur touristique
     2011
     '''
+    if is_each_zero_array('_invlst_2011', f7xa, f7xb, f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f7xj, f7xk, f7xl, f7xm,
+            f7xn, f7xo, f7xp, f7xq, f7xr):
+        return get_zero_array(f7xa.size)
     seuil1 = P.seuil1 * (1 + marpac)
     seuil2 = P.seuil2 * (1 + marpac)
     seuil3 = P.seuil3 * (1 + marpac)
@@ -863,6 +1007,9 @@ def _invlst_2012(marpac, f7xa, f7xb, f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f
     Investissements locatifs dans le secteur touristique
     2012
     '''
+    if is_each_zero_array('_invlst_2012', f7xa, f7xb, f7xc, f7xd, f7xe, f7xf, f7xg, f7xh, f7xi, f7xj, f7xk, f7xl, f7xm,
+            f7xn, f7xo, f7xp, f7xq, f7xr, f7xv, f7xx, f7xz):
+        return get_zero_array(f7xa.size)
     seuil1 = P.seuil1 * (1 + marpac)
     seuil2 = P.seuil2 * (1 + marpac)
     seuil3 = P.seuil3 * (1 + marpac)
@@ -888,6 +1035,8 @@ def _invlst_2013(marpac, f7uy, f7uz, f7xf, f7xi, f7xj, f7xk, f7xm, f7xn, f7xo, f
     Investissements locatifs dans le secteur touristique
     2013
     '''
+    if is_each_zero_array('_invlst_2013', f7uy, f7uz, f7xf, f7xi, f7xj, f7xk, f7xm, f7xn, f7xo, f7xp, f7xq, f7xr, f7xv):
+        return get_zero_array(f7uy.size)
 
     xi = P.taux_xi * (f7xf + f7xi + f7xp + f7xn + f7uy)
     xj = P.taux_xj * (f7xm + f7xj + f7xq + f7xv + f7uz)
@@ -903,6 +1052,8 @@ def _invrev(marpac, f7gs, f7gt, f7xg, f7gu, f7gv, P = law.ir.reductions_impots.i
     2002-2003
     TODO 1/4 codé en dur
     '''
+    if is_each_zero_array('_invrev', f7gs, f7gt, f7xg, f7gu, f7gv):
+        return get_zero_array(f7gs.size)
     return (P.taux_gs * min_(f7gs, P.seuil_gs * (1 + marpac)) / 4 +
              P.taux_gu * min_(f7gu, P.seuil_gu * (1 + marpac)) / 4 +
              P.taux_xg * min_(f7xg, P.seuil_xg * (1 + marpac)) / 4 +
@@ -914,6 +1065,8 @@ def _locmeu_2009(f7ij, P = law.ir.reductions_impots.locmeu):
     Investissement en vue de la location meublée non professionnelle dans certains établissements ou résidences
     2009
     '''
+    if is_each_zero_array('_locmeu_2009', f7ij):
+        return get_zero_array(f7ij.size)
     return P.taux * min_(P.max, f7ij) / 9
 
 
@@ -922,6 +1075,8 @@ def _locmeu_2010(f7ij, f7ik, f7il, f7im, f7is, P = law.ir.reductions_impots.locm
     Investissement en vue de la location meublée non professionnelle dans certains établissements ou résidences
     2010
     '''
+    if is_each_zero_array('_locmeu_2010', f7ij, f7ik, f7il, f7im, f7is):
+        return get_zero_array(f7ij.size)
     return ((min_(P.max, max_(f7ij, f7il)) + min_(P.max, f7im)) / 9 + f7ik) * P.taux + f7is
 
 
@@ -931,6 +1086,9 @@ def _locmeu_2011(f7ij, f7ik, f7il, f7im, f7in, f7io, f7ip, f7iq, f7ir, f7is, f7i
     Investissement en vue de la location meublée non professionnelle dans certains établissements ou résidences
     2011
     '''
+    if is_each_zero_array('_locmeu_2011', f7ij, f7ik, f7il, f7im, f7in, f7io, f7ip, f7iq, f7ir, f7is, f7it, f7iu, f7iv,
+            f7iw):
+        return get_zero_array(f7ij.size)
     m20 = (maxi(f7ij, f7il, f7in, f7iv) == max_(f7il, f7in))
     return ((min_(P.max, maxi(f7ij, f7il, f7in, f7iv)) * (P.taux20 * m20 + P.taux18 * not_(m20)) +
             P.taux * (min_(P.max, max_(f7im, f7iw)) + min_(P.max, f7io))) / 9 +
@@ -944,6 +1102,9 @@ def _locmeu_2012(f7ia, f7ib, f7ic, f7id, f7ie, f7if, f7ig, f7ih, f7ij, f7ik, f7i
     Investissement en vue de la location meublée non professionnelle dans certains établissements ou résidences
     2012
     '''
+    if is_each_zero_array('_locmeu_2012', f7ia, f7ib, f7ic, f7id, f7ie, f7if, f7ig, f7ih, f7ij, f7ik, f7il, f7im, f7in,
+            f7io, f7ip, f7iq, f7ir, f7is, f7it, f7iu, f7iv, f7iw, f7ix, f7iz):
+        return get_zero_array(f7ia.size)
     m18 = (maxi(f7id, f7ie, f7if, f7ig) == max_(f7ie, f7if))
     m20 = (maxi(f7ij, f7il, f7in, f7iv) == max_(f7il, f7in))
     return ((min_(P.max, maxi(f7ij, f7il, f7in, f7iv)) * (P.taux20 * m20 + P.taux18 * not_(m20)) +
@@ -960,6 +1121,10 @@ def _locmeu_2013(f7ia, f7ib, f7ic, f7id, f7ie, f7if, f7ig, f7ih, f7ij, f7ik, f7i
     Investissement en vue de la location meublée non professionnelle dans certains établissements ou résidences
     2013
     '''
+    if is_each_zero_array('_locmeu_2013', f7ia, f7ib, f7ic, f7id, f7ie, f7if, f7ig, f7ih, f7ij, f7ik, f7il, f7im, f7in,
+            f7io, f7ip, f7iq, f7ir, f7is, f7it, f7iu, f7iv, f7iw, f7ix, f7iy, f7iz, f7jc, f7ji, f7js, f7jt, f7ju, f7jv,
+            f7jw, f7jx, f7jy):
+        return get_zero_array(f7ia.size)
     m18 = (maxi(f7id, f7ie, f7if, f7ig) == max_(f7ie, f7if))
     m20 = (maxi(f7ij, f7il, f7in, f7iv) == max_(f7il, f7in))
     return ((min_(P.max, maxi(f7ij, f7il, f7in, f7iv)) * (P.taux20 * m20 + P.taux18 * not_(m20)) +
@@ -976,6 +1141,8 @@ def _mecena(f7us):
     Mécénat d'entreprise (case 7US)
     2013
     '''
+    if is_each_zero_array('_mecena', f7us):
+        return get_zero_array(f7us.size)
     return f7us
 
 
@@ -984,6 +1151,8 @@ def _mohist(f7nz, P = law.ir.reductions_impots.mohist):
     Travaux de conservation et de restauration d’objets classés monuments historiques (case NZ)
     2008-
     '''
+    if is_each_zero_array('_mohist', f7nz):
+        return get_zero_array(f7nz.size)
     return P.taux * min_(f7nz, P.max)
 
 
@@ -992,6 +1161,8 @@ def _patnat_2010(f7ka, P = law.ir.reductions_impots.patnat):
     Dépenses de protections du patrimoine naturel (case 7KA)
     2010
     '''
+    if is_each_zero_array('_patnat_2010', f7ka):
+        return get_zero_array(f7ka.size)
     max1 = P.max
     return P.taux * min_(f7ka, max1)
 
@@ -1001,6 +1172,8 @@ def _patnat_2011(f7ka, f7kb, P = law.ir.reductions_impots.patnat):
     Dépenses de protections du patrimoine naturel (case 7KA, 7KB)
     2011
     '''
+    if is_each_zero_array('_patnat_2011', f7ka, f7kb):
+        return get_zero_array(f7ka.size)
     max1 = P.max
     return P.taux * min_(f7ka, max1) + f7kb
 
@@ -1010,6 +1183,8 @@ def _patnat_2012(f7ka, f7kb, f7kc, P = law.ir.reductions_impots.patnat):
     Dépenses de protections du patrimoine naturel (case 7KA, 7KB, 7KC)
     2012
     '''
+    if is_each_zero_array('_patnat_2012', f7ka, f7kb, f7kc):
+        return get_zero_array(f7ka.size)
     max1 = P.max
     return P.taux * min_(f7ka, max1) + f7kb + f7kc
 
@@ -1019,6 +1194,8 @@ def _patnat_2013(f7ka, f7kb, f7kc, f7kd, P = law.ir.reductions_impots.patnat):
     Dépenses de protections du patrimoine naturel (case 7KA, 7KB, 7KC)
     2013
     '''
+    if is_each_zero_array('_patnat_2013', f7ka, f7kb, f7kc, f7kd):
+        return get_zero_array(f7ka.size)
     max1 = P.max
     return P.taux * min_(f7ka, max1) + f7kb + f7kc + f7kd
 
@@ -1028,6 +1205,8 @@ def _prcomp(f7wm, f7wn, f7wo, f7wp, P = law.ir.reductions_impots.prcomp):
     Prestations compensatoires
     2002-
     '''
+    if is_each_zero_array('_prcomp', f7wm, f7wn, f7wo, f7wp):
+        return get_zero_array(f7wm.size)
     div = (f7wo == 0) * 1 + f7wo  # Pour éviter les divisions par zéro
 
     return ((f7wm == 0) * ((f7wn == f7wo) * P.taux * min_(f7wn, P.seuil) +
@@ -1045,6 +1224,8 @@ def _repsoc(marpac, f7fh, P = law.ir.reductions_impots.repsoc):
     Intérèts d'emprunts pour reprises de société
     2003-
     '''
+    if is_each_zero_array('_repsoc', f7fh):
+        return get_zero_array(f7fh.size)
     seuil = P.seuil * (marpac + 1)
     return P.taux * min_(f7fh, seuil)
 
@@ -1054,6 +1235,8 @@ def _resimm_2009_2010(f7ra, f7rb, P = law.ir.reductions_impots.resimm):
     Travaux de restauration immobilière (cases 7RA et 7RB)
     2009-2010
     '''
+    if is_each_zero_array('_resimm_2009_2010', f7ra, f7rb):
+        return get_zero_array(f7ra.size)
     max1 = P.max
     max2 = max_(max1 - f7rb, 0)
     return P.taux_rb * min_(f7rb, max1) + P.taux_ra * min_(f7ra, max2)
@@ -1064,6 +1247,8 @@ def _resimm_2011(f7ra, f7rb, f7rc, f7rd, P = law.ir.reductions_impots.resimm):
     Travaux de restauration immobilière (cases 7RA, 7RB, 7RC, 7RD)
     2011
     '''
+    if is_each_zero_array('_resimm_2011', f7ra, f7rb, f7rc, f7rd):
+        return get_zero_array(f7ra.size)
     max1 = P.max
     max2 = max_(max1 - f7rd, 0)
     max3 = max_(max2 - f7rb, 0)
@@ -1077,6 +1262,8 @@ def _resimm_2012(f7ra, f7rb, f7rc, f7rd, f7re, f7rf, P = law.ir.reductions_impot
     Travaux de restauration immobilière (cases 7RA, 7RB, 7RC, 7RD, 7RE, 7RF)
     2012
     '''
+    if is_each_zero_array('_resimm_2012', f7ra, f7rb, f7rc, f7rd, f7re, f7rf):
+        return get_zero_array(f7ra.size)
     max1 = P.max
     max2 = max_(max1 - f7rd, 0)
     max3 = max_(max2 - f7rb, 0)
@@ -1091,6 +1278,8 @@ def _resimm_2013(f7ra, f7rb, f7rc, f7rd, f7re, f7rf, f7sx, f7sy, P = law.ir.redu
     Travaux de restauration immobilière (cases 7RA, 7RB, 7RC, 7RD, 7RE, 7RF, 7SX, 7SY)
     2012
     '''
+    if is_each_zero_array('_resimm_2013', f7ra, f7rb, f7rc, f7rd, f7re, f7rf, f7sx, f7sy):
+        return get_zero_array(f7ra.size)
     max1 = P.max
     max2 = max_(max1 - f7rd, 0)
     max3 = max_(max2 - f7rb, 0)
@@ -1114,6 +1303,8 @@ def _saldom_2002_2004(f7df, f7dg, _P, P = law.ir.reductions_impots.saldom):
     Sommes versées pour l'emploi d'un salariés à  domicile
     2002-2004
     '''
+    if is_each_zero_array('_saldom_2002_2004', f7df, f7dg):
+        return get_zero_array(f7df.size)
     isinvalid = f7dg
     max1 = P.max1 * not_(isinvalid) + P.max3 * isinvalid
     return P.taux * min_(f7df, max1)
@@ -1124,6 +1315,8 @@ def _saldom_2005_2006(nb_pac2, f7df, f7dl, f7dg, _P, P = law.ir.reductions_impot
     Sommes versées pour l'emploi d'un salariés à  domicile
     2005-2006
     '''
+    if is_each_zero_array('_saldom_2005_2006', f7df, f7dl, f7dg):
+        return get_zero_array(f7df.size)
     isinvalid = f7dg
     nbpacmin = nb_pac2 + f7dl
     maxBase = P.max1
@@ -1138,6 +1331,8 @@ def _saldom_2007_2008(nb_pac2, f7db, f7df, f7dl, f7dg, _P, P = law.ir.reductions
     Sommes versées pour l'emploi d'un salariés à  domicile
     2007-2008
     '''
+    if is_each_zero_array('_saldom_2007_2008', f7db, f7df, f7dl, f7dg):
+        return get_zero_array(f7db.size)
     isinvalid = f7dg
     nbpacmin = nb_pac2 + f7dl
     maxBase = P.max1
@@ -1153,6 +1348,8 @@ def _saldom_2009_2013(nb_pac2, f7db, f7df, f7dl, f7dq, f7dg, _P, P = law.ir.redu
     Sommes versées pour l'emploi d'un salariés à  domicile
     2009-2013
     '''
+    if is_each_zero_array('_saldom_2009_2013', f7db, f7df, f7dl, f7dq, f7dg):
+        return get_zero_array(f7db.size)
     isinvalid = f7dg
     annee1 = f7dq
     nbpacmin = nb_pac2 + f7dl
@@ -1169,6 +1366,8 @@ def _scelli_2009(f7hj, f7hk, P = law.ir.reductions_impots.scelli):
     Investissements locatif neufs : Dispositif Scellier (cases 7HJ et 7HK)
     2009
     '''
+    if is_each_zero_array('_scelli_2009', f7hj, f7hk):
+        return get_zero_array(f7hj.size)
     return max_(P.taux1 * min_(P.max, f7hj), P.taux2 * min_(P.max, f7hk)) / 9
 
 
@@ -1177,6 +1376,8 @@ def _scelli_2010(f7hj, f7hk, f7hn, f7ho, f7hl, f7hm, f7hr, f7hs, f7la, P = law.i
     Investissements locatif neufs : Dispositif Scellier
     2010
     '''
+    if is_each_zero_array('_scelli_2010', f7hj, f7hk, f7hn, f7ho, f7hl, f7hm, f7hr, f7hs, f7la):
+        return get_zero_array(f7hj.size)
     return (max_(
                 max_(P.taux1 * min_(P.max, f7hj),
                 P.taux2 * min_(P.max, f7hk)),
@@ -1196,6 +1397,10 @@ def _scelli_2011(f7hj, f7hk, f7hl, f7hm, f7hn, f7ho, f7hr, f7hs, f7ht, f7hu, f7h
     Investissements locatif neufs : Dispositif Scellier
     2011
     '''
+    if is_each_zero_array('_scelli_2011', f7hj, f7hk, f7hl, f7hm, f7hn, f7ho, f7hr, f7hs, f7ht, f7hu, f7hv, f7hw, f7hx,
+            f7hz, f7la, f7lb, f7lc, f7na, f7nb, f7nc, f7nd, f7ne, f7nf, f7ng, f7nh, f7ni, f7nj, f7nk, f7nl, f7nm, f7nn,
+            f7no, f7np, f7nq, f7nr, f7ns, f7nt):
+        return get_zero_array(f7hj.size)
     return (min_(P.max, maxi(
                 P.taux13 * max_(f7nf, f7nj) / 9,
                 P.taux15 * max_(f7ng, f7ni) / 9,
@@ -1222,6 +1427,11 @@ def _scelli_2012(f7ha, f7hb, f7hg, f7hh, f7hd, f7he, f7hf, f7hj, f7hk, f7hl, f7h
     Investissements locatif neufs : Dispositif Scellier
     2012
     '''
+    if is_each_zero_array('_scelli_2012', f7ha, f7hb, f7hg, f7hh, f7hd, f7he, f7hf, f7hj, f7hk, f7hl, f7hm, f7hn, f7ho,
+            f7hr, f7hs, f7ht, f7hu, f7hv, f7hw, f7hx, f7hz, f7ja, f7jb, f7jd, f7je, f7jf, f7jg, f7jh, f7jj, f7jk, f7jl,
+            f7jm, f7jn, f7jo, f7jp, f7jq, f7jr, f7la, f7lb, f7lc, f7ld, f7le, f7lf, f7na, f7nb, f7nc, f7nd, f7ne, f7nf,
+            f7ng, f7nh, f7ni, f7nj, f7nk, f7nl, f7nm, f7nn, f7no, f7np, f7nq, f7nr, f7ns, f7nt):
+        return get_zero_array(f7ha.size)
     return (min_(P.max, maxi(
                 P.taux13 * max_(f7nf, f7nj) / 9,
                 P.taux15 * max_(f7ng, f7ni) / 9,
@@ -1256,6 +1466,12 @@ def _scelli_2013(f7fa, f7fb, f7fc, f7fd, f7gj, f7gk, f7gl, f7gp, f7gs, f7gt, f7g
     Investissements locatif neufs : Dispositif Scellier
     2013
     '''
+    if is_each_zero_array('_scelli_2013', f7fa, f7fb, f7fc, f7fd, f7gj, f7gk, f7gl, f7gp, f7gs, f7gt, f7gu, f7gv, f7gw,
+            f7gx, f7ha, f7hb, f7hg, f7hh, f7hd, f7he, f7hf, f7hj, f7hk, f7hl, f7hm, f7hn, f7ho, f7hr, f7hs, f7ht, f7hu,
+            f7hv, f7hw, f7hx, f7hz, f7ja, f7jb, f7jd, f7je, f7jf, f7jg, f7jh, f7jj, f7jk, f7jl, f7jm, f7jn, f7jo, f7jp,
+            f7jq, f7jr, f7la, f7lb, f7lc, f7ld, f7le, f7lf, f7lm, f7ls, f7lz, f7mg, f7na, f7nb, f7nc, f7nd, f7ne, f7nf,
+            f7ng, f7nh, f7ni, f7nj, f7nk, f7nl, f7nm, f7nn, f7no, f7np, f7nq, f7nr, f7ns, f7nt):
+        return get_zero_array(f7fa.size)
     return (min_(P.max, maxi(
                 P.taux13 * max_(f7nf, f7nj) / 9,
                 P.taux15 * max_(f7ng, f7ni) / 9,
@@ -1287,6 +1503,8 @@ def _sofica(f7gn, f7fn, rng, P = law.ir.reductions_impots.sofica):
     Souscriptions au capital de SOFICA
     2006-
     '''
+    if is_each_zero_array('_sofica', f7gn, f7fn):
+        return get_zero_array(f7gn.size)
     max0 = min_(P.taux1 * max_(rng, 0), P.max)
     max1 = max_(0, max0 - f7gn)
     return P.taux2 * min_(f7gn, max0) + P.taux3 * min_(f7fn, max1)
@@ -1297,6 +1515,8 @@ def _sofipe(marpac, rbg_int, f7gs, _P, P = law.ir.reductions_impots.sofipe):
     Souscription au capital d’une SOFIPECHE (case 7GS)
     2009-2011
     """
+    if is_each_zero_array('_sofipe', f7gs):
+        return get_zero_array(f7gs.size)
     max1 = min_(P.max * (marpac + 1), P.base * rbg_int)  # page3 ligne 18
     return P.taux * min_(f7gs, max1)
 
@@ -1307,6 +1527,8 @@ def _spfcpi_2002(marpac, f7gq, _P, P = law.ir.reductions_impots.spfcpi):
     de fonds d'investissement de proximité
     2002
     '''
+    if is_each_zero_array('_spfcpi_2002', f7gq):
+        return get_zero_array(f7gq.size)
     max1 = P.max * (marpac + 1)
     return P.taux1 * min_(f7gq, max1)
 
@@ -1317,6 +1539,8 @@ def _spfcpi_2003_2006(marpac, f7gq, f7fq, _P, P = law.ir.reductions_impots.spfcp
     de fonds d'investissement de proximité
     2003-2006
     '''
+    if is_each_zero_array('_spfcpi_2003_2006', f7gq, f7fq):
+        return get_zero_array(f7gq.size)
     max1 = P.max * (marpac + 1)
     return (P.taux1 * min_(f7gq, max1) + P.taux1 * min_(f7fq, max1))
 
@@ -1327,6 +1551,8 @@ def _spfcpi_2007_2010(marpac, f7gq, f7fq, f7fm, _P, P = law.ir.reductions_impots
     de fonds d'investissement de proximité
     2007-2010
     '''
+    if is_each_zero_array('_spfcpi_2007_2010', f7gq, f7fq, f7fm):
+        return get_zero_array(f7gq.size)
     max1 = P.max * (marpac + 1)
     return (P.taux1 * min_(f7gq, max1) +
                 P.taux1 * min_(f7fq, max1) +
@@ -1339,6 +1565,8 @@ def _spfcpi_2011_2013(marpac, f7gq, f7fq, f7fm, f7fl, _P, P = law.ir.reductions_
     de fonds d'investissement de proximité
     2011-2013
     '''
+    if is_each_zero_array('_spfcpi_2011_2013', f7gq, f7fq, f7fm, f7fl):
+        return get_zero_array(f7gq.size)
     max1 = P.max * (marpac + 1)
     return (P.taux1 * min_(f7gq, max1) + P.taux1 * min_(f7fq, max1) + P.taux2 * min_(f7fm, max1) +
             P.taux3 * min_(f7fl, max1))
@@ -1350,6 +1578,8 @@ def _spfcpi_2014(f7gq):
     de fonds d'investissement de proximité
     2014
     '''
+    if is_each_zero_array('_spfcpi_2014', f7gq):
+        return get_zero_array(f7gq.size)
     return f7gq * 0
 
 
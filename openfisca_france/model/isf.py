@@ -28,7 +28,7 @@ from __future__ import division
 from numpy import (maximum as max_, minimum as min_)
 from openfisca_core.accessors import law
 
-from .base import QUIFAM, QUIFOY, QUIMEN
+from .base import QUIFAM, QUIFOY, QUIMEN, cast_from_entity_to_role, split_by_roles, sum_by_entity
 
 
 CHEF = QUIFAM['chef']
@@ -140,9 +140,9 @@ def _tot_impot(self, irpp, isf_avant_plaf, crds_holder, csg_holder, prelsoc_cap_
     Total des impôts dus au titre des revenus et produits (irpp, cehr, pl, prélèvements sociaux) + ISF
     Utilisé pour calculer le montant du plafonnement de l'ISF
     '''
-    crds = self.split_by_roles(crds_holder, roles = [VOUS, CONJ])
-    csg = self.split_by_roles(csg_holder, roles = [VOUS, CONJ])
-    prelsoc_cap = self.split_by_roles(prelsoc_cap_holder, roles = [VOUS, CONJ])
+    crds = split_by_roles(self, crds_holder, roles = [VOUS, CONJ])
+    csg = split_by_roles(self, csg_holder, roles = [VOUS, CONJ])
+    prelsoc_cap = split_by_roles(self, prelsoc_cap_holder, roles = [VOUS, CONJ])
 
     return -irpp + isf_avant_plaf - (crds[VOUS] + crds[CONJ]) - (csg[VOUS] + csg[CONJ]) - (prelsoc_cap[VOUS] + prelsoc_cap[CONJ])
 
@@ -158,13 +158,13 @@ def _revetproduits(self, salcho_imp_holder, pen_net_holder, rto_net_holder, rev_
     Utilisé pour calculer le montant du plafonnement de l'ISF
     Cf. http://www.impots.gouv.fr/portal/deploiement/p1/fichedescriptiveformulaire_8342/fichedescriptiveformulaire_8342.pdf
     '''
-    pen_net = self.sum_by_entity(pen_net_holder)
-    rag = self.sum_by_entity(rag_holder)
-    ric = self.sum_by_entity(ric_holder)
-    rpns_exon = self.sum_by_entity(rpns_exon_holder)
-    rpns_pvct = self.sum_by_entity(rpns_pvct_holder)
-    rto_net = self.sum_by_entity(rto_net_holder)
-    salcho_imp = self.sum_by_entity(salcho_imp_holder)
+    pen_net = sum_by_entity(self, pen_net_holder)
+    rag = sum_by_entity(self, rag_holder)
+    ric = sum_by_entity(self, ric_holder)
+    rpns_exon = sum_by_entity(self, rpns_exon_holder)
+    rpns_pvct = sum_by_entity(self, rpns_pvct_holder)
+    rto_net = sum_by_entity(self, rto_net_holder)
+    salcho_imp = sum_by_entity(self, salcho_imp_holder)
 
     # rev_cap et imp_lib pour produits soumis à prel libératoire- check TODO:
     # # def rev_exon et rev_etranger dans data? ##
@@ -264,7 +264,7 @@ def _maj_cga(self, frag_impo, nrag_impg,
     ntimp = nrag_impg + nbic_timp + nacc_timp + nbnc_timp
 
     maj_cga = max_(0, P.cga_taux2 * (ntimp + frag_impo))
-    return self.sum_by_entity(maj_cga)
+    return sum_by_entity(self, maj_cga)
 
 
 def _bouclier_rev(rbg, maj_cga, csg_deduc, rvcm_plus_abat, rev_cap_lib, rev_exo, rev_or, cd_penali, cd_eparet):
@@ -312,17 +312,17 @@ def _bouclier_rev(rbg, maj_cga, csg_deduc, rvcm_plus_abat, rev_cap_lib, rev_exo,
 def _bouclier_imp_gen (self, irpp, tax_hab_holder, tax_fonc, isf_tot, cotsoc_lib_holder, cotsoc_bar_holder,
         csgsald_holder, csgsali_holder, crdssal_holder, csgchoi_holder, csgchod_holder, csgrstd_holder,
         csgrsti_holder, imp_lib):  # # ajouter CSG- CRDS
-    cotsoc_bar = self.sum_by_entity(cotsoc_bar_holder)
-    cotsoc_lib = self.sum_by_entity(cotsoc_lib_holder)
-    crdssal = self.sum_by_entity(crdssal_holder)
-    csgchod = self.sum_by_entity(csgchod_holder)
-    csgchoi = self.sum_by_entity(csgchoi_holder)
-    csgsald = self.sum_by_entity(csgsald_holder)
-    csgsali = self.sum_by_entity(csgsali_holder)
-    csgrstd = self.sum_by_entity(csgrstd_holder)
-    csgrsti = self.sum_by_entity(csgrsti_holder)
-    tax_hab = self.cast_from_entity_to_role(tax_hab_holder, role = PREF)
-    tax_hab = self.sum_by_entity(tax_hab)
+    cotsoc_bar = sum_by_entity(self, cotsoc_bar_holder)
+    cotsoc_lib = sum_by_entity(self, cotsoc_lib_holder)
+    crdssal = sum_by_entity(self, crdssal_holder)
+    csgchod = sum_by_entity(self, csgchod_holder)
+    csgchoi = sum_by_entity(self, csgchoi_holder)
+    csgsald = sum_by_entity(self, csgsald_holder)
+    csgsali = sum_by_entity(self, csgsali_holder)
+    csgrstd = sum_by_entity(self, csgrstd_holder)
+    csgrsti = sum_by_entity(self, csgrsti_holder)
+    tax_hab = cast_from_entity_to_role(self, tax_hab_holder, role = PREF)
+    tax_hab = sum_by_entity(self, tax_hab)
 
     # # ajouter Prelèvements sources/ libé
     # # ajouter crds rstd
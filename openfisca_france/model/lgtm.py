@@ -12,11 +12,22 @@ import csv
 import json
 import pkg_resources
 
-from numpy import ceil, floor, fromiter, int16, logical_not as not_, maximum as max_, minimum as min_, round
+from numpy import (array, asarray, ceil, concatenate, cumsum, diff, floor, int8, int16, load, logical_not as not_,
+    maximum as max_, minimum as min_, round, searchsorted, where)
 from openfisca_core.accessors import law
 
 import openfisca_france
-from .base import QUIFAM, QUIMEN, QUIFOY
+from .base import (
+    QUIFAM,
+    QUIMEN,
+    QUIFOY,
+    cast_from_entity_to_role,
+    cast_from_entity_to_roles,
+    filter_role,
+    get_role_matrix,
+    split_by_roles,
+    sum_by_entity,
+    )
 from .pfam import nb_enf
 
 
@@ -26,7 +37,9 @@ PART = QUIFAM['part']
 VOUS = QUIFOY['vous']
 
 
-zone_apl_by_depcom = None
+ZONE_APL_ASSET = 'assets/apl/zone_apl_by_depcom.npz'
+zone_apl_depcoms = None  # Sorted depcom codes of communes and subcommunes
+zone_apl_zones = None  # APL zone of each depcom of zone_apl_depcoms
 
 
 def _al_pac(self, age_holder, smic55_holder, nbR_holder, af = law.fam.af, cf = law.fam.cf,
@@ -52,13 +65,13 @@ def _al_pac(self, age_holder, smic55_holder, nbR_holder, af = law.fam.af, cf = l
     grand-parents, enfants, petits enfants, frères, soeurs, oncles,
     tantes, neveux, nièces).
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     # P_AL.D_enfch est une dummy qui vaut 1 si les enfants sont comptés à
     # charge (cas actuel) et zéro sinon.
-    nbR = self.cast_from_entity_to_role(nbR_holder, role = VOUS)
-    al_nbinv = self.sum_by_entity(nbR)
+    nbR = cast_from_entity_to_role(self, nbR_holder, role = VOUS)
+    al_nbinv = sum_by_entity(self, nbR)
 
     age1 = af.age1
     age2 = cf.age2
@@ -83,10 +96,10 @@ def _br_al(self, etu_holder, boursier_holder, br_pf_i_holder, rev_coll_holder, b
     # ALabat : abatement prix en compte pour le calcul de la base ressources
     # des allocattions logement
     # plancher de ressources pour les etudiants
-    boursier = self.split_by_roles(boursier_holder, roles = [CHEF, PART])
-    br_pf_i = self.split_by_roles(br_pf_i_holder, roles = [CHEF, PART])
-    etu = self.split_by_roles(etu_holder, roles = [CHEF, PART])
-    rev_coll = self.sum_by_entity(rev_coll_holder)
+    boursier = split_by_roles(self, boursier_holder, roles = [CHEF, PART])
+    br_pf_i = split_by_roles(self, br_pf_i_holder, roles = [CHEF, PART])
+    etu = split_by_roles(self, etu_holder, roles = [CHEF, PART])
+    rev_coll = sum_by_entity(self, rev_coll_holder)
 
     etuC = (etu[CHEF]) & (not_(etu[PART]))
     etuP = not_(etu[CHEF]) & (etu[PART])
@@ -132,6 +145,70 @@ def _br_al(self, etu_holder, boursier_holder, br_pf_i_holder, rev_coll_holder, b
     return br_al
 
 
+def calculate_baremes_al(al, bmaf, isol, concub, al_pac, coloc, zone_apl):
+    '''
+    Barèmes des aides au logement en secteur locatif, évalués par type de ménage (voir get_type_menage_al)
+    Renvoie le loyer plafond L2, le forfait de charges C, les plafonds de ressources R1 et R2, le taux de famille TF
+    et le loyer de référence L_Ref.
+    '''
+    # Les barèmes sont indexés par la zone (0 hors zone) et par le type de ménage.
+    type_menage = get_type_menage_al(isol, concub, al_pac)
+    zone = where((zone_apl >= 1) & (zone_apl <= 3), zone_apl, 0)
+    pac_sup1 = max_(al_pac - 1, 0)
+    pac_sup2 = max_(al_pac - 2, 0)
+
+    # loyer plafond
+    lp_taux = (not_(coloc)) * 1 + coloc * al.loyers_plafond.colocation
+    zones_loyers_plafond = [None, al.loyers_plafond.zone1, al.loyers_plafond.zone2, al.loyers_plafond.zone3]
+    loyers_plafond = array([[0] * 7] + [
+        [0, z.L1, z.L2, z.L3, z.L3, z.L3, z.L3]
+        for z in zones_loyers_plafond[1:]
+        ])
+    loyers_plafond_supplement = array([0] + [z.L4 for z in zones_loyers_plafond[1:]])
+    L2 = (loyers_plafond[zone, type_menage] + loyers_plafond_supplement[zone] * pac_sup1) * lp_taux
+
+    # forfait de charges
+    P_fc = al.forfait_charges
+    C = where(coloc, isol * 0.5 + concub, 1) * P_fc.fc1 + al_pac * P_fc.fc2
+
+    # Plafond RO
+    R1 = al.rmi * (array([0, al.R1.taux1, al.R1.taux2, al.R1.taux3, al.R1.taux4, al.R1.taux4, al.R1.taux4])[
+        type_menage] + al.R1.taux5 * pac_sup2)
+    R2 = bmaf * (array([0, 0, 0, 0, al.R2.taux4, al.R2.taux4, al.R2.taux4])[type_menage] + al.R2.taux5 * pac_sup2)
+
+    # Taux de famille
+    TF = array([0, al.TF.taux1, al.TF.taux2, al.TF.taux3, al.TF.taux4, al.TF.taux5, al.TF.taux6])[type_menage] + \
+        al.TF.taux7 * max_(al_pac - 4, 0)
+
+    # Loyer de référence
+    L_Ref = loyers_plafond[2, type_menage] + loyers_plafond_supplement[2] * pac_sup1
+
+    return L2, C, R1, R2, TF, L_Ref
+
+
+def calculate_taux_loyer_al(TL, RL):
+    '''
+    Taux complémentaire des aides au logement, selon le rapport RL du loyer retenu au loyer de référence
+    C'est un barème marginal de RL, dont les seuils (00-45-75%) ne figurent que dans la description des paramètres.
+    '''
+    seuils = array([0, 0.45, 0.75])
+    taux = array([TL.taux1, TL.taux2, TL.taux3])
+    cumuls = concatenate(([0], cumsum(taux[:-1] * diff(seuils))))
+    tranche = max_(searchsorted(seuils, RL, side = 'right') - 1, 0)
+    return cumuls[tranche] + taux[tranche] * (RL - seuils[tranche])
+
+
+def get_type_menage_al(isol, concub, al_pac):
+    '''
+    Type de ménage des barèmes des aides au logement
+    0 : ni isolé ni en couple, sans personne à charge
+    1 : isolé sans personne à charge
+    2 : couple sans personne à charge
+    3 à 6 : 1, 2, 3, 4 personnes à charge ou plus
+    '''
+    return where(al_pac > 0, 2 + min_(al_pac, 4), 1 * isol + 2 * concub).astype(int)
+
+
 def _al(self, concub, br_al, so_holder, loyer_holder, coloc_holder, isol, al_pac, zone_apl_holder, nat_imp_holder,
         al = law.al,
         charge_loyer = law.ir.autre.charge_loyer,
@@ -142,16 +219,16 @@ def _al(self, concub, br_al, so_holder, loyer_holder, coloc_holder, isol, al_pac
     'fam'
     '''
     # variable ménage à redistribuer
-    so = self.cast_from_entity_to_roles(so_holder)
-    so = self.filter_role(so, role = CHEF)
-    loyer = self.cast_from_entity_to_roles(loyer_holder)
-    loyer = self.filter_role(loyer, role = CHEF)
-    zone_apl = self.cast_from_entity_to_roles(zone_apl_holder)
-    zone_apl = self.filter_role(zone_apl, role = CHEF)
+    so = cast_from_entity_to_roles(self, so_holder)
+    so = filter_role(self, so, role = CHEF)
+    loyer = cast_from_entity_to_roles(self, loyer_holder)
+    loyer = filter_role(self, loyer, role = CHEF)
+    zone_apl = cast_from_entity_to_roles(self, zone_apl_holder)
+    zone_apl = filter_role(self, zone_apl, role = CHEF)
     # Variables individuelles
     coloc = self.any_by_roles(coloc_holder)
     # Variables du foyer fiscal
-    nat_imp = self.cast_from_entity_to_roles(nat_imp_holder)
+    nat_imp = cast_from_entity_to_roles(self, nat_imp_holder)
     nat_imp = self.any_by_roles(nat_imp)
 
     # ne prend pas en compte les chambres ni les logements-foyers.
@@ -173,32 +250,17 @@ def _al(self, concub, br_al, so_holder, loyer_holder, coloc_holder, isol, al_pac
 
     loca = (3 <= so) & (5 >= so)
     acce = so == 1
-    rmi = al.rmi
     bmaf = fam.af.bmaf_n_2
 
     # # aides au logement pour les locataires
     # loyer mensuel;
     L1 = loyer
-    # loyer plafond;
-    lp_taux = (not_(coloc)) * 1 + coloc * al.loyers_plafond.colocation
-
-    z1 = al.loyers_plafond.zone1
-    z2 = al.loyers_plafond.zone2
-    z3 = al.loyers_plafond.zone3
-
-    Lz1 = ((isol) * (al_pac == 0) * z1.L1 + (concub) * (al_pac == 0) * z1.L2 + (al_pac > 0) * z1.L3 + (al_pac > 1) * (al_pac - 1) * z1.L4) * lp_taux
-    Lz2 = ((isol) * (al_pac == 0) * z2.L1 + (concub) * (al_pac == 0) * z2.L2 + (al_pac > 0) * z2.L3 + (al_pac > 1) * (al_pac - 1) * z2.L4) * lp_taux
-    Lz3 = ((isol) * (al_pac == 0) * z3.L1 + (concub) * (al_pac == 0) * z3.L2 + (al_pac > 0) * z3.L3 + (al_pac > 1) * (al_pac - 1) * z3.L4) * lp_taux
+    # loyer plafond, forfait de charges, plafonds de ressources, taux de famille et loyer de référence
+    L2, C, R1, R2, TF, L_Ref = calculate_baremes_al(al, bmaf, isol, concub, al_pac, coloc, zone_apl)
 
-    L2 = Lz1 * (zone_apl == 1) + Lz2 * (zone_apl == 2) + Lz3 * (zone_apl == 3)
     # loyer retenu
     L = min_(L1, L2)
 
-    # forfait de charges
-    P_fc = al.forfait_charges
-    C = not_(coloc) * (P_fc.fc1 + al_pac * P_fc.fc2) + \
-          (coloc) * ((isol * 0.5 + concub) * P_fc.fc1 + al_pac * P_fc.fc2)
-
     # dépense éligible
     E = L + C
 
@@ -206,15 +268,6 @@ def _al(self, concub, br_al, so_holder, loyer_holder, coloc_holder, isol, al_pac
     R = br_al
 
     # Plafond RO
-    R1 = al.R1.taux1 * rmi * (isol) * (al_pac == 0) + \
-         al.R1.taux2 * rmi * (concub) * (al_pac == 0) + \
-         al.R1.taux3 * rmi * (al_pac == 1) + \
-         al.R1.taux4 * rmi * (al_pac >= 2) + \
-         al.R1.taux5 * rmi * (al_pac > 2) * (al_pac - 2)
-
-    R2 = al.R2.taux4 * bmaf * (al_pac >= 2) + \
-         al.R2.taux5 * bmaf * (al_pac > 2) * (al_pac - 2)
-
     Ro = round(12 * (R1 - R2) * (1 - al.autres.abat_sal));
 
     Rp = max_(0, R - Ro);
@@ -222,25 +275,9 @@ def _al(self, concub, br_al, so_holder, loyer_holder, coloc_holder, isol, al_pac
     # Participation personnelle
     Po = max_(al.pp.taux * E, al.pp.min);
 
-    # Taux de famille
-    TF = al.TF.taux1 * (isol) * (al_pac == 0) + \
-         al.TF.taux2 * (concub) * (al_pac == 0) + \
-         al.TF.taux3 * (al_pac == 1) + \
-         al.TF.taux4 * (al_pac == 2) + \
-         al.TF.taux5 * (al_pac == 3) + \
-         al.TF.taux6 * (al_pac >= 4) + \
-         al.TF.taux7 * (al_pac > 4) * (al_pac - 4)
-
-    # Loyer de référence
-    L_Ref = z2.L1 * (isol) * (al_pac == 0) + \
-            z2.L2 * (concub) * (al_pac == 0) + \
-            z2.L3 * (al_pac >= 1) + \
-            z2.L4 * (al_pac > 1) * (al_pac - 1)
-
     RL = L / L_Ref
 
-    # TODO: paramètres en dur ??
-    TL = max_(max_(0, al.TL.taux2 * (RL - 0.45)), al.TL.taux3 * (RL - 0.75) + al.TL.taux2 * (0.75 - 0.45))
+    TL = calculate_taux_loyer_al(al.TL, RL)
 
     Tp = TF + TL
 
@@ -259,14 +296,15 @@ def _al(self, concub, br_al, so_holder, loyer_holder, coloc_holder, isol, al_pac
 
     return al
 
+
 def _alf(self, al, al_pac, so_holder, proprietaire_proche_famille):
     '''
     Allocation logement familiale
     '''
     # TODO: également pour les jeunes ménages et femmes enceintes
     # variable ménage à redistribuer
-    so = self.cast_from_entity_to_roles(so_holder)
-    so = self.filter_role(so, role = CHEF)
+    so = cast_from_entity_to_roles(self, so_holder)
+    so = filter_role(self, so, role = CHEF)
 
     return (al_pac >= 1) * (so != 3) * not_(proprietaire_proche_famille) * al
 
@@ -276,10 +314,10 @@ def _als_nonet(self, al, al_pac, etu_holder, so_holder, proprietaire_proche_fami
     Allocation logement sociale (non étudiante)
     '''
     # variable ménage à redistribuer
-    so = self.cast_from_entity_to_roles(so_holder)
-    so = self.filter_role(so, role = CHEF)
+    so = cast_from_entity_to_roles(self, so_holder)
+    so = filter_role(self, so, role = CHEF)
 
-    etu = self.split_by_roles(etu_holder, roles = [CHEF, PART])
+    etu = split_by_roles(self, etu_holder, roles = [CHEF, PART])
     return (al_pac == 0) * (so != 3) * not_(proprietaire_proche_famille) * not_(etu[CHEF] | etu[PART]) * al
 
 
@@ -288,10 +326,10 @@ def _alset(self, al, al_pac, etu_holder, so_holder, proprietaire_proche_famille)
     Allocation logement sociale étudiante
     '''
     # variable ménage à redistribuer
-    so = self.cast_from_entity_to_roles(so_holder)
-    so = self.filter_role(so, role = CHEF)
+    so = cast_from_entity_to_roles(self, so_holder)
+    so = filter_role(self, so, role = CHEF)
 
-    etu = self.split_by_roles(etu_holder, roles = [CHEF, PART])
+    etu = split_by_roles(self, etu_holder, roles = [CHEF, PART])
     return (al_pac == 0) * (so != 3) * not_(proprietaire_proche_famille) * (etu[CHEF] | etu[PART]) * al
 
 
@@ -309,8 +347,8 @@ def _apl(self, al, so_holder):
     '''
     # TODO:
     # variable ménage à redistribuer
-    so = self.cast_from_entity_to_roles(so_holder)
-    so = self.filter_role(so, role = CHEF)
+    so = cast_from_entity_to_roles(self, so_holder)
+    so = filter_role(self, so, role = CHEF)
     return al * (so == 3)
 
 
@@ -323,32 +361,47 @@ def _crds_lgtm(al, crds = law.fam.af.crds):
 
 def _zone_apl(depcom):
     """Retrouve la zone APL (aide personnalisée au logement) de la commune en fonction du depcom (code INSEE)."""
-    global zone_apl_by_depcom
-    if zone_apl_by_depcom is None:
-        with pkg_resources.resource_stream(
-                openfisca_france.__name__,
-                'assets/apl/20110914_zonage.csv',
-                ) as csv_file:
-            csv_reader = csv.DictReader(csv_file)
-            zone_apl_by_depcom = {
-                # Keep only first char of Zonage column because of 1bis value considered equivalent to 1.
-                row['CODGEO']: int(row['Zonage'][0])
-                for row in csv_reader
-                }
-        # Add subcommunes (arrondissements and communes associées), use the same value as their parent commune.
-        with pkg_resources.resource_stream(
-                openfisca_france.__name__,
-                'assets/apl/commune_depcom_by_subcommune_depcom.json',
-                ) as json_file:
-            commune_depcom_by_subcommune_depcom = json.load(json_file)
-            for subcommune_depcom, commune_depcom in commune_depcom_by_subcommune_depcom.iteritems():
-                zone_apl_by_depcom[subcommune_depcom] = zone_apl_by_depcom[commune_depcom]
-
+    depcoms, zones = load_zone_apl_arrays()
     default_value = 2
-    return fromiter(
-        (
-            zone_apl_by_depcom.get(depcom_cell, default_value)
-            for depcom_cell in depcom
-            ),
-        dtype = int16,
-        )
+    depcom = asarray(depcom, dtype = depcoms.dtype)
+    index = min_(searchsorted(depcoms, depcom), len(depcoms) - 1)
+    return where(depcoms[index] == depcom, zones[index], default_value).astype(int16)
+
+
+def build_zone_apl_arrays():
+    """Lit le zonage APL des communes et de leurs sous-communes et renvoie les depcom triés avec leur zone."""
+    with pkg_resources.resource_stream(
+            openfisca_france.__name__,
+            'assets/apl/20110914_zonage.csv',
+            ) as csv_file:
+        csv_reader = csv.DictReader(csv_file)
+        zone_apl_by_depcom = {
+            # Keep only first char of Zonage column because of 1bis value considered equivalent to 1.
+            row['CODGEO']: int(row['Zonage'][0])
+            for row in csv_reader
+            }
+    # Add subcommunes (arrondissements and communes associées), use the same value as their parent commune.
+    with pkg_resources.resource_stream(
+            openfisca_france.__name__,
+            'assets/apl/commune_depcom_by_subcommune_depcom.json',
+            ) as json_file:
+        commune_depcom_by_subcommune_depcom = json.load(json_file)
+        for subcommune_depcom, commune_depcom in commune_depcom_by_subcommune_depcom.iteritems():
+            zone_apl_by_depcom[subcommune_depcom] = zone_apl_by_depcom[commune_depcom]
+
+    depcoms = array(sorted(str(depcom) for depcom in zone_apl_by_depcom), dtype = 'S5')
+    zones = array([zone_apl_by_depcom[depcom] for depcom in depcoms], dtype = int8)
+    return depcoms, zones
+
+
+def load_zone_apl_arrays():
+    """Charge (une seule fois) les depcom triés et leur zone APL, depuis leur version binaire quand elle existe."""
+    global zone_apl_depcoms, zone_apl_zones
+    if zone_apl_depcoms is None:
+        if pkg_resources.resource_exists(openfisca_france.__name__, ZONE_APL_ASSET):
+            with pkg_resources.resource_stream(openfisca_france.__name__, ZONE_APL_ASSET) as npz_file:
+                npz = load(npz_file)
+                zone_apl_depcoms, zone_apl_zones = npz['depcoms'], npz['zones']
+        else:
+            zone_apl_depcoms, zone_apl_zones = build_zone_apl_arrays()
+    return zone_apl_depcoms, zone_apl_zones
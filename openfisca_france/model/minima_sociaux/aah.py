@@ -27,7 +27,7 @@ from __future__ import division
 from numpy import (maximum as max_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, split_by_roles
 
 CHEF = QUIFAM['chef']
 PART = QUIFAM['part']
@@ -85,10 +85,10 @@ def _aah(self, br_pf_i_holder, br_aah, inv_holder, age_holder, smic55_holder, co
     Notez, dans certaines situations, la Caf évalue forfaitairement vos
     ressources à partir de votre revenu mensuel.
     '''
-    age = self.split_by_roles(age_holder, roles = [CHEF, PART])
-    br_pf_i = self.split_by_roles(br_pf_i_holder, roles = [CHEF, PART])
-    inv = self.split_by_roles(inv_holder, roles = [CHEF, PART])
-    smic55 = self.split_by_roles(smic55_holder, roles = [CHEF, PART])
+    age = split_by_roles(self, age_holder, roles = [CHEF, PART])
+    br_pf_i = split_by_roles(self, br_pf_i_holder, roles = [CHEF, PART])
+    inv = split_by_roles(self, inv_holder, roles = [CHEF, PART])
+    smic55 = split_by_roles(self, smic55_holder, roles = [CHEF, PART])
 
 #    TODO éligibilité AAH, notamment avoir le % d'incapacité ?
 
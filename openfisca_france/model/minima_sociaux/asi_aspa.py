@@ -27,7 +27,7 @@ from __future__ import division
 from numpy import (maximum as max_, logical_not as not_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, cast_from_entity_to_role, split_by_roles
 
 CHEF = QUIFAM['chef']
 PART = QUIFAM['part']
@@ -44,8 +44,8 @@ def _br_mv_i(self, sali, choi, rsti, alr, rto, rpns, rev_cap_bar_holder, rev_cap
     Base ressource individuelle du minimum vieillesse et assimilés (ASPA)
     'ind'
     '''
-    rev_cap_bar = self.cast_from_entity_to_role(rev_cap_bar_holder, role = VOUS)
-    rev_cap_lib = self.cast_from_entity_to_role(rev_cap_lib_holder, role = VOUS)
+    rev_cap_bar = cast_from_entity_to_role(self, rev_cap_bar_holder, role = VOUS)
+    rev_cap_lib = cast_from_entity_to_role(self, rev_cap_lib_holder, role = VOUS)
 
     out = (sali + choi + rsti + alr + rto + rpns +
            max_(0, rev_cap_bar) + max_(0, rev_cap_lib) + max_(0, rfon_ms) + max_(0, div_ms)
@@ -72,7 +72,7 @@ def _br_mv(self, br_mv_i_holder):
     des pensions attachées aux distinctions honorifiques,
     de l'aide apportée ou susceptible d'être apportée par les personnes tenues à l'obligation alimentaire.
     '''
-    br_mv_i = self.split_by_roles(br_mv_i_holder, roles = [CHEF, PART])
+    br_mv_i = split_by_roles(self, br_mv_i_holder, roles = [CHEF, PART])
     return br_mv_i[CHEF] + br_mv_i[PART]
 
 
@@ -147,8 +147,8 @@ def _asi_aspa_nb_alloc(self, aspa_elig_holder, asi_elig_holder):
     '''
     Nombre d'allocataire à l'ASI
     '''
-    asi_elig = self.split_by_roles(asi_elig_holder, roles = [CHEF, PART])
-    aspa_elig = self.split_by_roles(aspa_elig_holder, roles = [CHEF, PART])
+    asi_elig = split_by_roles(self, asi_elig_holder, roles = [CHEF, PART])
+    aspa_elig = split_by_roles(self, aspa_elig_holder, roles = [CHEF, PART])
 
     return (1 * aspa_elig[CHEF] + 1 * aspa_elig[PART] + 1 * asi_elig[CHEF] + 1 * asi_elig[PART])
 
@@ -173,8 +173,8 @@ def _aspa(self, asi_elig_holder, aspa_elig_holder, maries, concub, asi_aspa_nb_a
     # TODO: Avant la réforme de 2007 n'était pas considéré comme un couple les individus en concubinage ou pacsés.
     # La base de ressources doit pouvoir être individualisée pour refletter ça.
 
-    asi_elig = self.split_by_roles(asi_elig_holder, roles = [CHEF, PART])
-    aspa_elig = self.split_by_roles(aspa_elig_holder, roles = [CHEF, PART])
+    asi_elig = split_by_roles(self, asi_elig_holder, roles = [CHEF, PART])
+    aspa_elig = split_by_roles(self, aspa_elig_holder, roles = [CHEF, PART])
 
     # Un seul éligible
     elig1 = ((asi_aspa_nb_alloc == 1) & (aspa_elig[CHEF] | aspa_elig[PART]))
@@ -222,8 +222,8 @@ def _asi(self, asi_elig_holder, aspa_elig_holder, maries, concub, asi_aspa_nb_al
     '''
     Calcule l'allocation supplémentaire d'invalidité (ASI)
     '''
-    asi_elig = self.split_by_roles(asi_elig_holder, roles = [CHEF, PART])
-    aspa_elig = self.split_by_roles(aspa_elig_holder, roles = [CHEF, PART])
+    asi_elig = split_by_roles(self, asi_elig_holder, roles = [CHEF, PART])
+    aspa_elig = split_by_roles(self, aspa_elig_holder, roles = [CHEF, PART])
 
     # Un seul éligible
     elig1 = ((asi_aspa_nb_alloc == 1) & (asi_elig[CHEF] | asi_elig[PART]))
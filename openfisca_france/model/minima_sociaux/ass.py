@@ -27,7 +27,7 @@ from __future__ import division
 from numpy import (maximum as max_, logical_not as not_, logical_or as or_, logical_and as and_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, split_by_roles
 
 CHEF = QUIFAM['chef']
 PART = QUIFAM['part']
@@ -79,7 +79,7 @@ def _ass(self, br_pf, ass_elig_i_holder, concub, ass_params = law.minim.ass):
         ou âgés de 57 ans et demi ou plus et justifiant de 10 ans d'activité salariée,
         ou justifiant d'au moins 160 trimestres de cotisation retraite.
     '''
-    ass_elig_i = self.split_by_roles(ass_elig_i_holder, roles = [CHEF, PART])
+    ass_elig_i = split_by_roles(self, ass_elig_i_holder, roles = [CHEF, PART])
 
     majo = 0
     cond_act_prec_suff = True # Transformer en variable d'entrée
@@ -27,7 +27,15 @@ from __future__ import division
 from numpy import (floor, maximum as max_, logical_not as not_, logical_and as and_, logical_or as or_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import (
+    QUIFAM,
+    QUIFOY,
+    cast_from_entity_to_role,
+    cast_from_entity_to_roles,
+    get_role_matrix,
+    split_by_roles,
+    sum_by_entity,
+    )
 from ..pfam import nb_enf, age_en_mois_benjamin
 
 CHEF = QUIFAM['chef']
@@ -38,8 +46,8 @@ CONJ = QUIFOY['conj']
 
 
 def _enceinte_fam(self, agem_holder, enceinte_holder):
-    agem_enf = self.split_by_roles(agem_holder, roles = ENFS)
-    enceinte = self.split_by_roles(enceinte_holder, roles = [CHEF, PART])
+    agem_enf = get_role_matrix(self, agem_holder, roles = ENFS)
+    enceinte = split_by_roles(self, enceinte_holder, roles = [CHEF, PART])
 
     benjamin = age_en_mois_benjamin(agem_enf)
     enceinte_compat = and_(benjamin < 0, benjamin > -6)
@@ -47,11 +55,11 @@ def _enceinte_fam(self, agem_holder, enceinte_holder):
 
 
 def _div_ms(self, f3vc_holder, f3ve_holder, f3vg_holder, f3vl_holder, f3vm_holder):
-    f3vc = self.cast_from_entity_to_role(f3vc_holder, role = VOUS)
-    f3ve = self.cast_from_entity_to_role(f3ve_holder, role = VOUS)
-    f3vg = self.cast_from_entity_to_role(f3vg_holder, role = VOUS)
-    f3vl = self.cast_from_entity_to_role(f3vl_holder, role = VOUS)
-    f3vm = self.cast_from_entity_to_role(f3vm_holder, role = VOUS)
+    f3vc = cast_from_entity_to_role(self, f3vc_holder, role = VOUS)
+    f3ve = cast_from_entity_to_role(self, f3ve_holder, role = VOUS)
+    f3vg = cast_from_entity_to_role(self, f3vg_holder, role = VOUS)
+    f3vl = cast_from_entity_to_role(self, f3vl_holder, role = VOUS)
+    f3vm = cast_from_entity_to_role(self, f3vm_holder, role = VOUS)
 
     return f3vc + f3ve + f3vg + f3vl + f3vm
 
@@ -61,8 +69,8 @@ def _rfon_ms(self, f4ba_holder, f4be_holder):
     Revenus fonciers pour la base ressource du rmi/rsa
     'ind'
     '''
-    f4ba = self.cast_from_entity_to_role(f4ba_holder, role = VOUS)
-    f4be = self.cast_from_entity_to_role(f4be_holder, role = VOUS)
+    f4ba = cast_from_entity_to_role(self, f4ba_holder, role = VOUS)
+    f4be = cast_from_entity_to_role(self, f4be_holder, role = VOUS)
 
     return f4ba + f4be
 
@@ -90,7 +98,7 @@ def _br_rmi_pf__2003(self, af_base, cf, asf, apje, ape, P = law.minim):
     TO DO: Add mva (majoration vie autonome),
     """
     out = P.rmi.pfInBRrmi * (af_base + cf + asf + apje + ape)
-    return self.cast_from_entity_to_role(out, entity = 'famille', role = CHEF)
+    return cast_from_entity_to_role(self, out, entity = 'famille', role = CHEF)
 
 
 def _br_rmi_pf_2004_2014(self, af_base, cf, asf, paje_base, paje_clca, paje_colca, P = law.minim):
@@ -101,7 +109,7 @@ def _br_rmi_pf_2004_2014(self, af_base, cf, asf, paje_base, paje_clca, paje_colc
 
     out = P.rmi.pfInBRrmi * (af_base + cf + asf + paje_base + paje_clca + paje_colca)
 
-    return self.cast_from_entity_to_role(out, entity = 'famille', role = CHEF)
+    return cast_from_entity_to_role(self, out, entity = 'famille', role = CHEF)
 
 
 def _br_rmi_pf_2014_(self, af_base, cf, rsa_forfait_asf, paje_base, paje_clca, paje_colca, P = law.minim):
@@ -112,7 +120,7 @@ def _br_rmi_pf_2014_(self, af_base, cf, rsa_forfait_asf, paje_base, paje_clca, p
 
     out = P.rmi.pfInBRrmi * (af_base + cf + rsa_forfait_asf + paje_base + paje_clca + paje_colca)
 
-    return self.cast_from_entity_to_role(out, entity = 'famille', role = CHEF)
+    return cast_from_entity_to_role(self, out, entity = 'famille', role = CHEF)
 
 
 def _br_rmi_ms(self, aspa, asi, aah, caah):
@@ -120,7 +128,7 @@ def _br_rmi_ms(self, aspa, asi, aah, caah):
     Minima sociaux inclus dans la base ressource RSA/RMI
     'ind'
     """
-    return self.cast_from_entity_to_role(aspa + asi ,
+    return cast_from_entity_to_role(self, aspa + asi ,
         entity = 'famille', role = CHEF) + aah + caah
 
 
@@ -129,9 +137,9 @@ def _br_rmi_i(self, ass_holder, ra_rsa, cho, rst, alr, rto, rev_cap_bar_holder,
     Base ressource individuelle du RSA/RMI
     'ind'
     '''
-    rev_cap_bar = self.cast_from_entity_to_role(rev_cap_bar_holder, role = VOUS)
-    rev_cap_lib = self.cast_from_entity_to_role(rev_cap_lib_holder, role = VOUS)
-    ass = self.cast_from_entity_to_roles(ass_holder)
+    rev_cap_bar = cast_from_entity_to_role(self, rev_cap_bar_holder, role = VOUS)
+    rev_cap_lib = cast_from_entity_to_role(self, rev_cap_lib_holder, role = VOUS)
+    ass = cast_from_entity_to_roles(self, ass_holder)
 
     return ass + ra_rsa + cho + rst + alr + rto + rev_cap_bar + rev_cap_lib + rfon_ms + div_ms
 
@@ -140,10 +148,11 @@ def _br_rmi(self, br_rmi_pf_holder, br_rmi_ms_holder, br_rmi_i_holder, rsa_base_
     """
     Base ressources du Rmi ou du Rsa
     """
-    br_rmi_i = self.split_by_roles(br_rmi_i_holder, roles = [CHEF, PART])
-    br_rmi_ms = self.split_by_roles(br_rmi_ms_holder, roles = [CHEF, PART])
-    br_rmi_pf = self.split_by_roles(br_rmi_pf_holder, roles = [CHEF, PART])
-    rsa_base_ressources_patrimoine_i = self.split_by_roles(rsa_base_ressources_patrimoine_i_holder, roles = [CHEF, PART])
+    br_rmi_i = split_by_roles(self, br_rmi_i_holder, roles = [CHEF, PART])
+    br_rmi_ms = split_by_roles(self, br_rmi_ms_holder, roles = [CHEF, PART])
+    br_rmi_pf = split_by_roles(self, br_rmi_pf_holder, roles = [CHEF, PART])
+    rsa_base_ressources_patrimoine_i = split_by_roles(self, rsa_base_ressources_patrimoine_i_holder,
+        roles = [CHEF, PART])
     br_rmi = (br_rmi_i[CHEF] + br_rmi_pf[CHEF] + br_rmi_ms[CHEF] + rsa_base_ressources_patrimoine_i[CHEF] +
               br_rmi_i[PART] + br_rmi_pf[PART] + br_rmi_ms[PART] + rsa_base_ressources_patrimoine_i[PART])
     return br_rmi
@@ -170,8 +179,8 @@ def _rmi_nbp(self, age_holder, smic55_holder, nb_par , P = law.minim.rmi):
     Nombre de personne à charge au sens du Rmi ou du Rsa
     'fam'
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     # TODO: file a issue to check if D_enfch in rsa should be removed
     return nb_par + nb_enf(age, smic55, 0, P.age_pac - 1)  # TODO: check limite d'âge in legislation
@@ -216,9 +225,9 @@ def _rsa_act_i(self, rsa_act_holder, concub_holder, maries_holder, quifam, idfam
 
     Note: le partage en moitié est un point de législation, pas un choix arbitraire.
     '''
-    concub = self.cast_from_entity_to_roles(concub_holder)
-    maries = self.cast_from_entity_to_roles(maries_holder)
-    rsa_act = self.cast_from_entity_to_roles(rsa_act_holder)
+    concub = cast_from_entity_to_roles(self, concub_holder)
+    maries = cast_from_entity_to_roles(self, maries_holder)
+    rsa_act = cast_from_entity_to_roles(self, rsa_act_holder)
 
     conj = or_(concub, maries)
     rsa_act_i = 0 * quifam
@@ -234,10 +243,10 @@ def _rsa_socle(self, age_holder, smic55_holder, activite_holder, nb_par, rmi = l
     Rsa socle / Rmi
     'fam'
     '''
-    age_par = self.split_by_roles(age_holder, roles = [CHEF, PART])
-    activite_par = self.split_by_roles(activite_holder, roles = [CHEF, PART])
-    age_enf = self.split_by_roles(age_holder, roles = ENFS)
-    smic55_enf = self.split_by_roles(smic55_holder, roles = ENFS)
+    age_par = split_by_roles(self, age_holder, roles = [CHEF, PART])
+    activite_par = split_by_roles(self, activite_holder, roles = [CHEF, PART])
+    age_enf = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55_enf = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     nbp = nb_par + nb_enf(age_enf, smic55_enf, 0, rmi.age_pac)
 
@@ -256,9 +265,9 @@ def _rsa_socle_majore(self, enceinte_fam, age_holder, smic55_holder, nb_par, iso
     Cacule le montant du RSA majoré pour isolement
     'fam'
     '''
-    age_par = self.split_by_roles(age_holder, roles = [CHEF, PART])
-    age_enf = self.split_by_roles(age_holder, roles = ENFS)
-    smic55_enf = self.split_by_roles(smic55_holder, roles = ENFS)
+    age_par = split_by_roles(self, age_holder, roles = [CHEF, PART])
+    age_enf = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55_enf = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     nbenf = nb_enf(age_enf, smic55_enf, 0, rmi.age_pac)
 
@@ -283,7 +292,7 @@ def _rsa(self, rsa_socle, rsa_socle_majore, ra_rsa_holder, rsa_forfait_logement,
     Cacule le montant du RSA
     'fam'
     '''
-    ra_rsa = self.split_by_roles(ra_rsa_holder, roles = [CHEF, PART])
+    ra_rsa = split_by_roles(self, ra_rsa_holder, roles = [CHEF, PART])
 
     # rsa_socle applicable - forfait logement - base ressources + bonification RSA activité
     base = max_(rsa_socle, rsa_socle_majore) - rsa_forfait_logement - br_rmi + P.pente * (ra_rsa[CHEF] + ra_rsa[PART])
@@ -298,9 +307,9 @@ def _api(self, agem_holder, age_holder, smic55_holder, isol, rsa_forfait_logemen
     """
     Allocation de parent isolé
     """
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    agem = self.split_by_roles(agem_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    agem = get_role_matrix(self, agem_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     # TODO:
     #    Majoration pour isolement
@@ -365,7 +374,7 @@ def _psa(self, api, rsa, activite_holder, af_nbenf, al, P = law.minim.rmi):
     ou d’avoir au moins un enfant à charge).
     La Psa, prime exceptionnelle, s’élève à 200 euros par foyer bénéficiaire.
     '''
-    activite = self.split_by_roles(activite_holder, roles = [CHEF, PART])
+    activite = split_by_roles(self, activite_holder, roles = [CHEF, PART])
 
     dummy_api = api > 0
     dummy_rmi = rsa > 0
@@ -394,9 +403,9 @@ def _aefa__2008_(self, age_holder, smic55_holder, af_nbenf, nb_par, ass, aer_hol
 
     Pour bénéficier de la Prime de Noël 2011, vous devez être éligible pour le compte du mois de novembre 2011 ou au plus de décembre 2011, soit d’une allocation de solidarité spécifique (ASS), de la prime forfaitaire mensuelle de reprise d'activité, de l'allocation équivalent retraite (allocataire AER), du revenu de solidarité active (Bénéficiaires RSA), de l'allocation de parent isolé (API), du revenu minimum d'insertion (RMI), de l’Allocation pour la Création ou la Reprise d'Entreprise (ACCRE-ASS) ou encore allocation chômage.
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    aer = self.sum_by_entity(aer_holder)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    aer = sum_by_entity(self, aer_holder)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     dummy_ass = ass > 0
     dummy_aer = aer > 0
@@ -436,9 +445,9 @@ def _aefa_2008(self, age_holder, smic55_holder, af_nbenf, nb_par, ass, aer_holde
 
     Pour bénéficier de la Prime de Noël 2011, vous devez être éligible pour le compte du mois de novembre 2011 ou au plus de décembre 2011, soit d’une allocation de solidarité spécifique (ASS), de la prime forfaitaire mensuelle de reprise d'activité, de l'allocation équivalent retraite (allocataire AER), du revenu de solidarité active (Bénéficiaires RSA), de l'allocation de parent isolé (API), du revenu minimum d'insertion (RMI), de l’Allocation pour la Création ou la Reprise d'Entreprise (ACCRE-ASS) ou encore allocation chômage.
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    aer = self.sum_by_entity(aer_holder)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    aer = sum_by_entity(self, aer_holder)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     dummy_ass = ass > 0
     dummy_aer = aer > 0
@@ -123,6 +123,7 @@ build_select_formula(
     [
         ('sali', inv_rev._salbrut_from_sali),
         # ('salnet', inv_rev._salbrut_from_salnet),
+        # ('salnet', inv_rev._tab_salbrut_from_salnet),  # Table de correspondance, adaptée aux enquêtes
         ('salnet', inv_rev._num_salbrut_from_salnet),
         ],
     FloatCol(
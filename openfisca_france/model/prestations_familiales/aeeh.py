@@ -28,7 +28,7 @@ from __future__ import division
 from numpy import (floor, maximum as max_, logical_not as not_, logical_and as and_, logical_or as or_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, split_by_roles
 
 
 CHEF = QUIFAM['chef']
@@ -50,9 +50,9 @@ def _aeeh_2003_(self, age_holder, inv_holder, isol, categ_inv_holder, P = law.fa
     Une majoration est versée au parent isolé bénéficiaire d'un complément d'Aeeh lorsqu'il cesse ou réduit son activité
     professionnelle ou lorsqu'il embauche une tierce personne rémunérée.
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    categ_inv = self.split_by_roles(categ_inv_holder, roles = ENFS)
-    inv = self.split_by_roles(inv_holder, roles = ENFS)
+    age = split_by_roles(self, age_holder, roles = ENFS)
+    categ_inv = split_by_roles(self, categ_inv_holder, roles = ENFS)
+    inv = split_by_roles(self, inv_holder, roles = ENFS)
 
     aeeh = 0
     for enfant in age.iterkeys():
@@ -92,9 +92,9 @@ def _aeeh__2002(self, age_holder, inv_holder, categ_inv_holder, P = law.fam):
     Une majoration est versée au parent isolé bénéficiaire d'un complément d'Aeeh lorsqu'il cesse ou réduit son activité
     professionnelle ou lorsqu'il embauche une tierce personne rémunérée.
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    categ_inv = self.split_by_roles(categ_inv_holder, roles = ENFS)
-    inv = self.split_by_roles(inv_holder, roles = ENFS)
+    age = split_by_roles(self, age_holder, roles = ENFS)
+    categ_inv = split_by_roles(self, categ_inv_holder, roles = ENFS)
+    inv = split_by_roles(self, inv_holder, roles = ENFS)
 
     aeeh = 0
     for enfant in age.iterkeys():
@@ -28,7 +28,7 @@ from __future__ import division
 from numpy import (round, floor, maximum as max_, logical_not as not_, logical_and as and_, logical_or as or_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, get_role_matrix
 from ..pfam import nb_enf, age_aine
 
 
@@ -44,8 +44,8 @@ def _af_nbenf(self, age_holder, smic55_holder, P = law.fam.af):
     Nombre d'enfants dans la familles au sens des allocations familiales
     'fam'
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     af_nbenf = nb_enf(age, smic55, P.age1, P.age2)
     return af_nbenf
@@ -70,8 +70,8 @@ def _af_majo(self, age_holder, smic55_holder, af_nbenf, P = law.fam.af):
     Allocations familiales - majoration pour âge
     'fam'
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     # TODO: Date d'entrée en vigueur de la nouvelle majoration
     # enfants nés après le "1997-04-30"
@@ -103,8 +103,8 @@ def _af_forf(self, age_holder, af_nbenf, smic55_holder, P = law.fam.af):
     Allocations familiales - forfait
     'fam'
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     bmaf = P.bmaf
     nbenf_forf = nb_enf(age, smic55, P.age3, P.age3)
@@ -28,7 +28,7 @@ from __future__ import division
 from numpy import (floor, maximum as max_, logical_not as not_, logical_and as and_, logical_or as or_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, get_role_matrix
 from ..pfam import nb_enf
 
 
@@ -46,8 +46,8 @@ def _ars(self, age_holder, af_nbenf, smic55_holder, br_pf, P = law.fam):
     # TODO: convention sur la mensualisation
     # On tient compte du fait qu'en cas de léger dépassement du plafond, une allocation dégressive
     # (appelée allocation différentielle), calculée en fonction des revenus, peut être versée.
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     bmaf = P.af.bmaf
     # On doit prendre l'âge en septembre
@@ -28,7 +28,7 @@ from __future__ import division
 from numpy import (floor, maximum as max_, logical_not as not_, logical_and as and_, logical_or as or_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, cast_from_entity_to_role, get_role_matrix, sum_by_entity
 from ..pfam import nb_enf
 
 
@@ -43,11 +43,11 @@ def _asf_elig(self, isol, caseT_holder, caseL_holder, alr_holder):
     '''
     Eligibilité à l'allocation de soutien familial (ASF)
     '''
-    caseT = self.cast_from_entity_to_role(caseT_holder, role = VOUS)
+    caseT = cast_from_entity_to_role(self, caseT_holder, role = VOUS)
     caseT = self.any_by_roles(caseT)
-    caseL = self.cast_from_entity_to_role(caseL_holder, role = VOUS)
+    caseL = cast_from_entity_to_role(self, caseL_holder, role = VOUS)
     caseL = self.any_by_roles(caseL)
-    alr = self.sum_by_entity(alr_holder)
+    alr = sum_by_entity(self, alr_holder)
 
     return isol * (caseT | caseL) * not_(alr > 0)
 
@@ -59,8 +59,8 @@ def _asf_nbenf(self, age_holder, smic55_holder, P = law.fam):
 
     # TODO: Ajouter orphelin recueilli, soustraction à l'obligation d'entretien (et date de celle-ci),
     # action devant le TGI pour complêter l'éligibilité
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     return nb_enf(age, smic55, P.af.age1, P.af.age3)
 
@@ -28,7 +28,7 @@ from __future__ import division
 from numpy import (round, floor, maximum as max_, minimum as min_, logical_not as not_, logical_and as and_, logical_or as or_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, get_role_matrix
 from ..pfam import nb_enf
 
 
@@ -52,8 +52,8 @@ def _cf(self, age_holder, br_pf, isol, biact, smic55_holder, P = law.fam):
     # l'année n-2 pour déterminer l'éligibilité avec le cf_seuil. Il faudrait
     # pouvoir déflater les revenus de l'année courante pour en tenir compte.
     """
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     bmaf = P.af.bmaf
     bmaf2 = P.af.bmaf_n_2
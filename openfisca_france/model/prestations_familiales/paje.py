@@ -28,7 +28,7 @@ from __future__ import division
 from numpy import (round, floor, zeros, maximum as max_, minimum as min_, logical_not as not_, logical_and as and_, logical_or as or_)
 from openfisca_core.accessors import law
 
-from ..base import QUIFAM, QUIFOY
+from ..base import QUIFAM, QUIFOY, get_role_matrix, split_by_roles, sum_by_entity
 from ..pfam import nb_enf, age_en_mois_benjamin
 
 
@@ -55,8 +55,8 @@ def _paje_base(self, age_holder, af_nbenf, br_pf, isol, biact, smic55_holder, P
     # TODO : théorie, il faut comparer les revenus de l'année n-2 à la bmaf de
     # l'année n-2 pour déterminer l'éligibilité avec le cf_seuil. Il faudrait
     # pouvoir déflater les revenus de l'année courante pour en tenir compte.
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     bmaf = P.af.bmaf
     bmaf2 = P.af.bmaf_n_2
@@ -84,8 +84,8 @@ def _paje_nais(self, agem_holder, age_holder, af_nbenf, br_pf, isol, biact, P =
     '''
     Prestation d'accueil du jeune enfant - Allocation de naissance
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    agem = self.split_by_roles(agem_holder, roles = ENFS)
+    age = split_by_roles(self, age_holder, roles = ENFS)
+    agem = split_by_roles(self, agem_holder, roles = ENFS)
 
     bmaf = P.af.bmaf
     nais_prime = round(100 * P.paje.nais.prime_tx * bmaf) / 100
@@ -133,7 +133,7 @@ def _paje_clca(self, agem_holder, af_nbenf, paje_base, inactif, partiel1, partie
 
     http://www.caf.fr/wps/portal/particuliers/catalogue/metropole/paje
     """
-    agem = self.split_by_roles(agem_holder, roles = ENFS)
+    agem = get_role_matrix(self, agem_holder, roles = ENFS)
 
     paje = paje_base >= 0
     # durée de versement :
@@ -197,12 +197,12 @@ def _paje_clmg(self, aah_holder, age_holder, smic55_holder, etu_holder, sal_hold
     Son salaire brut ne doit pas dépasser par jour de garde et par enfant 5 fois le montant du Smic horaire brut, soit au max 45,00 €.
     Vous ne devez pas bénéficier de l'exonération des cotisations sociales dues pour la personne employée.
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    etu = self.split_by_roles(etu_holder, roles = [CHEF, PART])
-    hsup = self.split_by_roles(hsup_holder, roles = [CHEF, PART])
-    sal = self.split_by_roles(sal_holder, roles = [CHEF, PART])
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
-    aah = self.sum_by_entity(aah_holder)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    etu = split_by_roles(self, etu_holder, roles = [CHEF, PART])
+    hsup = split_by_roles(self, hsup_holder, roles = [CHEF, PART])
+    sal = split_by_roles(self, sal_holder, roles = [CHEF, PART])
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
+    aah = sum_by_entity(self, aah_holder)
 
     # condition de revenu minimal
 
@@ -252,7 +252,7 @@ def _paje_colca(self, af_nbenf, agem_holder, opt_colca, paje_base, P = law.fam):
     '''
     Prestation d'accueil du jeune enfant - Complément optionnel de libre choix du mode de garde
     '''
-    agem = self.split_by_roles(agem_holder, roles = ENFS)
+    agem = get_role_matrix(self, agem_holder, roles = ENFS)
 
     age_m_benjamin = age_en_mois_benjamin(agem)
     condition = (age_m_benjamin < 12 * P.paje.colca.age) * (age_m_benjamin >= 0)
@@ -277,8 +277,8 @@ def _afeama(self, age_holder, smic55_holder, ape, af_nbenf, br_pf, P = law.fam):
     '''
     Aide à la famille pour l'emploi d'une assistante maternelle agréée
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     # TODO http://web.archive.org/web/20080205163300/http://www.caf.fr/wps/portal/particuliers/catalogue/metropole/afeama
     # Les seuils sont de 80 et 110 % de l'ARS
@@ -337,8 +337,8 @@ def _aged(self, age_holder, smic55_holder, br_pf, ape_taux_partiel, dep_trim, P
     la CAF prend en charge 50% des charges sociales (plafonné à 553 € par trimestre)
     '''
     # TODO: trimestrialiser
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     nbenf = nb_enf(age, smic55, 0, P.aged.age1 - 1)
     nbenf2 = nb_enf(age, smic55, 0, P.aged.age2 - 1)
@@ -380,8 +380,8 @@ def _ape(self, age_holder, smic55_holder, inactif, partiel1, partiel2, P = law.f
     L'allocation parentale d'éducation n'est pas soumise à condition de ressources, sauf l’APE à taux partiel pour les
     professions non salariées.
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     elig = (nb_enf(age, smic55, 0, P.ape.age - 1) >= 1) & (nb_enf(age, smic55, 0, P.af.age2) >= 2)
     # Inactif
@@ -406,8 +406,8 @@ def _apje(self, br_pf, age_holder, smic55_holder, isol, biact, P = law.fam):
     '''
     Allocation pour jeune enfant
     '''
-    age = self.split_by_roles(age_holder, roles = ENFS)
-    smic55 = self.split_by_roles(smic55_holder, roles = ENFS)
+    age = get_role_matrix(self, age_holder, roles = ENFS)
+    smic55 = get_role_matrix(self, smic55_holder, roles = ENFS)
 
     # TODO: APJE courte voir doc ERF 2006
     nbenf = nb_enf(age, smic55, 0, P.apje.age - 1)
@@ -11,7 +11,7 @@ from __future__ import division
 
 from numpy import logical_not as not_, maximum as max_, minimum as min_
 
-from .base import QUIMEN, QUIFOY
+from .base import QUIMEN, QUIFOY, cast_from_entity_to_role, cast_from_entity_to_roles, filter_role, sum_by_entity
 
 
 PREF = QUIMEN['pref']
@@ -43,19 +43,19 @@ def _exonere_taxe_habitation(
     atteint d'une infirmité ou d'une invalidité vous empêchant de subvenir à vos besoins par votre travail.
     '''
 
-    isf_tot = self.cast_from_entity_to_role(isf_tot_holder, role = VOUS)
-    isf_tot = self.sum_by_entity(isf_tot)
-    rfr = self.cast_from_entity_to_role(rfr_holder, role = VOUS)
-    rfr = self.sum_by_entity(rfr)
-    nbptr = self.cast_from_entity_to_role(nbptr_holder, role = VOUS)
-    nbptr = self.sum_by_entity(nbptr)  # TODO: Beurk
-    age = self.filter_role(age_holder, role = PREF)
-    statmarit = self.filter_role(statmarit_holder, role = PREF)
-
-    asi = self.cast_from_entity_to_roles(asi_holder)
-    asi = self.sum_by_entity(asi)
-    aspa = self.cast_from_entity_to_roles(aspa_holder)
-    aspa = self.sum_by_entity(aspa)
+    isf_tot = cast_from_entity_to_role(self, isf_tot_holder, role = VOUS)
+    isf_tot = sum_by_entity(self, isf_tot)
+    rfr = cast_from_entity_to_role(self, rfr_holder, role = VOUS)
+    rfr = sum_by_entity(self, rfr)
+    nbptr = cast_from_entity_to_role(self, nbptr_holder, role = VOUS)
+    nbptr = sum_by_entity(self, nbptr)  # TODO: Beurk
+    age = filter_role(self, age_holder, role = PREF)
+    statmarit = filter_role(self, statmarit_holder, role = PREF)
+
+    asi = cast_from_entity_to_roles(self, asi_holder)
+    asi = sum_by_entity(self, asi)
+    aspa = cast_from_entity_to_roles(self, aspa_holder)
+    aspa = sum_by_entity(self, aspa)
 
     P = _P.cotsoc.gen
 
@@ -38,7 +38,7 @@ from openfisca_france import entities
 
 log = logging.getLogger(__name__)
 
-from openfisca_france.model.base import QUIFOY
+from openfisca_france.model.base import QUIFOY, cast_from_entity_to_role, sum_by_entity
 VOUS = QUIFOY['vous']
 
 
@@ -49,11 +49,11 @@ def revenu_brut_global(self, allocations_familiales_imposables, rev_cat, deficit
     '''
     # (Total 17)
     # sans les revenus au quotient
-    nacc_pvce = self.sum_by_entity(nacc_pvce_holder)
+    nacc_pvce = sum_by_entity(self, nacc_pvce_holder)
     return max_(
         0,
         allocations_familiales_imposables + rev_cat + f6gh +
-        (self.sum_by_entity(nbic_impm_holder) + nacc_pvce) * (1 + cga) - deficit_ante
+        (sum_by_entity(self, nbic_impm_holder) + nacc_pvce) * (1 + cga) - deficit_ante
         )
 
 
@@ -63,10 +63,10 @@ def revenu_fiscal_de_reference(self, rni, allocations_familiales_imposables, f3v
     Revenu fiscal de référence
     f3vg -> rev_cat_pv -> ... -> rni
     '''
-    f3va = self.sum_by_entity(f3va_holder)
-    f3vi = self.sum_by_entity(f3vi_holder)
-    rpns_exon = self.sum_by_entity(rpns_exon_holder)
-    rpns_pvce = self.sum_by_entity(rpns_pvce_holder)
+    f3va = sum_by_entity(self, f3va_holder)
+    f3vi = sum_by_entity(self, f3vi_holder)
+    rpns_exon = sum_by_entity(self, rpns_exon_holder)
+    rpns_pvce = sum_by_entity(self, rpns_pvce_holder)
     return (
         max_(0, rni - allocations_familiales_imposables) +
         rfr_cd + rfr_rvcm + rev_cap_lib + f3vi + rpns_exon + rpns_pvce + f3va + f3vz + microentreprise
@@ -105,8 +105,8 @@ def build_reform_entity_class_by_symbol():
             '''
             Allocations familiales imposables
             '''
-            af = self.cast_from_entity_to_role(af_holder, role = VOUS)
-            af = self.sum_by_entity(af)
+            af = cast_from_entity_to_role(self, af_holder, role = VOUS)
+            af = sum_by_entity(self, af)
             return af * imposition
 
         def get_output_period(self, period):
@@ -40,7 +40,7 @@ from openfisca_france import entities
 
 log = logging.getLogger(__name__)
 
-from openfisca_france.model.base import QUIFAM, QUIFOY
+from openfisca_france.model.base import QUIFAM, QUIFOY, cast_from_entity_to_role, sum_by_entity
 
 VOUS = QUIFOY['vous']
 CHEF = QUIFAM['chef']
@@ -57,12 +57,12 @@ def revenu_disponible(self, rev_trav_holder, pen_holder, rev_cap_holder, impot_r
     Revenu disponible - ménage
     'men'
     '''
-    impot_revenu_lps = self.sum_by_entity(impot_revenu_lps_holder)
-    pen = self.sum_by_entity(pen_holder)
-    psoc = self.cast_from_entity_to_role(psoc_holder, role = CHEF)
-    psoc = self.sum_by_entity(psoc)
-    rev_cap = self.sum_by_entity(rev_cap_holder)
-    rev_trav = self.sum_by_entity(rev_trav_holder)
+    impot_revenu_lps = sum_by_entity(self, impot_revenu_lps_holder)
+    pen = sum_by_entity(self, pen_holder)
+    psoc = cast_from_entity_to_role(self, psoc_holder, role = CHEF)
+    psoc = sum_by_entity(self, psoc)
+    rev_cap = sum_by_entity(self, rev_cap_holder)
+    rev_trav = sum_by_entity(self, rev_trav_holder)
 
     return rev_trav + pen + rev_cap + impot_revenu_lps + psoc
 
@@ -160,8 +160,8 @@ def build_reform_entity_class_by_symbol():
             '''
             Assiette de la csg
             '''
-            rev_cap_bar = self.cast_from_entity_to_role(rev_cap_bar_holder, role = VOUS)
-            rev_cap_lib = self.cast_from_entity_to_role(rev_cap_lib_holder, role = VOUS)
+            rev_cap_bar = cast_from_entity_to_role(self, rev_cap_bar_holder, role = VOUS)
+            rev_cap_lib = cast_from_entity_to_role(self, rev_cap_lib_holder, role = VOUS)
             return salbrut + chobrut + rstbrut + rev_cap_bar + rev_cap_lib
 
         def get_output_period(self, period):
@@ -178,8 +178,8 @@ def build_reform_entity_class_by_symbol():
             Impôt individuel sur l'ensemble de l'assiette de la csg, comme proposé par
             Landais, Piketty, Saez (2011)
             '''
-            nbF = self.cast_from_entity_to_role(nbF_holder, role = VOUS)
-            nbH = self.cast_from_entity_to_role(nbH_holder, role = VOUS)
+            nbF = cast_from_entity_to_role(self, nbF_holder, role = VOUS)
+            nbH = cast_from_entity_to_role(self, nbH_holder, role = VOUS)
             nbEnf = (nbF + nbH / 2)
             ae = nbEnf * lps.abatt_enfant
             re = nbEnf * lps.reduc_enfant
@@ -24,17 +24,25 @@
 
 
 import collections
+import copy
 import datetime
 import itertools
 import logging
 import re
 import uuid
+import weakref
 
 from openfisca_core import conv, scenarios
 
 
+json_or_python_to_test_case_by_key_by_tax_benefit_system = weakref.WeakKeyDictionary()  # key = (period, repair)
 log = logging.getLogger(__name__)
 N_ = lambda message: message
+roles_by_entity_key_plural = collections.OrderedDict([
+    (u'familles', (u'parents', u'enfants')),
+    (u'foyers_fiscaux', (u'declarants', u'personnes_a_charge')),
+    (u'menages', (u'personne_de_reference', u'conjoint', u'enfants', u'autres')),
+    ])
 year_or_month_or_day_re = re.compile(ur'(18|19|20)\d{2}(-(0[1-9]|1[0-2])(-([0-2]\d|3[0-1]))?)?$')
 
 
@@ -103,679 +111,60 @@ class Scenario(scenarios.AbstractScenario):
 
     def make_json_or_python_to_test_case(self, period = None, repair = False):
         assert period is not None
+        json_or_python_to_test_case_by_key = json_or_python_to_test_case_by_key_by_tax_benefit_system.setdefault(
+            self.tax_benefit_system, {})
+        json_or_python_to_test_case = json_or_python_to_test_case_by_key.get((period, repair))
+        if json_or_python_to_test_case is None:
+            json_or_python_to_test_case = json_or_python_to_test_case_by_key[(period, repair)] = \
+                build_json_or_python_to_test_case(self.tax_benefit_system, period, repair)
+        return json_or_python_to_test_case
 
-        def json_or_python_to_test_case(value, state = None):
-            if value is None:
-                return value, None
-            if state is None:
-                state = conv.default_state
-
-            column_by_name = self.tax_benefit_system.column_by_name
-
-            # First validation and conversion step
-            test_case, error = conv.pipe(
-                conv.test_isinstance(dict),
-                conv.struct(
-                    dict(
-                        familles = conv.pipe(
-                            conv.condition(
-                                conv.test_isinstance(list),
-                                conv.pipe(
-                                    conv.uniform_sequence(
-                                        conv.test_isinstance(dict),
-                                        drop_none_items = True,
-                                        ),
-                                    conv.function(lambda values: collections.OrderedDict(
-                                        (value.pop('id', index), value)
-                                        for index, value in enumerate(values)
-                                        )),
-                                    ),
-                                ),
-                            conv.test_isinstance(dict),
-                            conv.uniform_mapping(
-                                conv.pipe(
-                                    conv.test_isinstance((basestring, int)),
-                                    conv.not_none,
-                                    ),
-                                conv.pipe(
-                                    conv.test_isinstance(dict),
-                                    conv.struct(
-                                        dict(itertools.chain(
-                                            dict(
-                                                enfants = conv.pipe(
-                                                    conv.test_isinstance(list),
-                                                    conv.uniform_sequence(
-                                                        conv.test_isinstance((basestring, int)),
-                                                        drop_none_items = True,
-                                                        ),
-                                                    conv.default([]),
-                                                    ),
-                                                parents = conv.pipe(
-                                                    conv.test_isinstance(list),
-                                                    conv.uniform_sequence(
-                                                        conv.test_isinstance((basestring, int)),
-                                                        drop_none_items = True,
-                                                        ),
-                                                    conv.default([]),
-                                                    ),
-                                                ).iteritems(),
-                                            (
-                                                (column.name, column.json_to_python)
-                                                for column in column_by_name.itervalues()
-                                                if column.entity == 'fam'
-                                                ),
-                                            )),
-                                        drop_none_values = True,
-                                        ),
-                                    ),
-                                drop_none_values = True,
-                                ),
-                            conv.default({}),
-                            ),
-                        foyers_fiscaux = conv.pipe(
-                            conv.condition(
-                                conv.test_isinstance(list),
-                                conv.pipe(
-                                    conv.uniform_sequence(
-                                        conv.test_isinstance(dict),
-                                        drop_none_items = True,
-                                        ),
-                                    conv.function(lambda values: collections.OrderedDict(
-                                        (value.pop('id', index), value)
-                                        for index, value in enumerate(values)
-                                        )),
-                                    ),
-                                ),
-                            conv.test_isinstance(dict),
-                            conv.uniform_mapping(
-                                conv.pipe(
-                                    conv.test_isinstance((basestring, int)),
-                                    conv.not_none,
-                                    ),
-                                conv.pipe(
-                                    conv.test_isinstance(dict),
-                                    conv.struct(
-                                        dict(itertools.chain(
-                                            dict(
-                                                declarants = conv.pipe(
-                                                    conv.test_isinstance(list),
-                                                    conv.uniform_sequence(
-                                                        conv.test_isinstance((basestring, int)),
-                                                        drop_none_items = True,
-                                                        ),
-                                                    conv.default([]),
-                                                    ),
-                                                personnes_a_charge = conv.pipe(
-                                                    conv.test_isinstance(list),
-                                                    conv.uniform_sequence(
-                                                        conv.test_isinstance((basestring, int)),
-                                                        drop_none_items = True,
-                                                        ),
-                                                    conv.default([]),
-                                                    ),
-                                                ).iteritems(),
-                                            (
-                                                (column.name, column.json_to_python)
-                                                for column in column_by_name.itervalues()
-                                                if column.entity == 'foy'
-                                                ),
-                                            )),
-                                        drop_none_values = True,
-                                        ),
-                                    ),
-                                drop_none_values = True,
-                                ),
-                            conv.default({}),
-                            ),
-                        individus = conv.pipe(
-                            conv.condition(
-                                conv.test_isinstance(list),
-                                conv.pipe(
-                                    conv.uniform_sequence(
-                                        conv.test_isinstance(dict),
-                                        drop_none_items = True,
-                                        ),
-                                    conv.function(lambda values: collections.OrderedDict(
-                                        (value.pop('id', index), value)
-                                        for index, value in enumerate(values)
-                                        )),
-                                    ),
-                                ),
-                            conv.test_isinstance(dict),
-                            conv.uniform_mapping(
-                                conv.pipe(
-                                    conv.test_isinstance((basestring, int)),
-                                    conv.not_none,
-                                    ),
-                                conv.pipe(
-                                    conv.test_isinstance(dict),
-                                    conv.struct(
-                                        dict(
-                                            (column.name, column.json_to_python)
-                                            for column in column_by_name.itervalues()
-                                            if column.entity == 'ind' and column.name not in (
-                                                'idfam', 'idfoy', 'idmen', 'quifam', 'quifoy', 'quimen')
-                                            ),
-                                        drop_none_values = True,
-                                        ),
-                                    ),
-                                drop_none_values = True,
-                                ),
-                            conv.empty_to_none,
-                            conv.not_none,
-                            ),
-                        menages = conv.pipe(
-                            conv.condition(
-                                conv.test_isinstance(list),
-                                conv.pipe(
-                                    conv.uniform_sequence(
-                                        conv.test_isinstance(dict),
-                                        drop_none_items = True,
-                                        ),
-                                    conv.function(lambda values: collections.OrderedDict(
-                                        (value.pop('id', index), value)
-                                        for index, value in enumerate(values)
-                                        )),
-                                    ),
-                                ),
-                            conv.test_isinstance(dict),
-                            conv.uniform_mapping(
-                                conv.pipe(
-                                    conv.test_isinstance((basestring, int)),
-                                    conv.not_none,
-                                    ),
-                                conv.pipe(
-                                    conv.test_isinstance(dict),
-                                    conv.struct(
-                                        dict(itertools.chain(
-                                            dict(
-                                                autres = conv.pipe(
-                                                    # personnes ayant un lien autre avec la personne de référence
-                                                    conv.test_isinstance(list),
-                                                    conv.uniform_sequence(
-                                                        conv.test_isinstance((basestring, int)),
-                                                        drop_none_items = True,
-                                                        ),
-                                                    conv.default([]),
-                                                    ),
-                                                # conjoint de la personne de référence
-                                                conjoint = conv.test_isinstance((basestring, int)),
-                                                enfants = conv.pipe(
-                                                    # enfants de la personne de référence ou de son conjoint
-                                                    conv.test_isinstance(list),
-                                                    conv.uniform_sequence(
-                                                        conv.test_isinstance((basestring, int)),
-                                                        drop_none_items = True,
-                                                        ),
-                                                    conv.default([]),
-                                                    ),
-                                                personne_de_reference = conv.test_isinstance((basestring, int)),
-                                                ).iteritems(),
-                                            (
-                                                (column.name, column.json_to_python)
-                                                for column in column_by_name.itervalues()
-                                                if column.entity == 'men'
-                                                ),
-                                            )),
-                                        drop_none_values = True,
-                                        ),
-                                    ),
-                                drop_none_values = True,
-                                ),
-                            conv.default({}),
-                            ),
-                        ),
-                    ),
-                )(value, state = state)
-            if error is not None:
-                return test_case, error
-
-            # Second validation step
-            familles_individus_id = list(test_case['individus'].iterkeys())
-            foyers_fiscaux_individus_id = list(test_case['individus'].iterkeys())
-            menages_individus_id = list(test_case['individus'].iterkeys())
-            test_case, error = conv.struct(
-                dict(
-                    familles = conv.uniform_mapping(
-                        conv.noop,
-                        conv.struct(
-                            dict(
-                                enfants = conv.uniform_sequence(conv.test_in_pop(familles_individus_id)),
-                                parents = conv.uniform_sequence(conv.test_in_pop(familles_individus_id)),
-                                ),
-                            default = conv.noop,
-                            ),
-                        ),
-                    foyers_fiscaux = conv.uniform_mapping(
-                        conv.noop,
-                        conv.struct(
-                            dict(
-                                declarants = conv.uniform_sequence(conv.test_in_pop(foyers_fiscaux_individus_id)),
-                                personnes_a_charge = conv.uniform_sequence(conv.test_in_pop(
-                                    foyers_fiscaux_individus_id)),
-                                ),
-                            default = conv.noop,
-                            ),
-                        ),
-                    menages = conv.uniform_mapping(
-                        conv.noop,
-                        conv.struct(
-                            dict(
-                                autres = conv.uniform_sequence(conv.test_in_pop(menages_individus_id)),
-                                conjoint = conv.test_in_pop(menages_individus_id),
-                                enfants = conv.uniform_sequence(conv.test_in_pop(menages_individus_id)),
-                                personne_de_reference = conv.test_in_pop(menages_individus_id),
-                                ),
-                            default = conv.noop,
-                            ),
-                        ),
-                    ),
-                default = conv.noop,
-                )(test_case, state = state)
-
-            if repair:
-                # Affecte à une famille chaque individu qui n'appartient à aucune d'entre elles.
-                new_famille = dict(
-                    enfants = [],
-                    parents = [],
-                    )
-                new_famille_id = None
-                for individu_id in familles_individus_id[:]:
-                    # Tente d'affecter l'individu à une famille d'après son foyer fiscal.
-                    foyer_fiscal_id, foyer_fiscal, foyer_fiscal_role = find_foyer_fiscal_and_role(test_case,
-                        individu_id)
-                    if foyer_fiscal_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 2:
-                        for declarant_id in foyer_fiscal[u'declarants']:
-                            if declarant_id != individu_id:
-                                famille_id, famille, other_role = find_famille_and_role(test_case, declarant_id)
-                                if other_role == u'parents' and len(famille[u'parents']) == 1:
-                                    # Quand l'individu n'est pas encore dans une famille, mais qu'il est déclarant
-                                    # dans un foyer fiscal, qu'il y a un autre déclarant dans ce même foyer fiscal
-                                    # et que cet autre déclarant est seul parent dans sa famille, alors ajoute
-                                    # l'individu comme autre parent de cette famille.
-                                    famille[u'parents'].append(individu_id)
-                                    familles_individus_id.remove(individu_id)
-                                break
-                    elif foyer_fiscal_role == u'personnes_a_charge' and foyer_fiscal[u'declarants']:
-                        for declarant_id in foyer_fiscal[u'declarants']:
-                            famille_id, famille, other_role = find_famille_and_role(test_case, declarant_id)
-                            if other_role == u'parents':
-                                # Quand l'individu n'est pas encore dans une famille, mais qu'il est personne à charge
-                                # dans un foyer fiscal, qu'il y a un déclarant dans ce foyer fiscal et que ce déclarant
-                                # est parent dans sa famille, alors ajoute l'individu comme enfant de cette famille.
-                                famille[u'enfants'].append(individu_id)
-                                familles_individus_id.remove(individu_id)
-                            break
-
-                    if individu_id in familles_individus_id:
-                        # L'individu n'est toujours pas affecté à une famille.
-                        # Tente d'affecter l'individu à une famille d'après son ménage.
-                        menage_id, menage, menage_role = find_menage_and_role(test_case, individu_id)
-                        if menage_role == u'personne_de_reference':
-                            conjoint_id = menage[u'conjoint']
-                            if conjoint_id is not None:
-                                famille_id, famille, other_role = find_famille_and_role(test_case, conjoint_id)
-                                if other_role == u'parents' and len(famille[u'parents']) == 1:
-                                    # Quand l'individu n'est pas encore dans une famille, mais qu'il est personne de
-                                    # référence dans un ménage, qu'il y a un conjoint dans ce ménage et que ce
-                                    # conjoint est seul parent dans sa famille, alors ajoute l'individu comme autre
-                                    # parent de cette famille.
-                                    famille[u'parents'].append(individu_id)
-                                    familles_individus_id.remove(individu_id)
-                        elif menage_role == u'conjoint':
-                            personne_de_reference_id = menage[u'personne_de_reference']
-                            if personne_de_reference_id is not None:
-                                famille_id, famille, other_role = find_famille_and_role(test_case,
-                                    personne_de_reference_id)
-                                if other_role == u'parents' and len(famille[u'parents']) == 1:
-                                    # Quand l'individu n'est pas encore dans une famille, mais qu'il est conjoint
-                                    # dans un ménage, qu'il y a une personne de référence dans ce ménage et que
-                                    # cette personne est seul parent dans une famille, alors ajoute l'individu comme
-                                    # autre parent de cette famille.
-                                    famille[u'parents'].append(individu_id)
-                                    familles_individus_id.remove(individu_id)
-                        elif menage_role == u'enfants' and (menage['personne_de_reference'] is not None
-                                or menage[u'conjoint'] is not None):
-                            for other_id in (menage['personne_de_reference'], menage[u'conjoint']):
-                                if other_id is None:
-                                    continue
-                                famille_id, famille, other_role = find_famille_and_role(test_case, other_id)
-                                if other_role == u'parents':
-                                    # Quand l'individu n'est pas encore dans une famille, mais qu'il est enfant dans un
-                                    # ménage, qu'il y a une personne à charge ou un conjoint dans ce ménage et que
-                                    # celui-ci est parent dans une famille, alors ajoute l'individu comme enfant de
-                                    # cette famille.
-                                    famille[u'enfants'].append(individu_id)
-                                    familles_individus_id.remove(individu_id)
-                                break
+    def new_batch_simulation(self, test_cases, debug = False, debug_all = False, repair = False, trace = False):
+        '''
+        Calcule ensemble, dans une seule simulation sur la période du scénario, des test cases indépendants
 
-                    if individu_id in familles_individus_id:
-                        # L'individu n'est toujours pas affecté à une famille.
-                        individu = test_case['individus'][individu_id]
-                        age = find_age(individu, period.start.date)
-                        if len(new_famille[u'parents']) < 2 and (age is None or age >= 18):
-                            new_famille[u'parents'].append(individu_id)
-                        else:
-                            new_famille[u'enfants'].append(individu_id)
-                        if new_famille_id is None:
-                            new_famille_id = unicode(uuid.uuid4())
-                            test_case[u'familles'][new_famille_id] = new_famille
-                        familles_individus_id.remove(individu_id)
-
-                # Affecte à un foyer fiscal chaque individu qui n'appartient à aucun d'entre eux.
-                new_foyer_fiscal = dict(
-                    declarants = [],
-                    personnes_a_charge = [],
-                    )
-                new_foyer_fiscal_id = None
-                for individu_id in foyers_fiscaux_individus_id[:]:
-                    # Tente d'affecter l'individu à un foyer fiscal d'après sa famille.
-                    famille_id, famille, famille_role = find_famille_and_role(test_case, individu_id)
-                    if famille_role == u'parents' and len(famille[u'parents']) == 2:
-                        for parent_id in famille[u'parents']:
-                            if parent_id != individu_id:
-                                foyer_fiscal_id, foyer_fiscal, other_role = find_foyer_fiscal_and_role(test_case,
-                                    parent_id)
-                                if other_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 1:
-                                    # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est parent
-                                    # dans une famille, qu'il y a un autre parent dans cette famille et que cet autre
-                                    # parent est seul déclarant dans son foyer fiscal, alors ajoute l'individu comme
-                                    # autre déclarant de ce foyer fiscal.
-                                    foyer_fiscal[u'declarants'].append(individu_id)
-                                    foyers_fiscaux_individus_id.remove(individu_id)
-                                break
-                    elif famille_role == u'enfants' and famille[u'parents']:
-                        for parent_id in famille[u'parents']:
-                            foyer_fiscal_id, foyer_fiscal, other_role = find_foyer_fiscal_and_role(test_case,
-                                parent_id)
-                            if other_role == u'declarants':
-                                # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est enfant dans une
-                                # famille, qu'il y a un parent dans cette famille et que ce parent est déclarant dans
-                                # son foyer fiscal, alors ajoute l'individu comme personne à charge de ce foyer fiscal.
-                                foyer_fiscal[u'personnes_a_charge'].append(individu_id)
-                                foyers_fiscaux_individus_id.remove(individu_id)
-                                break
+        Chaque test case (au format accepté par init_from_attributes) est converti, puis tous sont concaténés en un
+        seul test case, dont les identifiants sont préfixés par le rang de leur test case : les entités de chaque test
+        case sont donc contiguës dans la simulation.
 
-                    if individu_id in foyers_fiscaux_individus_id:
-                        # L'individu n'est toujours pas affecté à un foyer fiscal.
-                        # Tente d'affecter l'individu à un foyer fiscal d'après son ménage.
-                        menage_id, menage, menage_role = find_menage_and_role(test_case, individu_id)
-                        if menage_role == u'personne_de_reference':
-                            conjoint_id = menage[u'conjoint']
-                            if conjoint_id is not None:
-                                foyer_fiscal_id, foyer_fiscal, other_role = find_foyer_fiscal_and_role(test_case,
-                                    conjoint_id)
-                                if other_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 1:
-                                    # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est personne de
-                                    # référence dans un ménage, qu'il y a un conjoint dans ce ménage et que ce
-                                    # conjoint est seul déclarant dans un foyer fiscal, alors ajoute l'individu comme
-                                    # autre déclarant de ce foyer fiscal.
-                                    foyer_fiscal[u'declarants'].append(individu_id)
-                                    foyers_fiscaux_individus_id.remove(individu_id)
-                        elif menage_role == u'conjoint':
-                            personne_de_reference_id = menage[u'personne_de_reference']
-                            if personne_de_reference_id is not None:
-                                foyer_fiscal_id, foyer_fiscal, other_role = find_foyer_fiscal_and_role(test_case,
-                                    personne_de_reference_id)
-                                if other_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 1:
-                                    # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est conjoint
-                                    # dans un ménage, qu'il y a une personne de référence dans ce ménage et que
-                                    # cette personne est seul déclarant dans un foyer fiscal, alors ajoute l'individu
-                                    # comme autre déclarant de ce foyer fiscal.
-                                    foyer_fiscal[u'declarants'].append(individu_id)
-                                    foyers_fiscaux_individus_id.remove(individu_id)
-                        elif menage_role == u'enfants' and (menage['personne_de_reference'] is not None
-                                or menage[u'conjoint'] is not None):
-                            for other_id in (menage['personne_de_reference'], menage[u'conjoint']):
-                                if other_id is None:
-                                    continue
-                                foyer_fiscal_id, foyer_fiscal, other_role = find_foyer_fiscal_and_role(test_case,
-                                    other_id)
-                                if other_role == u'declarants':
-                                    # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est enfant dans
-                                    # un ménage, qu'il y a une personne à charge ou un conjoint dans ce ménage et que
-                                    # celui-ci est déclarant dans un foyer fiscal, alors ajoute l'individu comme
-                                    # personne à charge de ce foyer fiscal.
-                                    foyer_fiscal[u'declarants'].append(individu_id)
-                                    foyers_fiscaux_individus_id.remove(individu_id)
-                                    break
-
-                    if individu_id in foyers_fiscaux_individus_id:
-                        # L'individu n'est toujours pas affecté à un foyer fiscal.
-                        individu = test_case['individus'][individu_id]
-                        age = find_age(individu, period.start.date)
-                        if len(new_foyer_fiscal[u'declarants']) < 2 and (age is None or age >= 18):
-                            new_foyer_fiscal[u'declarants'].append(individu_id)
-                        else:
-                            new_foyer_fiscal[u'personnes_a_charge'].append(individu_id)
-                        if new_foyer_fiscal_id is None:
-                            new_foyer_fiscal_id = unicode(uuid.uuid4())
-                            test_case[u'foyers_fiscaux'][new_foyer_fiscal_id] = new_foyer_fiscal
-                        foyers_fiscaux_individus_id.remove(individu_id)
-
-                # Affecte à un ménage chaque individu qui n'appartient à aucun d'entre eux.
-                new_menage = dict(
-                    autres = [],
-                    conjoint = None,
-                    enfants = [],
-                    personne_de_reference = None,
-                    )
-                new_menage_id = None
-                for individu_id in menages_individus_id[:]:
-                    # Tente d'affecter l'individu à un ménage d'après sa famille.
-                    famille_id, famille, famille_role = find_famille_and_role(test_case, individu_id)
-                    if famille_role == u'parents' and len(famille[u'parents']) == 2:
-                        for parent_id in famille[u'parents']:
-                            if parent_id != individu_id:
-                                menage_id, menage, other_role = find_menage_and_role(test_case, parent_id)
-                                if other_role == u'personne_de_reference' and menage[u'conjoint'] is None:
-                                    # Quand l'individu n'est pas encore dans un ménage, mais qu'il est parent
-                                    # dans une famille, qu'il y a un autre parent dans cette famille et que cet autre
-                                    # parent est personne de référence dans un ménage et qu'il n'y a pas de conjoint
-                                    # dans ce ménage, alors ajoute l'individu comme conjoint de ce ménage.
-                                    menage[u'conjoint'] = individu_id
-                                    menages_individus_id.remove(individu_id)
-                                elif other_role == u'conjoint' and menage[u'personne_de_reference'] is None:
-                                    # Quand l'individu n'est pas encore dans un ménage, mais qu'il est parent
-                                    # dans une famille, qu'il y a un autre parent dans cette famille et que cet autre
-                                    # parent est conjoint dans un ménage et qu'il n'y a pas de personne de référence
-                                    # dans ce ménage, alors ajoute l'individu comme personne de référence de ce ménage.
-                                    menage[u'personne_de_reference'] = individu_id
-                                    menages_individus_id.remove(individu_id)
-                                break
-                    elif famille_role == u'enfants' and famille[u'parents']:
-                        for parent_id in famille[u'parents']:
-                            menage_id, menage, other_role = find_menage_and_role(test_case, parent_id)
-                            if other_role in (u'personne_de_reference', u'conjoint'):
-                                # Quand l'individu n'est pas encore dans un ménage, mais qu'il est enfant dans une
-                                # famille, qu'il y a un parent dans cette famille et que ce parent est personne de
-                                # référence ou conjoint dans un ménage, alors ajoute l'individu comme enfant de ce
-                                # ménage.
-                                menage[u'enfants'].append(individu_id)
-                                menages_individus_id.remove(individu_id)
-                                break
-
-                    if individu_id in menages_individus_id:
-                        # L'individu n'est toujours pas affecté à un ménage.
-                        # Tente d'affecter l'individu à un ménage d'après son foyer fiscal.
-                        foyer_fiscal_id, foyer_fiscal, foyer_fiscal_role = find_foyer_fiscal_and_role(test_case,
-                            individu_id)
-                        if foyer_fiscal_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 2:
-                            for declarant_id in foyer_fiscal[u'declarants']:
-                                if declarant_id != individu_id:
-                                    menage_id, menage, other_role = find_menage_and_role(test_case, declarant_id)
-                                    if other_role == u'personne_de_reference' and menage[u'conjoint'] is None:
-                                        # Quand l'individu n'est pas encore dans un ménage, mais qu'il est déclarant
-                                        # dans un foyer fiscal, qu'il y a un autre déclarant dans ce foyer fiscal et que
-                                        # cet autre déclarant est personne de référence dans un ménage et qu'il n'y a
-                                        # pas de conjoint dans ce ménage, alors ajoute l'individu comme conjoint de ce
-                                        # ménage.
-                                        menage[u'conjoint'] = individu_id
-                                        menages_individus_id.remove(individu_id)
-                                    elif other_role == u'conjoint' and menage[u'personne_de_reference'] is None:
-                                        # Quand l'individu n'est pas encore dans un ménage, mais qu'il est déclarant
-                                        # dans une foyer fiscal, qu'il y a un autre déclarant dans ce foyer fiscal et
-                                        # que cet autre déclarant est conjoint dans un ménage et qu'il n'y a pas de
-                                        # personne de référence dans ce ménage, alors ajoute l'individu comme personne
-                                        # de référence de ce ménage.
-                                        menage[u'personne_de_reference'] = individu_id
-                                        menages_individus_id.remove(individu_id)
-                                    break
-                        elif foyer_fiscal_role == u'personnes_a_charge' and foyer_fiscal[u'declarants']:
-                            for declarant_id in foyer_fiscal[u'declarants']:
-                                menage_id, menage, other_role = find_menage_and_role(test_case, declarant_id)
-                                if other_role in (u'personne_de_reference', u'conjoint'):
-                                    # Quand l'individu n'est pas encore dans un ménage, mais qu'il est personne à charge
-                                    # dans un foyer fiscal, qu'il y a un déclarant dans ce foyer fiscal et que ce
-                                    # déclarant est personne de référence ou conjoint dans un ménage, alors ajoute
-                                    # l'individu comme enfant de ce ménage.
-                                    menage[u'enfants'].append(individu_id)
-                                    menages_individus_id.remove(individu_id)
-                                    break
-
-                    if individu_id in menages_individus_id:
-                        # L'individu n'est toujours pas affecté à un ménage.
-                        if new_menage[u'personne_de_reference'] is None:
-                            new_menage[u'personne_de_reference'] = individu_id
-                        elif new_menage[u'conjoint'] is None:
-                            new_menage[u'conjoint'] = individu_id
-                        else:
-                            new_menage[u'enfants'].append(individu_id)
-                        if new_menage_id is None:
-                            new_menage_id = unicode(uuid.uuid4())
-                            test_case[u'menages'][new_menage_id] = new_menage
-                        menages_individus_id.remove(individu_id)
-
-            remaining_individus_id = set(familles_individus_id).union(foyers_fiscaux_individus_id, menages_individus_id)
-            if remaining_individus_id:
-                if error is None:
-                    error = {}
-                for individu_id in remaining_individus_id:
-                    error.setdefault('individus', {})[individu_id] = state._(u"Individual is missing from {}").format(
-                        state._(u' & ').join(
-                            word
-                            for word in [
-                                u'familles' if individu_id in familles_individus_id else None,
-                                u'foyers_fiscaux' if individu_id in foyers_fiscaux_individus_id else None,
-                                u'menages' if individu_id in menages_individus_id else None,
-                                ]
-                            if word is not None
-                            ))
-            if error is not None:
-                return test_case, error
-
-            # Third validation step
-            parents_id = set(
-                parent_id
-                for famille in test_case['familles'].itervalues()
-                for parent_id in famille['parents']
+        Renvoie la simulation et un TestCasesBatch, qui répartit les tableaux calculés entre les test cases.
+        '''
+        assert self.axes is None, "Axes can't be used with a batch of test cases"
+        assert self.period is not None
+        json_or_python_to_test_case = self.make_json_or_python_to_test_case(period = self.period, repair = repair)
+        batch_test_case = dict(
+            (entity_key_plural, collections.OrderedDict())
+            for entity_key_plural in [u'individus'] + roles_by_entity_key_plural.keys()
+            )
+        counts_by_entity_key_plural = dict(
+            (entity_key_plural, [])
+            for entity_key_plural in batch_test_case
+            )
+        for test_case_index, test_case in enumerate(test_cases):
+            test_case = conv.check(json_or_python_to_test_case)(test_case)
+            batch_id_by_id = dict(
+                (individu_id, u'{}-{}'.format(test_case_index, individu_id))
+                for individu_id in test_case[u'individus']
                 )
-            individu_by_id = test_case['individus']
-            test_case, error = conv.struct(
-                dict(
-                    familles = conv.pipe(
-                        conv.uniform_mapping(
-                            conv.noop,
-                            conv.struct(
-                                dict(
-                                    enfants = conv.uniform_sequence(
-                                        conv.test(
-                                            lambda individu_id:
-                                                find_age(individu_by_id[individu_id], period.start.date,
-                                                    default = 0) <= 25,
-                                            error = u"Une personne à charge d'un foyer fiscal doit avoir moins de"
-                                                u" 25 ans ou être invalide",
-                                            ),
-                                        ),
-                                    parents = conv.pipe(
-                                        conv.empty_to_none,
-                                        conv.not_none,
-                                        conv.test(lambda parents: len(parents) <= 2,
-                                            error = N_(u'A "famille" must have at most 2 "parents"'))
-                                        ),
-                                    ),
-                                default = conv.noop,
-                                ),
-                            ),
-                        conv.empty_to_none,
-                        conv.not_none,
-                        ),
-                    foyers_fiscaux = conv.pipe(
-                        conv.uniform_mapping(
-                            conv.noop,
-                            conv.struct(
-                                dict(
-                                    declarants = conv.pipe(
-                                        conv.empty_to_none,
-                                        conv.not_none,
-                                        conv.test(
-                                            lambda declarants: len(declarants) <= 2,
-                                            error = N_(u'A "foyer_fiscal" must have at most 2 "declarants"'),
-                                            ),
-                                        conv.uniform_sequence(conv.pipe(
-                                            # conv.test(lambda individu_id:
-                                            #     find_age(individu_by_id[individu_id], period.start.date,
-                                            #         default = 100) >= 18,
-                                            #     error = u"Un déclarant d'un foyer fiscal doit être agé d'au moins 18"
-                                            #         u" ans",
-                                            #     ),
-                                            conv.test(
-                                                lambda individu_id: individu_id in parents_id,
-                                                error = u"Un déclarant ou un conjoint sur la déclaration d'impôt, doit"
-                                                        u" être un parent dans sa famille",
-                                                ),
-                                            )),
-                                        ),
-                                    personnes_a_charge = conv.uniform_sequence(
-                                        conv.test(
-                                            lambda individu_id:
-                                                individu_by_id[individu_id].get('inv', False)
-                                                or find_age(individu_by_id[individu_id], period.start.date,
-                                                    default = 0) < 25,
-                                            error = u"Une personne à charge d'un foyer fiscal doit avoir moins de"
-                                                    u" 25 ans ou être invalide",
-                                            ),
-                                        ),
-                                    ),
-                                default = conv.noop,
-                                ),
-                            ),
-                        conv.empty_to_none,
-                        conv.not_none,
-                        ),
-                    individus = conv.uniform_mapping(
-                        conv.noop,
-                        conv.struct(
-                            dict(
-                                birth = conv.test(
-                                    lambda birth: period.start.date - birth >= datetime.timedelta(0),
-                                    error = u"L'individu doit être né au plus tard le jour de la simulation",
-                                    ),
-                                ),
-                            default = conv.noop,
-                            drop_none_values = 'missing',
-                            ),
-                        ),
-                    menages = conv.pipe(
-                        conv.uniform_mapping(
-                            conv.noop,
-                            conv.struct(
-                                dict(
-                                    personne_de_reference = conv.not_none,
-                                    ),
-                                default = conv.noop,
-                                ),
-                            ),
-                        conv.empty_to_none,
-                        conv.not_none,
-                        ),
-                    ),
-                default = conv.noop,
-                )(test_case, state = state)
-
-            return test_case, error
+            for individu_id, individu in test_case[u'individus'].iteritems():
+                batch_test_case[u'individus'][batch_id_by_id[individu_id]] = individu
+            for entity_key_plural, roles in roles_by_entity_key_plural.iteritems():
+                for entity_id, entity in test_case[entity_key_plural].iteritems():
+                    entity = entity.copy()
+                    for role in roles:
+                        members_id = entity.get(role)
+                        if isinstance(members_id, list):
+                            entity[role] = [batch_id_by_id[member_id] for member_id in members_id]
+                        elif members_id is not None:
+                            entity[role] = batch_id_by_id[members_id]
+                    batch_test_case[entity_key_plural][u'{}-{}'.format(test_case_index, entity_id)] = entity
+            for entity_key_plural, counts in counts_by_entity_key_plural.iteritems():
+                counts.append(len(test_case[entity_key_plural]))
 
-        return json_or_python_to_test_case
+        batch_scenario = copy.copy(self)
+        batch_scenario.test_case = batch_test_case
+        simulation = batch_scenario.new_simulation(debug = debug, debug_all = debug_all, trace = trace)
+        return simulation, TestCasesBatch(counts_by_entity_key_plural)
 
     def suggest(self):
         period_start_date = self.period.start.date
@@ -915,9 +304,770 @@ class Scenario(scenarios.AbstractScenario):
         return self_json
 
 
+def build_json_or_python_to_test_case(tax_benefit_system, period, repair):
+    '''
+    Construit le convertisseur des test cases d'un système socio-fiscal pour une période
+    Sa construction est plus coûteuse que la conversion d'un petit test case : Scenario le met en cache.
+    '''
+    # Convertisseurs des colonnes de chaque entité, calculés en un seul parcours des colonnes
+    json_to_python_by_column_name_by_entity = dict(fam = {}, foy = {}, ind = {}, men = {})
+    for column in tax_benefit_system.column_by_name.itervalues():
+        json_to_python_by_column_name_by_entity.setdefault(column.entity, {})[column.name] = \
+            column.json_to_python
+
+    # First validation and conversion step
+    json_or_python_to_test_case_first_step = conv.pipe(
+        conv.test_isinstance(dict),
+        conv.struct(
+            dict(
+                familles = conv.pipe(
+                    conv.condition(
+                        conv.test_isinstance(list),
+                        conv.pipe(
+                            conv.uniform_sequence(
+                                conv.test_isinstance(dict),
+                                drop_none_items = True,
+                                ),
+                            conv.function(lambda values: collections.OrderedDict(
+                                (value.pop('id', index), value)
+                                for index, value in enumerate(values)
+                                )),
+                            ),
+                        ),
+                    conv.test_isinstance(dict),
+                    conv.uniform_mapping(
+                        conv.pipe(
+                            conv.test_isinstance((basestring, int)),
+                            conv.not_none,
+                            ),
+                        conv.pipe(
+                            conv.test_isinstance(dict),
+                            conv.struct(
+                                dict(itertools.chain(
+                                    dict(
+                                        enfants = conv.pipe(
+                                            conv.test_isinstance(list),
+                                            conv.uniform_sequence(
+                                                conv.test_isinstance((basestring, int)),
+                                                drop_none_items = True,
+                                                ),
+                                            conv.default([]),
+                                            ),
+                                        parents = conv.pipe(
+                                            conv.test_isinstance(list),
+                                            conv.uniform_sequence(
+                                                conv.test_isinstance((basestring, int)),
+                                                drop_none_items = True,
+                                                ),
+                                            conv.default([]),
+                                            ),
+                                        ).iteritems(),
+                                    json_to_python_by_column_name_by_entity['fam'].iteritems(),
+                                    )),
+                                drop_none_values = True,
+                                ),
+                            ),
+                        drop_none_values = True,
+                        ),
+                    conv.default({}),
+                    ),
+                foyers_fiscaux = conv.pipe(
+                    conv.condition(
+                        conv.test_isinstance(list),
+                        conv.pipe(
+                            conv.uniform_sequence(
+                                conv.test_isinstance(dict),
+                                drop_none_items = True,
+                                ),
+                            conv.function(lambda values: collections.OrderedDict(
+                                (value.pop('id', index), value)
+                                for index, value in enumerate(values)
+                                )),
+                            ),
+                        ),
+                    conv.test_isinstance(dict),
+                    conv.uniform_mapping(
+                        conv.pipe(
+                            conv.test_isinstance((basestring, int)),
+                            conv.not_none,
+                            ),
+                        conv.pipe(
+                            conv.test_isinstance(dict),
+                            conv.struct(
+                                dict(itertools.chain(
+                                    dict(
+                                        declarants = conv.pipe(
+                                            conv.test_isinstance(list),
+                                            conv.uniform_sequence(
+                                                conv.test_isinstance((basestring, int)),
+                                                drop_none_items = True,
+                                                ),
+                                            conv.default([]),
+                                            ),
+                                        personnes_a_charge = conv.pipe(
+                                            conv.test_isinstance(list),
+                                            conv.uniform_sequence(
+                                                conv.test_isinstance((basestring, int)),
+                                                drop_none_items = True,
+                                                ),
+                                            conv.default([]),
+                                            ),
+                                        ).iteritems(),
+                                    json_to_python_by_column_name_by_entity['foy'].iteritems(),
+                                    )),
+                                drop_none_values = True,
+                                ),
+                            ),
+                        drop_none_values = True,
+                        ),
+                    conv.default({}),
+                    ),
+                individus = conv.pipe(
+                    conv.condition(
+                        conv.test_isinstance(list),
+                        conv.pipe(
+                            conv.uniform_sequence(
+                                conv.test_isinstance(dict),
+                                drop_none_items = True,
+                                ),
+                            conv.function(lambda values: collections.OrderedDict(
+                                (value.pop('id', index), value)
+                                for index, value in enumerate(values)
+                                )),
+                            ),
+                        ),
+                    conv.test_isinstance(dict),
+                    conv.uniform_mapping(
+                        conv.pipe(
+                            conv.test_isinstance((basestring, int)),
+                            conv.not_none,
+                            ),
+                        conv.pipe(
+                            conv.test_isinstance(dict),
+                            conv.struct(
+                                dict(
+                                    (column_name, json_to_python)
+                                    for column_name, json_to_python in json_to_python_by_column_name_by_entity[
+                                        'ind'].iteritems()
+                                    if column_name not in ('idfam', 'idfoy', 'idmen', 'quifam', 'quifoy', 'quimen')
+                                    ),
+                                drop_none_values = True,
+                                ),
+                            ),
+                        drop_none_values = True,
+                        ),
+                    conv.empty_to_none,
+                    conv.not_none,
+                    ),
+                menages = conv.pipe(
+                    conv.condition(
+                        conv.test_isinstance(list),
+                        conv.pipe(
+                            conv.uniform_sequence(
+                                conv.test_isinstance(dict),
+                                drop_none_items = True,
+                                ),
+                            conv.function(lambda values: collections.OrderedDict(
+                                (value.pop('id', index), value)
+                                for index, value in enumerate(values)
+                                )),
+                            ),
+                        ),
+                    conv.test_isinstance(dict),
+                    conv.uniform_mapping(
+                        conv.pipe(
+                            conv.test_isinstance((basestring, int)),
+                            conv.not_none,
+                            ),
+                        conv.pipe(
+                            conv.test_isinstance(dict),
+                            conv.struct(
+                                dict(itertools.chain(
+                                    dict(
+                                        autres = conv.pipe(
+                                            # personnes ayant un lien autre avec la personne de référence
+                                            conv.test_isinstance(list),
+                                            conv.uniform_sequence(
+                                                conv.test_isinstance((basestring, int)),
+                                                drop_none_items = True,
+                                                ),
+                                            conv.default([]),
+                                            ),
+                                        # conjoint de la personne de référence
+                                        conjoint = conv.test_isinstance((basestring, int)),
+                                        enfants = conv.pipe(
+                                            # enfants de la personne de référence ou de son conjoint
+                                            conv.test_isinstance(list),
+                                            conv.uniform_sequence(
+                                                conv.test_isinstance((basestring, int)),
+                                                drop_none_items = True,
+                                                ),
+                                            conv.default([]),
+                                            ),
+                                        personne_de_reference = conv.test_isinstance((basestring, int)),
+                                        ).iteritems(),
+                                    json_to_python_by_column_name_by_entity['men'].iteritems(),
+                                    )),
+                                drop_none_values = True,
+                                ),
+                            ),
+                        drop_none_values = True,
+                        ),
+                    conv.default({}),
+                    ),
+                ),
+            ),
+        )
+
+    def json_or_python_to_test_case(value, state = None):
+        if value is None:
+            return value, None
+        if state is None:
+            state = conv.default_state
+
+        # First validation and conversion step
+        test_case, error = json_or_python_to_test_case_first_step(value, state = state)
+        if error is not None:
+            return test_case, error
+
+        # Second validation step
+        familles_individus_id = list(test_case['individus'].iterkeys())
+        foyers_fiscaux_individus_id = list(test_case['individus'].iterkeys())
+        menages_individus_id = list(test_case['individus'].iterkeys())
+        test_case, error = conv.struct(
+            dict(
+                familles = conv.uniform_mapping(
+                    conv.noop,
+                    conv.struct(
+                        dict(
+                            enfants = conv.uniform_sequence(conv.test_in_pop(familles_individus_id)),
+                            parents = conv.uniform_sequence(conv.test_in_pop(familles_individus_id)),
+                            ),
+                        default = conv.noop,
+                        ),
+                    ),
+                foyers_fiscaux = conv.uniform_mapping(
+                    conv.noop,
+                    conv.struct(
+                        dict(
+                            declarants = conv.uniform_sequence(conv.test_in_pop(foyers_fiscaux_individus_id)),
+                            personnes_a_charge = conv.uniform_sequence(conv.test_in_pop(
+                                foyers_fiscaux_individus_id)),
+                            ),
+                        default = conv.noop,
+                        ),
+                    ),
+                menages = conv.uniform_mapping(
+                    conv.noop,
+                    conv.struct(
+                        dict(
+                            autres = conv.uniform_sequence(conv.test_in_pop(menages_individus_id)),
+                            conjoint = conv.test_in_pop(menages_individus_id),
+                            enfants = conv.uniform_sequence(conv.test_in_pop(menages_individus_id)),
+                            personne_de_reference = conv.test_in_pop(menages_individus_id),
+                            ),
+                        default = conv.noop,
+                        ),
+                    ),
+                ),
+            default = conv.noop,
+            )(test_case, state = state)
+
+        if repair:
+            # Index des rôles des individus dans chaque entité, tenus à jour à chaque ajout d'un individu
+            familles_index = RolesIndex(test_case[u'familles'], roles_by_entity_key_plural[u'familles'])
+            foyers_fiscaux_index = RolesIndex(test_case[u'foyers_fiscaux'],
+                roles_by_entity_key_plural[u'foyers_fiscaux'])
+            menages_index = RolesIndex(test_case[u'menages'], roles_by_entity_key_plural[u'menages'])
+
+            # Affecte à une famille chaque individu qui n'appartient à aucune d'entre elles.
+            new_famille = dict(
+                enfants = [],
+                parents = [],
+                )
+            new_famille_id = None
+            for individu_id in familles_individus_id[:]:
+                # Tente d'affecter l'individu à une famille d'après son foyer fiscal.
+                foyer_fiscal_id, foyer_fiscal, foyer_fiscal_role = foyers_fiscaux_index.find(individu_id)
+                if foyer_fiscal_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 2:
+                    for declarant_id in foyer_fiscal[u'declarants']:
+                        if declarant_id != individu_id:
+                            famille_id, famille, other_role = familles_index.find(declarant_id)
+                            if other_role == u'parents' and len(famille[u'parents']) == 1:
+                                # Quand l'individu n'est pas encore dans une famille, mais qu'il est déclarant
+                                # dans un foyer fiscal, qu'il y a un autre déclarant dans ce même foyer fiscal
+                                # et que cet autre déclarant est seul parent dans sa famille, alors ajoute
+                                # l'individu comme autre parent de cette famille.
+                                famille[u'parents'].append(individu_id)
+                                familles_index.add(famille_id, u'parents', individu_id)
+                                familles_individus_id.remove(individu_id)
+                            break
+                elif foyer_fiscal_role == u'personnes_a_charge' and foyer_fiscal[u'declarants']:
+                    for declarant_id in foyer_fiscal[u'declarants']:
+                        famille_id, famille, other_role = familles_index.find(declarant_id)
+                        if other_role == u'parents':
+                            # Quand l'individu n'est pas encore dans une famille, mais qu'il est personne à charge
+                            # dans un foyer fiscal, qu'il y a un déclarant dans ce foyer fiscal et que ce déclarant
+                            # est parent dans sa famille, alors ajoute l'individu comme enfant de cette famille.
+                            famille[u'enfants'].append(individu_id)
+                            familles_index.add(famille_id, u'enfants', individu_id)
+                            familles_individus_id.remove(individu_id)
+                        break
+
+                if individu_id in familles_individus_id:
+                    # L'individu n'est toujours pas affecté à une famille.
+                    # Tente d'affecter l'individu à une famille d'après son ménage.
+                    menage_id, menage, menage_role = menages_index.find(individu_id)
+                    if menage_role == u'personne_de_reference':
+                        conjoint_id = menage[u'conjoint']
+                        if conjoint_id is not None:
+                            famille_id, famille, other_role = familles_index.find(conjoint_id)
+                            if other_role == u'parents' and len(famille[u'parents']) == 1:
+                                # Quand l'individu n'est pas encore dans une famille, mais qu'il est personne de
+                                # référence dans un ménage, qu'il y a un conjoint dans ce ménage et que ce
+                                # conjoint est seul parent dans sa famille, alors ajoute l'individu comme autre
+                                # parent de cette famille.
+                                famille[u'parents'].append(individu_id)
+                                familles_index.add(famille_id, u'parents', individu_id)
+                                familles_individus_id.remove(individu_id)
+                    elif menage_role == u'conjoint':
+                        personne_de_reference_id = menage[u'personne_de_reference']
+                        if personne_de_reference_id is not None:
+                            famille_id, famille, other_role = familles_index.find(personne_de_reference_id)
+                            if other_role == u'parents' and len(famille[u'parents']) == 1:
+                                # Quand l'individu n'est pas encore dans une famille, mais qu'il est conjoint
+                                # dans un ménage, qu'il y a une personne de référence dans ce ménage et que
+                                # cette personne est seul parent dans une famille, alors ajoute l'individu comme
+                                # autre parent de cette famille.
+                                famille[u'parents'].append(individu_id)
+                                familles_index.add(famille_id, u'parents', individu_id)
+                                familles_individus_id.remove(individu_id)
+                    elif menage_role == u'enfants' and (menage['personne_de_reference'] is not None
+                            or menage[u'conjoint'] is not None):
+                        for other_id in (menage['personne_de_reference'], menage[u'conjoint']):
+                            if other_id is None:
+                                continue
+                            famille_id, famille, other_role = familles_index.find(other_id)
+                            if other_role == u'parents':
+                                # Quand l'individu n'est pas encore dans une famille, mais qu'il est enfant dans un
+                                # ménage, qu'il y a une personne à charge ou un conjoint dans ce ménage et que
+                                # celui-ci est parent dans une famille, alors ajoute l'individu comme enfant de
+                                # cette famille.
+                                famille[u'enfants'].append(individu_id)
+                                familles_index.add(famille_id, u'enfants', individu_id)
+                                familles_individus_id.remove(individu_id)
+                            break
+
+                if individu_id in familles_individus_id:
+                    # L'individu n'est toujours pas affecté à une famille.
+                    individu = test_case['individus'][individu_id]
+                    age = find_age(individu, period.start.date)
+                    if len(new_famille[u'parents']) < 2 and (age is None or age >= 18):
+                        famille_role = u'parents'
+                    else:
+                        famille_role = u'enfants'
+                    new_famille[famille_role].append(individu_id)
+                    if new_famille_id is None:
+                        new_famille_id = unicode(uuid.uuid4())
+                        test_case[u'familles'][new_famille_id] = new_famille
+                    familles_index.add(new_famille_id, famille_role, individu_id)
+                    familles_individus_id.remove(individu_id)
+
+            # Affecte à un foyer fiscal chaque individu qui n'appartient à aucun d'entre eux.
+            new_foyer_fiscal = dict(
+                declarants = [],
+                personnes_a_charge = [],
+                )
+            new_foyer_fiscal_id = None
+            for individu_id in foyers_fiscaux_individus_id[:]:
+                # Tente d'affecter l'individu à un foyer fiscal d'après sa famille.
+                famille_id, famille, famille_role = familles_index.find(individu_id)
+                if famille_role == u'parents' and len(famille[u'parents']) == 2:
+                    for parent_id in famille[u'parents']:
+                        if parent_id != individu_id:
+                            foyer_fiscal_id, foyer_fiscal, other_role = foyers_fiscaux_index.find(parent_id)
+                            if other_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 1:
+                                # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est parent
+                                # dans une famille, qu'il y a un autre parent dans cette famille et que cet autre
+                                # parent est seul déclarant dans son foyer fiscal, alors ajoute l'individu comme
+                                # autre déclarant de ce foyer fiscal.
+                                foyer_fiscal[u'declarants'].append(individu_id)
+                                foyers_fiscaux_index.add(foyer_fiscal_id, u'declarants', individu_id)
+                                foyers_fiscaux_individus_id.remove(individu_id)
+                            break
+                elif famille_role == u'enfants' and famille[u'parents']:
+                    for parent_id in famille[u'parents']:
+                        foyer_fiscal_id, foyer_fiscal, other_role = foyers_fiscaux_index.find(parent_id)
+                        if other_role == u'declarants':
+                            # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est enfant dans une
+                            # famille, qu'il y a un parent dans cette famille et que ce parent est déclarant dans
+                            # son foyer fiscal, alors ajoute l'individu comme personne à charge de ce foyer fiscal.
+                            foyer_fiscal[u'personnes_a_charge'].append(individu_id)
+                            foyers_fiscaux_index.add(foyer_fiscal_id, u'personnes_a_charge', individu_id)
+                            foyers_fiscaux_individus_id.remove(individu_id)
+                            break
+
+                if individu_id in foyers_fiscaux_individus_id:
+                    # L'individu n'est toujours pas affecté à un foyer fiscal.
+                    # Tente d'affecter l'individu à un foyer fiscal d'après son ménage.
+                    menage_id, menage, menage_role = menages_index.find(individu_id)
+                    if menage_role == u'personne_de_reference':
+                        conjoint_id = menage[u'conjoint']
+                        if conjoint_id is not None:
+                            foyer_fiscal_id, foyer_fiscal, other_role = foyers_fiscaux_index.find(conjoint_id)
+                            if other_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 1:
+                                # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est personne de
+                                # référence dans un ménage, qu'il y a un conjoint dans ce ménage et que ce
+                                # conjoint est seul déclarant dans un foyer fiscal, alors ajoute l'individu comme
+                                # autre déclarant de ce foyer fiscal.
+                                foyer_fiscal[u'declarants'].append(individu_id)
+                                foyers_fiscaux_index.add(foyer_fiscal_id, u'declarants', individu_id)
+                                foyers_fiscaux_individus_id.remove(individu_id)
+                    elif menage_role == u'conjoint':
+                        personne_de_reference_id = menage[u'personne_de_reference']
+                        if personne_de_reference_id is not None:
+                            foyer_fiscal_id, foyer_fiscal, other_role = foyers_fiscaux_index.find(
+                                personne_de_reference_id)
+                            if other_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 1:
+                                # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est conjoint
+                                # dans un ménage, qu'il y a une personne de référence dans ce ménage et que
+                                # cette personne est seul déclarant dans un foyer fiscal, alors ajoute l'individu
+                                # comme autre déclarant de ce foyer fiscal.
+                                foyer_fiscal[u'declarants'].append(individu_id)
+                                foyers_fiscaux_index.add(foyer_fiscal_id, u'declarants', individu_id)
+                                foyers_fiscaux_individus_id.remove(individu_id)
+                    elif menage_role == u'enfants' and (menage['personne_de_reference'] is not None
+                            or menage[u'conjoint'] is not None):
+                        for other_id in (menage['personne_de_reference'], menage[u'conjoint']):
+                            if other_id is None:
+                                continue
+                            foyer_fiscal_id, foyer_fiscal, other_role = foyers_fiscaux_index.find(other_id)
+                            if other_role == u'declarants':
+                                # Quand l'individu n'est pas encore dans un foyer fiscal, mais qu'il est enfant dans
+                                # un ménage, qu'il y a une personne à charge ou un conjoint dans ce ménage et que
+                                # celui-ci est déclarant dans un foyer fiscal, alors ajoute l'individu comme
+                                # personne à charge de ce foyer fiscal.
+                                foyer_fiscal[u'declarants'].append(individu_id)
+                                foyers_fiscaux_index.add(foyer_fiscal_id, u'declarants', individu_id)
+                                foyers_fiscaux_individus_id.remove(individu_id)
+                                break
+
+                if individu_id in foyers_fiscaux_individus_id:
+                    # L'individu n'est toujours pas affecté à un foyer fiscal.
+                    individu = test_case['individus'][individu_id]
+                    age = find_age(individu, period.start.date)
+                    if len(new_foyer_fiscal[u'declarants']) < 2 and (age is None or age >= 18):
+                        foyer_fiscal_role = u'declarants'
+                    else:
+                        foyer_fiscal_role = u'personnes_a_charge'
+                    new_foyer_fiscal[foyer_fiscal_role].append(individu_id)
+                    if new_foyer_fiscal_id is None:
+                        new_foyer_fiscal_id = unicode(uuid.uuid4())
+                        test_case[u'foyers_fiscaux'][new_foyer_fiscal_id] = new_foyer_fiscal
+                    foyers_fiscaux_index.add(new_foyer_fiscal_id, foyer_fiscal_role, individu_id)
+                    foyers_fiscaux_individus_id.remove(individu_id)
+
+            # Affecte à un ménage chaque individu qui n'appartient à aucun d'entre eux.
+            new_menage = dict(
+                autres = [],
+                conjoint = None,
+                enfants = [],
+                personne_de_reference = None,
+                )
+            new_menage_id = None
+            for individu_id in menages_individus_id[:]:
+                # Tente d'affecter l'individu à un ménage d'après sa famille.
+                famille_id, famille, famille_role = familles_index.find(individu_id)
+                if famille_role == u'parents' and len(famille[u'parents']) == 2:
+                    for parent_id in famille[u'parents']:
+                        if parent_id != individu_id:
+                            menage_id, menage, other_role = menages_index.find(parent_id)
+                            if other_role == u'personne_de_reference' and menage[u'conjoint'] is None:
+                                # Quand l'individu n'est pas encore dans un ménage, mais qu'il est parent
+                                # dans une famille, qu'il y a un autre parent dans cette famille et que cet autre
+                                # parent est personne de référence dans un ménage et qu'il n'y a pas de conjoint
+                                # dans ce ménage, alors ajoute l'individu comme conjoint de ce ménage.
+                                menage[u'conjoint'] = individu_id
+                                menages_index.add(menage_id, u'conjoint', individu_id)
+                                menages_individus_id.remove(individu_id)
+                            elif other_role == u'conjoint' and menage[u'personne_de_reference'] is None:
+                                # Quand l'individu n'est pas encore dans un ménage, mais qu'il est parent
+                                # dans une famille, qu'il y a un autre parent dans cette famille et que cet autre
+                                # parent est conjoint dans un ménage et qu'il n'y a pas de personne de référence
+                                # dans ce ménage, alors ajoute l'individu comme personne de référence de ce ménage.
+                                menage[u'personne_de_reference'] = individu_id
+                                menages_index.add(menage_id, u'personne_de_reference', individu_id)
+                                menages_individus_id.remove(individu_id)
+                            break
+                elif famille_role == u'enfants' and famille[u'parents']:
+                    for parent_id in famille[u'parents']:
+                        menage_id, menage, other_role = menages_index.find(parent_id)
+                        if other_role in (u'personne_de_reference', u'conjoint'):
+                            # Quand l'individu n'est pas encore dans un ménage, mais qu'il est enfant dans une
+                            # famille, qu'il y a un parent dans cette famille et que ce parent est personne de
+                            # référence ou conjoint dans un ménage, alors ajoute l'individu comme enfant de ce
+                            # ménage.
+                            menage[u'enfants'].append(individu_id)
+                            menages_index.add(menage_id, u'enfants', individu_id)
+                            menages_individus_id.remove(individu_id)
+                            break
+
+                if individu_id in menages_individus_id:
+                    # L'individu n'est toujours pas affecté à un ménage.
+                    # Tente d'affecter l'individu à un ménage d'après son foyer fiscal.
+                    foyer_fiscal_id, foyer_fiscal, foyer_fiscal_role = foyers_fiscaux_index.find(individu_id)
+                    if foyer_fiscal_role == u'declarants' and len(foyer_fiscal[u'declarants']) == 2:
+                        for declarant_id in foyer_fiscal[u'declarants']:
+                            if declarant_id != individu_id:
+                                menage_id, menage, other_role = menages_index.find(declarant_id)
+                                if other_role == u'personne_de_reference' and menage[u'conjoint'] is None:
+                                    # Quand l'individu n'est pas encore dans un ménage, mais qu'il est déclarant
+                                    # dans un foyer fiscal, qu'il y a un autre déclarant dans ce foyer fiscal et que
+                                    # cet autre déclarant est personne de référence dans un ménage et qu'il n'y a
+                                    # pas de conjoint dans ce ménage, alors ajoute l'individu comme conjoint de ce
+                                    # ménage.
+                                    menage[u'conjoint'] = individu_id
+                                    menages_index.add(menage_id, u'conjoint', individu_id)
+                                    menages_individus_id.remove(individu_id)
+                                elif other_role == u'conjoint' and menage[u'personne_de_reference'] is None:
+                                    # Quand l'individu n'est pas encore dans un ménage, mais qu'il est déclarant
+                                    # dans une foyer fiscal, qu'il y a un autre déclarant dans ce foyer fiscal et
+                                    # que cet autre déclarant est conjoint dans un ménage et qu'il n'y a pas de
+                                    # personne de référence dans ce ménage, alors ajoute l'individu comme personne
+                                    # de référence de ce ménage.
+                                    menage[u'personne_de_reference'] = individu_id
+                                    menages_index.add(menage_id, u'personne_de_reference', individu_id)
+                                    menages_individus_id.remove(individu_id)
+                                break
+                    elif foyer_fiscal_role == u'personnes_a_charge' and foyer_fiscal[u'declarants']:
+                        for declarant_id in foyer_fiscal[u'declarants']:
+                            menage_id, menage, other_role = menages_index.find(declarant_id)
+                            if other_role in (u'personne_de_reference', u'conjoint'):
+                                # Quand l'individu n'est pas encore dans un ménage, mais qu'il est personne à charge
+                                # dans un foyer fiscal, qu'il y a un déclarant dans ce foyer fiscal et que ce
+                                # déclarant est personne de référence ou conjoint dans un ménage, alors ajoute
+                                # l'individu comme enfant de ce ménage.
+                                menage[u'enfants'].append(individu_id)
+                                menages_index.add(menage_id, u'enfants', individu_id)
+                                menages_individus_id.remove(individu_id)
+                                break
+
+                if individu_id in menages_individus_id:
+                    # L'individu n'est toujours pas affecté à un ménage.
+                    if new_menage[u'personne_de_reference'] is None:
+                        menage_role = u'personne_de_reference'
+                        new_menage[menage_role] = individu_id
+                    elif new_menage[u'conjoint'] is None:
+                        menage_role = u'conjoint'
+                        new_menage[menage_role] = individu_id
+                    else:
+                        menage_role = u'enfants'
+                        new_menage[menage_role].append(individu_id)
+                    if new_menage_id is None:
+                        new_menage_id = unicode(uuid.uuid4())
+                        test_case[u'menages'][new_menage_id] = new_menage
+                    menages_index.add(new_menage_id, menage_role, individu_id)
+                    menages_individus_id.remove(individu_id)
+
+        remaining_individus_id = set(familles_individus_id).union(foyers_fiscaux_individus_id, menages_individus_id)
+        if remaining_individus_id:
+            if error is None:
+                error = {}
+            for individu_id in remaining_individus_id:
+                error.setdefault('individus', {})[individu_id] = state._(u"Individual is missing from {}").format(
+                    state._(u' & ').join(
+                        word
+                        for word in [
+                            u'familles' if individu_id in familles_individus_id else None,
+                            u'foyers_fiscaux' if individu_id in foyers_fiscaux_individus_id else None,
+                            u'menages' if individu_id in menages_individus_id else None,
+                            ]
+                        if word is not None
+                        ))
+        if error is not None:
+            return test_case, error
+
+        # Third validation step
+        parents_id = set(
+            parent_id
+            for famille in test_case['familles'].itervalues()
+            for parent_id in famille['parents']
+            )
+        individu_by_id = test_case['individus']
+        test_case, error = conv.struct(
+            dict(
+                familles = conv.pipe(
+                    conv.uniform_mapping(
+                        conv.noop,
+                        conv.struct(
+                            dict(
+                                enfants = conv.uniform_sequence(
+                                    conv.test(
+                                        lambda individu_id:
+                                            find_age(individu_by_id[individu_id], period.start.date,
+                                                default = 0) <= 25,
+                                        error = u"Une personne à charge d'un foyer fiscal doit avoir moins de"
+                                            u" 25 ans ou être invalide",
+                                        ),
+                                    ),
+                                parents = conv.pipe(
+                                    conv.empty_to_none,
+                                    conv.not_none,
+                                    conv.test(lambda parents: len(parents) <= 2,
+                                        error = N_(u'A "famille" must have at most 2 "parents"'))
+                                    ),
+                                ),
+                            default = conv.noop,
+                            ),
+                        ),
+                    conv.empty_to_none,
+                    conv.not_none,
+                    ),
+                foyers_fiscaux = conv.pipe(
+                    conv.uniform_mapping(
+                        conv.noop,
+                        conv.struct(
+                            dict(
+                                declarants = conv.pipe(
+                                    conv.empty_to_none,
+                                    conv.not_none,
+                                    conv.test(
+                                        lambda declarants: len(declarants) <= 2,
+                                        error = N_(u'A "foyer_fiscal" must have at most 2 "declarants"'),
+                                        ),
+                                    conv.uniform_sequence(conv.pipe(
+                                        # conv.test(lambda individu_id:
+                                        #     find_age(individu_by_id[individu_id], period.start.date,
+                                        #         default = 100) >= 18,
+                                        #     error = u"Un déclarant d'un foyer fiscal doit être agé d'au moins 18"
+                                        #         u" ans",
+                                        #     ),
+                                        conv.test(
+                                            lambda individu_id: individu_id in parents_id,
+                                            error = u"Un déclarant ou un conjoint sur la déclaration d'impôt, doit"
+                                                    u" être un parent dans sa famille",
+                                            ),
+                                        )),
+                                    ),
+                                personnes_a_charge = conv.uniform_sequence(
+                                    conv.test(
+                                        lambda individu_id:
+                                            individu_by_id[individu_id].get('inv', False)
+                                            or find_age(individu_by_id[individu_id], period.start.date,
+                                                default = 0) < 25,
+                                        error = u"Une personne à charge d'un foyer fiscal doit avoir moins de"
+                                                u" 25 ans ou être invalide",
+                                        ),
+                                    ),
+                                ),
+                            default = conv.noop,
+                            ),
+                        ),
+                    conv.empty_to_none,
+                    conv.not_none,
+                    ),
+                individus = conv.uniform_mapping(
+                    conv.noop,
+                    conv.struct(
+                        dict(
+                            birth = conv.test(
+                                lambda birth: period.start.date - birth >= datetime.timedelta(0),
+                                error = u"L'individu doit être né au plus tard le jour de la simulation",
+                                ),
+                            ),
+                        default = conv.noop,
+                        drop_none_values = 'missing',
+                        ),
+                    ),
+                menages = conv.pipe(
+                    conv.uniform_mapping(
+                        conv.noop,
+                        conv.struct(
+                            dict(
+                                personne_de_reference = conv.not_none,
+                                ),
+                            default = conv.noop,
+                            ),
+                        ),
+                    conv.empty_to_none,
+                    conv.not_none,
+                    ),
+                ),
+            default = conv.noop,
+            )(test_case, state = state)
+
+        return test_case, error
+
+    return json_or_python_to_test_case
+
+
+class TestCasesBatch(object):
+    '''
+    Position des entités de chaque test case dans une simulation par lot (cf. Scenario.new_batch_simulation)
+    '''
+    slices_by_entity_key_plural = None
+
+    def __init__(self, counts_by_entity_key_plural):
+        self.slices_by_entity_key_plural = slices_by_entity_key_plural = {}
+        for entity_key_plural, counts in counts_by_entity_key_plural.iteritems():
+            slices = slices_by_entity_key_plural[entity_key_plural] = []
+            start = 0
+            for count in counts:
+                slices.append(slice(start, start + count))
+                start += count
+
+    def calculate(self, simulation, column_name):
+        '''
+        Calcule une variable pour tout le lot et renvoie son tableau pour chaque test case
+        '''
+        array = simulation.calculate(column_name)
+        return self.split(array, simulation.entity_by_column_name[column_name].key_plural)
+
+    def split(self, array, entity_key_plural):
+        return [
+            array[entity_slice]
+            for entity_slice in self.slices_by_entity_key_plural[entity_key_plural]
+            ]
+
+
 # Finders
 
 
+class RolesIndex(object):
+    '''
+    Index du rôle de chaque individu dans les entités d'un même type (familles, foyers fiscaux ou ménages)
+
+    Construit en un seul parcours des entités, il remplace les parcours de toutes les entités faits par les fonctions
+    find_*_and_role, à condition d'être tenu à jour (cf. add) à chaque ajout d'un individu dans une entité.
+    '''
+    entity_by_id = None
+    entity_id_and_role_by_individu_id = None
+
+    def __init__(self, entity_by_id, roles):
+        self.entity_by_id = entity_by_id
+        self.entity_id_and_role_by_individu_id = entity_id_and_role_by_individu_id = {}
+        for entity_id, entity in entity_by_id.iteritems():
+            for role in roles:
+                members_id = entity[role]
+                if members_id is None:
+                    continue
+                if not isinstance(members_id, list):
+                    members_id = [members_id]
+                for individu_id in members_id:
+                    # Comme les finders, retient la première entité et le premier rôle où figure l'individu.
+                    entity_id_and_role_by_individu_id.setdefault(individu_id, (entity_id, role))
+
+    def add(self, entity_id, role, individu_id):
+        self.entity_id_and_role_by_individu_id.setdefault(individu_id, (entity_id, role))
+
+    def find(self, individu_id):
+        entity_id_and_role = self.entity_id_and_role_by_individu_id.get(individu_id)
+        if entity_id_and_role is None:
+            return None, None, None
+        entity_id, role = entity_id_and_role
+        return entity_id, self.entity_by_id[entity_id], role
+
+
 def find_famille_and_role(test_case, individu_id):
     for famille_id, famille in test_case['familles'].iteritems():
         for role in (u'parents', u'enfants'):
@@ -23,26 +23,60 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import collections
 import copy
+import json
 import logging
+import multiprocessing
+import os
 
 import numpy as np
 from openfisca_core import periods, simulations
 
+from . import calibration
+from .model.base import get_projection_cache, new_constant_array
 
+
+MANIFEST_FILENAME = 'manifest.json'
+SPARSE_DECLARATION_BOX_MAX_DENSITY = 0.1  # Declaration boxes filled for at most this share of foyers are stored sparse
 log = logging.getLogger(__name__)
+worker_survey_scenario = None  # Survey scenario of the current process, when it is a pool worker
 
 
 class SurveyScenario(object):
+    compact_dtypes = False  # When True, input holders are stored in the smallest dtype holding their values
     inflators = None
     input_data_frame = None
+    input_directory = None  # Directory of memory-mapped input columns, used instead of input_data_frame
     legislation_json = None
+    loading_statistics = None  # Bytes loaded into holders by new_simulation and, among them, bytes copied
+    projection_cache_max_bytes = None  # Byte budget of the projection cache of new simulations (None = unbounded)
     simulation = None
     tax_benefit_system = None
     tax_benefit_system_class = None
+    wide_column_names = frozenset()  # Input columns kept in their column dtype by compact mode, for their formulas
     year = None
     weight_column_name_by_entity_symbol = dict()
 
+    def init_from_directory(self, input_directory = None, tax_benefit_system_class = None, year = None):
+        '''
+        Utilise comme entrée un répertoire écrit par write_survey_directory, dont les colonnes sont projetées en
+        mémoire et ne sont lues qu'à leur première utilisation
+        '''
+        assert input_directory is not None
+        self.input_directory = input_directory
+        assert tax_benefit_system_class is not None
+        self.tax_benefit_system_class = tax_benefit_system_class
+        tax_benefit_system_subclass = adapt_to_survey(tax_benefit_system_class)
+        self.tax_benefit_system = tax_benefit_system_subclass()
+        assert year is not None
+        self.year = year
+        self.weight_column_name_by_entity_symbol['men'] = 'wprm'
+        self.weight_column_name_by_entity_symbol['fam'] = 'weight_fam'
+        self.weight_column_name_by_entity_symbol['foy'] = 'weight_foy'
+        self.weight_column_name_by_entity_symbol['ind'] = 'weight_ind'
+        return self
+
     def init_from_data_frame(self, input_data_frame = None, tax_benefit_system_class = None, year = None):
         assert input_data_frame is not None
         self.input_data_frame = input_data_frame
@@ -58,8 +92,86 @@ class SurveyScenario(object):
         self.weight_column_name_by_entity_symbol['ind'] = 'weight_ind'
         return self
 
+    def calibrate(self, margins, **kwargs):
+        '''
+        Cale les poids de la simulation sur les marges données (voir calibration.calibrate_simulation)
+
+        Renvoie le rapport de calage.
+        '''
+        assert self.simulation is not None
+        return calibration.calibrate_simulation(self.simulation, margins, self.weight_column_name_by_entity_symbol,
+            **kwargs)
+
+    def calculate_by_chunk(self, column_names, chunk_size = 100000, debug = False, debug_all = False,
+            processes = None, trace = False, weighted = False):
+        '''
+        Calcule les variables demandées par morceaux de la table d'enquête
+
+        Chaque morceau contient au plus chunk_size individus (sauf si une même entité en compte davantage) et aucune
+        entité n'est partagée entre deux morceaux. Une simulation est créée puis abandonnée pour chaque morceau, si
+        bien que la mémoire utilisée dépend de la taille des morceaux et non de celle de l'enquête.
+        Quand processes est donné, les morceaux sont répartis entre autant de processus, qui créent chacun une seule
+        fois leur système socio-fiscal. Les résultats sont toujours fusionnés dans l'ordre des morceaux : ils ne
+        dépendent pas du nombre de processus.
+        Renvoie, pour chaque variable, la concaténation de ses valeurs par morceau (dans l'ordre des morceaux) ou,
+        quand weighted est vrai, son total pondéré par la variable de poids de son entité.
+        '''
+        assert self.input_data_frame is not None, \
+            'calculate_by_chunk needs an input data frame (init_from_data_frame): survey directories are not chunked'
+        chunk_data_frames = iter_entity_aligned_chunks(self.input_data_frame, chunk_size)
+        if processes is None:
+            results = (
+                self.calculate_chunk_data_frame(chunk_data_frame, column_names, debug = debug, debug_all = debug_all,
+                    trace = trace, weighted = weighted)
+                for chunk_data_frame in chunk_data_frames
+                )
+        else:
+            results = iter_pool_results(
+                processes,
+                initialize_worker,
+                (self.tax_benefit_system_class, self.legislation_json, self.year,
+                    self.weight_column_name_by_entity_symbol, self.compact_dtypes, self.wide_column_names,
+                    self.projection_cache_max_bytes),
+                calculate_chunk_in_worker,
+                (
+                    (chunk_data_frame, column_names, debug, debug_all, trace, weighted)
+                    for chunk_data_frame in chunk_data_frames
+                    ),
+                )
+
+        arrays_by_column_name = dict((column_name, []) for column_name in column_names)
+        for result_by_column_name in results:
+            for column_name, result in result_by_column_name.iteritems():
+                arrays_by_column_name[column_name].append(result)
+
+        if weighted:
+            return dict(
+                (column_name, sum(totals))
+                for column_name, totals in arrays_by_column_name.iteritems()
+                )
+        return dict(
+            (column_name, np.concatenate(arrays))
+            for column_name, arrays in arrays_by_column_name.iteritems()
+            )
+
+    def calculate_chunk_data_frame(self, chunk_data_frame, column_names, debug = False, debug_all = False,
+            trace = False, weighted = False):
+        simulation = self.new_simulation_from_data_frame(chunk_data_frame, debug = debug, debug_all = debug_all,
+            trace = trace)
+        return calculate_chunk(simulation, column_names,
+            weight_column_name_by_entity_symbol = self.weight_column_name_by_entity_symbol if weighted else None)
+
     def new_simulation(self, debug = False, debug_all = False, trace = False):
-        input_data_frame = self.input_data_frame
+        if self.input_directory is not None:
+            simulation = self.new_simulation_from_directory(self.input_directory, debug = debug,
+                debug_all = debug_all, trace = trace)
+        else:
+            simulation = self.new_simulation_from_data_frame(self.input_data_frame, debug = debug,
+                debug_all = debug_all, trace = trace)
+        self.simulation = simulation
+        return simulation
+
+    def new_simulation_from_data_frame(self, input_data_frame, debug = False, debug_all = False, trace = False):
         # TODO Pass year to this method, not init_from_data_frame
         simulation = simulations.Simulation(
             debug = debug,
@@ -69,50 +181,38 @@ class SurveyScenario(object):
             tax_benefit_system = self.tax_benefit_system,
             trace = trace,
             )
+        get_projection_cache(simulation).max_bytes = self.projection_cache_max_bytes
 
         symbols_other_than_ind = [entity.symbol for entity in simulation.entity_by_key_singular.values()]
         symbols_other_than_ind.remove('ind')
         id_variables = ["id{}".format(symbol) for symbol in symbols_other_than_ind]
         role_variables = ["qui{}".format(symbol) for symbol in symbols_other_than_ind]
         for id_variable in id_variables + role_variables:
-            assert id_variable in self.input_data_frame.columns
-
-        column_by_name = self.tax_benefit_system.column_by_name
-        for column_name in input_data_frame:
-            if column_name not in column_by_name:
-                log.info('Unknown column "{}" in survey, dropped from input table'.format(column_name))
-                # waiting for the new pandas version to hit Travis repo
-                input_data_frame = input_data_frame.drop(column_name, axis = 1)
-                # , inplace = True)  # TODO: effet de bords ?
-        for column_name in input_data_frame:
-            if column_by_name[column_name].formula_class is not None:
-                log.info('Column "{}" in survey set to be calculated, dropped from input table'.format(column_name))
-                input_data_frame = input_data_frame.drop(column_name, axis = 1)
-                # , inplace = True)  # TODO: effet de bords ?
-
-        for entity in simulation.entity_by_key_singular.values():
-            if entity.is_persons_entity:
-                entity.count = entity.step_size = len(input_data_frame)
-            else:
-                entity.count = entity.step_size = (input_data_frame["qui{}".format(entity.symbol)] == 0).sum()
-                entity.roles_count = input_data_frame["qui{}".format(entity.symbol)].max() + 1
-#       TODO: Create a validation/conversion step
-#       TODO: introduce an assert when loading in place of astype
-        for column_name, column_series in input_data_frame.iteritems():
-            holder = simulation.get_or_new_holder(column_name)
-            entity = holder.entity
-            if entity.is_persons_entity:
-                array = column_series.values.astype(holder.column.dtype)
-            else:
-                array = column_series.values[input_data_frame['qui' + entity.symbol].values == 0].astype(
-                    holder.column.dtype)
-            assert array.size == entity.count, 'Bad size for {}: {} instead of {}'.format(
-                column_name,
-                array.size,
-                entity.count)
-            holder.array = np.array(array, dtype = holder.column.dtype)
+            assert id_variable in input_data_frame.columns
 
-        self.simulation = simulation
+        self.loading_statistics = fill_simulation_from_data_frame(simulation, input_data_frame,
+            compact_dtypes = self.compact_dtypes, wide_column_names = self.wide_column_names)
+        log.info('Survey input loaded: {loaded_bytes} bytes, of which {copied_bytes} bytes copied'.format(
+            **self.loading_statistics))
+        for entity_symbol, saved_bytes in sorted(self.loading_statistics['saved_bytes_by_entity_symbol'].iteritems()):
+            log.info('Compact dtypes saved {} bytes out of {} for entity {}'.format(saved_bytes,
+                self.loading_statistics['loaded_bytes_by_entity_symbol'][entity_symbol] + saved_bytes,
+                entity_symbol))
+
+        return simulation
+
+    def new_simulation_from_directory(self, input_directory, debug = False, debug_all = False, trace = False):
+        simulation = simulations.Simulation(
+            debug = debug,
+            debug_all = debug_all,
+            legislation_json = self.legislation_json,
+            period = periods.period(self.year),
+            tax_benefit_system = self.tax_benefit_system,
+            trace = trace,
+            )
+        get_projection_cache(simulation).max_bytes = self.projection_cache_max_bytes
+        attach_survey_directory(simulation, input_directory, compact_dtypes = self.compact_dtypes,
+            wide_column_names = self.wide_column_names)
         return simulation
 
     def inflate(self, inflators = None):
@@ -155,6 +255,316 @@ def adapt_to_survey(tax_benefit_system_class):
     return tax_benefit_system_subclass
 
 
+def attach_survey_directory(simulation, directory, compact_dtypes = False, wide_column_names = frozenset()):
+    '''
+    Branche sur la simulation les colonnes d'un répertoire écrit par write_survey_directory
+
+    Seules les colonnes d'identifiants et de rôles sont branchées immédiatement. Les autres sont projetées en mémoire
+    (en lecture seule) la première fois que leur holder est demandé : une variable d'entrée jamais utilisée ne coûte
+    rien et plusieurs processus partagent les mêmes pages du cache disque.
+    '''
+    manifest = load_survey_directory_manifest(directory)
+    column_by_name = simulation.tax_benefit_system.column_by_name
+    column_manifest_by_name_by_entity_symbol = {}
+    for column_name, column_manifest in manifest['columns'].iteritems():
+        column = column_by_name.get(column_name)
+        if column is None:
+            log.info('Unknown column "{}" in survey directory, ignored'.format(column_name))
+        elif column.formula_class is not None:
+            log.info('Column "{}" in survey directory set to be calculated, ignored'.format(column_name))
+        else:
+            column_manifest_by_name_by_entity_symbol.setdefault(column_manifest['entity'], {})[column_name] = \
+                column_manifest
+
+    for entity in simulation.entity_by_key_singular.values():
+        entity.count = entity.step_size = manifest['count_by_entity_symbol'][entity.symbol]
+        if not entity.is_persons_entity:
+            entity.roles_count = manifest['roles_count_by_entity_symbol'][entity.symbol]
+        column_manifest_by_name = column_manifest_by_name_by_entity_symbol.get(entity.symbol, {})
+        entity.get_or_new_holder = new_lazy_holder_getter(entity, directory, column_manifest_by_name,
+            compact_column_names = set(column_manifest_by_name) - wide_column_names if compact_dtypes
+                else frozenset())
+
+    persons = simulation.persons
+    for entity in simulation.entity_by_key_singular.values():
+        if not entity.is_persons_entity:
+            # Index and role holders are read directly from persons.holder_by_name, so they must exist beforehand.
+            persons.get_or_new_holder(entity.index_for_person_variable_name)
+            persons.get_or_new_holder(entity.role_for_person_variable_name)
+
+
+def calculate_chunk(simulation, column_names, weight_column_name_by_entity_symbol = None):
+    '''
+    Calcule les variables demandées dans la simulation d'un morceau d'enquête
+
+    Renvoie les tableaux calculés ou, quand weight_column_name_by_entity_symbol est donné, leurs totaux pondérés.
+    '''
+    result_by_column_name = {}
+    for column_name in column_names:
+        array = simulation.calculate(column_name)
+        if weight_column_name_by_entity_symbol is None:
+            result_by_column_name[column_name] = array
+        else:
+            entity = simulation.get_or_new_holder(column_name).entity
+            weight = simulation.calculate(weight_column_name_by_entity_symbol[entity.symbol])
+            result_by_column_name[column_name] = float(np.dot(weight, array))
+    return result_by_column_name
+
+
+def calculate_chunk_in_worker(arguments):
+    chunk_data_frame, column_names, debug, debug_all, trace, weighted = arguments
+    return worker_survey_scenario.calculate_chunk_data_frame(chunk_data_frame, column_names, debug = debug,
+        debug_all = debug_all, trace = trace, weighted = weighted)
+
+
+def fill_simulation_from_data_frame(simulation, input_data_frame, compact_dtypes = False,
+        wide_column_names = frozenset()):
+    '''
+    Charge les colonnes d'une table d'enquête (une ligne par individu) dans les holders de la simulation
+
+    Les colonnes inconnues ou calculées sont écartées en une seule passe, sans copier la table. Les tableaux sont
+    affectés aux holders sans copie quand leur type convient déjà ; seules les variables des entités autres que les
+    individus, restreintes aux têtes d'entité, sont nécessairement copiées.
+    Les cases de déclaration inutilisées (égales à leur valeur par défaut) deviennent des tableaux constants, qui
+    n'occupent pas de mémoire. Quand compact_dtypes est vrai, chaque colonne (sauf celles de wide_column_names) est
+    stockée dans le type renvoyé par get_compact_dtype.
+    Renvoie le nombre d'octets chargés et copiés, ainsi que, par entité, les octets chargés et économisés.
+    '''
+    input_column_names = list(iter_input_column_names(input_data_frame, simulation.tax_benefit_system.column_by_name))
+
+    is_head_by_entity_symbol = {}
+    for entity in simulation.entity_by_key_singular.values():
+        if entity.is_persons_entity:
+            entity.count = entity.step_size = len(input_data_frame)
+        else:
+            roles = input_data_frame["qui{}".format(entity.symbol)].values
+            is_head_by_entity_symbol[entity.symbol] = is_head = roles == 0
+            entity.count = entity.step_size = is_head.sum()
+            entity.roles_count = roles.max() + 1
+
+    loaded_bytes = 0
+    loaded_bytes_by_entity_symbol = collections.defaultdict(int)
+    copied_bytes = 0
+    saved_bytes_by_entity_symbol = collections.defaultdict(int)
+#   TODO: Create a validation/conversion step
+#   TODO: introduce an assert when loading in place of astype
+    for column_name in input_column_names:
+        holder = simulation.get_or_new_holder(column_name)
+        entity = holder.entity
+        column = holder.column
+        array = input_data_frame[column_name].values
+        if column.cerfa_field is not None and (array == column.default).all():
+            # Unused declaration box: a constant array needs no memory.
+            holder.array = new_constant_array(entity.count, column.dtype, column.default)
+            continue
+        copied = False
+        if not entity.is_persons_entity:
+            array = array[is_head_by_entity_symbol[entity.symbol]]
+            copied = True
+        if compact_dtypes and column_name not in wide_column_names:
+            dtype = get_compact_dtype(column, array)
+            saved_bytes_by_entity_symbol[entity.symbol] += array.size * (np.dtype(column.dtype).itemsize -
+                np.dtype(dtype).itemsize)
+        else:
+            dtype = column.dtype
+        if array.dtype != dtype:
+            array = array.astype(dtype)
+            copied = True
+        if copied:
+            copied_bytes += array.nbytes
+        assert array.size == entity.count, 'Bad size for {}: {} instead of {}'.format(
+            column_name,
+            array.size,
+            entity.count)
+        holder.array = array
+        loaded_bytes += array.nbytes
+        loaded_bytes_by_entity_symbol[entity.symbol] += array.nbytes
+
+    return dict(
+        copied_bytes = copied_bytes,
+        loaded_bytes = loaded_bytes,
+        loaded_bytes_by_entity_symbol = dict(loaded_bytes_by_entity_symbol),
+        saved_bytes_by_entity_symbol = dict(saved_bytes_by_entity_symbol),
+        )
+
+
+def get_compact_dtype(column, array):
+    '''
+    Renvoie le plus petit type capable de stocker les valeurs de array pour la colonne
+
+    Les booléens restent booléens, les énumérations (dont les rôles) passent en int8 quand leurs valeurs le
+    permettent et les réels en float32 quand la conversion est exacte. Les autres entiers gardent le type de leur
+    colonne, car les formules les utilisent dans des calculs qui déborderaient.
+    '''
+    dtype = np.dtype(column.dtype)
+    if dtype == np.bool_ or array.size == 0:
+        return dtype
+    if getattr(column, 'enum', None) is not None:
+        if np.iinfo(np.int8).min <= array.min() and array.max() <= np.iinfo(np.int8).max:
+            return np.dtype(np.int8)
+        return dtype
+    if dtype.kind == 'f' and dtype.itemsize > 4:
+        if (np.asarray(array, dtype = np.float32) == array).all():
+            return np.dtype(np.float32)
+    return dtype
+
+
+def initialize_worker(tax_benefit_system_class, legislation_json, year, weight_column_name_by_entity_symbol,
+        compact_dtypes = False, wide_column_names = frozenset(), projection_cache_max_bytes = None):
+    '''
+    Prépare un processus de calcul : le système socio-fiscal n'y est créé qu'une fois, pour tous ses morceaux
+
+    Le scénario du processus reprend les options de chargement et le budget du cache de projections du scénario
+    d'origine.
+    '''
+    global worker_survey_scenario
+    survey_scenario = SurveyScenario()
+    survey_scenario.compact_dtypes = compact_dtypes
+    survey_scenario.legislation_json = legislation_json
+    survey_scenario.projection_cache_max_bytes = projection_cache_max_bytes
+    survey_scenario.tax_benefit_system_class = tax_benefit_system_class
+    survey_scenario.tax_benefit_system = adapt_to_survey(tax_benefit_system_class)()
+    survey_scenario.weight_column_name_by_entity_symbol = weight_column_name_by_entity_symbol
+    survey_scenario.wide_column_names = wide_column_names
+    survey_scenario.year = year
+    worker_survey_scenario = survey_scenario
+
+
+def iter_entity_aligned_chunks(input_data_frame, chunk_size, id_variables = ('idmen', 'idfoy', 'idfam'),
+        role_variables = ('quimen', 'quifoy', 'quifam')):
+    '''
+    Découpe une table d'enquête en morceaux d'au plus chunk_size individus sans couper aucune entité
+
+    Les individus reliés (directement ou non) par un ménage, un foyer fiscal ou une famille forment un bloc qui
+    n'est jamais découpé : un bloc de plus de chunk_size individus forme donc un morceau à lui seul. Dans chaque
+    morceau, les identifiants d'entité sont renumérotés de 0 à n - 1 dans l'ordre des têtes d'entité, comme l'attend
+    la simulation.
+    '''
+    ids_list = [input_data_frame[id_variable].values for id_variable in id_variables]
+
+    # Propagate the smallest row index of each entity until every block of linked persons shares the same label.
+    labels = np.arange(len(input_data_frame))
+    while True:
+        previous_labels = labels
+        for ids in ids_list:
+            label_by_id = np.empty(ids.max() + 1, dtype = labels.dtype)
+            label_by_id.fill(len(labels))
+            np.minimum.at(label_by_id, ids, labels)
+            labels = label_by_id[ids]
+        if (labels == previous_labels).all():
+            break
+
+    order = np.argsort(labels, kind = 'mergesort')
+    sorted_labels = labels[order]
+    block_boundaries = np.concatenate((
+        np.flatnonzero(sorted_labels[1:] != sorted_labels[:-1]) + 1,
+        [len(sorted_labels)],
+        ))
+    start = 0
+    while start < len(sorted_labels):
+        index = np.searchsorted(block_boundaries, start + chunk_size, side = 'right') - 1
+        if index < 0 or block_boundaries[index] <= start:
+            # The next block alone holds more than chunk_size persons: it makes a chunk on its own.
+            index = np.searchsorted(block_boundaries, start, side = 'right')
+        stop = block_boundaries[index]
+        chunk_data_frame = input_data_frame.iloc[order[start:stop]].copy()
+        for id_variable, role_variable in zip(id_variables, role_variables):
+            ids = chunk_data_frame[id_variable].values
+            head_ids = ids[chunk_data_frame[role_variable].values == 0]
+            index_by_id = np.empty(ids.max() + 1, dtype = ids.dtype)
+            index_by_id[head_ids] = np.arange(len(head_ids))
+            chunk_data_frame[id_variable] = index_by_id[ids]
+        yield chunk_data_frame
+        start = stop
+
+
+def iter_input_column_names(input_data_frame, column_by_name):
+    '''
+    Itère sur les colonnes de la table d'enquête qui sont des variables d'entrée du système socio-fiscal
+    '''
+    for column_name in input_data_frame:
+        column = column_by_name.get(column_name)
+        if column is None:
+            log.info('Unknown column "{}" in survey, dropped from input table'.format(column_name))
+        elif column.formula_class is not None:
+            log.info('Column "{}" in survey set to be calculated, dropped from input table'.format(column_name))
+        else:
+            yield column_name
+
+
+def iter_pool_results(processes, initializer, initargs, function, arguments_iterator):
+    '''
+    Applique function à chaque élément de arguments_iterator dans un pool de processus
+
+    Les résultats sont renvoyés dans l'ordre des arguments. Au plus deux tâches par processus sont en attente, pour
+    ne pas charger en mémoire tous les morceaux d'enquête à la fois.
+    '''
+    pool = multiprocessing.Pool(processes, initializer = initializer, initargs = initargs)
+    try:
+        pending_results = collections.deque()
+        for arguments in arguments_iterator:
+            if len(pending_results) >= 2 * processes:
+                yield pending_results.popleft().get()
+            pending_results.append(pool.apply_async(function, (arguments,)))
+        while pending_results:
+            yield pending_results.popleft().get()
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def load_survey_directory_column(directory, column_name, column_manifest, count):
+    storage = column_manifest.get('storage', 'dense')
+    if storage == 'sparse':
+        sparse_file = np.load(os.path.join(directory, u'{}.sparse.npz'.format(column_name)))
+        array = np.zeros(count, dtype = column_manifest['dtype'])
+        array[sparse_file['indices']] = sparse_file['values']
+        return array
+    assert storage == 'dense', storage
+    return np.load(os.path.join(directory, u'{}.npy'.format(column_name)), mmap_mode = 'r')
+
+
+def load_survey_directory_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILENAME)) as manifest_file:
+        return json.load(manifest_file)
+
+
+def new_lazy_holder_getter(entity, directory, column_manifest_by_name, compact_column_names = frozenset()):
+    '''
+    Renvoie une variante de entity.get_or_new_holder qui projette en mémoire la colonne du répertoire d'enquête à
+    la création du holder
+
+    Les colonnes creuses sont matérialisées à ce moment-là et les colonnes constantes deviennent des tableaux
+    constants. Les colonnes de compact_column_names gardent leur type compact quand il convient à leurs valeurs.
+    '''
+    get_or_new_holder = entity.get_or_new_holder
+
+    def get_or_new_holder_from_directory(column_name):
+        holder = entity.holder_by_name.get(column_name)
+        if holder is None:
+            holder = get_or_new_holder(column_name)
+            column_manifest = column_manifest_by_name.get(column_name)
+            if column_manifest is None:
+                pass
+            elif column_manifest.get('storage') == 'constant':
+                holder.array = new_constant_array(entity.count, holder.column.dtype, column_manifest['value'])
+            else:
+                array = load_survey_directory_column(directory, column_name, column_manifest, entity.count)
+                dtype = get_compact_dtype(holder.column, array) if column_name in compact_column_names \
+                    else holder.column.dtype
+                if array.dtype != dtype:
+                    array = array.astype(dtype)
+                assert array.size == entity.count, 'Bad size for {}: {} instead of {}'.format(
+                    column_name,
+                    array.size,
+                    entity.count)
+                holder.array = array
+        return holder
+
+    return get_or_new_holder_from_directory
+
+
 def new_simulation_from_array_dict(array_dict = None, debug = False, debug_all = False, legislation_json = None,
         tax_benefit_system = None, trace = False, year = None):
     simulation = simulations.Simulation(
@@ -218,3 +628,63 @@ def new_simulation_from_array_dict(array_dict = None, debug = False, debug_all =
         holder.array = np.array(array, dtype = holder.column.dtype)
 
     return simulation
+
+
+def write_survey_directory(input_data_frame, directory, tax_benefit_system):
+    '''
+    Écrit une table d'enquête dans un répertoire, à raison d'un fichier .npy par variable d'entrée
+
+    Les variables des entités autres que les individus sont restreintes aux têtes d'entité et toutes les variables
+    sont converties dans le type de leur colonne. Les cases de déclaration constantes ne sont pas écrites et celles
+    qui sont peu remplies sont écrites sous forme creuse (indices et valeurs non nulles). Le fichier manifest.json
+    décrit les effectifs, le nombre de rôles ainsi que le type et le stockage de chaque variable.
+    '''
+    column_by_name = tax_benefit_system.column_by_name
+    symbol_by_entity_key_plural = dict(
+        (key_plural, entity_class.symbol)
+        for key_plural, entity_class in tax_benefit_system.entity_class_by_key_plural.iteritems()
+        )
+    manifest = dict(
+        columns = {},
+        count_by_entity_symbol = {},
+        roles_count_by_entity_symbol = {},
+        )
+    is_head_by_entity_symbol = {}
+    for entity_class in tax_benefit_system.entity_class_by_key_plural.itervalues():
+        if entity_class.is_persons_entity:
+            manifest['count_by_entity_symbol'][entity_class.symbol] = len(input_data_frame)
+        else:
+            roles = input_data_frame["qui{}".format(entity_class.symbol)].values
+            is_head_by_entity_symbol[entity_class.symbol] = is_head = roles == 0
+            manifest['count_by_entity_symbol'][entity_class.symbol] = int(is_head.sum())
+            manifest['roles_count_by_entity_symbol'][entity_class.symbol] = int(roles.max() + 1)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for column_name in iter_input_column_names(input_data_frame, column_by_name):
+        column = column_by_name[column_name]
+        entity_symbol = symbol_by_entity_key_plural[column.entity_key_plural]
+        array = input_data_frame[column_name].values
+        if entity_symbol in is_head_by_entity_symbol:
+            array = array[is_head_by_entity_symbol[entity_symbol]]
+        array = np.asarray(array, dtype = column.dtype)
+        column_manifest = manifest['columns'][column_name] = dict(
+            dtype = array.dtype.str,
+            entity = entity_symbol,
+            storage = 'dense',
+            )
+        if column.cerfa_field is not None and column.default == 0:
+            indices = np.flatnonzero(array)
+            if len(indices) == 0:
+                column_manifest['storage'] = 'constant'
+                column_manifest['value'] = 0
+                continue
+            if len(indices) <= SPARSE_DECLARATION_BOX_MAX_DENSITY * len(array):
+                column_manifest['storage'] = 'sparse'
+                np.savez(os.path.join(directory, u'{}.sparse.npz'.format(column_name)), indices = indices,
+                    values = array[indices])
+                continue
+        np.save(os.path.join(directory, u'{}.npy'.format(column_name)), array)
+
+    with open(os.path.join(directory, MANIFEST_FILENAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent = 2, sort_keys = True)
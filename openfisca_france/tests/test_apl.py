@@ -24,10 +24,84 @@
 
 
 import datetime
+import itertools
 
 from nose.tools import assert_equal
+import numpy as np
 
 from . import base
+from ..model import lgtm
+
+
+class FakeNode(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def new_fake_al():
+    # Distinct values for every parameter, so that a misplaced entry of the tables cannot go unnoticed.
+    return FakeNode(
+        forfait_charges = FakeNode(fc1 = 51.0, fc2 = 11.6),
+        loyers_plafond = FakeNode(
+            colocation = 0.75,
+            zone1 = FakeNode(L1 = 292.0, L2 = 352.0, L3 = 398.0, L4 = 57.8),
+            zone2 = FakeNode(L1 = 254.0, L2 = 311.0, L3 = 350.0, L4 = 50.9),
+            zone3 = FakeNode(L1 = 238.0, L2 = 288.0, L3 = 323.0, L4 = 46.3),
+            ),
+        R1 = FakeNode(taux1 = 0.45, taux2 = 0.63, taux3 = 0.72, taux4 = 0.81, taux5 = 0.27),
+        R2 = FakeNode(taux4 = 1.4, taux5 = 0.93),
+        rmi = 483.0,
+        TF = FakeNode(taux1 = 0.0283, taux2 = 0.0315, taux3 = 0.027, taux4 = 0.0238, taux5 = 0.0201, taux6 = 0.0185,
+            taux7 = -0.0006),
+        TL = FakeNode(taux1 = 0, taux2 = 0.0045, taux3 = 0.0068),
+        )
+
+
+def test_type_menage_al():
+    isol = np.array([True, False, False, True, False, True, False, True, False])
+    concub = np.array([False, True, False, False, True, False, True, False, True])
+    al_pac = np.array([0, 0, 0, 1, 1, 2, 3, 4, 6])
+    assert (lgtm.get_type_menage_al(isol, concub, al_pac) == [1, 2, 0, 3, 3, 4, 5, 6, 6]).all()
+
+
+def test_baremes_al():
+    al = new_fake_al()
+    bmaf = 399.0
+    al_pac, isol, coloc, zone_apl = (np.array(values) for values in zip(*itertools.product(
+        range(7), [True, False], [False, True], [0, 1, 2, 3, 4])))
+    concub = ~isol
+    L2, C, R1, R2, TF, L_Ref = lgtm.calculate_baremes_al(al, bmaf, isol, concub, al_pac, coloc, zone_apl)
+
+    # Expressions of _al before the scales were evaluated by table lookup
+    lp_taux = (~coloc) * 1 + coloc * al.loyers_plafond.colocation
+    z1 = al.loyers_plafond.zone1
+    z2 = al.loyers_plafond.zone2
+    z3 = al.loyers_plafond.zone3
+    Lz1 = ((isol) * (al_pac == 0) * z1.L1 + (concub) * (al_pac == 0) * z1.L2 + (al_pac > 0) * z1.L3 +
+        (al_pac > 1) * (al_pac - 1) * z1.L4) * lp_taux
+    Lz2 = ((isol) * (al_pac == 0) * z2.L1 + (concub) * (al_pac == 0) * z2.L2 + (al_pac > 0) * z2.L3 +
+        (al_pac > 1) * (al_pac - 1) * z2.L4) * lp_taux
+    Lz3 = ((isol) * (al_pac == 0) * z3.L1 + (concub) * (al_pac == 0) * z3.L2 + (al_pac > 0) * z3.L3 +
+        (al_pac > 1) * (al_pac - 1) * z3.L4) * lp_taux
+    assert np.allclose(L2, Lz1 * (zone_apl == 1) + Lz2 * (zone_apl == 2) + Lz3 * (zone_apl == 3))
+    P_fc = al.forfait_charges
+    assert np.allclose(C, (~coloc) * (P_fc.fc1 + al_pac * P_fc.fc2) +
+        (coloc) * ((isol * 0.5 + concub) * P_fc.fc1 + al_pac * P_fc.fc2))
+    rmi = al.rmi
+    assert np.allclose(R1, al.R1.taux1 * rmi * (isol) * (al_pac == 0) + al.R1.taux2 * rmi * (concub) * (al_pac == 0) +
+        al.R1.taux3 * rmi * (al_pac == 1) + al.R1.taux4 * rmi * (al_pac >= 2) +
+        al.R1.taux5 * rmi * (al_pac > 2) * (al_pac - 2))
+    assert np.allclose(R2, al.R2.taux4 * bmaf * (al_pac >= 2) + al.R2.taux5 * bmaf * (al_pac > 2) * (al_pac - 2))
+    assert np.allclose(TF, al.TF.taux1 * (isol) * (al_pac == 0) + al.TF.taux2 * (concub) * (al_pac == 0) +
+        al.TF.taux3 * (al_pac == 1) + al.TF.taux4 * (al_pac == 2) + al.TF.taux5 * (al_pac == 3) +
+        al.TF.taux6 * (al_pac >= 4) + al.TF.taux7 * (al_pac > 4) * (al_pac - 4))
+    assert np.allclose(L_Ref, z2.L1 * (isol) * (al_pac == 0) + z2.L2 * (concub) * (al_pac == 0) +
+        z2.L3 * (al_pac >= 1) + z2.L4 * (al_pac > 1) * (al_pac - 1))
+
+    RL = np.concatenate((np.linspace(0, 3, 301), L2[L_Ref > 0] / L_Ref[L_Ref > 0]))
+    TL = lgtm.calculate_taux_loyer_al(al.TL, RL)
+    assert np.allclose(TL, np.maximum(np.maximum(0, al.TL.taux2 * (RL - 0.45)),
+        al.TL.taux3 * (RL - 0.75) + al.TL.taux2 * (0.75 - 0.45)))
 
 
 def test_zone_1():
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import copy
+import datetime
+
+from openfisca_core import periods
+
+from . import base
+
+
+def test_batch_simulation():
+    year = 2013
+    test_cases = [
+        dict(
+            familles = [dict(parents = ['parent1'])],
+            foyers_fiscaux = [dict(declarants = ['parent1'])],
+            individus = [dict(id = 'parent1', birth = datetime.date(year - 40, 1, 1), sali = sali)],
+            menages = [dict(personne_de_reference = 'parent1')],
+            )
+        for sali in (0, 15000)
+        ] + [
+        dict(
+            familles = [dict(parents = ['parent1', 'parent2'], enfants = ['enfant1'])],
+            foyers_fiscaux = [dict(declarants = ['parent1', 'parent2'], personnes_a_charge = ['enfant1'])],
+            individus = [
+                dict(id = 'parent1', birth = datetime.date(year - 40, 1, 1), sali = 30000),
+                dict(id = 'parent2', birth = datetime.date(year - 38, 1, 1), sali = 20000),
+                dict(id = 'enfant1', birth = datetime.date(year - 9, 1, 1)),
+                ],
+            menages = [dict(personne_de_reference = 'parent1', conjoint = 'parent2', enfants = ['enfant1'])],
+            ),
+        ]
+    scenario = base.tax_benefit_system.new_scenario()
+    scenario.period = periods.period(year)
+    simulation, batch = scenario.new_batch_simulation(copy.deepcopy(test_cases))
+    for column_name in ('salnet', 'af', 'irpp', 'revdisp'):
+        for test_case, batch_array in zip(test_cases, batch.calculate(simulation, column_name)):
+            single_simulation = base.tax_benefit_system.new_scenario().init_from_attributes(
+                period = periods.period(year),
+                test_case = copy.deepcopy(test_case),
+                ).new_simulation(debug = True)
+            base.assert_near(batch_array, single_simulation.calculate(column_name), error_margin = 0.01)
+
+
+if __name__ == '__main__':
+    import logging
+    import sys
+
+    logging.basicConfig(level = logging.ERROR, stream = sys.stdout)
+    test_batch_simulation()
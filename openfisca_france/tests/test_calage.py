@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+from ..model import calage
+
+
+class FakeEntity(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def new_fake_formula(idmen, quimen, count):
+    persons = FakeEntity(holder_by_name = dict(
+        idmen = FakeEntity(array = idmen),
+        quimen = FakeEntity(array = quimen),
+        ))
+    menages = FakeEntity(count = count, index_for_person_variable_name = 'idmen',
+        role_for_person_variable_name = 'quimen', simulation = FakeEntity(persons = persons))
+    return FakeEntity(holder = FakeEntity(entity = menages))
+
+
+def test_count_by_menage():
+    # The third household has nobody matching the condition, the fourth nobody at all.
+    idmen = np.array([0, 0, 1, 2, 2, 2, 1])
+    quimen = np.array([0, 2, 0, 0, 1, 2, 1])
+    formula = new_fake_formula(idmen, quimen, 4)
+    condition = np.array([True, True, False, False, False, False, True])
+    assert (calage.count_by_menage(formula, condition) == [2, 1, 0, 0]).all()
+    assert (calage.get_quimen(formula) == quimen).all()
+
+
+def test_typmen15():
+    # nbinde, cohab, act_cpl, cplx, act_enf and the expected typmen15, for each of the 15 household types
+    cases = np.array([
+        (1, 0, 1, 0, 0, 1),
+        (1, 0, 0, 0, 0, 2),
+        (2, 0, 1, 0, 0, 3),
+        (2, 0, 0, 0, 1, 4),
+        (3, 0, 0, 0, 0, 5),
+        (2, 1, 1, 0, 0, 6),
+        (2, 1, 2, 0, 0, 7),
+        (2, 1, 0, 0, 0, 8),
+        (4, 1, 1, 0, 1, 9),
+        (3, 1, 2, 0, 0, 10),
+        (3, 1, 0, 0, 1, 11),
+        (3, 1, 0, 0, 0, 12),
+        (3, 0, 1, 1, 0, 13),
+        (4, 1, 1, 1, 1, 14),
+        (3, 1, 0, 1, 0, 15),
+        ])
+    nbinde, cohab, act_cpl, cplx, act_enf, typmen15 = cases.T
+    assert (calage._typmen15(nbinde, cohab == 1, act_cpl, cplx == 1, act_enf) == typmen15).all()
+
+
+if __name__ == '__main__':
+    import logging
+    import nose
+    import sys
+
+    logging.basicConfig(level = logging.ERROR, stream = sys.stdout)
+    nose.core.runmodule(argv = [__file__, '-v'])
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+from ..calibration import build_design_matrix, calibrate
+
+
+def build_survey(count = 1000):
+    random_state = np.random.RandomState(12345)
+    typmen15 = random_state.randint(1, 16, count)
+    nbinde = random_state.randint(1, 7, count)
+    idmen = np.repeat(np.arange(count), nbinde)
+    ageq = random_state.randint(0, 13, len(idmen))
+    revenu = random_state.lognormal(10, 1, count)
+    weights = random_state.uniform(500, 1500, count)
+    return weights, dict(
+        ageq = (idmen, ageq),
+        nbinde = (np.arange(count), nbinde),
+        revenu = (np.arange(count), revenu),
+        typmen15 = (np.arange(count), typmen15),
+        )
+
+
+def check_calibration(method, bounds):
+    weights, values_by_name = build_survey()
+    margins = {}
+    for name in ('ageq', 'nbinde', 'typmen15'):
+        index, values = values_by_name[name]
+        margins[name] = dict(
+            (category, 1.05 * weights[index][values == category].sum())
+            for category in np.unique(values)
+            )
+    index, revenu = values_by_name['revenu']
+    margins['revenu'] = 1.1 * (weights * revenu).sum()
+    design_matrix, targets, labels = build_design_matrix(margins, values_by_name, len(weights))
+    assert len(labels) == 13 + 6 + 15 + 1
+
+    calibrated_weights, report = calibrate(weights, design_matrix, targets, bounds = bounds, method = method)
+    assert report['converged'], report
+    assert np.allclose(design_matrix.T.dot(calibrated_weights), targets, rtol = 1e-5)
+    if bounds is not None:
+        ratio = calibrated_weights / weights
+        assert bounds[0] - 1e-9 <= ratio.min() and ratio.max() <= bounds[1] + 1e-9, (ratio.min(), ratio.max())
+
+
+def test_calibration():
+    for method, bounds in (
+            ('linear', None),
+            ('linear', (.5, 2)),
+            ('logit', (.5, 2)),
+            ('raking', None),
+            ):
+        yield check_calibration, method, bounds
+
+
+if __name__ == '__main__':
+    import logging
+    import nose
+    import sys
+
+    logging.basicConfig(level = logging.ERROR, stream = sys.stdout)
+    nose.core.runmodule(argv = [__file__, '-v'])
@@ -26,8 +26,12 @@
 import datetime
 
 from nose.tools import assert_less
+import numpy as np
+from openfisca_core.taxscales import MarginalRateTaxScale
 
 from . import base
+from ..model import irpp
+from ..model.base import ProjectionCache
 
 
 def test_irpp():
@@ -224,6 +228,22 @@ def test_irpp():
             yield check, ctx
 
 
+def test_calculate_quotient_familial():
+    bareme = MarginalRateTaxScale(name = 'bareme')
+    for threshold, rate in ((0, 0), (6011, 0.055), (11991, 0.14), (26631, 0.3), (71397, 0.41), (151200, 0.45)):
+        bareme.add_bracket(threshold, rate)
+    rni = np.array([-1000, 0, 6011, 20000, 80000, 400000], dtype = float)
+    nbptr = np.array([1, 1, 1.5, 2, 3, 2.5])
+    nb_adult = np.array([1, 1, 1, 2, 2, 2], dtype = float)
+    impot = irpp.calculate_quotient_familial(rni, nbptr, nb_adult, bareme)
+    assert np.allclose(impot[0], nbptr * bareme.calc(rni / nbptr))
+    assert np.allclose(impot[1], nb_adult * bareme.calc(rni / nb_adult))
+    projection_cache = ProjectionCache()
+    impot = irpp.calculate_quotient_familial(rni, nbptr, nb_adult, bareme, projection_cache = projection_cache)
+    assert irpp.calculate_quotient_familial(rni, nbptr, nb_adult, bareme, projection_cache = projection_cache) is impot
+    assert projection_cache.statistics['hits'] == 1
+
+
 if __name__ == '__main__':
     import logging
     import sys
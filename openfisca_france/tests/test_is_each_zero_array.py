@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import datetime
+
+import numpy as np
+
+from .base import tax_benefit_system
+from ..model import base
+
+
+def _fake_reduction(marpac, f7xx, f7yy, P = 0.5):
+    '''
+    Réduction fictive
+    '''
+    if base.is_each_zero_array('_fake_reduction', f7xx, f7yy):
+        return base.get_zero_array(f7xx.size)
+    return P * (f7xx + f7yy) * (marpac + 1)
+
+
+def test_is_each_zero_array():
+    calls_count = base.zero_shortcut_calls_count_by_function_name['_fake_reduction']
+    hits_count = base.zero_shortcut_hits_count_by_function_name['_fake_reduction']
+    marpac = np.array([0, 1, 1])
+    zero = np.zeros(3, dtype = np.int32)
+    result = _fake_reduction(marpac, zero, base.new_constant_array(3, np.int32))
+    assert (result == 0).all()
+    assert result.size == 3
+    assert base.zero_shortcut_hits_count_by_function_name['_fake_reduction'] == hits_count + 1
+
+    f7xx = np.array([0, 100, 0], dtype = np.int32)
+    result = _fake_reduction(marpac, f7xx, zero)
+    assert (result == 0.5 * f7xx * (marpac + 1)).all()
+    assert base.zero_shortcut_calls_count_by_function_name['_fake_reduction'] == calls_count + 2
+    assert base.zero_shortcut_hits_count_by_function_name['_fake_reduction'] == hits_count + 1
+
+
+def check_cappme_2013(foyer_fiscal, shortcut_taken):
+    hits_count = base.zero_shortcut_hits_count_by_function_name['_cappme_2013']
+    simulation = tax_benefit_system.new_scenario().init_single_entity(
+        period = 2013,
+        parent1 = dict(
+            birth = datetime.date(1970, 1, 1),
+            sali = 20000,
+            ),
+        foyer_fiscal = foyer_fiscal,
+        ).new_simulation()
+    cappme = simulation.calculate('cappme')
+    assert base.zero_shortcut_hits_count_by_function_name['_cappme_2013'] == hits_count + (1 if shortcut_taken else 0)
+    return cappme
+
+
+def test_is_each_zero_array_in_cappme_2013():
+    calls_count = base.zero_shortcut_calls_count_by_function_name['_cappme_2013']
+    cappme = check_cappme_2013(dict(), True)
+    assert (cappme == 0).all()
+    cappme = check_cappme_2013(dict(f7cf = 1000), False)
+    assert (cappme > 0).all()
+    assert base.zero_shortcut_calls_count_by_function_name['_cappme_2013'] == calls_count + 2
+
+
+if __name__ == '__main__':
+    import logging
+    import nose
+    import sys
+
+    logging.basicConfig(level = logging.ERROR, stream = sys.stdout)
+    nose.core.runmodule(argv = [__file__, '-v'])
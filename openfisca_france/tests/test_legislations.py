@@ -26,8 +26,10 @@
 import json
 import xml.etree.ElementTree
 
+import numpy as np
 from openfisca_core import conv, legislations, legislationsxml
 from . import base
+from ..model.cotisations_sociales import preprocessing
 
 
 def check_legislation_xml_file(year):
@@ -76,6 +78,26 @@ def check_legislation_xml_file(year):
     # Create tax_benefit system only now, to be able to debug XML validation errors in above code.
     if base.tax_benefit_system.preprocess_compact_legislation is not None:
         base.tax_benefit_system.preprocess_compact_legislation(compact_legislation)
+        check_tax_scales_bundles(compact_legislation)
+
+        # Same parameters: the preprocessed nodes are taken from the cache.
+        hits = preprocessing.preprocessing_cache_statistics['hits']
+        other_compact_legislation = legislations.compact_dated_node_json(legislation_json)
+        base.tax_benefit_system.preprocess_compact_legislation(other_compact_legislation)
+        assert preprocessing.preprocessing_cache_statistics['hits'] == hits + 1
+        assert other_compact_legislation.cotsoc.cotisations_salarie is compact_legislation.cotsoc.cotisations_salarie
+
+
+def check_tax_scales_bundles(compact_legislation):
+    salbrut = np.linspace(0, 500000, 501)
+    cotsoc = compact_legislation.cotsoc
+    for cotisation_name in ('cotisations_employeur', 'cotisations_salarie'):
+        bundle_by_category = getattr(cotsoc, cotisation_name + '_bundles').__dict__
+        for category, tax_scale_by_name in getattr(cotsoc, cotisation_name).__dict__.iteritems():
+            amount_by_name = bundle_by_category[category].calc(salbrut)
+            for name, tax_scale in tax_scale_by_name.iteritems():
+                assert np.allclose(amount_by_name[name], tax_scale.calc(salbrut)), \
+                    u'{} {} {}'.format(cotisation_name, category, name).encode('utf-8')
 
 
 def test_legislation_xml_file():
@@ -25,6 +25,9 @@
 
 import datetime
 
+import numpy as np
+
+from ..model import inversion_revenus
 from ..model.cotisations_sociales.travail import CAT
 from . import base
 
@@ -142,6 +145,19 @@ def test_salnet_to_salbrut():
             yield check_salnet_to_salbrut, count, salbrut_max, salbrut_min, type_sal, year
 
 
+def test_solve_increasing_function():
+    brut = np.linspace(0, 100000, 1001)
+    # Fonction croissante, linéaire par morceaux et discontinue, à la manière d'un passage du brut au net
+    function = lambda brut: 0.78 * brut - 0.08 * np.maximum(brut - 37000, 0) + 50 * (brut > 60000)
+    solution, unconverged_count = inversion_revenus.solve_increasing_function(function, function(brut))
+    assert unconverged_count == 0, unconverged_count
+    assert (abs(solution - brut) < 0.1).all(), str((brut, solution))
+
+    solution, unconverged_count = inversion_revenus.solve_increasing_function(function, function(brut),
+        max_iterations = 1)
+    assert unconverged_count > 0
+
+
 if __name__ == '__main__':
     import logging
     import sys
@@ -150,3 +166,4 @@ if __name__ == '__main__':
     for test in (test_chonet_to_chobrut, test_rstnet_to_rstbrut, test_salnet_to_salbrut):
         for function_and_arguments in test():
             function_and_arguments[0](*function_and_arguments[1:])
+    test_solve_increasing_function()
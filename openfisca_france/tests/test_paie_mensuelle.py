@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import division
+
+import datetime
+
+import numpy as np
+from openfisca_core import periods
+
+from ..model.cotisations_sociales.paie_mensuelle import calculate_monthly_payroll, get_monthly_compact_legislations
+from ..model.cotisations_sociales.travail import CAT
+from . import base
+
+
+def check_constant_monthly_payroll(type_sal_category, year):
+    # A constant monthly wage must yield, over the year, the amounts computed from the annual wage.
+    simulation = new_annual_simulation(type_sal_category, year, np.linspace(0, 120000, 13))
+    monthly_amount_by_name = calculate_monthly_payroll(
+        year,
+        get_monthly_compact_legislations(simulation, year),
+        np.tile(simulation.calculate('salbrut')[:, np.newaxis] / 12, (1, 12)),
+        simulation.calculate('type_sal'),
+        hsup = np.tile(simulation.calculate('hsup')[:, np.newaxis] / 12, (1, 12)),
+        indemnite_residence = np.tile(simulation.calculate('indemnite_residence')[:, np.newaxis] / 12, (1, 12)),
+        primes = np.tile(simulation.calculate('primes')[:, np.newaxis] / 12, (1, 12)),
+        supp_familial_traitement = np.tile(simulation.calculate('supp_familial_traitement')[:, np.newaxis] / 12,
+            (1, 12)),
+        taille_entreprise = simulation.calculate('taille_entreprise'),
+        taux_accident_travail = simulation.calculate('taux_accident_travail'),
+        )
+    for name in ('alleg_fillon', 'cotpat', 'cotsal', 'crdssal', 'csgsald', 'csgsali'):
+        base.assert_near(monthly_amount_by_name[name].sum(axis = 1), simulation.calculate(name), error_margin = 1)
+
+
+def check_varying_monthly_payroll(type_sal_category, year):
+    # Each month must be computed with its own monthly ceiling: the amount of a month is the twelfth of the annual
+    # amount of a constant wage equal to the wage of this month, whatever the wages of the other months.
+    monthly_wages = np.array([0, 1000, 1500, 2000, 2500, 3000, 3200, 3500, 4500, 6000, 10000, 15000])
+    simulation = new_annual_simulation(type_sal_category, year, 12 * monthly_wages)
+    shifted_months = (np.arange(12)[:, np.newaxis] + np.arange(12)[np.newaxis, :]) % 12
+    monthly_amount_by_name = calculate_monthly_payroll(
+        year,
+        get_monthly_compact_legislations(simulation, year),
+        monthly_wages[shifted_months],
+        simulation.calculate('type_sal'),
+        taille_entreprise = simulation.calculate('taille_entreprise'),
+        taux_accident_travail = simulation.calculate('taux_accident_travail'),
+        )
+    for name in ('alleg_fillon', 'cotpat', 'cotsal', 'crdssal', 'csgsald', 'csgsali'):
+        base.assert_near(monthly_amount_by_name[name], simulation.calculate(name)[shifted_months] / 12,
+            error_margin = 0.1)
+
+
+def new_annual_simulation(type_sal_category, year, salbrut):
+    simulation = base.tax_benefit_system.new_scenario().init_single_entity(
+        axes = [dict(name = 'salbrut', max = salbrut[-1], min = salbrut[0], count = len(salbrut))],
+        period = periods.period(year),
+        parent1 = dict(
+            birth = datetime.date(year - 40, 1, 1),
+            type_sal = CAT[type_sal_category],
+            ),
+        ).new_simulation(debug = True)
+    simulation.get_or_new_holder('salbrut').set_array(simulation.period, np.asarray(salbrut, dtype = float))
+    return simulation
+
+
+def test_constant_monthly_payroll():
+    for type_sal_category in ('prive_non_cadre', 'prive_cadre', 'public_titulaire_etat',
+            'public_titulaire_territoriale', 'public_non_titulaire'):
+        yield check_constant_monthly_payroll, type_sal_category, 2014
+
+
+def test_varying_monthly_payroll():
+    for type_sal_category in ('prive_non_cadre', 'prive_cadre'):
+        yield check_varying_monthly_payroll, type_sal_category, 2014
+
+
+if __name__ == '__main__':
+    import logging
+    import nose
+    import sys
+
+    logging.basicConfig(level = logging.ERROR, stream = sys.stdout)
+    nose.core.runmodule(argv = [__file__, '-v'])
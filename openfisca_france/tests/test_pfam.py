@@ -25,7 +25,10 @@
 
 import datetime
 
+import numpy as np
+
 from . import base
+from ..model import pfam
 
 
 def check_af2(year):
@@ -405,6 +408,18 @@ def test_af3qua():
 #        yield check_af5, year
 
 
+def test_role_matrix_helpers():
+    # Deux familles de trois places d'enfant : la seconde n'a qu'un enfant, les places vacantes valent -9999.
+    ages = np.array([[4, 12, 19], [7, -9999, -9999]])
+    agems = np.array([[50, 150, 230], [-9999, -9999, -9999]])
+    smic55 = np.array([[False, False, True], [False, False, False]])
+    assert (pfam.nb_enf(ages, smic55, 0, 20) == [2, 1]).all()
+    assert (pfam.nb_enf(ages, smic55, 10, 20) == [1, 0]).all()
+    assert (pfam.age_aine(ages, smic55, 0, 20) == [12, 7]).all()
+    assert (pfam.age_aine(ages, smic55, 13, 20) == [-9999, -9999]).all()
+    assert (pfam.age_en_mois_benjamin(agems) == [50, 12 * 9999]).all()
+
+
 if __name__ == '__main__':
     import logging
     import sys
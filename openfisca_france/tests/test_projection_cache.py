@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import datetime
+import gc
+import weakref
+
+import numpy as np
+
+from .base import tax_benefit_system
+from ..model import base
+
+
+def test_projection_cache_invalidation():
+    projection_cache = base.ProjectionCache()
+    array = np.arange(4)
+    projection = array * 2
+    assert projection_cache.get('key', (array,)) is None
+    projection_cache.set('key', (array,), projection)
+    assert projection_cache.get('key', (array,)) is projection
+    assert projection_cache.get('key', (array.copy(),)) is None
+    assert projection_cache.statistics == dict(evictions = 0, hits = 1, invalidations = 1, misses = 2)
+    assert projection_cache.bytes == 0
+
+
+def test_projection_cache_budget():
+    projection_cache = base.ProjectionCache(max_bytes = 100)
+    array = np.arange(4)
+    for key in range(5):
+        projection_cache.set(key, (array,), np.zeros(4))  # 32 bytes each
+    assert projection_cache.projection_by_key.keys() == [2, 3, 4]
+    assert projection_cache.bytes == 96
+    assert projection_cache.statistics['evictions'] == 2
+    projection_cache.set('big', (array,), np.zeros(100))
+    assert 'big' not in projection_cache.projection_by_key
+    projection_cache.invalidate()
+    assert projection_cache.bytes == 0
+
+
+def test_projection_cache_releases_simulation():
+    simulation = tax_benefit_system.new_scenario().init_single_entity(
+        period = 2013,
+        parent1 = dict(
+            birth = datetime.date(1970, 1, 1),
+            sali = 20000,
+            ),
+        parent2 = dict(
+            birth = datetime.date(1972, 1, 1),
+            ),
+        ).new_simulation()
+    simulation.calculate('revdisp')
+    assert base.get_projection_cache(simulation).statistics['misses'] > 0
+    simulation_reference = weakref.ref(simulation)
+    del simulation
+    gc.collect()
+    assert simulation_reference() is None
+
+
+def test_projection_cache_of_clone():
+    simulation = tax_benefit_system.new_scenario().init_single_entity(
+        period = 2013,
+        parent1 = dict(
+            birth = datetime.date(1970, 1, 1),
+            sali = 20000,
+            ),
+        ).new_simulation()
+    projection_cache = base.get_projection_cache(simulation)
+    projection_cache.max_bytes = 10 ** 6
+    simulation.calculate('revdisp')
+    statistics = projection_cache.statistics.copy()
+    clone = simulation.clone()
+    clone.calculate('revdisp')
+    clone_projection_cache = base.get_projection_cache(clone)
+    assert clone_projection_cache is not projection_cache
+    assert clone_projection_cache.max_bytes == 10 ** 6
+    assert clone_projection_cache.statistics['misses'] > 0
+    assert projection_cache.statistics == statistics
+    assert base.get_projection_cache(simulation) is projection_cache
+    clone_reference = weakref.ref(clone)
+    del clone, clone_projection_cache
+    gc.collect()
+    assert clone_reference() is None
+
+
+if __name__ == '__main__':
+    import logging
+    import nose
+    import sys
+
+    logging.basicConfig(level = logging.ERROR, stream = sys.stdout)
+    nose.core.runmodule(argv = [__file__, '-v'])
@@ -27,6 +27,7 @@ import datetime
 import json
 
 from nose.tools import assert_equal
+from openfisca_core import periods
 
 from . import base
 
@@ -453,6 +454,16 @@ def test_menage_1_personne_de_reference_1_conjoint_2_enfants():
         )
 
 
+def test_test_case_converter_is_cached():
+    year = 2013
+    converter = base.tax_benefit_system.new_scenario().make_json_or_python_to_test_case(
+        period = periods.period(year), repair = True)
+    assert converter is base.tax_benefit_system.new_scenario().make_json_or_python_to_test_case(
+        period = periods.period(year), repair = True)
+    assert converter is not base.tax_benefit_system.new_scenario().make_json_or_python_to_test_case(
+        period = periods.period(year), repair = False)
+
+
 if __name__ == '__main__':
     import logging
     import sys
@@ -465,3 +476,4 @@ if __name__ == '__main__':
     test_foyer_fiscal_2_declarants_2_personnes_a_charge()
     test_menage_1_personne_de_reference_3_enfants()
     test_menage_1_personne_de_reference_1_conjoint_2_enfants()
+    test_test_case_converter_is_cached()
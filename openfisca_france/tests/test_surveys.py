@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+
+# OpenFisca -- A versatile microsimulation software
+# By: OpenFisca Team <contact@openfisca.fr>
+#
+# Copyright (C) 2011, 2012, 2013, 2014 OpenFisca Team
+# https://github.com/openfisca
+#
+# This file is part of OpenFisca.
+#
+# OpenFisca is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# OpenFisca is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import shutil
+import tempfile
+
+import numpy as np
+from openfisca_core import periods, simulations
+import pandas
+
+from .. import surveys
+from ..surveys import attach_survey_directory, fill_simulation_from_data_frame, iter_entity_aligned_chunks, \
+    SurveyScenario, write_survey_directory
+from .base import tax_benefit_system
+
+
+def build_input_data_frame(sizes):
+    idmen = np.repeat(np.arange(len(sizes)), sizes)
+    role = np.concatenate([np.arange(size) for size in sizes])
+    return pandas.DataFrame(dict(
+        idfam = idmen,
+        idfoy = idmen,
+        idmen = idmen,
+        noindiv = np.arange(len(idmen)),
+        quifam = role,
+        quifoy = role,
+        quimen = role,
+        ))
+
+
+def test_entity_aligned_chunks_size():
+    chunk_size = 10
+    sizes = np.random.RandomState(12345).randint(1, 7, 200)
+    sizes[50] = 12  # A household larger than a chunk
+    input_data_frame = build_input_data_frame(sizes)
+    idmen_by_noindiv = input_data_frame['idmen'].values
+    chunk_by_noindiv = np.empty(len(input_data_frame), dtype = int)
+    for index, chunk_data_frame in enumerate(iter_entity_aligned_chunks(input_data_frame, chunk_size)):
+        noindiv = chunk_data_frame['noindiv'].values
+        chunk_by_noindiv[noindiv] = index
+        households_count = len(np.unique(idmen_by_noindiv[noindiv]))
+        # Only a single household larger than chunk_size may exceed it.
+        assert len(chunk_data_frame) <= chunk_size or households_count == 1
+        assert (chunk_data_frame['idmen'].values[chunk_data_frame['quimen'].values == 0] ==
+            np.arange(households_count)).all()
+    assert len(np.unique(chunk_by_noindiv)) == index + 1
+    # No household is split between chunks.
+    for idmen in range(len(sizes)):
+        assert len(np.unique(chunk_by_noindiv[idmen_by_noindiv == idmen])) == 1
+
+
+def test_simulation_from_survey_directory():
+    year = 2013
+    sizes = np.array([1, 2, 3, 1, 2])
+    input_data_frame = build_input_data_frame(sizes)
+    input_data_frame['sali'] = np.arange(len(input_data_frame)) * 5000
+    input_data_frame['f7uf'] = np.where(input_data_frame['quifoy'].values == 0, 300, 0)
+    input_data_frame['f7ud'] = 0  # Stored as a constant
+    directory = tempfile.mkdtemp()
+    try:
+        write_survey_directory(input_data_frame, directory, tax_benefit_system)
+        directory_simulation = simulations.Simulation(period = periods.period(year),
+            tax_benefit_system = tax_benefit_system)
+        attach_survey_directory(directory_simulation, directory)
+        data_frame_simulation = simulations.Simulation(period = periods.period(year),
+            tax_benefit_system = tax_benefit_system)
+        fill_simulation_from_data_frame(data_frame_simulation, input_data_frame)
+        for column_name in ('sali', 'f7ud', 'f7uf', 'irpp', 'revdisp'):
+            directory_array = directory_simulation.calculate(column_name)
+            assert (directory_array == data_frame_simulation.calculate(column_name)).all(), column_name
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_calculate_by_chunk_in_processes():
+    sizes = np.random.RandomState(12345).randint(1, 5, 40)
+    input_data_frame = build_input_data_frame(sizes)
+    input_data_frame['sali'] = np.arange(len(input_data_frame)) * 1000
+    input_data_frame['type_sal'] = np.arange(len(input_data_frame)) % 2
+    survey_scenario = SurveyScenario()
+    survey_scenario.compact_dtypes = True
+    survey_scenario.input_data_frame = input_data_frame
+    survey_scenario.projection_cache_max_bytes = 10 ** 6
+    survey_scenario.tax_benefit_system = tax_benefit_system
+    survey_scenario.tax_benefit_system_class = tax_benefit_system.__class__
+    survey_scenario.year = 2013
+    # Survey specific columns are not needed here: the pool workers, forked from this process, use the plain
+    # tax-benefit system too.
+    adapt_to_survey = surveys.adapt_to_survey
+    surveys.adapt_to_survey = lambda tax_benefit_system_class: tax_benefit_system_class
+    try:
+        column_names = ['revdisp', 'type_sal']
+        result_by_column_name = survey_scenario.calculate_by_chunk(column_names, chunk_size = 20)
+        pool_result_by_column_name = survey_scenario.calculate_by_chunk(column_names, chunk_size = 20,
+            processes = 2)
+    finally:
+        surveys.adapt_to_survey = adapt_to_survey
+    # In compact mode, enumerations are stored as int8, in the pool workers as well.
+    assert result_by_column_name['type_sal'].dtype == np.int8
+    for column_name in column_names:
+        assert pool_result_by_column_name[column_name].dtype == result_by_column_name[column_name].dtype
+        assert (pool_result_by_column_name[column_name] == result_by_column_name[column_name]).all()
+
+
+if __name__ == '__main__':
+    import logging
+    import nose
+    import sys
+
+    logging.basicConfig(level = logging.ERROR, stream = sys.stdout)
+    nose.core.runmodule(argv = [__file__, '-v'])